@@ -1,5 +1,7 @@
 from .nrkmeans import NrKmeans
 from .autonr import AutoNR
+from .minibatch_nrkmeans import MiniBatchNrKmeans
 
 __all__ = ['NrKmeans',
-           'AutoNR']
\ No newline at end of file
+           'AutoNR',
+           'MiniBatchNrKmeans']
\ No newline at end of file
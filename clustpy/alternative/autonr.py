@@ -10,11 +10,12 @@ from scipy.spatial.distance import pdist, squareform
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 from scipy.spatial.distance import cdist
+from joblib import Parallel, delayed, effective_n_jobs
 
 
 def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspaces: int, max_n_clusters: int,
             mdl_for_noisespace: bool, max_distance: float, precision: float, similarity_threshold: float,
-            random_state: np.random.RandomState, debug: bool) -> (NrKmeans, float, list):
+            random_state: np.random.RandomState, debug: bool, n_jobs: int = None) -> (NrKmeans, float, list):
     """
     Start the actual AutoNR clustering procedure on the input data set.
 
@@ -42,6 +43,8 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
         use a fixed random state to get a repeatable solution
     debug : bool
         If true, additional information will be printed to the console
+    n_jobs : int
+        Number of candidate operations and NrKmeans repetitions that are evaluated concurrently. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -83,63 +86,26 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
             order.append(len(best_nrkmeans.n_clusters) - 1)
         else:
             order = list(reversed(np.argsort(best_subspace_costs)))
-        # Go through subspaces and try to improve mdl costs
-        for subspace_nr in order:
-            if debug:
-                print("==================================================")
-                print(
-                    "Try splitting subspace_nr {0} with n_clusters = [{1}] and m = {2}. Costs = {3}".format(subspace_nr,
-                                                                                                            best_nrkmeans.n_clusters[
-                                                                                                                subspace_nr],
-                                                                                                            best_nrkmeans.m[
-                                                                                                                subspace_nr],
-                                                                                                            best_subspace_costs[
-                                                                                                                subspace_nr]))
-            # Check if dimensionality is bigger than 1 else subspace_nr can not be splitted any more
-            # Noise space can still be converted to cluster space
-            split_cluster_count = best_nrkmeans.n_clusters[subspace_nr]
-            if best_nrkmeans.m[subspace_nr] == 1 and best_nrkmeans.n_clusters[subspace_nr] > 1:
-                continue
-            # If there are more than one subspace_nr just search within the turned subspace_nr
-            if len(best_nrkmeans.n_clusters) > 1:
-                X_subspace = best_nrkmeans.transform_subspace(X, subspace_nr)
-            else:
-                X_subspace = X.copy()
-            # Try to find more structure in the noise space
-            if best_nrkmeans.n_clusters[subspace_nr] == 1:
-                nrkmeans_split, mdl_total_split, mdl_threshold_split, subspace_costs_split = _split_noise_space(
-                    X_subspace, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs, all_mdl_costs,
-                    nrkmeans_repetitions, outliers, max_n_clusters, mdl_for_noisespace, max_distance, precision,
-                    similarity_threshold, random_state, debug)
-            # Split existing cluster space
-            else:
-                nrkmeans_split, mdl_total_split, mdl_threshold_split, subspace_costs_split = _split_cluster_space(
-                    X_subspace, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs, all_mdl_costs,
-                    nrkmeans_repetitions, outliers, mdl_for_noisespace, max_distance, precision, random_state, debug)
-            # ============================= FULL SPACE =====================================
-            # Execute new found n_clusters for full space (except number of subspaces was 1)
-            if len(best_nrkmeans.n_clusters) > 1 and mdl_threshold_split < best_subspace_costs[subspace_nr]:
-                # Get parameters for full space execution
-                n_clusters_full, centers_full, P_full, V_full = _get_full_space_parameters_split(X, best_nrkmeans,
-                                                                                                 nrkmeans_split,
-                                                                                                 subspace_nr)
-                if debug:
-                    print("==================================================")
-                    print("Full space execution with n_clusters = {0}. Current best costs = {1}".format(n_clusters_full,
-                                                                                                        best_mdl_overall))
-                nrkmeans, mdl_cost, subspace_costs = _execute_nrkmeans(X,
-                                                                       n_clusters_full,
-                                                                       1,
-                                                                       random_state,
-                                                                       centers_full, V_full, P_full,
-                                                                       outliers=outliers, debug=debug,
-                                                                       mdl_for_noisespace=mdl_for_noisespace,
-                                                                       max_distance=max_distance, precision=precision)
-                all_mdl_costs.append(_Nrkmeans_Mdl_Costs(True, mdl_cost,
-                                                         "noise_space_split" if split_cluster_count else "cluster_space_split"))
-                if mdl_cost < best_mdl_overall:
-                    if debug:
-                        print("!!! Better solution found !!!")
+        # Subspaces with a dimensionality of 1 can not be split any more. Noise space can still be converted to cluster space
+        candidates = [subspace_nr for subspace_nr in order if
+                      best_nrkmeans.m[subspace_nr] > 1 or best_nrkmeans.n_clusters[subspace_nr] == 1]
+        # Each candidate gets its own random state, so that the result does not depend on the number of concurrent evaluations
+        candidate_seeds = random_state.randint(0, 2 ** 31 - 1, len(candidates))
+        # Evaluate the candidates batchwise. The first candidate (in the given order) that improves the costs wins
+        batch_size = min(effective_n_jobs(n_jobs), max(len(candidates), 1))
+        for batch_start in range(0, len(candidates), batch_size):
+            batch = candidates[batch_start:batch_start + batch_size]
+            # Remaining workers are used for the NrKmeans repetitions of each candidate
+            all_results = Parallel(n_jobs=n_jobs if len(batch) > 1 else None)(
+                delayed(_try_subspace_split)(X, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs,
+                                             nrkmeans_repetitions, outliers, max_n_clusters, mdl_for_noisespace,
+                                             max_distance, precision, similarity_threshold,
+                                             np.random.RandomState(candidate_seeds[batch_start + i]), debug,
+                                             max(effective_n_jobs(n_jobs) // len(batch), 1))
+                for i, subspace_nr in enumerate(batch))
+            for nrkmeans, mdl_cost, subspace_costs, candidate_mdl_costs in all_results:
+                all_mdl_costs += candidate_mdl_costs
+                if nrkmeans is not None:
                     best_nrkmeans = nrkmeans
                     best_subspace_costs = subspace_costs
                     best_mdl_overall = mdl_cost
@@ -147,16 +113,7 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
                     better_found_since_merging = True
                     # Continue with next iteration
                     break
-            # If number of subspaces was 1, check if total mdl split was smaller than best mdl overall
-            elif len(best_nrkmeans.n_clusters) == 1 and mdl_total_split < best_mdl_overall:
-                if debug:
-                    print("!!! Better solution found !!!")
-                best_nrkmeans = nrkmeans_split
-                best_subspace_costs = subspace_costs_split
-                best_mdl_overall = mdl_total_split
-                better_solution_found = True
-                better_found_since_merging = True
-                # Continue with next iteration
+            if better_solution_found:
                 break
         # If better solution has been found, try to merge found subspaces
         if better_found_since_merging:
@@ -172,7 +129,8 @@ def _autonr(X: np.ndarray, nrkmeans_repetitions: int, outliers: bool, max_subspa
                                                                                                          mdl_for_noisespace,
                                                                                                          max_distance,
                                                                                                          precision,
-                                                                                                         debug)
+                                                                                                         debug,
+                                                                                                         n_jobs)
                 better_found_since_merging = False
                 # If merging did not improve the result or max number of subspaces is reached, end program
                 if len(best_nrkmeans.n_clusters) == max_subspaces or not better_found_merge:
@@ -251,11 +209,12 @@ def _check_input_parameters(X: np.ndarray, nrkmeans_repetitions: int, max_subspa
 def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int,
                       random_state: np.random.RandomState, centers: list = None, V: np.ndarray = None,
                       P: list = None, outliers: bool = False, mdl_for_noisespace: bool = True,
-                      max_distance: float = None, precision: float = None, debug: float = False) -> (
-        NrKmeans, float, list):
+                      max_distance: float = None, precision: float = None, debug: float = False,
+                      n_jobs: int = None) -> (NrKmeans, float, list):
     """
     Execute NrKmeans multiple times and return the best result found.
     In addition the method will return the total MDL costs of the best found result and its MDL costs per subspace.
+    The repetitions can be executed concurrently. The best result is selected in the order of the repetitions, so the result equals the one of a serial execution.
 
     Parameters
     ----------
@@ -283,6 +242,8 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
         precision used to convert probability densities to actual probabilities (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    n_jobs : int
+        Number of NrKmeans repetitions that run concurrently. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -304,31 +265,15 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
     add_random_executions = False
     if nrkmeans_repetitions > 1 and centers is not None and V is not None and P is not None:
         add_random_executions = True
-    for i in range(nrkmeans_repetitions):
-        if centers is not None and not (i > 0 and add_random_executions):
-            input_centers = centers.copy()
-        else:
-            input_centers = None
-        if V is not None and not (i > 0 and add_random_executions):
-            input_V = V.copy()
-        else:
-            input_V = None
-        if P is not None and not (i > 0 and add_random_executions):
-            input_P = P.copy()
-        else:
-            input_P = None
-        # Execute NrKmeans
-        nrkmeans = NrKmeans(n_clusters.copy(), random_state=randoms[i], cluster_centers=input_centers, V=input_V,
-                            P=input_P,
-                            outliers=outliers, mdl_for_noisespace=mdl_for_noisespace,
-                            max_distance=max_distance, precision=precision)
-        try:
-            nrkmeans.fit(X)
-        except (Exception, ValueError) as err:
-            print("Error occurred during NrKmeans execution: " + str(err))
-            raise err
-        # Get MDL Costs
-        total_costs, _, all_subspace_costs = nrkmeans.calculate_mdl_costs(X)
+    all_results = Parallel(n_jobs=n_jobs if nrkmeans_repetitions > 1 else None)(
+        delayed(_execute_single_nrkmeans)(X, n_clusters, randoms[i],
+                                          None if (i > 0 and add_random_executions) else centers,
+                                          None if (i > 0 and add_random_executions) else V,
+                                          None if (i > 0 and add_random_executions) else P,
+                                          outliers, mdl_for_noisespace, max_distance, precision)
+        for i in range(nrkmeans_repetitions))
+    # Get best result (in the order of the repetitions, as in a serial execution)
+    for nrkmeans, total_costs, all_subspace_costs in all_results:
         if total_costs < best_total_mdl_costs:
             best_total_mdl_costs = total_costs
             best_subspace_costs = all_subspace_costs
@@ -339,11 +284,167 @@ def _execute_nrkmeans(X: np.ndarray, n_clusters: list, nrkmeans_repetitions: int
     return best_nrkmeans, best_total_mdl_costs, best_subspace_costs
 
 
+def _execute_single_nrkmeans(X: np.ndarray, n_clusters: list, random_state: int, centers: list, V: np.ndarray,
+                             P: list, outliers: bool, mdl_for_noisespace: bool, max_distance: float,
+                             precision: float) -> (NrKmeans, float, list):
+    """
+    Execute a single repetition of NrKmeans and calculate the MDL costs of the result.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    n_clusters : list
+        list containing number of clusters for each subspace
+    random_state : int
+        the seed of this repetition
+    centers : list
+        list containing the cluster centers for each subspace. Can be None
+    V : np.ndarray
+        the orthonormal rotation matrix. Can be None
+    P : list
+        list containing projections (ids of corresponding dimensions) for each subspace. Can be None
+    outliers : bool
+        defines if outliers should be identified through MDL
+    mdl_for_noisespace : bool
+        defines if MDL should be used to identify noise space dimensions instead of only considering negative eigenvalues when running NrKmeans
+    max_distance : float
+        distance used to encode cluster centers and outliers
+    precision : float
+        precision used to convert probability densities to actual probabilities
+
+    Returns
+    -------
+    tuple : (NrKmeans, float, list)
+        The NrKmeans object,
+        The total MDL costs,
+        A list containing the MDL costs of each subspace
+    """
+    nrkmeans = NrKmeans(n_clusters.copy(), random_state=random_state,
+                        cluster_centers=None if centers is None else centers.copy(),
+                        V=None if V is None else V.copy(), P=None if P is None else P.copy(),
+                        outliers=outliers, mdl_for_noisespace=mdl_for_noisespace,
+                        max_distance=max_distance, precision=precision)
+    try:
+        nrkmeans.fit(X)
+    except (Exception, ValueError) as err:
+        print("Error occurred during NrKmeans execution: " + str(err))
+        raise err
+    # Get MDL Costs
+    total_costs, _, all_subspace_costs = nrkmeans.calculate_mdl_costs(X)
+    return nrkmeans, total_costs, all_subspace_costs
+
+
+def _try_subspace_split(X: np.ndarray, subspace_nr: int, best_nrkmeans: NrKmeans, best_mdl_overall: float,
+                        best_subspace_costs: list, nrkmeans_repetitions: int, outliers: bool, max_n_clusters: int,
+                        mdl_for_noisespace: bool, max_distance: float, precision: float, similarity_threshold: float,
+                        random_state: np.random.RandomState, debug: bool, n_jobs: int = None) -> (
+        NrKmeans, float, list, list):
+    """
+    Try to improve the MDL costs of the current best NrKmeans result by splitting a single subspace.
+    A noise space will be split using _split_noise_space and a cluster space using _split_cluster_space.
+    If there are multiple subspaces, the found split will afterwards be evaluated in the full space.
+    The candidates of one AutoNR iteration are independent of each other and can therefore be evaluated concurrently.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    subspace_nr : int
+        the index of the subspace that should be split
+    best_nrkmeans : NrKmeans
+        the best NrKmeans result found in a previous iteration of AutoNR
+    best_mdl_overall : float
+        the MDL costs of the best NrKmeans result found so far
+    best_subspace_costs : list
+        the MDL costs of each subspace of the best NrKmeans result found so far
+    nrkmeans_repetitions : int
+        number of NrKmeans repetitions for each execution step to find the best local minimum
+    outliers : bool
+        defines if outliers should be identified through MDL
+    max_n_clusters : int
+        maximum number of clusters for each subspace
+    mdl_for_noisespace : bool
+        defines if MDL should be used to identify noise space dimensions instead of only considering negative eigenvalues when running NrKmeans
+    max_distance : float
+        distance used to encode cluster centers and outliers
+    precision : float
+        precision used to convert probability densities to actual probabilities
+    similarity_threshold : float
+        threshold that defines if the noise space has not changed for two subsequent iterations by checking the subspace costs
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+    debug : bool
+        If true, additional information will be printed to the console
+    n_jobs : int
+        Number of NrKmeans repetitions that run concurrently. -1 uses all available cores (default: None)
+
+    Returns
+    -------
+    tuple : (NrKmeans, float, list, list)
+        The improved NrKmeans result (None if the split did not improve the MDL costs),
+        The total MDL costs of the improved NrKmeans result,
+        The MDL costs of each subspace of the improved NrKmeans result,
+        A list containing objects of type _Nrkmeans_Mdl_Costs representing all intermediate results of this split
+    """
+    all_mdl_costs = []
+    if debug:
+        print("==================================================")
+        print("Try splitting subspace_nr {0} with n_clusters = [{1}] and m = {2}. Costs = {3}".format(
+            subspace_nr, best_nrkmeans.n_clusters[subspace_nr], best_nrkmeans.m[subspace_nr],
+            best_subspace_costs[subspace_nr]))
+    split_cluster_count = best_nrkmeans.n_clusters[subspace_nr]
+    # If there are more than one subspace_nr just search within the turned subspace_nr
+    if len(best_nrkmeans.n_clusters) > 1:
+        X_subspace = best_nrkmeans.transform_subspace(X, subspace_nr)
+    else:
+        X_subspace = X.copy()
+    # Try to find more structure in the noise space
+    if best_nrkmeans.n_clusters[subspace_nr] == 1:
+        nrkmeans_split, mdl_total_split, mdl_threshold_split, subspace_costs_split = _split_noise_space(
+            X_subspace, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs, all_mdl_costs,
+            nrkmeans_repetitions, outliers, max_n_clusters, mdl_for_noisespace, max_distance, precision,
+            similarity_threshold, random_state, debug, n_jobs)
+    # Split existing cluster space
+    else:
+        nrkmeans_split, mdl_total_split, mdl_threshold_split, subspace_costs_split = _split_cluster_space(
+            X_subspace, subspace_nr, best_nrkmeans, best_mdl_overall, best_subspace_costs, all_mdl_costs,
+            nrkmeans_repetitions, outliers, mdl_for_noisespace, max_distance, precision, random_state, debug, n_jobs)
+    # ============================= FULL SPACE =====================================
+    # Execute new found n_clusters for full space (except number of subspaces was 1)
+    if len(best_nrkmeans.n_clusters) > 1 and mdl_threshold_split < best_subspace_costs[subspace_nr]:
+        # Get parameters for full space execution
+        n_clusters_full, centers_full, P_full, V_full = _get_full_space_parameters_split(X, best_nrkmeans,
+                                                                                         nrkmeans_split,
+                                                                                         subspace_nr)
+        if debug:
+            print("==================================================")
+            print("Full space execution with n_clusters = {0}. Current best costs = {1}".format(n_clusters_full,
+                                                                                                best_mdl_overall))
+        nrkmeans, mdl_cost, subspace_costs = _execute_nrkmeans(X, n_clusters_full, 1, random_state,
+                                                               centers_full, V_full, P_full,
+                                                               outliers=outliers, debug=debug,
+                                                               mdl_for_noisespace=mdl_for_noisespace,
+                                                               max_distance=max_distance, precision=precision)
+        all_mdl_costs.append(_Nrkmeans_Mdl_Costs(True, mdl_cost,
+                                                 "noise_space_split" if split_cluster_count else "cluster_space_split"))
+        if mdl_cost < best_mdl_overall:
+            if debug:
+                print("!!! Better solution found !!!")
+            return nrkmeans, mdl_cost, subspace_costs, all_mdl_costs
+    # If number of subspaces was 1, check if total mdl split was smaller than best mdl overall
+    elif len(best_nrkmeans.n_clusters) == 1 and mdl_total_split < best_mdl_overall:
+        if debug:
+            print("!!! Better solution found !!!")
+        return nrkmeans_split, mdl_total_split, subspace_costs_split, all_mdl_costs
+    return None, None, None, all_mdl_costs
+
+
 def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans: NrKmeans, best_mdl_overall: float,
                        best_subspace_costs: list, all_mdl_costs: list, nrkmeans_repetitions: int, outliers: bool,
                        max_n_clusters: int, mdl_for_noisespace: bool, max_distance: float, precision: float,
-                       similarity_threshold: float, random_state: np.random.RandomState, debug: bool) -> (
-        NrKmeans, float, float, list):
+                       similarity_threshold: float, random_state: np.random.RandomState, debug: bool,
+                       n_jobs: int = None) -> (NrKmeans, float, float, list):
     """
     Perform a noise space split. This operation tries to split an existing noise space into a new noise space and a cluster space.
     In the beginning a NrKmeans run with n_clusters = [2, 1] will be executed.
@@ -382,6 +483,8 @@ def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans:
         use a fixed random state to get a repeatable solution
     debug : bool
         If true, additional information will be printed to the console
+    n_jobs : int
+        Number of NrKmeans repetitions that run concurrently. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -414,7 +517,8 @@ def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans:
                                                                P=None if centers is None else nrkmeans.P,
                                                                outliers=outliers, debug=debug,
                                                                mdl_for_noisespace=mdl_for_noisespace,
-                                                               max_distance=max_distance, precision=precision)
+                                                               max_distance=max_distance, precision=precision,
+                                                               n_jobs=n_jobs)
         sum_subspace_costs = np.sum(subspace_costs)
         all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 1,
                                                  best_mdl_overall - best_subspace_costs[
@@ -468,7 +572,8 @@ def _split_noise_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans:
 def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans: NrKmeans, best_mdl_overall: float,
                          best_subspace_costs: list, all_mdl_costs: list, nrkmeans_repetitions: int, outliers: bool,
                          mdl_for_noisespace: bool, max_distance: float, precision: float,
-                         random_state: np.random.RandomState, debug: bool) -> (NrKmeans, float, float, list):
+                         random_state: np.random.RandomState, debug: bool, n_jobs: int = None) -> (
+        NrKmeans, float, float, list):
     """
     Perform a cluster space split. This operation tries to split an existing cluster space into two new cluster spaces.
     In the beginning a both subspaces contain the original number of clusters.
@@ -505,6 +610,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
         use a fixed random state to get a repeatable solution
     debug : bool
         If true, additional information will be printed to the console
+    n_jobs : int
+        Number of NrKmeans repetitions that run concurrently. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -547,7 +654,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
                                                                                  debug=debug,
                                                                                  mdl_for_noisespace=mdl_for_noisespace,
                                                                                  max_distance=max_distance,
-                                                                                 precision=precision)
+                                                                                 precision=precision,
+                                                                                 n_jobs=n_jobs)
                     sum_subspace_costs_1 = np.sum(subspace_costs_1)
                     all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 1,
                                                              best_mdl_overall - best_subspace_costs[
@@ -569,7 +677,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
                                                                                  debug=debug,
                                                                                  mdl_for_noisespace=mdl_for_noisespace,
                                                                                  max_distance=max_distance,
-                                                                                 precision=precision)
+                                                                                 precision=precision,
+                                                                                 n_jobs=n_jobs)
                     sum_subspace_costs_2 = np.sum(subspace_costs_2)
                     all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 1,
                                                              best_mdl_overall - best_subspace_costs[
@@ -607,7 +716,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
                                                                    P_split,
                                                                    outliers=outliers, debug=debug,
                                                                    mdl_for_noisespace=mdl_for_noisespace,
-                                                                   max_distance=max_distance, precision=precision)
+                                                                   max_distance=max_distance, precision=precision,
+                                                                   n_jobs=n_jobs)
             sum_subspace_costs = np.sum(subspace_costs)
             all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 1,
                                                      best_mdl_overall - best_subspace_costs[
@@ -651,8 +761,8 @@ def _split_cluster_space(X_subspace: np.ndarray, subspace_nr: int, best_nrkmeans
 
 def _merge_spaces(X: np.ndarray, best_nrkmeans: NrKmeans, best_mdl_overall: float, best_subspace_costs: list,
                   all_mdl_costs: list, max_n_clusters: int, outliers: bool, random_state: np.random.RandomState,
-                  mdl_for_noisespace: bool, max_distance: float, precision: float, debug: bool) -> (
-        NrKmeans, float, float, bool):
+                  mdl_for_noisespace: bool, max_distance: float, precision: float, debug: bool,
+                  n_jobs: int = None) -> (NrKmeans, float, float, bool):
     """
     Perform a cluster space merge. This operation tries combine two existing cluster spaces into a single cluster space.
     Starts with the highest possible number of clusters which is equal to n_clusters_1 * n_clusters_2.
@@ -660,6 +770,7 @@ def _merge_spaces(X: np.ndarray, best_nrkmeans: NrKmeans, best_mdl_overall: floa
     If merging was successful, i.e. a better NrKmeans result was found, merging procedure will repeat.
     If no enhancement occurs or only one subspace (noise space excluded) is left, merging stops.
     Reuses the parameters of the previous run.
+    All combinations of subspaces are evaluated concurrently. Afterwards, the results are processed in the original order.
 
     Parameters
     ----------
@@ -687,6 +798,8 @@ def _merge_spaces(X: np.ndarray, best_nrkmeans: NrKmeans, best_mdl_overall: floa
         precision used to convert probability densities to actual probabilities
     debug : bool
         If true, additional information will be printed to the console
+    n_jobs : int
+        Number of subspace combinations that are evaluated concurrently. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -707,108 +820,23 @@ def _merge_spaces(X: np.ndarray, best_nrkmeans: NrKmeans, best_mdl_overall: floa
                 print("==================================================")
             best_nrkmeans_iteration = None
             best_subspace_costs_iteration = None
-            # Go through each combination of subspaces
-            for i in range(len(best_nrkmeans.n_clusters) - 1):
-                for j in range(i + 1, len(best_nrkmeans.n_clusters)):
-                    # Skip noise space
-                    if best_nrkmeans.n_clusters[j] == 1:
-                        continue
-                    if debug:
-                        print("==================================================")
-                        print(
-                            "Try merging subspace_nr {0} with n_clusters = [{1}] and subspace_nr {2} with n_clusters = [{3}]. Combined costs = {4}".format(
-                                i, best_nrkmeans.n_clusters[i], j, best_nrkmeans.n_clusters[j],
-                                best_subspace_costs[i] + best_subspace_costs[j]
-                            ))
-                    # If there are more than two subspaces just search within the turned subspaces
-                    if len(best_nrkmeans.n_clusters) > 2:
-                        X_subspace = np.c_[
-                            best_nrkmeans.transform_subspace(X, i), best_nrkmeans.transform_subspace(X, j)]
-                    else:
-                        X_subspace = X.copy()
-                    # Get default subspace_nr costs threshold and V as identity matrix
-                    nrkmeans_merge = None
-                    mdl_threshold_merge = np.inf
-                    # Rotation stays the same for single subspace_nr
-                    V = np.identity(X_subspace.shape[1])
-                    # Create every combination of centers for the two subspaces
-                    centers = []
-                    turned_centers_1 = np.matmul(best_nrkmeans.cluster_centers[i], best_nrkmeans.V)[:,
-                                       best_nrkmeans.P[i]]
-                    turned_centers_2 = np.matmul(best_nrkmeans.cluster_centers[j], best_nrkmeans.V)[:,
-                                       best_nrkmeans.P[j]]
-                    for center_1 in turned_centers_1:
-                        for center_2 in turned_centers_2:
-                            centers.append(np.append(center_1, center_2))
-                    centers = [centers]
-                    # Try decreasing number of clusters within merged subspaces
-                    for n in reversed(range(max(best_nrkmeans.n_clusters[i], best_nrkmeans.n_clusters[j]),
-                                            best_nrkmeans.n_clusters[i] * best_nrkmeans.n_clusters[j] + 1)):
-                        # Skip if n is larger than the maximum amount of clusters
-                        if n > max_n_clusters:
-                            centers = [_merge_nearest_centers(centers[0])]
-                            continue
-                        # In case clusters have been lost, n_clusters and centers can diverge
-                        if nrkmeans_merge is not None and len(centers[0]) < n:
-                            continue
-                        nrkmeans, mdl_cost, subspace_costs = _execute_nrkmeans(X_subspace, [n], 1,
-                                                                               random_state,
-                                                                               centers, V,
-                                                                               outliers=outliers,
-                                                                               debug=debug,
-                                                                               mdl_for_noisespace=mdl_for_noisespace,
-                                                                               max_distance=max_distance,
-                                                                               precision=precision)
-                        sum_subspace_costs = subspace_costs[0]
-                        all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 2,
-                                                                 best_mdl_overall - best_subspace_costs[i] -
-                                                                 best_subspace_costs[
-                                                                     j] + sum_subspace_costs, "cluster_space_merge"))
-                        if sum_subspace_costs < mdl_threshold_merge:
-                            # Save new values
-                            nrkmeans_merge = nrkmeans
-                            mdl_threshold_merge = sum_subspace_costs
-                            mdl_total_merge = mdl_cost
-                            subspace_costs_merge = subspace_costs
-                            # Prepare values for next iteration
-                            centers = [_merge_nearest_centers(nrkmeans_merge.cluster_centers[0])]
-                        else:
-                            # pass
-                            break
-                    # ============================= FULL SPACE =====================================
-                    # Execute new found n_clusters for full space (except number of subspaces was 2)
-                    if len(best_nrkmeans.n_clusters) > 2 and mdl_threshold_merge < best_subspace_costs[i] + \
-                            best_subspace_costs[j]:
-                        # Get parameters for full space execution
-                        n_clusters_full, centers_full, P_full, V_full = _get_full_space_parameters_merge(X,
-                                                                                                         best_nrkmeans,
-                                                                                                         nrkmeans_merge,
-                                                                                                         i, j)
-                        if debug:
-                            print("==================================================")
-                            print("Next full try with: " + str(n_clusters_full))
-                        nrkmeans, mdl_cost, subspace_costs = _execute_nrkmeans(X, n_clusters_full, 1,
-                                                                               random_state,
-                                                                               centers_full, V_full, P_full,
-                                                                               outliers=outliers,
-                                                                               debug=debug,
-                                                                               mdl_for_noisespace=mdl_for_noisespace,
-                                                                               max_distance=max_distance,
-                                                                               precision=precision)
-                        all_mdl_costs.append(_Nrkmeans_Mdl_Costs(True, mdl_cost, "cluster_space_merge"))
-                        if mdl_cost < best_mdl_overall:
-                            if debug:
-                                print("!!! Better solution found !!!")
-                            best_nrkmeans_iteration = nrkmeans
-                            best_subspace_costs_iteration = subspace_costs
-                            best_mdl_overall = mdl_cost
-                    # If number of subspaces was 2, check if total mdl merge was smaller than best mdl overall
-                    elif len(best_nrkmeans.n_clusters) <= 2 and mdl_total_merge < best_mdl_overall:
-                        if debug:
-                            print("!!! Better solution found !!!")
-                        best_nrkmeans_iteration = nrkmeans_merge
-                        best_subspace_costs_iteration = subspace_costs_merge
-                        best_mdl_overall = mdl_total_merge
+            # Go through each combination of subspaces (skip noise space)
+            candidates = [(i, j) for i in range(len(best_nrkmeans.n_clusters) - 1) for j in
+                          range(i + 1, len(best_nrkmeans.n_clusters)) if best_nrkmeans.n_clusters[j] != 1]
+            # Each candidate gets its own random state, so that the result does not depend on the number of concurrent evaluations
+            candidate_seeds = random_state.randint(0, 2 ** 31 - 1, len(candidates))
+            all_results = Parallel(n_jobs=n_jobs if len(candidates) > 1 else None)(
+                delayed(_try_subspace_merge)(X, i, j, best_nrkmeans, best_mdl_overall, best_subspace_costs,
+                                             max_n_clusters, outliers, np.random.RandomState(candidate_seeds[c]),
+                                             mdl_for_noisespace, max_distance, precision, debug)
+                for c, (i, j) in enumerate(candidates))
+            # Process results in the order of the candidates, as in a serial execution
+            for nrkmeans, mdl_cost, subspace_costs, candidate_mdl_costs in all_results:
+                all_mdl_costs += candidate_mdl_costs
+                if nrkmeans is not None and mdl_cost < best_mdl_overall:
+                    best_nrkmeans_iteration = nrkmeans
+                    best_subspace_costs_iteration = subspace_costs
+                    best_mdl_overall = mdl_cost
             # Overwrite best NrKmeans with best possible merge
             if best_nrkmeans_iteration is not None:
                 better_found = True
@@ -823,6 +851,149 @@ def _merge_spaces(X: np.ndarray, best_nrkmeans: NrKmeans, best_mdl_overall: floa
     return best_nrkmeans, best_subspace_costs, best_mdl_overall, better_found
 
 
+def _try_subspace_merge(X: np.ndarray, i: int, j: int, best_nrkmeans: NrKmeans, best_mdl_overall: float,
+                        best_subspace_costs: list, max_n_clusters: int, outliers: bool,
+                        random_state: np.random.RandomState, mdl_for_noisespace: bool, max_distance: float,
+                        precision: float, debug: bool) -> (NrKmeans, float, list, list):
+    """
+    Try to improve the MDL costs of the current best NrKmeans result by merging two subspaces.
+    Starts with the highest possible number of clusters which is equal to n_clusters_1 * n_clusters_2.
+    This number of clusters is successively lowered by one until the MDL costs of the merged subspace do not improve anymore.
+    If there are more than two subspaces, the found merge will afterwards be evaluated in the full space.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The full-dimensional input data set
+    i : int
+        the index of the first subspace
+    j : int
+        the index of the second subspace
+    best_nrkmeans : NrKmeans
+        the best NrKmeans result found in a previous iteration of AutoNR
+    best_mdl_overall : float
+        the MDL costs of the best NrKmeans result found so far
+    best_subspace_costs : list
+        the MDL costs of each subspace of the best NrKmeans result found so far
+    max_n_clusters : int
+        maximum number of clusters for each subspace
+    outliers : bool
+        defines if outliers should be identified through MDL
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+    mdl_for_noisespace : bool
+        defines if MDL should be used to identify noise space dimensions instead of only considering negative eigenvalues when running NrKmeans
+    max_distance : float
+        distance used to encode cluster centers and outliers
+    precision : float
+        precision used to convert probability densities to actual probabilities
+    debug : bool
+        If true, additional information will be printed to the console
+
+    Returns
+    -------
+    tuple : (NrKmeans, float, list, list)
+        The improved NrKmeans result (None if the merge did not improve the MDL costs),
+        The total MDL costs of the improved NrKmeans result,
+        The MDL costs of each subspace of the improved NrKmeans result,
+        A list containing objects of type _Nrkmeans_Mdl_Costs representing all intermediate results of this merge
+    """
+    all_mdl_costs = []
+    if debug:
+        print("==================================================")
+        print(
+            "Try merging subspace_nr {0} with n_clusters = [{1}] and subspace_nr {2} with n_clusters = [{3}]. Combined costs = {4}".format(
+                i, best_nrkmeans.n_clusters[i], j, best_nrkmeans.n_clusters[j],
+                best_subspace_costs[i] + best_subspace_costs[j]
+            ))
+    # If there are more than two subspaces just search within the turned subspaces
+    if len(best_nrkmeans.n_clusters) > 2:
+        X_subspace = np.c_[
+            best_nrkmeans.transform_subspace(X, i), best_nrkmeans.transform_subspace(X, j)]
+    else:
+        X_subspace = X.copy()
+    # Get default subspace_nr costs threshold and V as identity matrix
+    nrkmeans_merge = None
+    mdl_threshold_merge = np.inf
+    # Rotation stays the same for single subspace_nr
+    V = np.identity(X_subspace.shape[1])
+    # Create every combination of centers for the two subspaces
+    centers = []
+    turned_centers_1 = np.matmul(best_nrkmeans.cluster_centers[i], best_nrkmeans.V)[:,
+                       best_nrkmeans.P[i]]
+    turned_centers_2 = np.matmul(best_nrkmeans.cluster_centers[j], best_nrkmeans.V)[:,
+                       best_nrkmeans.P[j]]
+    for center_1 in turned_centers_1:
+        for center_2 in turned_centers_2:
+            centers.append(np.append(center_1, center_2))
+    centers = [centers]
+    # Try decreasing number of clusters within merged subspaces
+    for n in reversed(range(max(best_nrkmeans.n_clusters[i], best_nrkmeans.n_clusters[j]),
+                            best_nrkmeans.n_clusters[i] * best_nrkmeans.n_clusters[j] + 1)):
+        # Skip if n is larger than the maximum amount of clusters
+        if n > max_n_clusters:
+            centers = [_merge_nearest_centers(centers[0])]
+            continue
+        # In case clusters have been lost, n_clusters and centers can diverge
+        if nrkmeans_merge is not None and len(centers[0]) < n:
+            continue
+        nrkmeans, mdl_cost, subspace_costs = _execute_nrkmeans(X_subspace, [n], 1,
+                                                               random_state,
+                                                               centers, V,
+                                                               outliers=outliers,
+                                                               debug=debug,
+                                                               mdl_for_noisespace=mdl_for_noisespace,
+                                                               max_distance=max_distance,
+                                                               precision=precision)
+        sum_subspace_costs = subspace_costs[0]
+        all_mdl_costs.append(_Nrkmeans_Mdl_Costs(len(best_nrkmeans.n_clusters) == 2,
+                                                 best_mdl_overall - best_subspace_costs[i] -
+                                                 best_subspace_costs[
+                                                     j] + sum_subspace_costs, "cluster_space_merge"))
+        if sum_subspace_costs < mdl_threshold_merge:
+            # Save new values
+            nrkmeans_merge = nrkmeans
+            mdl_threshold_merge = sum_subspace_costs
+            mdl_total_merge = mdl_cost
+            subspace_costs_merge = subspace_costs
+            # Prepare values for next iteration
+            centers = [_merge_nearest_centers(nrkmeans_merge.cluster_centers[0])]
+        else:
+            # pass
+            break
+    # ============================= FULL SPACE =====================================
+    # Execute new found n_clusters for full space (except number of subspaces was 2)
+    if len(best_nrkmeans.n_clusters) > 2 and mdl_threshold_merge < best_subspace_costs[i] + \
+            best_subspace_costs[j]:
+        # Get parameters for full space execution
+        n_clusters_full, centers_full, P_full, V_full = _get_full_space_parameters_merge(X,
+                                                                                         best_nrkmeans,
+                                                                                         nrkmeans_merge,
+                                                                                         i, j)
+        if debug:
+            print("==================================================")
+            print("Next full try with: " + str(n_clusters_full))
+        nrkmeans, mdl_cost, subspace_costs = _execute_nrkmeans(X, n_clusters_full, 1,
+                                                               random_state,
+                                                               centers_full, V_full, P_full,
+                                                               outliers=outliers,
+                                                               debug=debug,
+                                                               mdl_for_noisespace=mdl_for_noisespace,
+                                                               max_distance=max_distance,
+                                                               precision=precision)
+        all_mdl_costs.append(_Nrkmeans_Mdl_Costs(True, mdl_cost, "cluster_space_merge"))
+        if mdl_cost < best_mdl_overall:
+            if debug:
+                print("!!! Better solution found !!!")
+            return nrkmeans, mdl_cost, subspace_costs, all_mdl_costs
+    # If number of subspaces was 2, check if total mdl merge was smaller than best mdl overall
+    elif len(best_nrkmeans.n_clusters) <= 2 and mdl_total_merge < best_mdl_overall:
+        if debug:
+            print("!!! Better solution found !!!")
+        return nrkmeans_merge, mdl_total_merge, subspace_costs_merge, all_mdl_costs
+    return None, None, None, all_mdl_costs
+
+
 def _split_largest_cluster(V: np.ndarray, m_subspace: int, P_subspace: np.ndarray, centers_subspace: np.ndarray,
                            scatter_matrices_subspace: np.ndarray, labels_subspace: np.ndarray) -> np.ndarray:
     """
@@ -1144,6 +1315,10 @@ class AutoNR(BaseEstimator, ClusterMixin):
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    n_jobs : int
+        Number of jobs used to evaluate the candidate operations (splits of the different subspaces or merges of the different subspace pairs) of one iteration and the NrKmeans repetitions concurrently.
+        The candidates are processed in their original order, i.e., as in a serial execution the first candidate that improves the MDL costs wins.
+        Therefore, the result does not depend on n_jobs. -1 uses all available cores (default: None)
 
     Attributes
     ----------
@@ -1167,7 +1342,7 @@ class AutoNR(BaseEstimator, ClusterMixin):
     def __init__(self, nrkmeans_repetitions: int = 15, outliers: bool = True, max_subspaces: int = None,
                  max_n_clusters: int = None, mdl_for_noisespace: bool = True, max_distance: float = None,
                  precision: float = None, similarity_threshold: float = 1e-5,
-                 random_state: np.random.RandomState = None, debug: bool = False):
+                 random_state: np.random.RandomState = None, debug: bool = False, n_jobs: int = None):
         # Fixed attributes
         self.nrkmeans_repetitions = nrkmeans_repetitions
         self.outliers = outliers
@@ -1179,6 +1354,7 @@ class AutoNR(BaseEstimator, ClusterMixin):
         self.similarity_threshold = similarity_threshold
         self.random_state = check_random_state(random_state)
         self.debug = debug
+        self.n_jobs = n_jobs
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'AutoNR':
         """
@@ -1201,7 +1377,7 @@ class AutoNR(BaseEstimator, ClusterMixin):
                                                      self.max_subspaces,
                                                      self.max_n_clusters, self.mdl_for_noisespace,
                                                      self.max_distance, self.precision, self.similarity_threshold,
-                                                     self.random_state, self.debug)
+                                                     self.random_state, self.debug, self.n_jobs)
         # Output
         self.n_clusters_ = nrkmeans.n_clusters
         self.nrkmeans_ = nrkmeans
@@ -0,0 +1,293 @@
+"""
+@authors:
+agent
+"""
+
+import numpy as np
+from sklearn.utils import check_random_state
+from clustpy.alternative.nrkmeans import NrKmeans, _initialize_nrkmeans_parameters, _assign_labels, \
+    _update_rotation, _remove_empty_subspace
+
+
+def _minibatch_nrkmeans_step(X_batch: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list, centers: list,
+                             cluster_counts: list, cluster_scatters: list, threshold_negative_eigenvalue: float,
+                             debug: bool) -> (np.ndarray, list, list, list, list, list, list, list):
+    """
+    Execute a single mini-batch update of NrKmeans.
+    First, the objects of the batch are assigned to the closest cluster centers in each subspace.
+    Afterwards, the running statistics of each cluster (number of objects, mean and scatter matrix around the mean) are updated.
+    The statistics of the batch are computed around the batch means of the clusters and merged with the running statistics using the pairwise update by Chan et al.
+    Hence, the scatter matrices are never obtained as the difference of two large matrices, which would be prone to numerical cancellation for well-separated clusters.
+    The scatter matrix of each subspace is the sum of the scatter matrices of its clusters.
+    These scatter matrices are used to update the rotation in the same way as in NrKmeans.
+    centers, cluster_counts and cluster_scatters are changed in-place.
+
+    Parameters
+    ----------
+    X_batch : np.ndarray
+        the current batch
+    n_clusters : list
+        list containing number of clusters for each subspace
+    V : np.ndarray
+        the orthonormal rotation matrix
+    m : list
+        list containing the dimensionalities for each subspace
+    P : list
+        list containing projections (ids of corresponding dimensions) for each subspace
+    centers : list
+        list containing the cluster centers for each subspace. The centers of non-empty clusters equal the means of the objects assigned so far
+    cluster_counts : list
+        list containing the number of objects assigned to each cluster so far for each subspace
+    cluster_scatters : list
+        list containing the scatter matrices (around the cluster means) of the objects assigned to each cluster so far for each subspace.
+        Each entry is an array of shape (n_clusters x d x d)
+    threshold_negative_eigenvalue : float
+        threshold to consider an eigenvalue as negative. Used for the update of the subspace dimensions
+    debug : bool
+        If true, additional information will be printed to the console
+
+    Returns
+    -------
+    tuple : (np.ndarray, list, list, list, list, list, list, list)
+        The updated orthonormal rotation matrix,
+        The updated number of clusters for each subspace,
+        The updated dimensionalities of the subspaces,
+        The updated projections,
+        The updated cluster centers,
+        The updated cluster counts,
+        The updated cluster scatter matrices,
+        The scatter matrix of each subspace
+
+    References
+    ----------
+    Chan, Tony F., Gene H. Golub, and Randall J. LeVeque. "Updating formulae and a pairwise algorithm for computing sample variances."
+    COMPSTAT 1982 5th Symposium held at Toulouse 1982. Physica, Heidelberg, 1982.
+    """
+    subspaces = len(n_clusters)
+    scatter_matrices = [None] * subspaces
+    for i in range(subspaces):
+        # Assign the objects of the batch to the closest cluster centers
+        labels_batch = _assign_labels(X_batch, V, centers[i], P[i])
+        # Merge the statistics of the batch into the running statistics of each cluster
+        for c in np.unique(labels_batch):
+            X_cluster = X_batch[labels_batch == c]
+            n_batch = X_cluster.shape[0]
+            mean_batch = np.mean(X_cluster, axis=0)
+            centered_cluster = X_cluster - mean_batch
+            n_old = cluster_counts[i][c]
+            n_new = n_old + n_batch
+            delta = mean_batch - centers[i][c]
+            cluster_scatters[i][c] += np.matmul(centered_cluster.T, centered_cluster) + (
+                    n_old * n_batch / n_new) * np.outer(delta, delta)
+            # Clusters without objects so far receive the batch mean (clusters without objects keep their centers)
+            centers[i][c] += delta * (n_batch / n_new)
+            cluster_counts[i][c] = n_new
+        # Get scatter matrix
+        scatter_matrices[i] = np.sum(cluster_scatters[i], axis=0)
+    # Update rotation for each pair of subspaces
+    for i in range(subspaces - 1):
+        for j in range(i + 1, subspaces):
+            P_1_new, P_2_new, V = _update_rotation(X_batch, V, i, j, n_clusters, P, scatter_matrices,
+                                                   threshold_negative_eigenvalue, False, False, None, None, None)
+            m[i] = len(P_1_new)
+            m[j] = len(P_2_new)
+            P[i] = P_1_new
+            P[j] = P_2_new
+    # Handle empty subspaces (no dimensionalities left) -> Should be removed
+    is_subspace_kept = [m_subspace > 0 for m_subspace in m]
+    cluster_counts = [counts for counts, keep in zip(cluster_counts, is_subspace_kept) if keep]
+    cluster_scatters = [scatters for scatters, keep in zip(cluster_scatters, is_subspace_kept) if keep]
+    _, n_clusters, m, P, centers, _, scatter_matrices = _remove_empty_subspace(n_clusters, m, P, centers,
+                                                                               np.zeros((1, subspaces)),
+                                                                               scatter_matrices, debug)
+    return V, n_clusters, m, P, centers, cluster_counts, cluster_scatters, scatter_matrices
+
+
+class MiniBatchNrKmeans(NrKmeans):
+    """
+    Mini-batch version of the Non-Redundant Kmeans (NrKmeans) algorithm.
+    In each step, only a batch of the data set is assigned to the clusters.
+    Instead of the full data set, running statistics are stored, i.e., the number of objects, the mean and the scatter matrix of each cluster.
+    The scatter matrices and therefore the rotation are updated using these statistics.
+    Hence, the memory consumption does not depend on the number of objects.
+    The data set can be a memory-mapped array (np.memmap), which is read batchwise in fit(),
+    or the batches can be supplied by an arbitrary batch iterator using partial_fit().
+    Since the batches of a memory-mapped array are read as contiguous blocks (in random order), the objects should not be sorted.
+    The MDL extensions (mdl_for_noisespace and outliers) are not supported.
+
+    Parameters
+    ----------
+    n_clusters : list
+        list containing number of clusters for each subspace
+    V : np.ndarray
+        the initial orthonormal rotation matrix (default: None)
+    m : list
+        list containing the initial dimensionalities for each subspace (default: None)
+    P : list
+        list containing the initial projections (ids of corresponding dimensions) for each subspace (default: None)
+    cluster_centers : list
+        list containing the initial cluster centers for each subspace (default: None)
+    batch_size : int
+        size of the batches (default: 1024)
+    max_iter : int
+        maximum number of passes over the data set in fit() (default: 100)
+    tol : float
+        fit() stops if the squared change of the cluster centers within a pass over the data set is smaller than tol times the
+        average squared distance of the objects to their mean. If 0, all max_iter passes will be executed (default: 1e-4)
+    threshold_negative_eigenvalue : float
+        threshold to consider an eigenvalue as negative. Used for the update of the subspace dimensions (default: -1e-7)
+    compute_labels : bool
+        defines whether the final labels of the data set should be calculated at the end of fit() (requires an additional pass over the data set) (default: True)
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    debug : bool
+        If true, additional information will be printed to the console (default: False)
+
+    Attributes
+    ----------
+    labels_ : np.ndarray
+        The final labels. Shape equals (n_samples x n_subspaces). Only available if compute_labels is True
+    scatter_matrices_ : list
+        The final scatter matrix of each subspace. Is based on the accumulated statistics of all processed batches,
+        i.e., objects that have been processed multiple times are also contained multiple times
+    n_steps_ : int
+        The number of processed batches
+
+    Examples
+    ----------
+    >>> from clustpy.data import create_nr_data
+    >>> X, L = create_nr_data(100000, random_state=1)
+    >>> np.save("X.npy", X)
+    >>> X_memmap = np.load("X.npy", mmap_mode="r")
+    >>> mbnrk = MiniBatchNrKmeans([3, 3, 1], batch_size=2048).fit(X_memmap)
+    >>> # Alternatively, use an arbitrary batch iterator
+    >>> mbnrk = MiniBatchNrKmeans([3, 3, 1])
+    >>> for start in range(0, X.shape[0], 2048):
+    ...     mbnrk.partial_fit(X_memmap[start:start + 2048])
+    >>> labels = mbnrk.predict(X_memmap)
+
+    References
+    ----------
+    Mautz, Dominik, et al. "Discovering non-redundant k-means clusterings in optimal subspaces."
+    Proceedings of the 24th ACM SIGKDD International Conference on Knowledge Discovery & Data Mining. 2018.
+
+    and
+
+    Sculley, David. "Web-scale k-means clustering."
+    Proceedings of the 19th international conference on World wide web. 2010.
+    """
+
+    def __init__(self, n_clusters: list, V: np.ndarray = None, m: list = None, P: list = None,
+                 cluster_centers: list = None, batch_size: int = 1024, max_iter: int = 100, tol: float = 1e-4,
+                 threshold_negative_eigenvalue: float = -1e-7, compute_labels: bool = True,
+                 random_state: np.random.RandomState = None, debug: bool = False):
+        super().__init__(n_clusters, V=V, m=m, P=P, cluster_centers=cluster_centers, max_iter=max_iter,
+                         threshold_negative_eigenvalue=threshold_negative_eigenvalue, random_state=random_state,
+                         debug=debug)
+        # Fixed attributes (the variables V, m, P and cluster_centers are overwritten by the fitted parameters)
+        self.input_V = V
+        self.input_m = m
+        self.input_P = P
+        self.input_cluster_centers = cluster_centers
+        self.batch_size = batch_size
+        self.tol = tol
+        self.compute_labels = compute_labels
+
+    def _initialize_statistics(self, X_batch: np.ndarray) -> None:
+        """
+        Initialize the parameters (using the first batch) and the running statistics of the clusters.
+        The initialization is always based on the input parameters and not on the results of a previous execution.
+
+        Parameters
+        ----------
+        X_batch : np.ndarray
+            the first batch
+        """
+        V, m, P, centers, subspaces, _, _ = _initialize_nrkmeans_parameters(
+            X_batch, self.input_n_clusters.copy(), None if self.input_V is None else self.input_V.copy(),
+            None if self.input_m is None else list(self.input_m), None if self.input_P is None else list(self.input_P),
+            self.input_cluster_centers, False, False, self.max_iter, self.random_state)
+        self.V = V
+        self.m = list(m)
+        self.P = list(P)
+        self.cluster_centers = [np.array(centers_subspace, dtype=np.float64) for centers_subspace in centers]
+        self.n_clusters = self.input_n_clusters.copy()
+        self._cluster_counts = [np.zeros(n_clusters_subspace, dtype=np.int64) for n_clusters_subspace in
+                                self.n_clusters]
+        self._cluster_scatters = [np.zeros((n_clusters_subspace, X_batch.shape[1], X_batch.shape[1])) for
+                                  n_clusters_subspace in self.n_clusters]
+        self.n_steps_ = 0
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray = None) -> 'MiniBatchNrKmeans':
+        """
+        Update the clustering using a single batch.
+        Can be used to process data sets that are supplied by a batch iterator.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            the current batch
+        y : np.ndarray
+            the labels (can be ignored)
+
+        Returns
+        -------
+        self : MiniBatchNrKmeans
+            this instance of the MiniBatchNrKmeans algorithm
+        """
+        X_batch = np.asarray(X, dtype=np.float64)
+        if not hasattr(self, "n_steps_"):
+            self._initialize_statistics(X_batch)
+        self.V, self.n_clusters, self.m, self.P, self.cluster_centers, self._cluster_counts, self._cluster_scatters, \
+            self.scatter_matrices_ = _minibatch_nrkmeans_step(X_batch, self.n_clusters, self.V, self.m, self.P,
+                                                              self.cluster_centers, self._cluster_counts,
+                                                              self._cluster_scatters,
+                                                              self.threshold_negative_eigenvalue, self.debug)
+        self.n_steps_ += 1
+        return self
+
+    def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'MiniBatchNrKmeans':
+        """
+        Initiate the actual clustering process on the input data set.
+        The data set is processed in batches, so it can also be a memory-mapped array (np.memmap).
+        If compute_labels is True, the resulting cluster labels will be stored in the labels_ attribute.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            the given data set
+        y : np.ndarray
+            the labels (can be ignored)
+
+        Returns
+        -------
+        self : MiniBatchNrKmeans
+            this instance of the MiniBatchNrKmeans algorithm
+        """
+        assert self.batch_size >= max(self.input_n_clusters), "batch_size must not be smaller than the number of clusters"
+        random_state = check_random_state(self.random_state)
+        # Start from scratch, i.e., reinitialize the parameters and statistics using the input parameters
+        if hasattr(self, "n_steps_"):
+            del self.n_steps_
+        batch_starts = np.arange(0, X.shape[0], self.batch_size)
+        for iteration in range(self.max_iter):
+            old_centers = None if iteration == 0 else [centers.copy() for centers in self.cluster_centers]
+            for start in random_state.permutation(batch_starts):
+                self.partial_fit(X[start:start + self.batch_size])
+            # Check if the centers have not changed
+            if old_centers is not None and len(old_centers) == len(self.cluster_centers) and self.tol > 0:
+                center_shift = np.sum([np.sum((centers - old_centers[i]) ** 2) for i, centers in
+                                       enumerate(self.cluster_centers) if centers.shape == old_centers[i].shape])
+                # Average squared distance to the mean (total scatter = within-cluster + between-cluster scatter)
+                counts = self._cluster_counts[0]
+                mean = np.sum(self.cluster_centers[0][counts > 0] * counts[counts > 0, None], axis=0) / np.sum(counts)
+                variance = (np.trace(self.scatter_matrices_[0]) + np.sum(
+                    counts[counts > 0] * np.sum((self.cluster_centers[0][counts > 0] - mean) ** 2, axis=1))) / np.sum(
+                    counts)
+                if center_shift <= self.tol * variance:
+                    break
+        if self.debug:
+            print("[MiniBatchNrKmeans] Finished after " + str(iteration + 1) + " passes over the data set")
+        if self.compute_labels:
+            self.labels_ = self.predict(X)
+        return self
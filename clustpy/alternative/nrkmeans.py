@@ -4,15 +4,20 @@ Collin Leiber
 """
 
 import numpy as np
+import scipy.sparse
 from scipy.stats import ortho_group
 from sklearn.utils import check_random_state
 from scipy.spatial.distance import pdist
 from sklearn.utils.extmath import row_norms
-from sklearn.metrics.pairwise import pairwise_distances_argmin_min
 from sklearn.metrics import normalized_mutual_info_score as nmi
 from sklearn.base import BaseEstimator, ClusterMixin
 from clustpy.utils.plots import plot_scatter_matrix
 import clustpy.utils._information_theory as mdl
+from joblib import Parallel, delayed, effective_n_jobs, dump, load
+import tempfile
+import shutil
+import os
+import hashlib
 
 """
 Output and naming of kmeans++ in Sklearn changed multiple times. This wrapper can work with multiple versions
@@ -127,6 +132,8 @@ def _nrkmeans(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list,
     # Check if labels stay the same (break condition)
     old_labels = None
     n_outliers = np.zeros(subspaces, dtype=int)
+    # Buffer for the centered objects that is reused by all scatter matrix updates
+    buffer = np.empty((min(65536, X.shape[0]), X.shape[1]))
     # Repeat actions until convergence or max_iter
     for iteration in range(max_iter):
         # Execute basic kmeans steps
@@ -136,7 +143,8 @@ def _nrkmeans(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list,
                 # Assign each point to closest cluster center
                 labels[:, i] = _assign_labels(X, V, centers[i], P[i])
                 # Update centers and scatter matrices depending on cluster assignments
-                centers[i], scatter_matrices[i] = _update_centers_and_scatter_matrix(X, n_clusters[i], labels[:, i])
+                centers[i], scatter_matrices[i] = _update_centers_and_scatter_matrix(X, n_clusters[i], labels[:, i],
+                                                                                     buffer=buffer)
                 # Remove empty clusters
                 n_clusters[i], centers[i], labels[:, i] = _remove_empty_cluster(n_clusters[i], centers[i], labels[:, i],
                                                                                 debug)
@@ -146,7 +154,8 @@ def _nrkmeans(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list,
                                                                   scatter_matrices[i], m[i], P[i],
                                                                   X.shape[0], max_distance)
                 # Again update centers and scatter matrices so rotations includes new strucure
-                centers[i], scatter_matrices[i] = _update_centers_and_scatter_matrix(X, n_clusters[i], labels[:, i])
+                centers[i], scatter_matrices[i] = _update_centers_and_scatter_matrix(X, n_clusters[i], labels[:, i],
+                                                                                     buffer=buffer)
         # Check if labels have not changed
         if _are_labels_equal(labels, old_labels):
             break
@@ -176,6 +185,76 @@ def _nrkmeans(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list,
     return labels, centers, V, m, P, n_clusters, scatter_matrices
 
 
+def _nrkmeans_single_run(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list, centers: list,
+                         mdl_for_noisespace: bool, outliers: bool, max_iter: int, threshold_negative_eigenvalue: float,
+                         max_distance: float, precision: float, cost_type: str, random_state: int, debug: bool) -> (
+        float, np.ndarray, list, np.ndarray, list, list, list, list):
+    """
+    Execute a single NrKmeans run (one of the n_init executions) and calculate its costs.
+    The input parameters are copied beforehand, as they are changed in-place by _nrkmeans.
+    Therefore, all runs are independent of each other and can be executed in parallel.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    n_clusters : list
+        list containing number of clusters for each subspace
+    V : np.ndarray
+        the orthonormal rotation matrix. Can be None
+    m : list
+        list containing the dimensionalities for each subspace. Can be None
+    P : list
+        list containing projections (ids of corresponding dimensions) for each subspace. Can be None
+    centers : list
+        list containing the cluster centers for each subspace. Can be None
+    mdl_for_noisespace : bool
+        defines if MDL should be used to identify noise space dimensions instead of only considering negative eigenvalues
+    outliers : bool
+        defines if outliers should be identified through MDL
+    max_iter : int
+        maximum number of iterations for the algorithm
+    threshold_negative_eigenvalue : float
+        threshold to consider an eigenvalue as negative. Used for the update of the subspace dimensions
+    max_distance : float
+        distance used to encode cluster centers and outliers. Only relevant if a MDL strategy is used
+    precision : float
+        precision used to convert probability densities to actual probabilities. Only relevant if a MDL strategy is used
+    cost_type : str
+        Can be "default" or "mdl" and defines whether the standard NrKmeans cost function or MDL costs should be calculated
+    random_state : int
+        the seed of this run
+    debug : bool
+        If true, additional information will be printed to the console
+
+    Returns
+    -------
+    tuple : (float, np.ndarray, list, np.ndarray, list, list, list, list)
+        The costs of the result,
+        The labels,
+        The cluster centers,
+        The orthonormal rotation matrix,
+        The dimensionalities of the subpsaces,
+        The projections,
+        The number of clusters for each subspace (usually the same as the input),
+        The scatter matrix of each subspace
+    """
+    n_clusters = n_clusters.copy()
+    m = None if m is None else m.copy()
+    P = None if P is None else [P_subspace.copy() for P_subspace in P]
+    centers = None if centers is None else [centers_subspace.copy() for centers_subspace in centers]
+    labels, centers, V, m, P, n_clusters, scatter_matrices = _nrkmeans(X, n_clusters, V, m, P, centers,
+                                                                       mdl_for_noisespace, outliers, max_iter,
+                                                                       threshold_negative_eigenvalue, max_distance,
+                                                                       precision, check_random_state(random_state),
+                                                                       debug)
+    if cost_type == "default":
+        costs = _get_total_cost_function(V, P, scatter_matrices)
+    else:  # in case of cost_type == "mdl"
+        costs, _, _ = _mdl_costs(X, n_clusters, m, P, V, scatter_matrices, labels, outliers, max_distance, precision)
+    return costs, labels, centers, V, m, P, n_clusters, scatter_matrices
+
+
 def _initialize_nrkmeans_parameters(X: np.ndarray, n_clusters: list, V: np.ndarray, m: list, P: list, centers: list,
                                     mdl_for_noisespace: bool, outliers: bool, max_iter: int,
                                     random_state: np.random.RandomState) -> (
@@ -321,9 +400,14 @@ def _initialize_nrkmeans_parameters(X: np.ndarray, n_clusters: list, V: np.ndarr
     return V, m, P, centers, subspaces, labels, scatter_matrices
 
 
-def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P_subspace: np.ndarray) -> np.ndarray:
+def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P_subspace: np.ndarray,
+                   block_size: int = 65536) -> np.ndarray:
     """
     Assign each point in each subspace to its nearest cluster center.
+    The squared distance within the subspace equals ||V_P^T x||^2 - 2 x^T V_P V_P^T c + ||V_P^T c||^2, where the first term does not depend on the center.
+    Therefore, the data set does not have to be projected onto the subspace. Instead, the projected centers are mapped back into the full-dimensional space
+    and only a single multiplication of X with these (n_features x n_clusters) vectors is needed.
+    The objects are processed blockwise to limit the size of the intermediate distance matrix.
 
     Parameters
     ----------
@@ -335,6 +419,8 @@ def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P
         the cluster centers in this subspace
     P_subspace : np.ndarray
         the relevant dimensions (projections) in this subspace
+    block_size : int
+        the number of objects that are assigned at once (default: 65536)
 
     Returns
     -------
@@ -342,21 +428,29 @@ def _assign_labels(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, P
         The updated cluster labels in this subspace
     """
     cropped_V = V[:, P_subspace]
-    cropped_X = np.matmul(X, cropped_V)
     cropped_centers = np.matmul(centers_subspace, cropped_V)
-    # Find nearest center
-    labels, _ = pairwise_distances_argmin_min(X=cropped_X, Y=cropped_centers, metric='euclidean',
-                                              metric_kwargs={'squared': True})
+    # Projected centers in the full-dimensional space
+    backprojected_centers = np.matmul(cropped_V, cropped_centers.T)
+    centers_squared_norms = np.sum(cropped_centers ** 2, axis=1)
     # cython k-means code assumes int32 inputs
-    labels = labels.astype(np.int32)
+    labels = np.zeros(X.shape[0], dtype=np.int32)
+    for start in range(0, X.shape[0], block_size):
+        distances = np.matmul(X[start:start + block_size], backprojected_centers)
+        distances *= -2
+        distances += centers_squared_norms
+        labels[start:start + block_size] = np.argmin(distances, axis=1)
     return labels
 
 
-def _update_centers_and_scatter_matrix(X: np.ndarray, n_clusters_subspace: int, labels_subspace: np.ndarray) -> (
-        np.ndarray, np.ndarray):
+def _update_centers_and_scatter_matrix(X: np.ndarray, n_clusters_subspace: int, labels_subspace: np.ndarray,
+                                       block_size: int = 65536, buffer: np.ndarray = None) -> (np.ndarray, np.ndarray):
     """
     Update the cluster centers within this subspace depending on the labels of the data points. Also updates the
-    scatter matrix by summing up the outer product of the distance between each point and its center.
+    scatter matrix, i.e., the sum of the outer product of the distance between each point and its center.
+    The cluster sums are obtained by a single multiplication with a sparse one-hot matrix of the labels.
+    The scatter matrix is accumulated blockwise. The centered objects of a block are written into a buffer of shape (block_size x d),
+    which can be reused across subspaces and iterations. Apart from this buffer, only arrays of size n, k x d and d x d are allocated.
+    Outliers (label -1) are ignored, i.e., their rows in the buffer are set to zero.
 
     Parameters
     ----------
@@ -366,6 +460,11 @@ def _update_centers_and_scatter_matrix(X: np.ndarray, n_clusters_subspace: int,
         number of clusters in this subspace
     labels_subspace : np.ndarray
         the cluster labels in this subspace
+    block_size : int
+        the number of objects that are centered at once (default: 65536)
+    buffer : np.ndarray
+        float64 array with at least min(block_size, n) rows and d columns that is used to store the centered objects of a block.
+        If None, a new buffer will be allocated (default: None)
 
     Returns
     -------
@@ -373,11 +472,26 @@ def _update_centers_and_scatter_matrix(X: np.ndarray, n_clusters_subspace: int,
         The updated cluster centers,
         The updated scatter matrix
     """
+    assigned_ids = np.where(labels_subspace >= 0)[0]
     # Get new centers
-    centers = np.array([np.mean(X[labels_subspace == cluster_id], axis=0) for cluster_id in range(n_clusters_subspace)])
+    cluster_sizes = np.bincount(labels_subspace[assigned_ids], minlength=n_clusters_subspace)
+    one_hot = scipy.sparse.csr_matrix((np.ones(assigned_ids.shape[0]), (labels_subspace[assigned_ids], assigned_ids)),
+                                      shape=(n_clusters_subspace, X.shape[0]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Empty clusters receive a nan center
+        centers = np.asarray(one_hot @ X) / cluster_sizes[:, None]
     # Get new scatter matrix
-    centered_points = X[labels_subspace >= 0] - centers[labels_subspace[labels_subspace >= 0]]
-    scatter_matrix = np.matmul(centered_points.T, centered_points)
+    if buffer is None:
+        buffer = np.empty((min(block_size, X.shape[0]), X.shape[1]))
+    scatter_matrix = np.zeros((X.shape[1], X.shape[1]))
+    for start in range(0, X.shape[0], block_size):
+        labels_block = labels_subspace[start:start + block_size]
+        centered_points = buffer[:labels_block.shape[0]]
+        # Outliers receive an arbitrary center and are set to zero afterward
+        np.take(centers, labels_block, axis=0, out=centered_points, mode="clip")
+        np.subtract(X[start:start + block_size], centered_points, out=centered_points)
+        centered_points[labels_block < 0] = 0
+        scatter_matrix += np.matmul(centered_points.T, centered_points)
     return centers, scatter_matrix
 
 
@@ -778,6 +892,10 @@ class NrKmeans(BaseEstimator, ClusterMixin):
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    n_jobs : int
+        Number of NrKmeans executions (see n_init) that run concurrently.
+        The workers are separate processes, which access the data set through a memmap.
+        The result is equal to the one of a serial execution. -1 uses all available cores (default: None)
 
     Attributes
     ----------
@@ -802,7 +920,7 @@ class NrKmeans(BaseEstimator, ClusterMixin):
                  cluster_centers: list = None, mdl_for_noisespace: bool = False, outliers: bool = False,
                  max_iter: int = 300, n_init: int = 1, cost_type: str = "default",
                  threshold_negative_eigenvalue: float = -1e-7, max_distance: float = None, precision: float = None,
-                 random_state: np.random.RandomState = None, debug: bool = False):
+                 random_state: np.random.RandomState = None, debug: bool = False, n_jobs: int = None):
         # Fixed attributes
         self.input_n_clusters = n_clusters.copy()
         self.max_iter = max_iter
@@ -814,6 +932,7 @@ class NrKmeans(BaseEstimator, ClusterMixin):
         self.max_distance = max_distance
         self.precision = precision
         self.debug = debug
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
         # Variables
         self.n_clusters = n_clusters
@@ -847,22 +966,27 @@ class NrKmeans(BaseEstimator, ClusterMixin):
         if self.mdl_for_noisespace and self.precision is None:
             self.precision = _get_precision(X)
         all_random_states = self.random_state.choice(10000, self.n_init, replace=False)
-        # Get best result
+        # When running in parallel, the workers access the data set through a memmap instead of receiving pickled copies
+        tmp_folder = None
+        if effective_n_jobs(self.n_jobs) > 1 and self.n_init > 1:
+            tmp_folder = tempfile.mkdtemp(prefix="clustpy_nrkmeans_")
+            dump(X, os.path.join(tmp_folder, "X.joblib"))
+            X_shared = load(os.path.join(tmp_folder, "X.joblib"), mmap_mode="r")
+        else:
+            X_shared = X
+        try:
+            all_results = Parallel(n_jobs=self.n_jobs if self.n_init > 1 else None)(
+                delayed(_nrkmeans_single_run)(X_shared, self.n_clusters, self.V, self.m, self.P, self.cluster_centers,
+                                              self.mdl_for_noisespace, self.outliers, self.max_iter,
+                                              self.threshold_negative_eigenvalue, self.max_distance, self.precision,
+                                              cost_type, all_random_states[i], self.debug) for i in range(self.n_init))
+        finally:
+            if tmp_folder is not None:
+                del X_shared
+                shutil.rmtree(tmp_folder, ignore_errors=True)
+        # Get best result (in the order of the executions, as in a serial execution)
         best_costs = np.inf
-        for i in range(self.n_init):
-            local_random_state = check_random_state(all_random_states[i])
-            labels, centers, V, m, P, n_clusters, scatter_matrices = _nrkmeans(X, self.n_clusters, self.V, self.m,
-                                                                               self.P, self.cluster_centers,
-                                                                               self.mdl_for_noisespace,
-                                                                               self.outliers, self.max_iter,
-                                                                               self.threshold_negative_eigenvalue,
-                                                                               self.max_distance, self.precision,
-                                                                               local_random_state, self.debug)
-            if cost_type == "default":
-                costs = _get_total_cost_function(V, P, scatter_matrices)
-            else:  # in case of cost_type == "mdl"
-                costs, _, _ = _mdl_costs(X, n_clusters, m, P, V, scatter_matrices, labels,
-                                         self.outliers, self.max_distance, self.precision)
+        for costs, labels, centers, V, m, P, n_clusters, scatter_matrices in all_results:
             if costs < best_costs:
                 best_costs = costs
                 # Update class variables
@@ -891,7 +1015,7 @@ class NrKmeans(BaseEstimator, ClusterMixin):
             the predicted labels of the input data set for each subspace. Shape equals (n_samples x n_subspaces)
         """
         # Check if NrKmeans has run
-        assert hasattr(self, "labels_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
+        assert hasattr(self, "scatter_matrices_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
         predicted_labels = np.zeros((X.shape[0], len(self.n_clusters)), dtype=np.int32)
         # Get labels for each subspace
         for sub in range(len(self.n_clusters)):
@@ -920,7 +1044,7 @@ class NrKmeans(BaseEstimator, ClusterMixin):
         rotated_data : np.ndarray
             The rotated dataset
         """
-        assert hasattr(self, "labels_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
+        assert hasattr(self, "scatter_matrices_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
         rotated_data = np.matmul(X, self.V)
         return rotated_data
 
@@ -941,7 +1065,7 @@ class NrKmeans(BaseEstimator, ClusterMixin):
         rotated_data : np.ndarray
             The rotated and projected dataset
         """
-        assert hasattr(self, "labels_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
+        assert hasattr(self, "scatter_matrices_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
         subspace_V = self.V[:, self.P[subspace_index]]
         rotated_data = np.matmul(X, subspace_V)
         return rotated_data
@@ -1032,7 +1156,7 @@ class NrKmeans(BaseEstimator, ClusterMixin):
         costs : float
             The total loss of this NrKmeans object
         """
-        assert hasattr(self, "labels_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
+        assert hasattr(self, "scatter_matrices_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
         costs = _get_total_cost_function(self.V, self.P, self.scatter_matrices_)
         return costs
 
@@ -1072,6 +1196,11 @@ class NrKmeans(BaseEstimator, ClusterMixin):
                     self.P[subspace_id], self.P[-1][relevant_entries]]
                 self.m[subspace_id] += len(relevant_entries)
         else:
+            assert hasattr(self, "labels_"), "The NrKmeans algorithm has not run yet. Use the fit() function first."
+            max_distance = np.max(pdist(X)) if self.max_distance is None else self.max_distance
+            precision = _get_precision(X) if self.precision is None else self.precision
+            # Only a single subspace changes in each step. Therefore, the costs of all other subspaces can be reused
+            cost_cache = {}
             for proj in self.P[-1]:
                 best_match_id = None
                 best_mdl_costs = np.inf
@@ -1080,7 +1209,8 @@ class NrKmeans(BaseEstimator, ClusterMixin):
                     self.P[subspace_id] = np.r_[self.P[subspace_id], [proj]]
                     self.m[subspace_id] += 1
                     # Get mdl costs
-                    mdl_costs, _, _ = self.calculate_mdl_costs(X)
+                    mdl_costs, _, _ = _mdl_costs(X, self.n_clusters, self.m, self.P, self.V, self.scatter_matrices_,
+                                                 self.labels_, self.outliers, max_distance, precision, cost_cache)
                     if mdl_costs < best_mdl_costs:
                         best_mdl_costs = mdl_costs
                         best_match_id = subspace_id
@@ -1149,41 +1279,44 @@ def _compare_possible_splits(X: np.ndarray, V: np.ndarray, cluster_index: int, n
     """
     # Find best split of dimensions
     best_costs = np.inf
-    best_P_cluster, best_P_noise = _update_projections(P_combined, 0)
+    best_m_cluster = 0
+    # The cluster space consists of the first m_cluster dimensions of P_combined, the noise space of the remaining ones.
+    # Therefore, the traces of the rotated scatter matrices can be updated incrementally using the variance of each single rotated dimension
+    cropped_V_combined = V[:, P_combined]
+    traces_cluster = np.cumsum(_get_column_variances(cropped_V_combined, scatter_matrices[cluster_index]))
+    traces_noise = np.cumsum(_get_column_variances(cropped_V_combined, scatter_matrices[noise_index])[::-1])[::-1]
     # Try raising number of dimensionalities in the cluster space until costs raise
     for m_cluster in range(1, n_negative_e + 1):
         m_noise = len(P_combined) - m_cluster
-        P_cluster, P_noise = _update_projections(P_combined, m_cluster)
         # Get costs for this combination of dimensionalities
-        costs = _mdl_m_dependant_subspace_costs(X, V, cluster_index, noise_index, m_cluster, m_noise, P_cluster,
-                                                P_noise, scatter_matrices, n_clusters, outliers, n_outliers,
-                                                max_distance, precision)
+        costs = _mdl_m_dependant_subspace_costs(X.shape[0], cluster_index, noise_index, m_cluster, m_noise,
+                                                traces_cluster[m_cluster - 1],
+                                                traces_noise[m_cluster] if m_noise > 0 else 0, n_clusters,
+                                                outliers, n_outliers, max_distance, precision)
         # If costs are lower, next try. Else break
         if costs < best_costs:
             best_costs = costs
-            best_P_cluster = P_cluster.copy()
-            best_P_noise = P_noise.copy()
+            best_m_cluster = m_cluster
         else:
             break
+    best_P_cluster, best_P_noise = _update_projections(P_combined, best_m_cluster)
     return best_P_cluster, best_P_noise
 
 
-def _mdl_m_dependant_subspace_costs(X: np.ndarray, V: np.ndarray, cluster_index: int, noise_index: int, m_cluster: int,
-                                    m_noise: int, P_cluster: np.ndarray, P_noise: np.ndarray,
-                                    scatter_matrices: list, n_clusters: list, outliers: bool, n_outliers: np.ndarray,
-                                    max_distance: float, precision: float) -> float:
+def _mdl_m_dependant_subspace_costs(n_points: int, cluster_index: int, noise_index: int, m_cluster: int, m_noise: int,
+                                    trace_cluster: float, trace_noise: float, n_clusters: list, outliers: bool,
+                                    n_outliers: np.ndarray, max_distance: float, precision: float) -> float:
     """
     Get the total costs depending on the subspace dimensions for one cluster space and the noise space.
     Method can be used to determine the best possible number of dimensions to swap from cluster into the noise
     space.
+    The point encoding costs only depend on the traces of the rotated scatter matrices of the two subspaces.
     See 'Automatic Parameter Selection for Non-Redundant Clustering' for more information.
 
     Parameters
     ----------
-    X : np.ndarray
-        the given data set
-    V : np.ndarray
-        the orthonormal rotation matrix
+    n_points : int
+        the number of objects
     cluster_index : int
         index of the cluster space
     noise_index : int
@@ -1192,12 +1325,10 @@ def _mdl_m_dependant_subspace_costs(X: np.ndarray, V: np.ndarray, cluster_index:
         dimensionality of the cluster space
     m_noise : int
         dimensionality of the noise space
-    P_cluster : np.ndarray
-        projections of the cluster space
-    P_noise : np.ndarray
-        projections of the noise space
-    scatter_matrices : list
-        the scatter matrix of each subspace
+    trace_cluster : float
+        trace of the scatter matrix of the cluster space rotated by the projections of the cluster space
+    trace_noise : float
+        trace of the scatter matrix of the noise space rotated by the projections of the noise space
     n_clusters : list
         list containing number of clusters for each subspace
     outliers : bool
@@ -1214,31 +1345,25 @@ def _mdl_m_dependant_subspace_costs(X: np.ndarray, V: np.ndarray, cluster_index:
     combined_costs : float
         The combined costs of the cluster and the noise space for this selection of dimensionalities
     """
-    n_points = X.shape[0]
     # ==== Costs of cluster space ====
-    cropped_V_cluster = V[:, P_cluster]
     # Costs for cluster dimensionality
     cluster_costs = mdl.integer_costs(m_cluster)
     # Costs for centers
     cluster_costs += n_clusters[cluster_index] * _mdl_reference_vector(m_cluster, max_distance, precision)
     # Costs for point encoding
-    cluster_costs += mdl.mdl_costs_gmm_common_covariance(m_cluster,
-                                                         scatter_matrices[cluster_index],
-                                                         n_points - n_outliers[cluster_index], cropped_V_cluster,
-                                                         "spherical")
+    cluster_costs += mdl.mdl_costs_gaussian_spherical_covariance_from_trace(m_cluster, trace_cluster,
+                                                                            n_points - n_outliers[cluster_index])
     # Costs for outliers
     if outliers:
         cluster_costs += n_outliers[cluster_index] * _mdl_costs_uniform_pdf(m_cluster, max_distance)
     # ==== Costs of noise space ====
-    cropped_V_noise = V[:, P_noise]
     # Costs for noise dimensionality
     noise_costs = mdl.integer_costs(m_noise)
     # Costs for centers
     noise_costs += n_clusters[noise_index] * _mdl_reference_vector(m_noise, max_distance, precision)
     # Costs for point encoding
-    noise_costs += mdl.mdl_costs_gmm_common_covariance(m_noise,
-                                                       scatter_matrices[noise_index],
-                                                       n_points - n_outliers[noise_index], cropped_V_noise, "spherical")
+    noise_costs += mdl.mdl_costs_gaussian_spherical_covariance_from_trace(m_noise, trace_noise,
+                                                                          n_points - n_outliers[noise_index])
     # Costs for outliers
     if outliers:
         noise_costs += n_outliers[noise_index] * _mdl_costs_uniform_pdf(m_noise, max_distance)
@@ -1249,7 +1374,7 @@ def _mdl_m_dependant_subspace_costs(X: np.ndarray, V: np.ndarray, cluster_index:
 
 def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarray, labels_subspace: np.ndarray,
                         scatter_matrix_subspace: np.ndarray, m_subspace: int, P_subspace: np.ndarray,
-                        n_points: int, max_distance: float) -> (np.ndarray, int):
+                        n_points: int, max_distance: float, block_size: int = 65536) -> (np.ndarray, int):
     """
     Check for each point if it should be interpreted as an outlier in this subspace. Outliers are defined by the cost
     difference when this point is removed from its cluster. If it is cheaper to encode the point separately it is an outlier.
@@ -1277,6 +1402,8 @@ def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarr
         the number of objects. Used for the calculation of the MDL costs (since the method should also work for predictions, it can not be obtained from X)
     max_distance : float
         distance used to encode the outliers
+    block_size : int
+        the number of objects whose distances to their centers are calculated at once (default: 65536)
 
     Returns
     -------
@@ -1288,12 +1415,14 @@ def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarr
     cropped_V = V[:, P_subspace]
     # Copy labels to update theses based on new outliers
     labels_subspace_copy = labels_subspace.copy()
-    # Calculate points distances to respective centers
-    cropped_X = np.matmul(X, cropped_V)
+    # Calculate points distances to respective centers (blockwise, so X is never projected as a whole)
     cropped_centers = np.matmul(centers_subspace, cropped_V)
     cropped_scatter_matrix = np.matmul(np.matmul(cropped_V.transpose(), scatter_matrix_subspace), cropped_V)
-    differences_per_dim = np.power(cropped_X - cropped_centers[labels_subspace], 2)
-    differences_sum = np.sum(differences_per_dim, axis=1)
+    differences_sum = np.zeros(X.shape[0])
+    for start in range(0, X.shape[0], block_size):
+        differences = np.matmul(X[start:start + block_size], cropped_V)
+        differences -= cropped_centers[labels_subspace[start:start + block_size]]
+        differences_sum[start:start + block_size] = np.einsum("ij,ij->i", differences, differences)
     # Get costs of a single outlier
     outlier_coding_cost = _mdl_costs_uniform_pdf(m_subspace, max_distance)
     outlier_coding_cost += np.log2(n_points) - np.log2(len(centers_subspace))
@@ -1318,13 +1447,17 @@ def _check_for_outliers(X: np.ndarray, V: np.ndarray, centers_subspace: np.ndarr
 
 
 def _mdl_costs(X: np.ndarray, n_clusters: list, m: list, P: list, V: np.ndarray, scatter_matrices: list,
-               labels: np.ndarray, outliers: bool, max_distance: float, precision: float) -> (float, float, list):
+               labels: np.ndarray, outliers: bool, max_distance: float, precision: float,
+               cost_cache: dict = None) -> (float, float, list):
     """
     Calculate the total mdl costs of a non-redundant clustering found by NrKmeans.
     Total costs consists of global costs which describe the whole system (e.g. number of subspaces)
     and separate costs for each subspace. This include the exact dimensionalities of the subspaces, number of clusters,
     the centers, cluster assignments, cluster variances and coding costs for each point within a cluster and for each
     outlier.
+    If a cost_cache is given, the costs of each subspace are stored using the projections, the labels and the dimensionality of the subspace as key.
+    Further, the variance of each rotated dimension is stored for the scatter matrix of each subspace, so that the costs of new projections can be obtained without projecting the scatter matrix again.
+    Therefore, a cache must only be used as long as the data set, the rotation and the scatter matrices do not change.
     See 'Automatic Parameter Selection for Non-Redundant Clustering' for more information.
 
     Parameters
@@ -1349,6 +1482,8 @@ def _mdl_costs(X: np.ndarray, n_clusters: list, m: list, P: list, V: np.ndarray,
         distance used to encode cluster centers and outliers
     precision : float
         precision used to convert probability densities to actual probabilities
+    cost_cache : dict
+        dictionary used to store intermediate results. Will be updated in-place. If None, no cache will be used (default: None)
 
     Returns
     -------
@@ -1373,7 +1508,19 @@ def _mdl_costs(X: np.ndarray, n_clusters: list, m: list, P: list, V: np.ndarray,
     # Costs for each subspace
     all_subspace_costs = []
     for subspace in range(subspaces):
-        cropped_V = V[:, P[subspace]]
+        if cost_cache is not None:
+            labels_fingerprint = hashlib.blake2b(labels[:, subspace].tobytes(), digest_size=16).digest()
+            subspace_key = (P[subspace].tobytes(), labels_fingerprint, m[subspace])
+            if subspace_key in cost_cache:
+                all_subspace_costs.append(cost_cache[subspace_key])
+                continue
+            # Variance of each rotated dimension regarding the scatter matrix of this subspace
+            variances_key = ("column_variances", labels_fingerprint)
+            if variances_key not in cost_cache:
+                cost_cache[variances_key] = _get_column_variances(V, scatter_matrices[subspace])
+            trace = np.sum(cost_cache[variances_key][P[subspace]])
+        else:
+            trace = np.sum(_get_column_variances(V[:, P[subspace]], scatter_matrices[subspace]))
         # Calculate costs
         model_costs = 0
         # Costs for dimensionality
@@ -1398,17 +1545,40 @@ def _mdl_costs(X: np.ndarray, n_clusters: list, m: list, P: list, V: np.ndarray,
         # Subspace Variance costs
         model_costs += mdl.bic_costs(n_points, True)
         # Coding costs for each point
-        coding_costs = mdl.mdl_costs_gmm_common_covariance(m[subspace],
-                                                           scatter_matrices[subspace],
-                                                           n_points - n_outliers, cropped_V, "spherical")
+        coding_costs = mdl.mdl_costs_gaussian_spherical_covariance_from_trace(m[subspace], trace,
+                                                                              n_points - n_outliers)
         coding_costs += n_points * _mdl_costs_precision(m[subspace], precision)
         # Save this subspace costs
-        all_subspace_costs.append(model_costs + outlier_costs + assignment_costs + coding_costs)
+        subspace_costs = model_costs + outlier_costs + assignment_costs + coding_costs
+        if cost_cache is not None:
+            cost_cache[subspace_key] = subspace_costs
+        all_subspace_costs.append(subspace_costs)
     # return full and single subspace costs
     total_costs = global_costs + sum(all_subspace_costs)
     return total_costs, global_costs, all_subspace_costs
 
 
+def _get_column_variances(cropped_V: np.ndarray, scatter_matrix: np.ndarray) -> np.ndarray:
+    """
+    Get the variance (scaled by the number of objects) of the data along each column of the rotation matrix, i.e., the diagonal of V^T S V.
+    The trace of a rotated scatter matrix equals the sum of the entries corresponding to the dimensions of the subspace.
+
+    Parameters
+    ----------
+    cropped_V : np.ndarray
+        the (cropped) orthonormal rotation matrix
+    scatter_matrix : np.ndarray
+        the scatter matrix
+
+    Returns
+    -------
+    column_variances : np.ndarray
+        The variance along each column of cropped_V
+    """
+    column_variances = np.einsum("ij,ij->j", np.matmul(scatter_matrix, cropped_V), cropped_V)
+    return column_variances
+
+
 def _mdl_costs_uniform_pdf(m_subspace: int, max_distance: float) -> float:
     """
     Get the MDL costs of an uniform distribution by using a data range defied by the max_distance parameter.
@@ -80,6 +80,19 @@ def test_simple_autonr():
     assert autonr.labels_.shape[0] == labels.shape[0]
 
 
+def test_autonr_parallel():
+    X, labels = create_nr_data(200, random_state=1)
+    autonr = AutoNR(nrkmeans_repetitions=2, max_subspaces=3, random_state=1)
+    autonr.fit(X)
+    # Result must not depend on the number of concurrent evaluations
+    autonr_parallel = AutoNR(nrkmeans_repetitions=2, max_subspaces=3, random_state=1, n_jobs=2)
+    autonr_parallel.fit(X)
+    assert np.array_equal(autonr_parallel.n_clusters_, autonr.n_clusters_)
+    assert np.array_equal(autonr_parallel.labels_, autonr.labels_)
+    assert autonr_parallel.mdl_costs_ == autonr.mdl_costs_
+    assert [c.costs for c in autonr_parallel.all_mdl_costs_] == [c.costs for c in autonr.all_mdl_costs_]
+
+
 @patch("matplotlib.pyplot.show")  # Used to test plots (show will not be called)
 def test_plot_autonr_mdl_costs_progress(mock_fig):
     X, labels = create_nr_data(200, random_state=1)
@@ -0,0 +1,102 @@
+import numpy as np
+from clustpy.alternative import MiniBatchNrKmeans
+from clustpy.alternative.minibatch_nrkmeans import _minibatch_nrkmeans_step
+from clustpy.alternative.nrkmeans import _update_centers_and_scatter_matrix, _assign_labels, _update_rotation
+from clustpy.data import create_nr_data
+import os
+
+
+def test_minibatch_nrkmeans_step():
+    X, _ = create_nr_data(300, random_state=1)
+    V = np.identity(X.shape[1])
+    centers = [X[:3].copy(), X[:1].copy()]
+    cluster_counts = [np.zeros(3, dtype=np.int64), np.zeros(1, dtype=np.int64)]
+    cluster_scatters = [np.zeros((3, X.shape[1], X.shape[1])), np.zeros((1, X.shape[1], X.shape[1]))]
+    initial_centers = [c.copy() for c in centers]
+    V_new, n_clusters, m, P, centers, cluster_counts, cluster_scatters, scatter_matrices = _minibatch_nrkmeans_step(
+        X[:100], [3, 1], V, [3, 3], [np.array([0, 1, 2]), np.array([3, 4, 5])], centers, cluster_counts,
+        cluster_scatters, -1e-7, False)
+    assert np.sum(cluster_counts[0]) == 100 and np.sum(cluster_counts[1]) == 100
+    # A single step on a batch must result in the same scatter matrices and centers as the full-batch update
+    labels = _assign_labels(X[:100], np.identity(X.shape[1]), initial_centers[0], np.array([0, 1, 2]))
+    expected_centers, expected_scatter = _update_centers_and_scatter_matrix(X[:100], 3, labels)
+    assert np.allclose(centers[0][cluster_counts[0] > 0], expected_centers[cluster_counts[0] > 0])
+    assert np.allclose(scatter_matrices[0], expected_scatter)
+    assert np.allclose(np.sum(cluster_scatters[0], axis=0), expected_scatter)
+    assert np.allclose(centers[1][0], np.mean(X[:100], axis=0))
+    assert np.allclose(np.matmul(V_new, V_new.T), np.identity(X.shape[1]))
+    assert sum(m) == X.shape[1]
+
+
+def test_minibatch_nrkmeans_step_well_separated_clusters():
+    random_state = np.random.RandomState(1)
+    labels = random_state.randint(3, size=(3000, 2))
+    separation = 1e7
+    X = np.c_[labels * separation + random_state.randn(3000, 2), random_state.randn(3000) + labels[:, 0] * 5]
+    P = [np.array([0]), np.array([1, 2])]
+    centers = [np.array([[c * separation, 0, 0] for c in range(3)], dtype=np.float64),
+               np.array([[0, c * separation, 0] for c in range(3)], dtype=np.float64)]
+    cluster_counts = [np.zeros(3, dtype=np.int64), np.zeros(3, dtype=np.int64)]
+    cluster_scatters = [np.zeros((3, 3, 3)), np.zeros((3, 3, 3))]
+    for start in range(0, X.shape[0], 256):
+        _, _, m, P_new, centers, cluster_counts, cluster_scatters, scatter_matrices = _minibatch_nrkmeans_step(
+            X[start:start + 256], [3, 3], np.identity(3), [1, 2], [P_subspace.copy() for P_subspace in P],
+            centers, cluster_counts, cluster_scatters, -1e-7, False)
+    # The merged statistics must match the scatter matrices of the full data set, also within the clusters
+    expected_scatter_matrices = [_update_centers_and_scatter_matrix(X, 3, labels[:, i])[1] for i in range(2)]
+    assert abs(scatter_matrices[0][0, 0] - expected_scatter_matrices[0][0, 0]) < 1e-3
+    assert abs(scatter_matrices[1][1, 1] - expected_scatter_matrices[1][1, 1]) < 1e-3
+    # The eigenvalue decisions must equal the ones obtained by the exact scatter matrices
+    P_1_expected, P_2_expected, _ = _update_rotation(X, np.identity(3), 0, 1, [3, 3], P, expected_scatter_matrices,
+                                                     -1e-7, False, False, None, None, None)
+    assert np.array_equal(np.sort(P_new[0]), np.sort(P_1_expected))
+    assert np.array_equal(np.sort(P_new[1]), np.sort(P_2_expected))
+    assert m == [len(P_1_expected), len(P_2_expected)]
+
+
+def test_simple_minibatch_nrkmeans(tmp_path):
+    X, labels = create_nr_data(3000, random_state=1)
+    mbnrk = MiniBatchNrKmeans([3, 3, 1], batch_size=256, random_state=1)
+    assert not hasattr(mbnrk, "labels_")
+    mbnrk.fit(X)
+    assert mbnrk.labels_.dtype == np.int32
+    assert mbnrk.labels_.shape == labels.shape
+    assert np.array_equal(mbnrk.labels_, mbnrk.predict(X))
+    # Check if random state is working
+    mbnrk_2 = MiniBatchNrKmeans([3, 3, 1], batch_size=256, random_state=1).fit(X)
+    assert np.array_equal(mbnrk.labels_, mbnrk_2.labels_)
+    assert np.array_equal(mbnrk.V, mbnrk_2.V)
+    # Memory-mapped array
+    path = os.path.join(tmp_path, "X.npy")
+    np.save(path, X)
+    X_memmap = np.load(path, mmap_mode="r")
+    mbnrk_3 = MiniBatchNrKmeans([3, 3, 1], batch_size=256, random_state=1).fit(X_memmap)
+    assert np.array_equal(mbnrk.labels_, mbnrk_3.labels_)
+    # Batch iterator
+    mbnrk_4 = MiniBatchNrKmeans([3, 3, 1], random_state=1)
+    for start in range(0, X.shape[0], 500):
+        mbnrk_4.partial_fit(X_memmap[start:start + 500])
+    assert mbnrk_4.n_steps_ == 6
+    assert not hasattr(mbnrk_4, "labels_")
+    assert mbnrk_4.predict(X).shape == labels.shape
+    assert mbnrk_4.transform_full_space(X).shape == X.shape
+
+
+def test_minibatch_nrkmeans_refit():
+    X, _ = create_nr_data(600, random_state=1)
+    V = np.identity(X.shape[1])
+    P = [np.arange(0, X.shape[1], 2), np.arange(1, X.shape[1], 2)]
+    m = [len(P[0]), len(P[1])]
+    cluster_centers = [X[:3].copy(), X[3:4].copy()]
+    mbnrk = MiniBatchNrKmeans([3, 1], V=V, m=m, P=P, cluster_centers=cluster_centers, batch_size=X.shape[0],
+                              max_iter=1, random_state=1)
+    mbnrk.fit(X)
+    V_first, labels_first = mbnrk.V.copy(), mbnrk.labels_.copy()
+    assert not np.array_equal(V_first, V)
+    # The input parameters are not changed and a second execution of fit starts from them again
+    assert np.array_equal(mbnrk.input_V, np.identity(X.shape[1]))
+    assert mbnrk.input_m == m and mbnrk.input_P is P and mbnrk.input_cluster_centers is cluster_centers
+    mbnrk.fit(X)
+    assert mbnrk.n_steps_ == 1
+    assert np.array_equal(mbnrk.V, V_first)
+    assert np.array_equal(mbnrk.labels_, labels_first)
@@ -2,7 +2,8 @@ import numpy as np
 from clustpy.alternative import NrKmeans
 from clustpy.alternative.nrkmeans import _assign_labels, _are_labels_equal, _is_matrix_orthogonal, _is_matrix_symmetric, \
     _create_full_rotation_matrix, _update_projections, _update_centers_and_scatter_matrix, _remove_empty_cluster, \
-    _get_cost_function_of_subspace, _get_total_cost_function, _remove_empty_subspace, _get_precision
+    _get_cost_function_of_subspace, _get_total_cost_function, _remove_empty_subspace, _get_precision, \
+    _get_column_variances, _mdl_costs
 from clustpy.data import create_nr_data
 from unittest.mock import patch
 
@@ -18,6 +19,22 @@ def test_update_centers_and_scatter_matrices():
                                                                                          labels_subspace)
     assert np.array_equal(expected_centers, calculated_centers, equal_nan=True)
     assert np.array_equal(expected_scatter_matrix, calculated_scatter_matrices)
+    # Outliers (label -1) are ignored
+    labels_subspace = np.array([0, 0, 0, 1, 1, 1, 3, 3, 3, -1])
+    calculated_centers, calculated_scatter_matrices = _update_centers_and_scatter_matrix(X, n_clusters_subspace,
+                                                                                         labels_subspace)
+    assert np.array_equal(calculated_centers[3], [16 / 3, 16 / 3, 16 / 3])
+    centered_points = X[:-1] - calculated_centers[labels_subspace[:-1]]
+    assert np.array_equal(np.matmul(centered_points.T, centered_points), calculated_scatter_matrices)
+    # Blockwise calculation
+    _, calculated_scatter_matrices_blockwise = _update_centers_and_scatter_matrix(X, n_clusters_subspace,
+                                                                                  labels_subspace, block_size=3)
+    assert np.allclose(calculated_scatter_matrices, calculated_scatter_matrices_blockwise)
+    # Reuse a preallocated buffer
+    buffer = np.full((3, X.shape[1]), np.nan)
+    _, calculated_scatter_matrices_buffer = _update_centers_and_scatter_matrix(X, n_clusters_subspace, labels_subspace,
+                                                                               block_size=3, buffer=buffer)
+    assert np.array_equal(calculated_scatter_matrices_blockwise, calculated_scatter_matrices_buffer)
 
 
 def test_assign_labels():
@@ -193,6 +210,38 @@ def test_get_precision():
     assert precision_calculated == 2
 
 
+def test_get_column_variances():
+    V = np.array([[0, 1, 0], [1, 0, 0], [0, 0, 1]])
+    scatter_matrix = np.array([[1, 2, 3], [2, 5, 6], [3, 6, 9]])
+    assert np.array_equal(_get_column_variances(V, scatter_matrix), np.array([5, 1, 9]))
+    assert np.array_equal(_get_column_variances(V[:, [2, 0]], scatter_matrix), np.array([9, 5]))
+
+
+def test_mdl_costs_with_cache():
+    X, _ = create_nr_data(200, random_state=1)
+    nrk = NrKmeans([3, 3, 1], outliers=True, random_state=1).fit(X)
+    costs = _mdl_costs(X, nrk.n_clusters, nrk.m, nrk.P, nrk.V, nrk.scatter_matrices_, nrk.labels_, True,
+                       nrk.max_distance, nrk.precision)
+    cost_cache = {}
+    costs_cache = _mdl_costs(X, nrk.n_clusters, nrk.m, nrk.P, nrk.V, nrk.scatter_matrices_, nrk.labels_, True,
+                             nrk.max_distance, nrk.precision, cost_cache)
+    assert np.isclose(costs[0], costs_cache[0])
+    assert np.allclose(costs[2], costs_cache[2])
+    # Second call uses the cached subspace costs
+    costs_cache_2 = _mdl_costs(X, nrk.n_clusters, nrk.m, nrk.P, nrk.V, nrk.scatter_matrices_, nrk.labels_, True,
+                               nrk.max_distance, nrk.precision, cost_cache)
+    assert costs_cache_2[2] == costs_cache[2]
+    # Changed projections are recomputed using the cached variances
+    P = [nrk.P[0], np.r_[nrk.P[1], nrk.P[2][:1]], nrk.P[2][1:]]
+    m = [len(p) for p in P]
+    costs = _mdl_costs(X, nrk.n_clusters, m, P, nrk.V, nrk.scatter_matrices_, nrk.labels_, True, nrk.max_distance,
+                       nrk.precision)
+    costs_cache = _mdl_costs(X, nrk.n_clusters, m, P, nrk.V, nrk.scatter_matrices_, nrk.labels_, True,
+                             nrk.max_distance, nrk.precision, cost_cache)
+    assert np.allclose(costs[2], costs_cache[2])
+    assert costs_cache[2][0] == costs_cache_2[2][0]
+
+
 """
 Tests regarding the NrKmeans object
 """
@@ -231,6 +280,20 @@ def test_simple_nrkmeans():
     assert np.array_equal(nrk_4.labels_[:-3], nrk_4.predict(X[:-3]))
 
 
+def test_nrkmeans_parallel():
+    X, labels = create_nr_data(200, random_state=1)
+    nrk = NrKmeans([3, 3, 1], n_init=3, random_state=1).fit(X)
+    nrk_parallel = NrKmeans([3, 3, 1], n_init=3, n_jobs=2, random_state=1).fit(X)
+    assert np.array_equal(nrk.labels_, nrk_parallel.labels_)
+    assert np.array_equal(nrk.V, nrk_parallel.V)
+    assert nrk.m == nrk_parallel.m
+    # Input parameters must not be changed by the executions
+    n_clusters = [3, 3, 1]
+    nrk_2 = NrKmeans(n_clusters, n_init=2, random_state=1).fit(X)
+    assert n_clusters == [3, 3, 1]
+    assert nrk_2.input_n_clusters == [3, 3, 1]
+
+
 @patch("matplotlib.pyplot.show")  # Used to test plots (show will not be called)
 def test_plot_nrkmeans_result(mock_fig):
     X, labels = create_nr_data(200, random_state=1)
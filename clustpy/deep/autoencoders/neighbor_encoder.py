@@ -8,17 +8,22 @@ import numpy as np
 from scipy.spatial.distance import cdist
 from clustpy.deep.autoencoders.feedforward_autoencoder import FeedforwardAutoencoder
 from clustpy.deep.autoencoders._abstract_autoencoder import FullyConnectedBlock
+from clustpy.utils import NeighborGraph
 
 
 def get_neighbors_batchwise(X: np.ndarray, n_neighbors: int, metric: str = "sqeuclidean",
-                            batch_size: int = 10000) -> list:
+                            batch_size: int = 10000, neighbor_graph: NeighborGraph = None,
+                            return_ids: bool = False) -> list:
     """
     For large datasets it is often not possible to determine the nearest neighbors in a trivial manner.
     Therefore, here is an implementation that calculates the nearest neighbors in batches.
-    Ignores the objects themselves (with distance of 0) as nearest neighbors.
+    Ignores the objects themselves as nearest neighbors.
     It reduces the memory consumption of a trivial nearest neighbor implementation from (data_size x data_size) to (batch_size x data_size).
     A list is returned, which can be given as additional input into a DataLoader and is therefore directly compatible with the NeighborEncoder.
+    If return_ids is True, only the ids of the nearest neighbors are returned instead of n_neighbors copies of the data set.
+    These can be used with get_neighbor_dataloader, which gathers the neighbors from the data set at batch time.
     Due to runtime concerns it is still recommended to use a more complex nearest neighbor retrieval implementation (e.g. from sklearn.neighbor)!
+    Alternatively, a precomputed NeighborGraph can be supplied, in which case no distances are calculated.
 
     Parameters
     ----------
@@ -30,11 +35,17 @@ def get_neighbors_batchwise(X: np.ndarray, n_neighbors: int, metric: str = "sqeu
         The distance metric to be used. See scipy.spatial.distance.cdist for more information (default: sqeuclidean)
     batch_size : int
         The size of the batches (default: 10000)
+    neighbor_graph : NeighborGraph
+        A NeighborGraph (see clustpy.utils.NeighborGraph) that has been fitted on X and contains at least n_neighbors neighbors for each object.
+        If it is specified, metric and batch_size will be ignored (default: None)
+    return_ids : bool
+        If True, a (data_size x n_neighbors) array containing the ids (int32) of the nearest neighbors will be returned (default: False)
 
     Returns
     -------
     nearest_neigbors : list
-        A list containing the nearest neighbors as torch.Tensors, i.e. [1-nearest-neighbor tensor, 2-nearest-neighbor tensor, ...]
+        A list containing the nearest neighbors as np.ndarrays, i.e. [1-nearest-neighbor array, 2-nearest-neighbor array, ...].
+        If return_ids is True, a np.ndarray containing the ids of the nearest neighbors, sorted by increasing distance
 
     Examples
     --------
@@ -44,29 +55,152 @@ def get_neighbors_batchwise(X: np.ndarray, n_neighbors: int, metric: str = "sqeu
     >>> n_neighbors = 3
     >>> neighbors = get_neighbors_batchwise(X, n_neighbors)
     >>> dataloader = get_dataloader(X, 256, True, additional_inputs=neighbors)
+    >>> # Alternatively (memory-efficient):
+    >>> neighbor_ids = get_neighbors_batchwise(X, n_neighbors, return_ids=True)
+    >>> dataloader = get_neighbor_dataloader(X, neighbor_ids, 256, True)
     >>> neighbor_encoder = NeighborEncoder(layers=[X.shape[1], 512, 256, 10], n_neighbors=n_neighbors)
-    >>> neighbor_encoder.fit(dataloader=dataloader, n_epochs=5, lr=1e-3)
+    >>> neighbor_encoder.fit(dataloader=dataloader, n_epochs=5, optimizer_params={"lr": 1e-3})
     """
-    # batch_size should not be larger than the dataset
-    batch_size = min(X.shape[0], batch_size)
-    # Create list containing the nearest neighbors
-    nearest_neigbors = [np.zeros(X.shape) for _ in range(n_neighbors)]
-    # Check if last batch is a complete batch
-    add_one_batch = 0 if X.shape[0] % batch_size == 0 else 1
-    n_iterations = X.shape[0] // batch_size + add_one_batch
-    for i in range(n_iterations):
-        index_0 = i * batch_size
-        if i != n_iterations - 1 or add_one_batch == 0:
-            index_1 = index_0 + batch_size
-        else:
-            index_1 = index_0 + X.shape[0] % batch_size
-        distances = cdist(X[index_0:index_1], X, metric=metric)
-        arg_distances = np.argsort(distances, axis=1)
-        for k in range(n_neighbors):
-            nearest_neigbors[k][index_0:index_1] = X[arg_distances[:, k + 1]]
+    if neighbor_graph is not None:
+        assert neighbor_graph.n_samples_ == X.shape[0], "The NeighborGraph must be fitted on the input data set"
+        _, neighbor_ids = neighbor_graph.kneighbors(n_neighbors)
+        neighbor_ids = np.ascontiguousarray(neighbor_ids, dtype=np.int32)
+    else:
+        assert n_neighbors < X.shape[0], "n_neighbors must be smaller than the number of objects"
+        neighbor_ids = np.zeros((X.shape[0], n_neighbors), dtype=np.int32)
+        for index_0 in range(0, X.shape[0], batch_size):
+            index_1 = min(index_0 + batch_size, X.shape[0])
+            distances = cdist(X[index_0:index_1], X, metric=metric)
+            # Ignore the objects themselves
+            distances[np.arange(index_1 - index_0), np.arange(index_0, index_1)] = np.inf
+            # Only the n_neighbors smallest distances have to be sorted
+            candidates = np.argpartition(distances, n_neighbors - 1, axis=1)[:, :n_neighbors]
+            order = np.argsort(np.take_along_axis(distances, candidates, axis=1), axis=1, kind="stable")
+            neighbor_ids[index_0:index_1] = np.take_along_axis(candidates, order, axis=1)
+    if return_ids:
+        return neighbor_ids
+    nearest_neigbors = [X[neighbor_ids[:, k]] for k in range(n_neighbors)]
     return nearest_neigbors
 
 
+class _NeighborDataset(torch.utils.data.Dataset):
+    """
+    Dataset that contains the data set only once together with the ids of the nearest neighbors of each object.
+    The nearest neighbors are gathered from the data set batchwise using collate_fn.
+    Each batch has the form [index, data, 1-nearest-neighbor, 2-nearest-neighbor, ...], like a dataloader created with get_dataloader(X, batch_size, additional_inputs=neighbors).
+
+    Parameters
+    ----------
+    X : torch.Tensor
+        the actual data set
+    neighbor_ids : torch.Tensor
+        the ids of the nearest neighbors of each object
+
+    Attributes
+    ----------
+    X : torch.Tensor
+        the actual data set
+    neighbor_ids : torch.Tensor
+        the ids of the nearest neighbors of each object
+    """
+
+    def __init__(self, X: torch.Tensor, neighbor_ids: torch.Tensor):
+        assert X.shape[0] == neighbor_ids.shape[0], "Size mismatch between X and neighbor_ids"
+        self.X = X
+        self.neighbor_ids = neighbor_ids
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Get the index of the sample. The actual data is retrieved in collate_fn.
+
+        Parameters
+        ----------
+        index : int
+            index of the desired sample
+
+        Returns
+        -------
+        index : int
+            index of the desired sample
+        """
+        return index
+
+    def __len__(self) -> int:
+        """
+        Get length of the dataset which equals the length of the input data set.
+
+        Returns
+        -------
+        dataset_size : int
+            Length of the dataset.
+        """
+        dataset_size = self.X.shape[0]
+        return dataset_size
+
+    def collate_fn(self, indices: list) -> list:
+        """
+        Gather the samples and their nearest neighbors of a batch.
+
+        Parameters
+        ----------
+        indices : list
+            the indices of the samples in the batch
+
+        Returns
+        -------
+        batch : list
+            List containing the batch. Consists of [index, data, 1-nearest-neighbor, 2-nearest-neighbor, ...]
+        """
+        indices = torch.tensor(indices)
+        neighbor_ids = self.neighbor_ids[indices].long()
+        batch = [indices, self.X[indices]] + [self.X[neighbor_ids[:, k]] for k in range(neighbor_ids.shape[1])]
+        return batch
+
+
+def get_neighbor_dataloader(X: np.ndarray, neighbor_ids: np.ndarray, batch_size: int, shuffle: bool = True,
+                            drop_last: bool = False, dl_kwargs: dict = {}) -> torch.utils.data.DataLoader:
+    """
+    Create a dataloader for the NeighborEncoder that stores the data set only once.
+    Instead of n_neighbors copies of the data set, only the ids of the nearest neighbors are stored and the neighbors are gathered from the data set at batch time.
+    The batches are equal to the ones of get_dataloader(X, batch_size, shuffle, drop_last, additional_inputs=neighbors).
+
+    Parameters
+    ----------
+    X : np.ndarray / torch.Tensor
+        the actual data set (can be np.ndarray or torch.Tensor)
+    neighbor_ids : np.ndarray / torch.Tensor
+        the ids of the nearest neighbors of each object, e.g., obtained by get_neighbors_batchwise(X, n_neighbors, return_ids=True)
+    batch_size : int
+        the batch size
+    shuffle : bool
+        boolean that defines if the data set should be shuffled (default: True)
+    drop_last : bool
+        boolean that defines if the last batch should be ignored (default: False)
+    dl_kwargs : any
+        other arguments for torch.utils.data.DataLoader
+
+    Returns
+    -------
+    dataloader : torch.utils.data.DataLoader
+        The final dataloader
+    """
+    assert type(X) in [np.ndarray, torch.Tensor], "X must be of type np.ndarray or torch.Tensor."
+    if type(X) is np.ndarray:
+        # Convert np.ndarray to torch.Tensor
+        X = torch.from_numpy(X).float()
+    if type(neighbor_ids) is np.ndarray:
+        neighbor_ids = torch.from_numpy(neighbor_ids)
+    dataset = _NeighborDataset(X, neighbor_ids)
+    dataloader = torch.utils.data.DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        drop_last=drop_last,
+        collate_fn=dataset.collate_fn,
+        **dl_kwargs)
+    return dataloader
+
+
 class NeighborEncoder(FeedforwardAutoencoder):
     """
     A NeighborEncoder. Does not compare the reconstruction of an object to itself but to its nearest neighbors.
@@ -131,6 +265,8 @@ class NeighborEncoder(FeedforwardAutoencoder):
     >>> # Alternatively: neighbors = get_neighbors_batchwise(X, n_neighbors)
 
     >>> dataloader = get_dataloader(X, 256, True, additional_inputs=neighbors)
+    >>> # Memory-efficient alternative that gathers the neighbors at batch time:
+    >>> # dataloader = get_neighbor_dataloader(X, neighbor_ids[:, 1:n_neighbors + 1], 256, True)
     >>> neighbor_encoder = NeighborEncoder(layers=[X.shape[1], 512, 256, 10], n_neighbors=n_neighbors, decode_self=False)
     >>> neighbor_encoder.fit(dataloader=dataloader, device=device, n_epochs=5, lr=1e-3)
 
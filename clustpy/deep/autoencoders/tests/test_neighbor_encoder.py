@@ -1,7 +1,8 @@
 from clustpy.deep.autoencoders import NeighborEncoder
 from clustpy.deep import get_dataloader, DCN
-from clustpy.deep.autoencoders.neighbor_encoder import get_neighbors_batchwise
+from clustpy.deep.autoencoders.neighbor_encoder import get_neighbors_batchwise, get_neighbor_dataloader
 from clustpy.data import create_subspace_data
+from clustpy.utils import NeighborGraph
 from scipy.spatial.distance import pdist, squareform
 import torch
 import numpy as np
@@ -84,3 +85,32 @@ def test_get_neighbors_batchwise():
     neighbors = get_neighbors_batchwise(X, n_neighbors, batch_size=2)
     for i in range(len(result)):
         assert np.array_equal(result[i], neighbors[i])
+    # Check if it also works with a NeighborGraph
+    neighbor_graph = NeighborGraph(3).fit(X)
+    neighbors = get_neighbors_batchwise(X, n_neighbors, neighbor_graph=neighbor_graph)
+    for i in range(len(result)):
+        assert np.array_equal(result[i], neighbors[i])
+    # Check if ids are returned
+    neighbor_ids = get_neighbors_batchwise(X, n_neighbors, batch_size=3, return_ids=True)
+    assert neighbor_ids.dtype == np.int32
+    assert np.array_equal(neighbor_ids, np.array([[1, 2], [2, 0], [1, 0], [2, 1], [5, 6], [4, 6], [4, 5]]))
+
+
+def test_get_neighbor_dataloader():
+    data, _ = create_subspace_data(500, subspace_features=(3, 10), random_state=1)
+    n_neighbors = 3
+    neighbors = get_neighbors_batchwise(data, n_neighbors, batch_size=128)
+    neighbor_ids = get_neighbors_batchwise(data, n_neighbors, batch_size=128, return_ids=True)
+    dataloader = get_dataloader(data, 64, False, additional_inputs=neighbors)
+    neighbor_dataloader = get_neighbor_dataloader(data, neighbor_ids, 64, False)
+    assert len(neighbor_dataloader) == len(dataloader)
+    for batch, neighbor_batch in zip(dataloader, neighbor_dataloader):
+        assert type(neighbor_batch) is list
+        assert len(neighbor_batch) == len(batch)
+        for t1, t2 in zip(batch, neighbor_batch):
+            assert torch.equal(t1, t2)
+    # Test fitting
+    neighborencoder = NeighborEncoder(layers=[data.shape[1], 32, 5], n_neighbors=n_neighbors)
+    neighborencoder.fit(n_epochs=2, optimizer_params={"lr": 1e-3},
+                        dataloader=get_neighbor_dataloader(data, neighbor_ids, 64, True))
+    assert neighborencoder.fitted is True
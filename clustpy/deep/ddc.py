@@ -11,13 +11,19 @@ from clustpy.deep._data_utils import get_dataloader
 from clustpy.deep._train_utils import get_trained_autoencoder
 from sklearn.utils import check_random_state
 from sklearn.manifold import TSNE
-from scipy.spatial.distance import pdist, squareform
+from scipy.spatial.distance import pdist, cdist
+from sklearn.neighbors import NearestNeighbors
+
+"""
+Maximum number of pairwise distances that are kept in memory at the same time
+"""
+_DDC_BLOCK_SIZE = 2 ** 22
 
 
 def _ddc(X: np.ndarray, ratio: float, batch_size: int, pretrain_optimizer_params: dict, pretrain_epochs: int,
          optimizer_class: torch.optim.Optimizer, loss_fn: torch.nn.modules.loss._Loss, autoencoder: torch.nn.Module,
-         embedding_size: int, custom_dataloaders: tuple, tsne_params: dict, random_state: np.random.RandomState) -> (
-        int, np.ndarray, torch.nn.Module, TSNE):
+         embedding_size: int, custom_dataloaders: tuple, tsne_params: dict, random_state: np.random.RandomState,
+         kernel_cutoff: float = None, d_c_sample_size: int = None) -> (int, np.ndarray, torch.nn.Module, TSNE):
     """
     Start the actual DDC clustering procedure on the input data set.
 
@@ -48,6 +54,12 @@ def _ddc(X: np.ndarray, ratio: float, batch_size: int, pretrain_optimizer_params
         Parameters for the t-SNE execution. Check out sklearn.manifold.TSNE for more information
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    kernel_cutoff : float
+        If specified, the Gaussian kernel used to calculate rho is truncated at kernel_cutoff * d_c. Must be at least 1.
+        If None, the kernel is evaluated for all pairs of samples (default: None)
+    d_c_sample_size : int
+        If specified, the average pairwise distance used to obtain d_c is estimated using this number of random pairs of samples.
+        If None, all pairs are used (default: None)
 
     Returns
     -------
@@ -76,13 +88,15 @@ def _ddc(X: np.ndarray, ratio: float, batch_size: int, pretrain_optimizer_params
     tsne = TSNE(**tsne_params)
     X_tsne = tsne.fit_transform(X_embed)
     # Execute Density Peak Algorithm
-    n_clusters, labels = _density_peak_clustering(X_tsne, ratio)
+    n_clusters, labels = _density_peak_clustering(X_tsne, ratio, kernel_cutoff, d_c_sample_size, random_state)
     return n_clusters, labels, autoencoder, tsne
 
 
-def _density_peak_clustering(X: np.ndarray, ratio: float) -> (int, np.ndarray):
+def _density_peak_clustering(X: np.ndarray, ratio: float, kernel_cutoff: float = None, d_c_sample_size: int = None,
+                             random_state: np.random.RandomState = None) -> (int, np.ndarray):
     """
     Execute the variant of the Density Peak Algorithm as proposed in the paper.
+    All pairwise computations are performed blockwise or using radius-bounded neighborhoods, so the full distance matrix is never stored.
 
     Parameters
     ----------
@@ -90,6 +104,14 @@ def _density_peak_clustering(X: np.ndarray, ratio: float) -> (int, np.ndarray):
         The given data set
     ratio : float
         The ratio parameter, defining the cutoff distance d_c by calculating: average pairwise distance * ratio
+    kernel_cutoff : float
+        If specified, the Gaussian kernel used to calculate rho is truncated at kernel_cutoff * d_c, i.e., only the neighbors within this radius are considered.
+        Must be at least 1. If None, the kernel is evaluated for all pairs of samples (default: None)
+    d_c_sample_size : int
+        If specified, the average pairwise distance used to obtain d_c is estimated using this number of random pairs of samples.
+        If None, all pairs are used (default: None)
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution. Only relevant if d_c_sample_size is specified (default: None)
 
     Returns
     -------
@@ -97,65 +119,252 @@ def _density_peak_clustering(X: np.ndarray, ratio: float) -> (int, np.ndarray):
         The number of clusters,
         The cluster labels
     """
-    distances = pdist(X)
-    max_dist = np.max(distances)
-    d_c = np.mean(distances) * ratio
+    assert kernel_cutoff is None or kernel_cutoff >= 1, "kernel_cutoff must be None or at least 1"
+    d_c, max_dist = _get_cutoff_distance(X, ratio, d_c_sample_size, random_state)
     if d_c >= max_dist:
         print(
             "[WARNING] ratio parameter was chosen too large (ratio={0}). It is recommended to set ratio smaller than 1. d_c will be set to the maximum possible value".format(
                 ratio))
         d_c = max_dist - 1e-8  # d_c can not be larger than the max distance
+    # Index used to get all neighbors within a radius
+    nn_index = NearestNeighbors().fit(X)
     # Calculate rho_i
-    adj_distancse = np.exp(-((distances / d_c) ** 2))  # Equation 7
-    rhos = np.sum(squareform(adj_distancse), axis=1)
+    if kernel_cutoff is None:
+        rhos = _get_rhos_blockwise(X, d_c)
+    else:
+        rhos = np.zeros(X.shape[0])
+        for rows, _, distances in _radius_neighbors_blockwise(nn_index, X, kernel_cutoff * d_c,
+                                                               np.arange(X.shape[0])):
+            rhos += np.bincount(rows, weights=np.exp(-((distances / d_c) ** 2)), minlength=X.shape[0])  # Equation 7
     avg_rho = np.mean(rhos)  # Below Equation 9
-    # Calculate delta_i and search for local cluster centers
-    distances = squareform(distances)  # Convert distances to symmetric matrix
-    deltas = np.zeros(X.shape[0])
+    # Calculate delta_i
+    nn_with_higher_dens, deltas = _get_nearest_neighbors_with_higher_density(X, rhos, avg_rho, nn_index, d_c)
+    # Search for local cluster centers. Samples without a sample of higher density are always centers
+    is_center = ((deltas > d_c) & (rhos > avg_rho)) | (nn_with_higher_dens == -1)  # Equation 9
+    # Each sample gets the label of its nearest neighbor with higher density -> process samples by decreasing density
     labels = np.full(X.shape[0], -1, np.int32)
-    cluster_rhos = np.zeros((0, 2))
-    cluster_id = 0
-    chain_of_ids = []
-    queue = list(range(X.shape[0]))
-    while len(queue) > 0:
-        i = queue.pop(0)
-        if labels[i] == -1:
-            chain_of_ids.append(i)
-            distances_i = distances[i].copy()
-            distances_i[rhos <= rhos[i]] = max_dist  # Equation 8
-            nn_with_higher_dens = np.argmin(distances_i)  # Equation 8
-            deltas[i] = distances_i[nn_with_higher_dens]  # Equation 8
-            # Check if i is local cluster center
-            if deltas[i] > d_c and rhos[i] > avg_rho:  # Equation 9
-                labels[chain_of_ids] = cluster_id
-                cluster_rhos = np.r_[cluster_rhos, [[np.sum(rhos[chain_of_ids]), len(chain_of_ids)]]]
-                cluster_id += 1
-                chain_of_ids = []
-            elif labels[nn_with_higher_dens] != -1:
-                labels[chain_of_ids] = labels[nn_with_higher_dens]
-                cluster_rhos[labels[nn_with_higher_dens], 0] += np.sum(rhos[chain_of_ids])
-                cluster_rhos[labels[nn_with_higher_dens], 1] += len(chain_of_ids)
-                chain_of_ids = []
-            else:
-                queue.insert(0, nn_with_higher_dens)
+    center_ids = np.where(is_center)[0]
+    labels[center_ids] = np.arange(center_ids.shape[0])
+    for i in np.argsort(-rhos, kind="stable"):
+        if not is_center[i]:
+            labels[i] = labels[nn_with_higher_dens[i]]
+    # Clusters are numbered in the order of their first sample
+    first_sample_in_cluster = np.full(center_ids.shape[0], X.shape[0])
+    np.minimum.at(first_sample_in_cluster, labels, np.arange(X.shape[0]))
+    cluster_order = np.argsort(first_sample_in_cluster)
+    cluster_rank = np.empty(center_ids.shape[0], dtype=np.int32)
+    cluster_rank[cluster_order] = np.arange(center_ids.shape[0])
+    labels = cluster_rank[labels]
     # ==> Start Merging of clusters
     # Average rho of clusters
-    avg_cluster_rho = cluster_rhos[:, 0] / cluster_rhos[:, 1]
+    avg_cluster_rho = np.bincount(labels, weights=rhos) / np.bincount(labels)
     # Get core points
-    ids_core_points = np.where(rhos > avg_cluster_rho[labels])[0]  # Equation 10
-    # Are clusters density connected?
-    for i in range(len(ids_core_points) - 1):
-        core_point_i = ids_core_points[i]
-        for j in range(i + 1, len(ids_core_points)):
-            core_point_j = ids_core_points[j]
-            if distances[core_point_i, core_point_j] < d_c and labels[core_point_i] != labels[
-                core_point_j]:  # Equation 11
-                min_label = min(labels[core_point_i], labels[core_point_j])
-                max_label = max(labels[core_point_i], labels[core_point_j])
-                labels[labels == max_label] = min_label
-                labels[labels > max_label] -= 1
-                cluster_id -= 1
-    return cluster_id, labels
+    is_core_point = rhos > avg_cluster_rho[labels]  # Equation 10
+    # Are clusters density connected? Check all pairs of core points with a distance smaller than d_c
+    connected_labels = np.zeros((0, 2), dtype=labels.dtype)
+    for rows, cols, distances in _radius_neighbors_blockwise(nn_index, X, d_c, np.where(is_core_point)[0]):
+        connected = (distances < d_c) & is_core_point[cols] & (labels[rows] != labels[cols])  # Equation 11
+        connected_labels = np.r_[connected_labels, np.sort(np.c_[labels[rows[connected]], labels[cols[connected]]],
+                                                           axis=1)]
+        connected_labels = np.unique(connected_labels, axis=0)
+    # Merge connected clusters. The merged cluster gets the smallest label of its components
+    parents = _union_find(center_ids.shape[0], connected_labels)
+    _, labels = np.unique(parents[labels], return_inverse=True)
+    n_clusters = np.unique(parents).shape[0]
+    return n_clusters, labels.astype(np.int32)
+
+
+def _get_cutoff_distance(X: np.ndarray, ratio: float, d_c_sample_size: int,
+                         random_state: np.random.RandomState) -> (float, float):
+    """
+    Get the cutoff distance d_c, i.e., average pairwise distance * ratio, and the maximum pairwise distance.
+    If d_c_sample_size is None, all pairwise distances are computed blockwise.
+    Else, both values are estimated from random pairs of samples.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The given data set
+    ratio : float
+        The ratio parameter, defining the cutoff distance d_c by calculating: average pairwise distance * ratio
+    d_c_sample_size : int
+        Number of random pairs of samples used to estimate the average pairwise distance. Can be None
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution. Only relevant if d_c_sample_size is specified
+
+    Returns
+    -------
+    tuple : (float, float)
+        The cutoff distance d_c,
+        The maximum pairwise distance
+    """
+    if d_c_sample_size is not None:
+        random_state = check_random_state(random_state)
+        ids_1 = random_state.randint(X.shape[0], size=d_c_sample_size)
+        # Second sample must differ from the first one
+        ids_2 = (ids_1 + random_state.randint(1, X.shape[0], size=d_c_sample_size)) % X.shape[0]
+        distances = np.sqrt(np.sum((X[ids_1] - X[ids_2]) ** 2, axis=1))
+        return np.mean(distances) * ratio, np.max(distances)
+    sum_dist = 0.
+    max_dist = 0.
+    block_size = max(1, _DDC_BLOCK_SIZE // X.shape[0])
+    for start in range(0, X.shape[0], block_size):
+        end = min(start + block_size, X.shape[0])
+        # Only the distances within the block and to the following samples are required
+        distances_within = pdist(X[start:end])
+        distances_following = cdist(X[start:end], X[end:])
+        sum_dist += np.sum(distances_within) + np.sum(distances_following)
+        max_dist = max(max_dist, np.max(distances_within, initial=0), np.max(distances_following, initial=0))
+    d_c = sum_dist / (X.shape[0] * (X.shape[0] - 1) / 2) * ratio
+    return d_c, max_dist
+
+
+def _get_rhos_blockwise(X: np.ndarray, d_c: float) -> np.ndarray:
+    """
+    Calculate rho_i (Equation 7) by evaluating the Gaussian kernel for all pairs of samples blockwise.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The given data set
+    d_c : float
+        The cutoff distance
+
+    Returns
+    -------
+    rhos : np.ndarray
+        The density of each sample
+    """
+    rhos = np.zeros(X.shape[0])
+    block_size = max(1, _DDC_BLOCK_SIZE // X.shape[0])
+    for start in range(0, X.shape[0], block_size):
+        ids_in_block = np.arange(start, min(start + block_size, X.shape[0]))
+        adj_distances = np.exp(-((cdist(X[ids_in_block], X) / d_c) ** 2))  # Equation 7
+        adj_distances[np.arange(ids_in_block.shape[0]), ids_in_block] = 0
+        rhos[ids_in_block] = np.sum(adj_distances, axis=1)
+    return rhos
+
+
+def _radius_neighbors_blockwise(nn_index: NearestNeighbors, X: np.ndarray, radius: float, ids: np.ndarray):
+    """
+    Get the neighbors within a radius of the specified samples.
+    The samples are processed blockwise, so that the number of returned pairs in each block is limited.
+
+    Parameters
+    ----------
+    nn_index : NearestNeighbors
+        The nearest neighbor index fitted on the data set
+    X : np.ndarray
+        The given data set
+    radius : float
+        The radius
+    ids : np.ndarray
+        The ids of the samples whose neighbors should be returned
+
+    Returns
+    -------
+    generator : (np.ndarray, np.ndarray, np.ndarray)
+        Generator returning for each block: the ids of the samples, the ids of the neighbors (excluding the samples themselves) and the distances between them
+    """
+    block_size = max(1, _DDC_BLOCK_SIZE // X.shape[0])
+    for start in range(0, ids.shape[0], block_size):
+        ids_in_block = ids[start:start + block_size]
+        distances, neighbors = nn_index.radius_neighbors(X[ids_in_block], radius=radius)
+        rows = np.repeat(ids_in_block, [n.shape[0] for n in neighbors])
+        cols = np.concatenate(neighbors).astype(np.int64)
+        distances = np.concatenate(distances)
+        not_self = rows != cols
+        yield rows[not_self], cols[not_self], distances[not_self]
+
+
+def _get_nearest_neighbors_with_higher_density(X: np.ndarray, rhos: np.ndarray, avg_rho: float,
+                                               nn_index: NearestNeighbors, d_c: float) -> (np.ndarray, np.ndarray):
+    """
+    Get the nearest neighbor with higher density of each sample and the corresponding distance delta_i (Equation 8).
+    First, the neighbors within the radius d_c are checked.
+    Samples without a neighbor of higher density within the radius are local cluster centers if their density is larger than avg_rho.
+    Therefore, only for the remaining samples, the nearest neighbor with higher density is searched for among all samples of higher density (using a sorted-by-rho index).
+
+    Parameters
+    ----------
+    X : np.ndarray
+        The given data set
+    rhos : np.ndarray
+        The density of each sample
+    avg_rho : float
+        The average density
+    nn_index : NearestNeighbors
+        The nearest neighbor index fitted on the data set
+    d_c : float
+        The cutoff distance
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray)
+        The nearest neighbor with higher density of each sample (-1 if no such sample exists or if it is not required),
+        The distance to this neighbor (np.inf if no such sample exists within the radius)
+    """
+    nn_with_higher_dens = np.full(X.shape[0], -1)
+    deltas = np.full(X.shape[0], np.inf)
+    # Check neighbors within the radius. Sort by sample, distance and neighbor id to get the first (smallest) neighbor
+    for rows, cols, distances in _radius_neighbors_blockwise(nn_index, X, d_c, np.arange(X.shape[0])):
+        higher_dens = rhos[cols] > rhos[rows]
+        rows, cols, distances = rows[higher_dens], cols[higher_dens], distances[higher_dens]
+        order = np.lexsort((cols, distances, rows))
+        rows, cols, distances = rows[order], cols[order], distances[order]
+        is_first = np.r_[True, rows[1:] != rows[:-1]] if rows.shape[0] > 0 else np.zeros(0, dtype=bool)
+        nn_with_higher_dens[rows[is_first]] = cols[is_first]
+        deltas[rows[is_first]] = distances[is_first]
+    # Search among all samples with higher density if no such neighbor is within the radius and the sample is no center
+    ids_missing = np.where((nn_with_higher_dens == -1) & (rhos <= avg_rho))[0]
+    if ids_missing.shape[0] > 0:
+        ids_sorted_by_rho = np.argsort(-rhos, kind="stable")
+        rhos_sorted_negative = -rhos[ids_sorted_by_rho]
+        for i in ids_missing:
+            n_higher_dens = np.searchsorted(rhos_sorted_negative, -rhos[i], side="left")
+            if n_higher_dens > 0:
+                candidates = ids_sorted_by_rho[:n_higher_dens]
+                distances_i = cdist(X[i:i + 1], X[candidates])[0]
+                nn_with_higher_dens[i] = np.min(candidates[distances_i == np.min(distances_i)])
+    return nn_with_higher_dens, deltas
+
+
+def _union_find(n_elements: int, pairs: np.ndarray) -> np.ndarray:
+    """
+    Merge elements that are connected by the input pairs using a union-find structure.
+    The representative of each set is its smallest element.
+
+    Parameters
+    ----------
+    n_elements : int
+        The number of elements
+    pairs : np.ndarray
+        Array of shape (n_pairs, 2) containing the connected elements
+
+    Returns
+    -------
+    parents : np.ndarray
+        The representative of the set of each element
+    """
+    parents = np.arange(n_elements)
+
+    def find(element):
+        root = element
+        while parents[root] != root:
+            root = parents[root]
+        # Path compression
+        while parents[element] != root:
+            parents[element], element = root, parents[element]
+        return root
+
+    for element_1, element_2 in pairs:
+        root_1 = find(element_1)
+        root_2 = find(element_2)
+        if root_1 != root_2:
+            parents[max(root_1, root_2)] = min(root_1, root_2)
+    for element in range(n_elements):
+        parents[element] = find(element)
+    return parents
 
 
 class DDC(BaseEstimator, ClusterMixin):
@@ -190,6 +399,12 @@ class DDC(BaseEstimator, ClusterMixin):
         Check out sklearn.manifold.TSNE for more information (default: {"n_components": 2})
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    kernel_cutoff : float
+        If specified, the Gaussian kernel used to calculate rho is truncated at kernel_cutoff * d_c, i.e., only neighbors within this radius are considered.
+        Must be at least 1. Setting it (e.g., to 3) avoids evaluating all pairs of samples in the clustering step. If None, the kernel is evaluated for all pairs of samples (default: None)
+    d_c_sample_size : int
+        If specified, the average pairwise distance used to obtain d_c is estimated using this number of random pairs of samples.
+        If None, all pairs are used (default: None)
 
     Attributes
     ----------
@@ -220,7 +435,8 @@ class DDC(BaseEstimator, ClusterMixin):
                  pretrain_epochs: int = 100, optimizer_class: torch.optim.Optimizer = torch.optim.Adam,
                  loss_fn: torch.nn.modules.loss._Loss = torch.nn.MSELoss(), autoencoder: torch.nn.Module = None,
                  embedding_size: int = 10, custom_dataloaders: tuple = None, tsne_params: dict = None,
-                 random_state: np.random.RandomState = None):
+                 random_state: np.random.RandomState = None, kernel_cutoff: float = None,
+                 d_c_sample_size: int = None):
         self.ratio = ratio
         if ratio > 1:
             print("[WARNING] ratio for DDC algorithm has been set to a value > 1 which can cause poor results")
@@ -236,6 +452,8 @@ class DDC(BaseEstimator, ClusterMixin):
         self.tsne_params = {"n_components": 2} if tsne_params is None else tsne_params
         self.random_state = check_random_state(random_state)
         set_torch_seed(self.random_state)
+        self.kernel_cutoff = kernel_cutoff
+        self.d_c_sample_size = d_c_sample_size
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DDC':
         """
@@ -262,7 +480,9 @@ class DDC(BaseEstimator, ClusterMixin):
                                                      self.embedding_size,
                                                      self.custom_dataloaders,
                                                      self.tsne_params,
-                                                     self.random_state)
+                                                     self.random_state,
+                                                     self.kernel_cutoff,
+                                                     self.d_c_sample_size)
         self.labels_ = labels
         self.n_clusters_ = n_clusters
         self.autoencoder = autoencoder
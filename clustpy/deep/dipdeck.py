@@ -6,6 +6,7 @@ Collin Leiber
 from scipy.spatial.distance import cdist
 import numpy as np
 from clustpy.utils import dip_test, dip_pval
+from clustpy.utils.diptest import _get_dip_boot_random_state
 import torch
 from clustpy.deep._utils import detect_device, encode_batchwise, squared_euclidean_distance, int_to_one_hot, \
     set_torch_seed, embedded_kmeans_prediction
@@ -111,9 +112,11 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
         X = torch.cat(X_new, dim=0).numpy()
     # Get nearest points to optimal centers
     centers_cpu, embedded_centers_cpu = _get_nearest_points_to_optimal_centers(X, init_centers, embedded_data)
+    # When bootstrapping, use a fixed seed so the null distributions can be reused across clusters and iterations
+    boot_random_state = _get_dip_boot_random_state(random_state, pval_strategy)
     # Initial dip values
     dip_matrix_cpu = _get_dip_matrix(embedded_data, embedded_centers_cpu, cluster_labels_cpu, n_clusters_init,
-                                     max_cluster_size_diff_factor, pval_strategy, n_boots, random_state)
+                                     max_cluster_size_diff_factor, pval_strategy, n_boots, boot_random_state)
     # Use DipDECK optimizer parameters (usually learning rate is reduced by a magnitude of 10)
     optimizer = optimizer_class(autoencoder.parameters(), **clustering_optimizer_params)
     # Start training
@@ -133,7 +136,7 @@ def _dip_deck(X: np.ndarray, n_clusters_init: int, dip_merge_threshold: float, c
                                                                                           augmentation_invariance,
                                                                                           max_cluster_size_diff_factor,
                                                                                           pval_strategy, n_boots,
-                                                                                          random_state, debug)
+                                                                                          boot_random_state, debug)
     # Return results
     return cluster_labels_cpu, n_clusters_current, centers_cpu, autoencoder
 
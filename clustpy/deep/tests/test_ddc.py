@@ -1,4 +1,5 @@
 from clustpy.deep import DDC
+from clustpy.deep.ddc import _density_peak_clustering, _union_find
 from clustpy.data import create_subspace_data, load_optdigits
 from clustpy.deep.tests._helpers_for_tests import _get_test_augmentation_dataloaders
 import torch
@@ -17,3 +18,21 @@ def test_simple_ddc():
     ddc2 = DDC(pretrain_epochs=3, random_state=1)
     ddc2.fit(X)
     assert np.array_equal(ddc.labels_, ddc2.labels_)
+
+
+def test_density_peak_clustering():
+    X = np.r_[np.random.RandomState(1).normal(0, 1, (100, 2)), np.random.RandomState(2).normal(10, 1, (100, 2))]
+    n_clusters, labels = _density_peak_clustering(X, 0.1)
+    assert n_clusters == 2
+    assert labels.dtype == np.int32
+    assert np.array_equal(labels, np.array([0] * 100 + [1] * 100))
+    # Truncated kernel and sampled d_c
+    n_clusters, labels = _density_peak_clustering(X, 0.1, kernel_cutoff=3, d_c_sample_size=1000,
+                                                  random_state=np.random.RandomState(1))
+    assert n_clusters == 2
+    assert np.array_equal(labels, np.array([0] * 100 + [1] * 100))
+
+
+def test_union_find():
+    parents = _union_find(6, np.array([[1, 4], [3, 4], [2, 5]]))
+    assert np.array_equal(parents, np.array([0, 1, 2, 1, 1, 2]))
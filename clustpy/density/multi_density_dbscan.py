@@ -6,22 +6,31 @@ Collin Leiber
 from sklearn.neighbors import NearestNeighbors
 import numpy as np
 from sklearn.base import BaseEstimator, ClusterMixin
+from clustpy.utils import NeighborGraph
+import heapq
 
 
-def _multi_density_dbscan(X: np.ndarray, k: int, var: float, min_cluster_size: int, metric: str) -> (int, np.ndarray, list):
+def _multi_density_dbscan(X: np.ndarray, k: int, var: float, min_cluster_size: int, metric: str,
+                          n_jobs: int = None) -> (int, np.ndarray, list):
     """
     Start the actual Multiple Density DBSCAN clustering procedure on the input data set.
 
     Parameters
     ----------
     X : np.ndarray
-        the given data set
+        the given data set. Can also be a NeighborGraph containing at least k neighbors for each point.
+        Note that a NeighborGraph never contains the point itself, while for a data set the first of the k + 1 nearest neighbors is removed. Therefore, the results can differ if X contains duplicates.
+        If metric is 'precomputed', X can also be a sparse neighbor graph containing the distances to k + 1 neighbors for each point (e.g., obtained by sklearn.neighbors.KNeighborsTransformer(n_neighbors=k, mode='distance'))
     k : int
         the number of neighbors to consider
     var : float
         Defines the factor that the density of a point may deviate from the average cluster density
     min_cluster_size : int
         The minimum cluster size (if a cluster is smaller, all contained points will be labeled as noise)
+    metric : str
+        The metric to use when calculating density with nearest neighbors algorithm
+    n_jobs : int
+        Number of jobs used for the nearest neighbor search. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -30,18 +39,25 @@ def _multi_density_dbscan(X: np.ndarray, k: int, var: float, min_cluster_size: i
         The cluster labels
         The final cluster densities
     """
-    assert k <= X.shape[0], "The number of nearest neighbors k can not be larger than the number of data points"
+    n_points = X.n_samples_ if isinstance(X, NeighborGraph) else X.shape[0]
+    assert k <= n_points, "The number of nearest neighbors k can not be larger than the number of data points"
     assert var >= 1, "var must be >= 1"
     assert min_cluster_size > 1, "min_cluster_size must be > 1"
-    # Get k nearest neighbors and densities for each point
-    nearest_neighbors = NearestNeighbors(n_neighbors=k + 1, metric=metric).fit(X)
-    densities, knns = nearest_neighbors.kneighbors(X, n_neighbors=k + 1)
-    knns = knns[:, 1:]
-    densities = np.mean(densities[:, 1:], axis=1)
+    # Get k nearest neighbors (excluding the point itself) and densities for each point
+    if isinstance(X, NeighborGraph):
+        densities, knns = X.kneighbors(k)
+        densities = densities.astype(np.float64)
+    else:
+        # The first neighbor is removed. In case of duplicates, this is not necessarily the point itself
+        nearest_neighbors = NearestNeighbors(n_neighbors=k + 1, metric=metric, n_jobs=n_jobs).fit(X)
+        densities, knns = nearest_neighbors.kneighbors(X, n_neighbors=k + 1)
+        densities = densities[:, 1:]
+        knns = knns[:, 1:]
+    densities = np.mean(densities, axis=1)
     # Order densities
     order = np.argsort(densities)
     # Start parameters
-    labels = -np.ones(X.shape[0], dtype=np.int32)
+    labels = -np.ones(n_points, dtype=np.int32)
     cluster_densities = []
     c_id = 0
     # Iterate over all points
@@ -65,6 +81,7 @@ def _gather(p1: int, c_id: int, densities: np.ndarray, knns: np.ndarray, labels:
     """
     Expand the current cluster (consisting of a single most dense point).
     Check each added point's neighbors to see if their density is low enough to add them the cluster.
+    The neighbors are managed in a heap ordered by (density, id), so the neighbor with the lowest density (and the lowest id in case of ties) is checked next.
 
     Parameters
     ----------
@@ -90,15 +107,17 @@ def _gather(p1: int, c_id: int, densities: np.ndarray, knns: np.ndarray, labels:
     # Add point to cluster and assign Label
     cluster_points = [p1]
     labels[p1] = c_id
-    # Get neighbors of point 1
-    neighbors = [kn for kn in knns[p1, :] if labels[kn] == -1]
-    neighbors = _sort_neighbors_by_densities(neighbors, densities)
+    # Points that are currently contained in the heap (each point is contained at most once)
+    in_neighbors = set()
+    neighbors = []
+    _push_neighbors_to_heap(densities, labels, neighbors, in_neighbors, knns[p1, :])
     # Set start density of the cluster
     cluster_density = densities[p1]
     while len(neighbors) > 0:
-        p2 = neighbors.pop(0)
+        density_p2, p2 = heapq.heappop(neighbors)
+        in_neighbors.remove(p2)
+        # Skip points that have been assigned in the meantime (lazy deletion)
         if labels[p2] == -1:
-            density_p2 = densities[p2]
             # Is density of point 2 high enough?
             if density_p2 <= var * cluster_density:
                 # Add point to cluster and assign Label
@@ -107,40 +126,16 @@ def _gather(p1: int, c_id: int, densities: np.ndarray, knns: np.ndarray, labels:
                 # Update Cluster density
                 cluster_density = (cluster_density * (len(cluster_points) - 1) + density_p2) / len(cluster_points)
                 # Add new neighbors
-                neighbors = _add_neighbors_to_neighbor_list(densities, labels, neighbors, knns[p2, :])
+                _push_neighbors_to_heap(densities, labels, neighbors, in_neighbors, knns[p2, :])
     return cluster_points, cluster_density
 
 
-def _sort_neighbors_by_densities(neighbors: list, densities: np.ndarray) -> list:
-    """
-    Sort the available neighbors by their densities. Sort in ascending order.
-    If densities are equal samples will be sorted by their id.
-
-    Parameters
-    ----------
-    neighbors : list
-        the ids of the neighbors
-    densities : np.ndarray
-        the densities
-
-    Returns
-    -------
-    neighbors : list
-        the ids of the neighbors sorted by densities
-    """
-    neighbors = sorted(neighbors, key=lambda x: (densities[x], x))
-    return neighbors
-
-
-def _add_neighbors_to_neighbor_list(densities: np.ndarray, labels: np.ndarray, current_neighbors: list,
-                                    new_neighbors: np.ndarray) -> list:
+def _push_neighbors_to_heap(densities: np.ndarray, labels: np.ndarray, neighbors: list, in_neighbors: set,
+                            new_neighbors: np.ndarray) -> None:
     """
-    Add the new neighbors to the neighboring list.
-    Make sure that they are correctly sorted according to their density.
-    Result should be equal to:
-    current_neighbors += [kn for kn in new_neighbors if labels[kn] == -1]
-    current_neighbors = list(set(current_neighbors))
-    current_neighbors = _sort_neighbors_by_densities(neighbors, densities)
+    Add the new neighbors that are not yet assigned to a cluster to the heap of neighbors.
+    The heap entries are (density, id) tuples. Points that are already contained in the heap are ignored.
+    The heap and the set of contained points are updated in-place.
 
     Parameters
     ----------
@@ -148,30 +143,19 @@ def _add_neighbors_to_neighbor_list(densities: np.ndarray, labels: np.ndarray, c
         The densities of all points
     labels : np.ndarray
         The current cluster labels
-    current_neighbors : list
-        The current list of neighbors of cluster objects
-    new_neighbors : list
-        The new neighbors that should be added to the neighbor list
-
-    Returns
-    -------
-    current_neighbors : list
-        The updated neighbor list
+    neighbors : list
+        The heap containing the current neighbors of cluster objects
+    in_neighbors : set
+        The ids of the points that are contained in the heap
+    new_neighbors : np.ndarray
+        The new neighbors that should be added to the heap
     """
     # ignore points that are already assigned
     new_neighbors = new_neighbors[labels[new_neighbors] == -1]
-    # Sort new neighbors by density
-    sorted_new_neighbors = _sort_neighbors_by_densities(new_neighbors, densities)
-    # Get densities of current neighbors
-    index = 0
-    for p in sorted_new_neighbors:
-        while index < len(current_neighbors) and (densities[p] > densities[current_neighbors[index]] or (
-                densities[p] == densities[current_neighbors[index]] and p > current_neighbors[index])):
-            index += 1
-        if index == len(current_neighbors) or current_neighbors[index] != p:
-            current_neighbors.insert(index, p)  # Add new neighbor, ignore if point already in neighbor list
-        index += 1
-    return current_neighbors
+    for p, density_p in zip(new_neighbors.tolist(), densities[new_neighbors].tolist()):
+        if p not in in_neighbors:
+            in_neighbors.add(p)
+            heapq.heappush(neighbors, (density_p, p))
 
 
 class MultiDensityDBSCAN(BaseEstimator, ClusterMixin):
@@ -189,6 +173,12 @@ class MultiDensityDBSCAN(BaseEstimator, ClusterMixin):
         Defines the factor that the density of a point may deviate from the average cluster density (default: 2.5)
     min_cluster_size : int
         The minimum cluster size (if a cluster is smaller, all contained points will be labeled as noise) (default: 2)
+    metric : str
+        The metric to use when calculating density with nearest neighbors algorithm.
+        If it is 'precomputed', the input of fit can also be a sparse neighbor graph containing the distances to k + 1 neighbors for each point (e.g., obtained by sklearn.neighbors.KNeighborsTransformer(n_neighbors=k, mode='distance')).
+        This allows to reuse the neighbor graph for multiple executions (default: 'euclidean')
+    n_jobs : int
+        Number of jobs used for the nearest neighbor search. -1 uses all available cores (default: None)
 
     Attributes
     ----------
@@ -198,8 +188,6 @@ class MultiDensityDBSCAN(BaseEstimator, ClusterMixin):
         The final labels
     cluster_densities_ : list
         The final cluster densities
-    metric : str
-        The metric to use when calculating density with nearest neighbors algorithm
 
     References
     ----------
@@ -207,11 +195,13 @@ class MultiDensityDBSCAN(BaseEstimator, ClusterMixin):
     International Conference on Intelligent Data Engineering and Automated Learning. Springer, Berlin, Heidelberg, 2011.
     """
 
-    def __init__(self, k: int = 15, var: float = 2.5, min_cluster_size: int = 2, metric: str = 'euclidean'):
+    def __init__(self, k: int = 15, var: float = 2.5, min_cluster_size: int = 2, metric: str = 'euclidean',
+                 n_jobs: int = None):
         self.k = k
         self.var = var
         self.min_cluster_size = min_cluster_size
         self.metric = metric
+        self.n_jobs = n_jobs
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'MultiDensityDBSCAN':
         """
@@ -221,7 +211,8 @@ class MultiDensityDBSCAN(BaseEstimator, ClusterMixin):
         Parameters
         ----------
         X : np.ndarray
-            the given data set
+            the given data set. Can also be a NeighborGraph (see clustpy.utils.NeighborGraph) containing at least k neighbors for each point.
+            If X contains duplicates, the result can differ from the one obtained by a NeighborGraph, as the first of the k + 1 nearest neighbors is removed instead of the point itself
         y : np.ndarray
             the labels (can be ignored)
 
@@ -230,7 +221,8 @@ class MultiDensityDBSCAN(BaseEstimator, ClusterMixin):
         self : MultiDensityDBSCAN
             this instance of the Multi Density DBSCAN algorithm
         """
-        n_clusters, labels, cluster_densities = _multi_density_dbscan(X, self.k, self.var, self.min_cluster_size, self.metric)
+        n_clusters, labels, cluster_densities = _multi_density_dbscan(X, self.k, self.var, self.min_cluster_size,
+                                                                      self.metric, self.n_jobs)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_densities_ = cluster_densities
@@ -1,37 +1,40 @@
 from clustpy.density import MultiDensityDBSCAN
-from clustpy.density.multi_density_dbscan import _sort_neighbors_by_densities, _add_neighbors_to_neighbor_list
+from clustpy.density.multi_density_dbscan import _push_neighbors_to_heap
 from sklearn.datasets import make_blobs
+from sklearn.neighbors import KNeighborsTransformer
+from clustpy.utils import NeighborGraph
 import numpy as np
+import heapq
 
 
-def test_add_neighbors_to_neighbor_list():
+def _pop_all(neighbors):
+    return [heapq.heappop(neighbors)[1] for _ in range(len(neighbors))]
+
+
+def test_push_neighbors_to_heap():
     densities = np.array([3, 5, 7, 4, 1, 6, 2, 9, 8, 0, 10, 11, 0.5])
-    neighbors = [6, 5, 2, 7, 11]  # densities: [2, 6, 7, 9, 11]
+    neighbors = []
+    in_neighbors = set()
+    labels = np.array([0] + [-1] * 8 + [0] + [-1] * 3)
+    _push_neighbors_to_heap(densities, labels, neighbors, in_neighbors, np.array([6, 5, 2, 7, 11]))
+    assert in_neighbors == {6, 5, 2, 7, 11}
     new_neighbors = np.array(
         [0, 4, 1, 8, 10, 11, 12, 2])  # Sorted: [12, 4, 0, 1, 2, 8, 10, 11] / densities: [0.5, 1, 3, 5, 7, 8, 10, 11]
-    labels = np.array([0] + [-1] * 8 + [0] + [-1] * 3)
-    neighbors = _add_neighbors_to_neighbor_list(densities, labels, neighbors, new_neighbors)
-    assert np.array_equal([12, 4, 6, 1, 5, 2, 8, 7, 10, 11], neighbors)
-    assert np.array_equal([0.5, 1, 2, 5, 6, 7, 8, 9, 10, 11], densities[neighbors])
+    _push_neighbors_to_heap(densities, labels, neighbors, in_neighbors, new_neighbors)
+    assert len(neighbors) == 10
+    sorted_neighbors = _pop_all(neighbors)
+    assert np.array_equal([12, 4, 6, 1, 5, 2, 8, 7, 10, 11], sorted_neighbors)
+    assert np.array_equal([0.5, 1, 2, 5, 6, 7, 8, 9, 10, 11], densities[sorted_neighbors])
     # Check if order of samples with same density is correct
     densities = np.array([1, 2, 3, 2, 1, 2, 2, 0, 4, 2])
-    neighbors = [4, 1, 6]
-    new_neighbors = np.array([3, 0, 2, 6, 5, 9, 1, 7])
+    neighbors = []
+    in_neighbors = set()
     labels = np.array([-1] * 9 + [0])
-    neighbors = _add_neighbors_to_neighbor_list(densities, labels, neighbors, new_neighbors)
-    assert np.array_equal([7, 0, 4, 1, 3, 5, 6, 2], neighbors)
-    assert np.array_equal([0, 1, 1, 2, 2, 2, 2, 3], densities[neighbors])
-
-
-def test_sort_neighbors_by_densities():
-    densities = np.array([0, 3, 2, 6, 4, 7, 8, 10, 1, 5, 3, 7, 9, 1])
-    neighbors = [2, 5, 8, 10, 12]  # densities = [2, 7, 1, 3, 9]
-    sorted_neighbors = _sort_neighbors_by_densities(neighbors, densities)
-    assert np.array_equal([8, 2, 10, 5, 12], sorted_neighbors)
-    densities = np.array([0, 0, 1, 1, 2, 3, 4, 4])
-    neighbors = [0, 1, 2, 4, 7, 6]  # densities = [0, 0, 1, 3, 4, 4]
-    sorted_neighbors = _sort_neighbors_by_densities(neighbors, densities)
-    assert np.array_equal([0, 1, 2, 4, 6, 7], sorted_neighbors)
+    _push_neighbors_to_heap(densities, labels, neighbors, in_neighbors, np.array([4, 1, 6]))
+    _push_neighbors_to_heap(densities, labels, neighbors, in_neighbors, np.array([3, 0, 2, 6, 5, 9, 1, 7]))
+    sorted_neighbors = _pop_all(neighbors)
+    assert np.array_equal([7, 0, 4, 1, 3, 5, 6, 2], sorted_neighbors)
+    assert np.array_equal([0, 1, 1, 2, 2, 2, 2, 3], densities[sorted_neighbors])
 
 
 def test_simple_MutliDensityDBSCAN():
@@ -42,3 +45,30 @@ def test_simple_MutliDensityDBSCAN():
     md_dbscan.fit(X)
     assert md_dbscan.labels_.dtype == np.int32
     assert md_dbscan.labels_.shape == labels.shape
+
+
+def test_MultiDensityDBSCAN_precomputed():
+    X, labels = make_blobs(200, 4, centers=3, random_state=1)
+    md_dbscan = MultiDensityDBSCAN(k=10, n_jobs=2)
+    md_dbscan.fit(X)
+    # Use precomputed neighbor graph
+    neighbor_graph = KNeighborsTransformer(n_neighbors=10, mode="distance").fit_transform(X)
+    md_dbscan_precomputed = MultiDensityDBSCAN(k=10, metric="precomputed")
+    md_dbscan_precomputed.fit(neighbor_graph)
+    assert md_dbscan.n_clusters_ == md_dbscan_precomputed.n_clusters_
+    assert np.array_equal(md_dbscan.labels_, md_dbscan_precomputed.labels_)
+    # Use NeighborGraph
+    neighbor_graph = NeighborGraph(15).fit(X)
+    md_dbscan_neighbor_graph = MultiDensityDBSCAN(k=10).fit(neighbor_graph)
+    assert md_dbscan.n_clusters_ == md_dbscan_neighbor_graph.n_clusters_
+    assert np.array_equal(md_dbscan.labels_, md_dbscan_neighbor_graph.labels_)
+
+
+def test_MultiDensityDBSCAN_with_duplicates():
+    X = np.array([2, 3, 2, 2, 2, 3, 2, 4, 4, 2, 2, 3, 2]).reshape((-1, 1))
+    # The first of the k + 1 nearest neighbors is removed (in case of duplicates, this is not necessarily the point itself)
+    md_dbscan = MultiDensityDBSCAN(k=3, var=1.5).fit(X)
+    assert np.array_equal(md_dbscan.labels_, [0, 1, 0, 0, -1, 2, -1, 2, 2, -1, -1, 1, -1])
+    # A NeighborGraph never contains the point itself
+    md_dbscan_neighbor_graph = MultiDensityDBSCAN(k=3, var=1.5).fit(NeighborGraph(3).fit(X))
+    assert np.array_equal(md_dbscan_neighbor_graph.labels_, [0, 1, 0, 0, 0, 1, -1, 2, 2, -1, -1, 1, -1])
@@ -5,11 +5,160 @@ Collin Leiber
 
 from sklearn.base import BaseEstimator, ClusterMixin
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
+from scipy.spatial.distance import pdist, squareform, cdist
 
 
-def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_full_tree: bool, metric: str) -> (
-        np.ndarray, list):
+class _DianaDistances():
+    """
+    Provides the pairwise distances of the objects for DIANA.
+    The distances can be stored as a square matrix, as a condensed matrix (only the upper triangle) or can be computed on demand.
+    Diameters and sums of distances are always computed blockwise, so that at most block_size distances are held in memory at once (in addition to the stored distances).
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set (or the distance matrix if metric is "precomputed")
+    metric : str
+        Metric used to compute the dissimilarity (see scipy.spatial.distance.cdist) or "precomputed"
+    distance_storage : str
+        Defines how the distances are stored. Can be "square" (full distance matrix), "condensed" (upper triangle of the distance matrix) or "none" (distances are computed on demand) (default: "square")
+    dtype : type
+        The dtype of the stored distances, e.g., np.float32 to halve the memory consumption. Irrelevant if distance_storage is "none" (default: np.float64)
+    block_size : int
+        Maximum number of pairwise distances that are computed at once (default: 2**22)
+    """
+
+    def __init__(self, X: np.ndarray, metric: str, distance_storage: str = "square", dtype: type = np.float64,
+                 block_size: int = 2 ** 22):
+        assert distance_storage in ["square", "condensed",
+                                    "none"], "distance_storage must be 'square', 'condensed' or 'none'. Your input: {0}".format(
+            distance_storage)
+        if metric == "precomputed":
+            assert X.ndim == 2 and X.shape[0] == X.shape[
+                1], "If metric is 'precomputed', X must be a square distance matrix"
+        self.X = X
+        self.metric = metric
+        self.distance_storage = distance_storage
+        self.block_size = block_size
+        self.n_points = X.shape[0]
+        if distance_storage == "square":
+            if metric == "precomputed":
+                self.distances = X.astype(dtype, copy=False)
+            else:
+                self.distances = squareform(pdist(X, metric=metric)).astype(dtype, copy=False)
+        elif distance_storage == "condensed":
+            if metric == "precomputed":
+                self.distances = squareform(X, checks=False).astype(dtype, copy=False)
+            else:
+                self.distances = self._get_condensed_distances(dtype)
+        else:
+            self.distances = None
+
+    def _get_condensed_distances(self, dtype: type) -> np.ndarray:
+        """
+        Compute the condensed distance matrix blockwise, so that no full matrix in float64 has to be created.
+
+        Parameters
+        ----------
+        dtype : type
+            The dtype of the condensed distances
+
+        Returns
+        -------
+        condensed_distances : np.ndarray
+            The condensed distance matrix (see scipy.spatial.distance.pdist)
+        """
+        n = self.n_points
+        condensed_distances = np.empty(n * (n - 1) // 2, dtype=dtype)
+        rows_per_block = max(1, self.block_size // n)
+        for start in range(0, n - 1, rows_per_block):
+            end = min(start + rows_per_block, n - 1)
+            block = cdist(self.X[start:end], self.X[start + 1:], metric=self.metric)
+            for i in range(start, end):
+                offset = n * i - i * (i + 1) // 2
+                condensed_distances[offset:offset + n - i - 1] = block[i - start, i - start:]
+        return condensed_distances
+
+    def get_distances(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Get the pairwise distances between two sets of objects.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            The ids of the first set of objects
+        cols : np.ndarray
+            The ids of the second set of objects
+
+        Returns
+        -------
+        distances : np.ndarray
+            Matrix of shape (rows.shape[0], cols.shape[0]) containing the pairwise distances
+        """
+        if self.distance_storage == "square":
+            distances = self.distances[np.ix_(rows, cols)]
+        elif self.distance_storage == "condensed":
+            i = np.minimum(rows[:, None], cols[None, :]).astype(np.int64)
+            j = np.maximum(rows[:, None], cols[None, :]).astype(np.int64)
+            is_diagonal = i == j
+            condensed_ids = self.n_points * i - i * (i + 1) // 2 + j - i - 1
+            condensed_ids[is_diagonal] = 0
+            distances = self.distances[condensed_ids]
+            distances[is_diagonal] = 0
+        elif self.metric == "precomputed":
+            distances = self.X[np.ix_(rows, cols)]
+        else:
+            distances = cdist(self.X[rows], self.X[cols], metric=self.metric)
+        return distances
+
+    def get_diameter(self, points: np.ndarray) -> float:
+        """
+        Get the diameter of a set of objects, i.e. the largest distance between two of the objects.
+        Because of symmetry, only the upper triangle of the distance matrix is considered.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            The ids of the objects
+
+        Returns
+        -------
+        diameter : float
+            The diameter
+        """
+        diameter = 0
+        rows_per_block = max(1, self.block_size // points.shape[0])
+        for start in range(0, points.shape[0] - 1, rows_per_block):
+            block = self.get_distances(points[start:start + rows_per_block], points[start:])
+            diameter = max(diameter, np.max(block))
+        return diameter
+
+    def get_sum_distances(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Get the sum of distances of each object in rows to all objects in cols.
+
+        Parameters
+        ----------
+        rows : np.ndarray
+            The ids of the objects for which the sums should be computed
+        cols : np.ndarray
+            The ids of the objects to which the distances should be summed up
+
+        Returns
+        -------
+        sum_distances : np.ndarray
+            The sum of distances for each object in rows
+        """
+        sum_distances = np.zeros(rows.shape[0])
+        rows_per_block = max(1, self.block_size // max(1, cols.shape[0]))
+        for start in range(0, rows.shape[0], rows_per_block):
+            block = self.get_distances(rows[start:start + rows_per_block], cols)
+            sum_distances[start:start + rows_per_block] = np.sum(block, axis=1, dtype=np.float64)
+        return sum_distances
+
+
+def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_full_tree: bool, metric: str,
+           distance_storage: str, dtype: type, block_size: int) -> (np.ndarray, list):
     """
     Start the actual DIANA clustering procedure on the input data set.
     
@@ -25,6 +174,12 @@ def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_
         Defines whether the full tree should be constructed after n_clusters has been reached
     metric : str
         Metric used to compute the dissimilarity. Can be "euclidean", "l1", "l2", "manhattan", "cosine", or "precomputed" (see scipy.spatial.distance.pdist)
+    distance_storage : str
+        Defines how the distances are stored. Can be "square", "condensed" or "none"
+    dtype : type
+        The dtype of the stored distances
+    block_size : int
+        Maximum number of pairwise distances that are computed at once
 
     Returns
     -------
@@ -34,22 +189,32 @@ def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_
     """
     labels = np.zeros(X.shape[0], dtype=np.int32)
     final_labels = np.zeros(X.shape[0], dtype=np.int32)
-    # Calculate pairwise distances (must only be done once)
-    global_distance_matrix = squareform(pdist(X, metric=metric))
+    # Prepare pairwise distances (must only be done once)
+    distances = _DianaDistances(X, metric, distance_storage, dtype, block_size)
+    # The members and diameters of the clusters are cached and only updated for the two new clusters after a split (diameter is -1 for clusters of size one)
+    cluster_points = [np.arange(X.shape[0])]
+    cluster_diameters = np.full(X.shape[0], -1.)
+    if X.shape[0] > 1:
+        cluster_diameters[0] = distances.get_diameter(cluster_points[0])
     # Start with a single cluster
     current_n_clusters = 1
     tree = []
     while current_n_clusters < n_clusters or construct_full_tree:
         # Get cluster with maximum diameter (largest distance between two poinst within a cluster)
-        split_cluster_id, cluster_distance_matrix = _get_cluster_with_max_diameter(
-            global_distance_matrix, labels, current_n_clusters, distance_threshold)
+        split_cluster_id = _get_cluster_with_max_diameter(cluster_diameters[:current_n_clusters], distance_threshold)
         # Check if we only have clusters of size one or only clusters with diameter < distance_threshold
         if split_cluster_id is None:
             break
         else:
             # Split cluster by updating labels and tree
-            labels_new = _split_cluster(cluster_distance_matrix, split_cluster_id, current_n_clusters)
-            labels[labels == split_cluster_id] = labels_new
+            points = cluster_points[split_cluster_id]
+            labels_new = _split_cluster(distances, points, split_cluster_id, current_n_clusters)
+            cluster_points[split_cluster_id] = points[labels_new == split_cluster_id]
+            cluster_points.append(points[labels_new == current_n_clusters])
+            labels[cluster_points[-1]] = current_n_clusters
+            for cluster_id in [split_cluster_id, current_n_clusters]:
+                cluster_diameters[cluster_id] = distances.get_diameter(cluster_points[cluster_id]) if \
+                    cluster_points[cluster_id].shape[0] > 1 else -1
             tree.append((split_cluster_id, current_n_clusters))
             current_n_clusters += 1
         if current_n_clusters == n_clusters:
@@ -58,59 +223,48 @@ def _diana(X: np.ndarray, n_clusters: int, distance_threshold: float, construct_
     return final_labels, tree
 
 
-def _get_cluster_with_max_diameter(global_distance_matrix: np.ndarray, labels: np.ndarray, n_clusters: int,
-                                   distance_threshold: float) -> (int, np.ndarray):
+def _get_cluster_with_max_diameter(cluster_diameters: np.ndarray, distance_threshold: float) -> int:
     """
     Identify the cluster with the largest diameter, i.e. with the largest distance between two objects assigned to this cluster.
     Here, only diameters which are larger than distance_threshold are taken into account.
-    If only clusters of size one occur or all diameters are below distance_threshold, all return values will be None.
+    If only clusters of size one occur or all diameters are below distance_threshold, None will be returned.
 
     Parameters
     ----------
-    global_distance_matrix : np.ndarray
-        The global distance matrix containing the pairwise distances of all objects
-    labels : np.ndarray
-        The current cluster labels
-    n_clusters : int
-        The current number of clusters
+    cluster_diameters : np.ndarray
+        The diameters of the current clusters (-1 for clusters of size one)
     distance_threshold : float
         The distance thresholds defines the minimum diameter that is considered
 
     Returns
     -------
-    tuple: (int, np.ndarray)
-        The id of the cluster that should be split,
-        The pariwise distances of all points within that cluster
+    split_cluster_id : int
+        The id of the cluster that should be split
     """
-    max_diameter = -1
-    split_cluster_id = None
-    resulting_cluster_distance_matrix = None
+    # Cluster must contain more than one object
+    is_candidate = (cluster_diameters >= 0) & (cluster_diameters >= distance_threshold)
+    if not np.any(is_candidate):
+        return None
     # Search cluster with largest diamter (two objects within a cluster with largest distance)
-    for cluster_id in range(n_clusters):
-        points = labels == cluster_id
-        # Cluster must contain more than one object
-        if np.sum(points) > 1:
-            # Get pairwise distances of all points within cluster
-            cluster_distance_matrix = global_distance_matrix[np.ix_(points, points)]
-            diameter = np.max(cluster_distance_matrix)
-            if diameter > max_diameter and diameter >= distance_threshold:
-                # Save parameters of current cluster with largest diameter
-                max_diameter = diameter
-                split_cluster_id = cluster_id
-                resulting_cluster_distance_matrix = cluster_distance_matrix
-    return split_cluster_id, resulting_cluster_distance_matrix
-
-
-def _split_cluster(cluster_distance_matrix: np.ndarray, split_cluster_id: int, new_cluster_id: int) -> np.ndarray:
+    split_cluster_id = int(np.argmax(np.where(is_candidate, cluster_diameters, -np.inf)))
+    return split_cluster_id
+
+
+def _split_cluster(distances: _DianaDistances, points: np.ndarray, split_cluster_id: int,
+                   new_cluster_id: int) -> np.ndarray:
     """
     Split the specified cluster into two.
     Therefore, it repeatedly calculates the average dissimilarity of the objects to the two subclusters.
     If the subclusters do not change for an iteration the splitting procedure terminates.
+    The sums of distances are only calculated once and are afterwards updated by the distances to the objects that moved to the splinter group.
+    Thereby, only objects that are still part of the original subcluster are considered.
 
     Parameters
     ----------
-    cluster_distance_matrix : np.ndarray
-        The distance matrix of the specified cluster containing the pairwise distances of respective objects
+    distances : _DianaDistances
+        Object providing the pairwise distances of the objects
+    points : np.ndarray
+        The ids of the objects within the specified cluster
     split_cluster_id: int
         The id of the cluster that should be split
     new_cluster_id : int
@@ -122,29 +276,35 @@ def _split_cluster(cluster_distance_matrix: np.ndarray, split_cluster_id: int, n
         The updated cluster labels
     """
     # Create labels
-    labels_new = np.zeros(cluster_distance_matrix.shape[0], dtype=np.int32) + split_cluster_id
-    # Initialize sum of distances for second subcluster
-    sum_distances_1 = np.sum(cluster_distance_matrix, axis=1)
-    sum_distances_2 = np.zeros(cluster_distance_matrix.shape[0])
+    labels_new = np.zeros(points.shape[0], dtype=np.int32) + split_cluster_id
+    # Initialize sum of distances for both subclusters (only for objects remaining in the original subcluster)
+    remaining = np.arange(points.shape[0])
+    sum_distances_1 = distances.get_sum_distances(points, points)
+    sum_distances_2 = np.zeros(points.shape[0])
     splinter_group = np.array([np.argmax(sum_distances_1)])
     # Start splitting procedure
-    size_group_1 = cluster_distance_matrix.shape[0] - 1
-    size_group_2 = 0
     while splinter_group.shape[0] > 0:
         # Update labels
-        labels_new[splinter_group] = new_cluster_id
-        # Update sum of distances for each subcluster
-        size_group_1 -= splinter_group.shape[0]
-        size_group_2 += splinter_group.shape[0]
-        sum_splinter_group = np.sum(cluster_distance_matrix[:, splinter_group], axis=1)
-        sum_distances_1 -= sum_splinter_group
-        sum_distances_2 += sum_splinter_group
-        if size_group_1 > 0:
-            # Get new splinter group (only checks objects of the original cluster)
-            splinter_group = np.where((labels_new == split_cluster_id) &
-                                      (sum_distances_1 / size_group_1 > sum_distances_2 / size_group_2))[0]
-        else:
+        moved_points = remaining[splinter_group]
+        labels_new[moved_points] = new_cluster_id
+        is_remaining = np.ones(remaining.shape[0], dtype=bool)
+        is_remaining[splinter_group] = False
+        remaining = remaining[is_remaining]
+        # Average dissimilarity within the original subcluster does not consider the object itself
+        size_group_1 = remaining.shape[0] - 1
+        size_group_2 = points.shape[0] - remaining.shape[0]
+        if size_group_1 <= 0:
             break
+        # Update sum of distances for each subcluster
+        sum_splinter_group = distances.get_sum_distances(points[remaining], points[moved_points])
+        sum_distances_1 = sum_distances_1[is_remaining] - sum_splinter_group
+        sum_distances_2 = sum_distances_2[is_remaining] + sum_splinter_group
+        # Get new splinter group (only checks objects of the original cluster)
+        differences = sum_distances_1 / size_group_1 - sum_distances_2 / size_group_2
+        splinter_group = np.where(differences > 0)[0]
+        if splinter_group.shape[0] == remaining.shape[0]:
+            # The original subcluster must not become empty -> keep the object with the smallest difference
+            splinter_group = np.delete(splinter_group, np.argmin(differences))
     return labels_new
 
 
@@ -164,6 +324,13 @@ class Diana(BaseEstimator, ClusterMixin):
         Defines whether the full tree should be constructed after n_clusters has been reached (default: False)
     metric : str
         Metric used to compute the dissimilarity. Can be "euclidean", "l1", "l2", "manhattan", "cosine", or "precomputed" (see scipy.spatial.distance.pdist) (default: euclidean)
+    distance_storage : str
+        Defines how the pairwise distances are stored. Can be "square" (full distance matrix), "condensed" (upper triangle of the distance matrix, requires about half of the memory) or "none" (distances are computed blockwise on demand, no quadratic memory consumption).
+        "none" allows the clustering of large data sets but increases the runtime as distances are computed repeatedly (default: "square")
+    dtype : type
+        The dtype of the stored distances. np.float32 halves the memory consumption. Irrelevant if distance_storage is "none" (default: np.float64)
+    block_size : int
+        Maximum number of pairwise distances that are computed at once when calculating diameters and average dissimilarities (default: 2**22)
 
     Attributes
     ----------
@@ -179,11 +346,15 @@ class Diana(BaseEstimator, ClusterMixin):
     """
 
     def __init__(self, n_clusters: int = None, distance_threshold: float = 0, construct_full_tree: bool = False,
-                 metric: str = "euclidean"):
+                 metric: str = "euclidean", distance_storage: str = "square", dtype: type = np.float64,
+                 block_size: int = 2 ** 22):
         self.n_clusters = n_clusters
         self.distance_threshold = distance_threshold
         self.construct_full_tree = construct_full_tree
         self.metric = metric
+        self.distance_storage = distance_storage
+        self.dtype = dtype
+        self.block_size = block_size
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'Diana':
         """
@@ -205,7 +376,8 @@ class Diana(BaseEstimator, ClusterMixin):
         assert self.n_clusters is None or self.distance_threshold == 0, "If n_clusters is set, distance_threshold must be 0. Else the number of identified clusters can be incorrect"
         if self.n_clusters is None or self.n_clusters > X.shape[0]:
             self.n_clusters = X.shape[0]
-        labels, tree = _diana(X, self.n_clusters, self.distance_threshold, self.construct_full_tree, self.metric)
+        labels, tree = _diana(X, self.n_clusters, self.distance_threshold, self.construct_full_tree, self.metric,
+                              self.distance_storage, self.dtype, self.block_size)
         self.labels_ = labels
         self.tree_ = tree
         return self
@@ -1,46 +1,68 @@
 from clustpy.hierarchical import Diana
-from clustpy.hierarchical.diana import _split_cluster, _get_cluster_with_max_diameter
+from clustpy.hierarchical.diana import _split_cluster, _get_cluster_with_max_diameter, _DianaDistances
 import numpy as np
 from sklearn.datasets import make_blobs
+from scipy.spatial.distance import pdist, squareform
+
+
+def test_diana_distances():
+    X, _ = make_blobs(50, 3, centers=2, random_state=1)
+    distance_matrix = squareform(pdist(X))
+    rows = np.array([0, 5, 5, 49, 10])
+    cols = np.array([49, 5, 0, 3])
+    for distance_storage in ["square", "condensed", "none"]:
+        for metric in ["euclidean", "precomputed"]:
+            distances = _DianaDistances(X if metric == "euclidean" else distance_matrix, metric, distance_storage,
+                                        block_size=7)
+            assert np.allclose(distances.get_distances(rows, cols), distance_matrix[np.ix_(rows, cols)])
+            assert np.isclose(distances.get_diameter(np.arange(X.shape[0])), np.max(distance_matrix))
+            assert np.isclose(distances.get_diameter(rows[:2]), distance_matrix[0, 5])
+            assert np.allclose(distances.get_sum_distances(rows, cols),
+                               np.sum(distance_matrix[np.ix_(rows, cols)], axis=1))
+    # Condensed storage using float32
+    distances = _DianaDistances(X, "euclidean", "condensed", np.float32, block_size=7)
+    assert distances.distances.dtype == np.float32
+    assert distances.distances.shape == (X.shape[0] * (X.shape[0] - 1) // 2,)
+    assert np.allclose(distances.distances, pdist(X))
 
 
 def test_get_cluster_with_max_diameter():
-    # Uses the example from the original paper
-    global_distance_matrix = np.array([[0, 2, 6, 10, 9],
-                                       [2, 0, 5, 9, 8],
-                                       [6, 5, 0, 4, 5],
-                                       [10, 9, 4, 0, 3],
-                                       [9, 8, 5, 3, 0]])
-    # First iteration
-    labels = np.array([0, 0, 0, 0, 0])
-    split_cluster_id, cluster_distance_matrix = _get_cluster_with_max_diameter(global_distance_matrix, labels, 1, 0)
+    # First iteration (uses the example from the original paper)
+    split_cluster_id = _get_cluster_with_max_diameter(np.array([10.]), 0)
     assert split_cluster_id == 0
-    assert np.array_equal(cluster_distance_matrix, global_distance_matrix)
     # Second iteration
-    labels = np.array([0, 0, 1, 1, 1])
-    split_cluster_id, cluster_distance_matrix = _get_cluster_with_max_diameter(global_distance_matrix, labels, 2, 0)
+    split_cluster_id = _get_cluster_with_max_diameter(np.array([2., 5.]), 0)
     assert split_cluster_id == 1
-    assert np.array_equal(cluster_distance_matrix, np.array([[0, 4, 5],
-                                                             [4, 0, 3],
-                                                             [5, 3, 0]]))
+    # Ignore clusters of size one and clusters with a diameter below the threshold
+    split_cluster_id = _get_cluster_with_max_diameter(np.array([2., -1, 5., 0.]), 3)
+    assert split_cluster_id == 2
+    split_cluster_id = _get_cluster_with_max_diameter(np.array([2., -1, 0.]), 3)
+    assert split_cluster_id is None
+    split_cluster_id = _get_cluster_with_max_diameter(np.array([-1., -1]), 0)
+    assert split_cluster_id is None
 
 
 def test_split_cluster():
     # Uses the example from the original paper
+    global_distance_matrix = np.array([[0, 2, 6, 10, 9],
+                                       [2, 0, 5, 9, 8],
+                                       [6, 5, 0, 4, 5],
+                                       [10, 9, 4, 0, 3],
+                                       [9, 8, 5, 3, 0]])
+    distances = _DianaDistances(global_distance_matrix, "precomputed")
     # First iteration
-    cluster_distance_matrix = np.array([[0, 2, 6, 10, 9],
-                                        [2, 0, 5, 9, 8],
-                                        [6, 5, 0, 4, 5],
-                                        [10, 9, 4, 0, 3],
-                                        [9, 8, 5, 3, 0]])
-    labels = _split_cluster(cluster_distance_matrix, 0, 1)
+    labels = _split_cluster(distances, np.arange(5), 0, 1)
     assert np.array_equal(labels, np.array([1, 1, 0, 0, 0]))
     # Second iteration
-    cluster_distance_matrix = np.array([[0, 4, 5],
-                                        [4, 0, 3],
-                                        [5, 3, 0]])
-    labels = _split_cluster(cluster_distance_matrix, 0, 2)
+    labels = _split_cluster(distances, np.array([2, 3, 4]), 0, 2)
     assert np.array_equal(labels, np.array([2, 0, 0]))
+    # Original cluster must not become empty
+    X = np.array([[-1., 1.], [1., -1.], [-3., 0.], [-1., -1.], [0., 2.]])
+    labels = _split_cluster(_DianaDistances(X, "euclidean"), np.arange(5), 0, 1)
+    assert np.array_equal(labels, np.array([1, 0, 1, 1, 1]))
+    diana = Diana(construct_full_tree=True).fit(X)
+    assert np.unique(diana.labels_).shape[0] == 5
+    assert len(diana.tree_) == 4
 
 
 """
@@ -83,3 +105,19 @@ def test_pruning_tree():
     assert np.unique(diana.labels_).shape[0] == X.shape[0]
     labels_pruned = diana.prune_tree(4)
     assert np.unique(labels_pruned).shape[0] == 5
+
+
+def test_Diana_distance_storage():
+    X, labels = make_blobs(150, 4, centers=3, random_state=1)
+    diana = Diana(n_clusters=5, construct_full_tree=True)
+    diana.fit(X)
+    for distance_storage in ["condensed", "none"]:
+        diana_storage = Diana(n_clusters=5, construct_full_tree=True, distance_storage=distance_storage,
+                              block_size=100)
+        diana_storage.fit(X)
+        assert np.array_equal(diana.labels_, diana_storage.labels_)
+        assert diana.tree_ == diana_storage.tree_
+    # Using float32
+    diana_float32 = Diana(n_clusters=5, distance_storage="condensed", dtype=np.float32)
+    diana_float32.fit(X)
+    assert np.unique(diana_float32.labels_).shape[0] == 5
@@ -1,7 +1,7 @@
 from .clustering_metrics import variation_of_information, unsupervised_clustering_accuracy, \
     information_theoretic_external_cluster_validity_measure, fair_normalized_mutual_information
-from .pair_counting_scores import PairCountingScores, pc_f1_score, pc_jaccard_score, pc_precision_score, pc_rand_score, \
-    pc_recall_score
+from .pair_counting_scores import PairCountingScores, ContingencyPairCountingScores, pc_f1_score, pc_jaccard_score, \
+    pc_precision_score, pc_rand_score, pc_recall_score
 from .multipe_labelings_scoring import is_multi_labelings_n_clusters_correct, MultipleLabelingsConfusionMatrix, \
     MultipleLabelingsPairCountingScores, remove_noise_spaces_from_labels, multiple_labelings_pc_f1_score, \
     multiple_labelings_pc_jaccard_score, multiple_labelings_pc_precision_score, multiple_labelings_pc_rand_score, \
@@ -11,6 +11,7 @@ from .confusion_matrix import ConfusionMatrix
 __all__ = ['variation_of_information',
            'unsupervised_clustering_accuracy',
            'PairCountingScores',
+           'ContingencyPairCountingScores',
            'pc_f1_score',
            'pc_jaccard_score',
            'pc_precision_score',
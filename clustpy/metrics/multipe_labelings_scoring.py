@@ -7,6 +7,11 @@ from clustpy.metrics.confusion_matrix import ConfusionMatrix, _plot_confusion_ma
 from scipy.optimize import linear_sum_assignment
 from collections.abc import Callable
 
+"""
+Maximum number of labelings (predicted + ground truth) for which pair-counting categories are calculated using the inclusion-exclusion principle
+"""
+_MAX_LABELINGS_FOR_INCLUSION_EXCLUSION = 10
+
 """
 HELPERS
 """
@@ -259,22 +264,94 @@ def _get_multiple_labelings_pair_counting_categories(labels_true: np.ndarray, la
     if remove_noise_spaces:
         labels_true = remove_noise_spaces_from_labels(labels_true)
         labels_pred = remove_noise_spaces_from_labels(labels_pred)
+    if labels_true.shape[1] + labels_pred.shape[1] <= _MAX_LABELINGS_FOR_INCLUSION_EXCLUSION:
+        # Number of pairs that share a cluster in any labeling of the prediction and in any labeling of the ground truth
+        n_same_pred = _get_n_pairs_anywhere_same_cluster(labels_pred)
+        n_same_true = _get_n_pairs_anywhere_same_cluster(labels_true)
+        n_tp = n_same_pred + n_same_true - _get_n_pairs_anywhere_same_cluster(np.c_[labels_pred, labels_true])
+        n_fp = n_same_pred - n_tp
+        n_fn = n_same_true - n_tp
+        n_tn = labels_pred.shape[0] * (labels_pred.shape[0] - 1) // 2 - n_tp - n_fp - n_fn
+    else:
+        n_tp, n_fp, n_fn, n_tn = _get_multiple_labelings_pair_counting_categories_chunkwise(labels_true, labels_pred)
+    return n_tp, n_fp, n_fn, n_tn
+
+
+def _get_n_pairs_anywhere_same_cluster(labels: np.ndarray) -> int:
+    """
+    Get the number of pairs of samples that share a cluster label in at least one labeling.
+    Uses the inclusion-exclusion principle, i.e., the number of pairs that share a cluster label in all labelings of a subset of labelings is added or subtracted depending on the size of the subset.
+    The number of pairs that share a cluster label in all labelings of a subset can be obtained by counting the samples within each cell of the contingency table of these labelings.
+    Therefore, the runtime is linear in the number of samples but exponential in the number of labelings.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        The set of labelings
+
+    Returns
+    -------
+    n_pairs : int
+        The number of pairs sharing a cluster label in at least one labeling
+    """
+    labels_ids = np.array([np.unique(labels[:, s], return_inverse=True)[1].reshape(-1) for s in range(labels.shape[1])],
+                          dtype=np.int64).reshape((labels.shape[1], labels.shape[0]))
+    n_pairs = 0
+    for subset in range(1, 2 ** labels.shape[1]):
+        subset_labelings = [s for s in range(labels.shape[1]) if subset & (1 << s)]
+        # Get id of the cell in the contingency table of all labelings in the subset
+        cell_ids = labels_ids[subset_labelings[0]]
+        for s in subset_labelings[1:]:
+            cell_ids = np.unique(cell_ids * (np.max(labels_ids[s]) + 1) + labels_ids[s], return_inverse=True)[
+                1].reshape(-1)
+        cell_sizes = np.bincount(cell_ids).astype(np.int64)
+        n_pairs_same_cell = int(np.sum(cell_sizes * (cell_sizes - 1) // 2))
+        n_pairs += n_pairs_same_cell if len(subset_labelings) % 2 == 1 else -n_pairs_same_cell
+    return n_pairs
+
+
+def _get_multiple_labelings_pair_counting_categories_chunkwise(labels_true: np.ndarray, labels_pred: np.ndarray,
+                                                                chunk_size: int = None) -> (int, int, int, int):
+    """
+    Get the number of 'true positives', 'false positives', 'false negatives' and 'true negatives' using multiple labelings by comparing chunks of samples with all subsequent samples.
+    The comparisons are vectorized and the memory consumption is bounded by the size of the chunks.
+    Used if there are too many labelings for the inclusion-exclusion principle.
+
+    Parameters
+    ----------
+    labels_true : np.ndarray
+        The true set of labelings. Shape must match (n_samples, n_subspaces)
+    labels_pred : np.ndarray
+        The predicted set of labelings. Shape must match (n_samples, n_subspaces)
+    chunk_size : int
+        The number of samples within a chunk. If None, it will be chosen so that each comparison contains approximately 10^7 entries (default: None)
+
+    Returns
+    -------
+    tuple : (int, int, int, int)
+        The number of true positives,
+        The number of false positives,
+        The number of false negatives,
+        The number of true negatives
+    """
+    n_points = labels_pred.shape[0]
+    if chunk_size is None:
+        chunk_size = max(1, 10 ** 7 // max(1, n_points * max(labels_true.shape[1], labels_pred.shape[1], 1)))
     n_tp = 0
     n_fp = 0
     n_fn = 0
-    n_tn = 0
-    for i in range(labels_pred.shape[0] - 1):
-        for j in range(i + 1, labels_pred.shape[0]):
-            if _anywhere_same_cluster(labels_pred, i, j):
-                if _anywhere_same_cluster(labels_true, i, j):
-                    n_tp += 1
-                else:
-                    n_fp += 1
-            else:
-                if _anywhere_same_cluster(labels_true, i, j):
-                    n_fn += 1
-                else:
-                    n_tn += 1
+    for start in range(0, n_points - 1, chunk_size):
+        end = min(start + chunk_size, n_points - 1)
+        same_pred = np.any(labels_pred[start:end, None, :] == labels_pred[None, start + 1:, :], axis=2)
+        same_true = np.any(labels_true[start:end, None, :] == labels_true[None, start + 1:, :], axis=2)
+        # Only consider pairs (i, j) with j > i
+        upper_triangle = np.arange(start + 1, n_points)[None, :] > np.arange(start, end)[:, None]
+        same_pred &= upper_triangle
+        same_true &= upper_triangle
+        n_tp += int(np.sum(same_pred & same_true))
+        n_fp += int(np.sum(same_pred & ~same_true))
+        n_fn += int(np.sum(~same_pred & same_true))
+    n_tn = n_points * (n_points - 1) // 2 - n_tp - n_fp - n_fn
     return n_tp, n_fp, n_fn, n_tn
 
 
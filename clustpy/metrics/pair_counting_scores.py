@@ -1,5 +1,6 @@
 from clustpy.metrics.clustering_metrics import _check_number_of_points
 import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, issparse
 
 """
 Internal functions
@@ -317,6 +318,7 @@ def pc_f1_score(labels_true: np.ndarray, labels_pred: np.ndarray) -> float:
 def _get_pair_counting_categories(labels_true: np.ndarray, labels_pred: np.ndarray) -> (int, int, int, int):
     """
     Get the number of 'true positives', 'false positives', 'false negatives' and 'true negatives' to calculate pair-counting scores.
+    The numbers are derived from the contingency table of the labels, which results in a runtime that is linear in the number of samples.
 
     Parameters
     ----------
@@ -336,15 +338,75 @@ def _get_pair_counting_categories(labels_true: np.ndarray, labels_pred: np.ndarr
     _check_number_of_points(labels_true, labels_pred)
     if labels_true.ndim != 1 or labels_pred.ndim != 1:
         raise Exception("labels_true and labels_pred labels should just contain a single column.")
-    n_tp = 0
-    n_fp = 0
-    n_fn = 0
-    n_tn = 0
-    for i in range(labels_pred.shape[0] - 1):
-        n_tp += np.sum((labels_pred[i] == labels_pred[i + 1:]) & (labels_true[i] == labels_true[i + 1:]))
-        n_fp += np.sum((labels_pred[i] == labels_pred[i + 1:]) & (labels_true[i] != labels_true[i + 1:]))
-        n_fn += np.sum((labels_pred[i] != labels_pred[i + 1:]) & (labels_true[i] == labels_true[i + 1:]))
-        n_tn += np.sum((labels_pred[i] != labels_pred[i + 1:]) & (labels_true[i] != labels_true[i + 1:]))
+    contingency_table = _get_contingency_table(labels_true, labels_pred)
+    n_tp, n_fp, n_fn, n_tn = _get_pair_counting_categories_from_contingency_table(contingency_table)
+    return n_tp, n_fp, n_fn, n_tn
+
+
+def _get_contingency_table(labels_true: np.ndarray, labels_pred: np.ndarray) -> csr_matrix:
+    """
+    Get the contingency table of the ground truth and the predicted labels as a sparse matrix.
+    Each row corresponds to a ground truth label and each column to a predicted label.
+    Only combinations of labels that actually occur are stored, so the table can also be used for many clusters.
+
+    Parameters
+    ----------
+    labels_true : np.ndarray
+        The ground truth labels of the data set
+    labels_pred : np.ndarray
+        The labels as predicted by a clustering algorithm
+
+    Returns
+    -------
+    contingency_table : csr_matrix
+        The sparse contingency table
+    """
+    _, labels_true_ids = np.unique(labels_true, return_inverse=True)
+    _, labels_pred_ids = np.unique(labels_pred, return_inverse=True)
+    labels_true_ids = labels_true_ids.reshape(-1)
+    labels_pred_ids = labels_pred_ids.reshape(-1)
+    n_true = 0 if labels_true_ids.shape[0] == 0 else np.max(labels_true_ids) + 1
+    n_pred = 0 if labels_pred_ids.shape[0] == 0 else np.max(labels_pred_ids) + 1
+    # Duplicate entries are summed up when converting to csr
+    contingency_table = coo_matrix((np.ones(labels_true_ids.shape[0], dtype=np.int64),
+                                    (labels_true_ids, labels_pred_ids)), shape=(n_true, n_pred)).tocsr()
+    return contingency_table
+
+
+def _get_pair_counting_categories_from_contingency_table(contingency_table: np.ndarray) -> (int, int, int, int):
+    """
+    Get the number of 'true positives', 'false positives', 'false negatives' and 'true negatives' from a contingency table.
+    Two samples form a true positive pair if they are contained in the same cell of the contingency table.
+    The number of pairs within the same row (same ground truth label) or the same column (same predicted label) is then used to obtain the remaining categories.
+
+    Parameters
+    ----------
+    contingency_table : np.ndarray
+        The contingency table. Each row corresponds to a ground truth label and each column to a predicted label. Can also be a scipy sparse matrix
+
+    Returns
+    -------
+    tuple : (int, int, int, int)
+        The number of true positives,
+        The number of false positives,
+        The number of false negatives,
+        The number of true negatives
+    """
+    if issparse(contingency_table):
+        cell_sizes = csr_matrix(contingency_table).data
+    else:
+        cell_sizes = np.asarray(contingency_table).reshape(-1)
+    cell_sizes = cell_sizes.astype(np.int64)
+    true_cluster_sizes = np.asarray(contingency_table.sum(axis=1), dtype=np.int64).reshape(-1)
+    pred_cluster_sizes = np.asarray(contingency_table.sum(axis=0), dtype=np.int64).reshape(-1)
+    n_points = int(np.sum(cell_sizes))
+    n_pairs_same_cell = int(np.sum(cell_sizes * (cell_sizes - 1) // 2))
+    n_pairs_same_true = int(np.sum(true_cluster_sizes * (true_cluster_sizes - 1) // 2))
+    n_pairs_same_pred = int(np.sum(pred_cluster_sizes * (pred_cluster_sizes - 1) // 2))
+    n_tp = n_pairs_same_cell
+    n_fp = n_pairs_same_pred - n_tp
+    n_fn = n_pairs_same_true - n_tp
+    n_tn = n_points * (n_points - 1) // 2 - n_tp - n_fp - n_fn
     return n_tp, n_fp, n_fn, n_tn
 
 
@@ -479,3 +541,42 @@ class PairCountingScores():
         """
         score = _f1_score(self.n_tp, self.n_fp, self.n_fn)
         return score
+
+
+class ContingencyPairCountingScores(PairCountingScores):
+    """
+    Obtain all parameters that are necessary to calculate the pair-counting scores 'jaccard', 'rand', 'precision', 'recall' and 'f1' from a precomputed contingency table.
+    These parameters are the number of 'true positives', 'false positives', 'false negatives' and 'true negatives'.
+    The resulting object can call all pair-counting score methods.
+    This is useful if the contingency table (e.g., ConfusionMatrix.confusion_matrix) is already available, as it does not have to be recomputed for each metric.
+
+    Parameters
+    ----------
+    contingency_table : np.ndarray
+        The contingency table. Each row corresponds to a ground truth label and each column to a predicted label.
+        The number in each cell (i, j) indicates how many objects with ground truth label i have been predicted label j. Can also be a scipy sparse matrix
+
+    Attributes
+    ----------
+    n_tp : int
+        The number of true positives,
+    n_fp : int
+        The number of false positives,
+    n_fn : int
+        The number of false negatives,
+    n_tn : int
+        The number of true negatives
+
+    References
+    ----------
+    Pfitzner, Darius, Richard Leibbrandt, and David Powers. "Characterization and evaluation of similarity measures for pairs of clusterings."
+    Knowledge and Information Systems 19 (2009): 361-394.
+    """
+
+    def __init__(self, contingency_table: np.ndarray):
+        assert contingency_table.ndim == 2, "contingency_table must be 2-dimensional"
+        n_tp, n_fp, n_fn, n_tn = _get_pair_counting_categories_from_contingency_table(contingency_table)
+        self.n_tp = n_tp
+        self.n_fp = n_fp
+        self.n_fn = n_fn
+        self.n_tn = n_tn
@@ -2,7 +2,8 @@ from clustpy.metrics import remove_noise_spaces_from_labels, MultipleLabelingsPa
     MultipleLabelingsConfusionMatrix, multiple_labelings_pc_f1_score, multiple_labelings_pc_jaccard_score, \
     multiple_labelings_pc_precision_score, multiple_labelings_pc_rand_score, multiple_labelings_pc_recall_score, \
     is_multi_labelings_n_clusters_correct
-from clustpy.metrics.multipe_labelings_scoring import _anywhere_same_cluster
+from clustpy.metrics.multipe_labelings_scoring import _anywhere_same_cluster, \
+    _get_multiple_labelings_pair_counting_categories, _get_multiple_labelings_pair_counting_categories_chunkwise
 import numpy as np
 from unittest.mock import patch
 
@@ -78,6 +79,27 @@ def test_MultipleLabelingsPairCountingScores():
     assert mlpcs.f1() == multiple_labelings_pc_f1_score(labels_true, labels_pred, remove_noise)
 
 
+def test_get_multiple_labelings_pair_counting_categories_matches_pairwise_comparison():
+    random_state = np.random.RandomState(1)
+    labels_true = random_state.randint(-1, 4, (80, 3))
+    labels_pred = random_state.randint(-1, 3, (80, 2))
+    # Compare each pair of samples
+    n_tp, n_fp, n_fn, n_tn = 0, 0, 0, 0
+    for i in range(labels_pred.shape[0] - 1):
+        for j in range(i + 1, labels_pred.shape[0]):
+            same_pred = _anywhere_same_cluster(labels_pred, i, j)
+            same_true = _anywhere_same_cluster(labels_true, i, j)
+            n_tp += same_pred and same_true
+            n_fp += same_pred and not same_true
+            n_fn += not same_pred and same_true
+            n_tn += not same_pred and not same_true
+    assert _get_multiple_labelings_pair_counting_categories(labels_true, labels_pred, False) == (n_tp, n_fp, n_fn, n_tn)
+    assert _get_multiple_labelings_pair_counting_categories_chunkwise(labels_true, labels_pred) == (
+        n_tp, n_fp, n_fn, n_tn)
+    assert _get_multiple_labelings_pair_counting_categories_chunkwise(labels_true, labels_pred, chunk_size=7) == (
+        n_tp, n_fp, n_fn, n_tn)
+
+
 def test_is_multi_labelings_n_clusters_correct():
     labels_true = np.array([[0, 0, 0, 0, 1],
                             [0, 0, -1, 1, 2],
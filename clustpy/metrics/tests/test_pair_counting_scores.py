@@ -1,5 +1,6 @@
-from clustpy.metrics import PairCountingScores, pc_jaccard_score, pc_rand_score, pc_precision_score, pc_recall_score, \
-    pc_f1_score
+from clustpy.metrics import PairCountingScores, ContingencyPairCountingScores, pc_jaccard_score, pc_rand_score, \
+    pc_precision_score, pc_recall_score, pc_f1_score, ConfusionMatrix
+from clustpy.metrics.pair_counting_scores import _get_pair_counting_categories, _get_contingency_table
 import numpy as np
 
 
@@ -22,3 +23,40 @@ def testPairCountingScores():
     assert pcs.recall() == pc_recall_score(labels_true, labels_pred)
     assert pcs.f1() == 2 * (7 / 16) * (7 / 9) / ((7 / 16) + (7 / 9))
     assert pcs.f1() == pc_f1_score(labels_true, labels_pred)
+
+
+def test_get_pair_counting_categories_matches_pairwise_comparison():
+    random_state = np.random.RandomState(1)
+    labels_true = random_state.randint(-1, 5, 200)
+    labels_pred = random_state.randint(-1, 8, 200)
+    # Compare each pair of samples
+    n_tp, n_fp, n_fn, n_tn = 0, 0, 0, 0
+    for i in range(labels_pred.shape[0] - 1):
+        same_true = labels_true[i] == labels_true[i + 1:]
+        same_pred = labels_pred[i] == labels_pred[i + 1:]
+        n_tp += np.sum(same_pred & same_true)
+        n_fp += np.sum(same_pred & ~same_true)
+        n_fn += np.sum(~same_pred & same_true)
+        n_tn += np.sum(~same_pred & ~same_true)
+    assert _get_pair_counting_categories(labels_true, labels_pred) == (n_tp, n_fp, n_fn, n_tn)
+    # Empty labels
+    assert _get_pair_counting_categories(np.array([]), np.array([])) == (0, 0, 0, 0)
+
+
+def testContingencyPairCountingScores():
+    labels_true = np.array([0, 0, 0, 1, 1, 1, 2, 2, 2])
+    labels_pred = np.array([0, 0, 0, 0, 0, 1, 1, 1, 1])
+    pcs = PairCountingScores(labels_true, labels_pred)
+    # Dense contingency table
+    cpcs = ContingencyPairCountingScores(ConfusionMatrix(labels_true, labels_pred).confusion_matrix)
+    assert (cpcs.n_tp, cpcs.n_fp, cpcs.n_fn, cpcs.n_tn) == (pcs.n_tp, pcs.n_fp, pcs.n_fn, pcs.n_tn)
+    assert cpcs.jaccard() == pcs.jaccard()
+    assert cpcs.rand() == pcs.rand()
+    assert cpcs.precision() == pcs.precision()
+    assert cpcs.recall() == pcs.recall()
+    assert cpcs.f1() == pcs.f1()
+    # Sparse contingency table
+    contingency_table = _get_contingency_table(labels_true, labels_pred)
+    assert np.array_equal(contingency_table.toarray(), ConfusionMatrix(labels_true, labels_pred).confusion_matrix)
+    cpcs = ContingencyPairCountingScores(contingency_table)
+    assert (cpcs.n_tp, cpcs.n_fp, cpcs.n_fn, cpcs.n_tn) == (pcs.n_tp, pcs.n_fp, pcs.n_fn, pcs.n_tn)
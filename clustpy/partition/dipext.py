@@ -4,7 +4,7 @@ Benjamin Schelling and Sam Maurus (original R implementation),
 Collin Leiber
 """
 
-from clustpy.utils import dip_test, dip_gradient
+from clustpy.utils import dip_test, dip_test_batch, dip_gradient
 import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.base import BaseEstimator, ClusterMixin, TransformerMixin
@@ -119,7 +119,7 @@ def _find_max_dip_by_sgd(X: np.ndarray, step_size: float, momentum: float, n_sta
         The data set projected onto this projection axis
     """
     # Get dip-value of each axis
-    axis_dips = [dip_test(X[:, i], just_dip=True, is_data_sorted=False) for i in range(X.shape[1])]
+    axis_dips = dip_test_batch(X.T, just_dip=True, is_data_sorted=False)
     if X.shape[1] == 1:
         return axis_dips[0], np.array([1]), X
     # Sort axes by dip-values
@@ -4,16 +4,51 @@ Collin Leiber
 """
 
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
-from clustpy.utils import dip_test, dip_pval, dip_boot_samples
+from scipy.spatial.distance import cdist
+from clustpy.utils import dip_test_batch, dip_pval, dip_boot_samples
+from clustpy.utils.diptest import _get_dip_boot_random_state
 from clustpy.partition.xmeans import _initial_kmeans_clusters, _execute_two_means
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 
+"""
+Maximum number of distances that are computed at once when calculating the dip values of the viewers
+"""
+_DIPMEANS_BLOCK_SIZE = 2 ** 22
+
+
+def _get_viewer_dips(X: np.ndarray, ids_in_cluster: np.ndarray, viewer_ids: np.ndarray) -> np.ndarray:
+    """
+    Calculate the dip values of the distances of each viewer to all points in the cluster.
+    The distances are computed blockwise, so that the full distance matrix of the cluster is never created.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    ids_in_cluster : np.ndarray
+        The ids of all points in the cluster
+    viewer_ids : np.ndarray
+        The ids of the viewers (subset of ids_in_cluster)
+
+    Returns
+    -------
+    viewer_dips : np.ndarray
+        The dip value of each viewer
+    """
+    X_cluster = X[ids_in_cluster]
+    viewer_dips = np.zeros(viewer_ids.shape[0])
+    viewers_per_block = max(1, _DIPMEANS_BLOCK_SIZE // ids_in_cluster.shape[0])
+    for start in range(0, viewer_ids.shape[0], viewers_per_block):
+        viewer_distances = cdist(X[viewer_ids[start:start + viewers_per_block]], X_cluster, 'euclidean')
+        viewer_dips[start:start + viewers_per_block] = dip_test_batch(viewer_distances, just_dip=True,
+                                                                      is_data_sorted=False)
+    return viewer_dips
+
 
 def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float, pval_strategy: str, n_boots: int,
-              n_split_trials: int, n_clusters_init: int, max_n_clusters: int, random_state: np.random.RandomState) -> (
-        int, np.ndarray, np.ndarray):
+              n_split_trials: int, n_clusters_init: int, max_n_clusters: int, n_viewers: int, split_strategy: str,
+              n_jobs: int, random_state: np.random.RandomState) -> (int, np.ndarray, np.ndarray):
     """
     Start the actual DipMeans clustering procedure on the input data set.
 
@@ -35,6 +70,14 @@ def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float
         The initial number of clusters. Can also by of type np.ndarray if initial cluster centers are specified
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init
+    n_viewers : int
+        Maximum number of viewers per cluster. If a cluster contains more points, the viewers will be sampled randomly. If None, all points will be used as viewers
+    split_strategy : str
+        Defines how a cluster is split. If 'global', each split trial executes KMeans on the whole data set using all cluster centers.
+        If 'local', each split trial executes 2-Means only on the objects of the cluster and the best split is refined by a single KMeans on the whole data set with a bounded number of iterations.
+        'local' is considerably faster for large data sets with many clusters
+    n_jobs : int
+        Number of split trials that are executed concurrently (using threads). -1 uses all available cores
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
 
@@ -47,33 +90,36 @@ def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float
     """
     assert max_n_clusters >= n_clusters_init, "max_n_clusters can not be smaller than n_clusters_init"
     assert significance >= 0 and significance <= 1, "significance must be a value in the range [0, 1]"
-    # Calculate distance matrix
-    data_dist_matrix = squareform(pdist(X, 'euclidean'))
+    assert n_viewers is None or n_viewers > 0, "n_viewers must be None or larger than 0"
     # Initialize parameters
     n_clusters, labels, centers, _ = _initial_kmeans_clusters(X, n_clusters_init, random_state)
+    # When bootstrapping, use a fixed seed so the null distributions can be reused across iterations
+    boot_random_state = _get_dip_boot_random_state(random_state, pval_strategy)
     while n_clusters <= max_n_clusters:
         # Default score is 0 for all clusters
         cluster_scores = np.zeros(n_clusters)
         ids_in_each_cluster = [np.where(labels == c)[0] for c in range(n_clusters)]
         for c in range(n_clusters):
             ids_in_cluster = ids_in_each_cluster[c]
-            # Get pairwise distances of points in cluster
-            cluster_dist_matrix = data_dist_matrix[np.ix_(ids_in_cluster, ids_in_cluster)]
-            # Calculate dip values for the distances of each point
-            cluster_dips = np.array([dip_test(cluster_dist_matrix[p, :], just_dip=True, is_data_sorted=False) for p in
-                                     range(ids_in_cluster.shape[0])])
+            # Get viewers (sample if cluster is larger than n_viewers)
+            if n_viewers is None or ids_in_cluster.shape[0] <= n_viewers:
+                viewer_ids = ids_in_cluster
+            else:
+                viewer_ids = np.sort(random_state.choice(ids_in_cluster, n_viewers, replace=False))
+            # Calculate dip values for the distances of each viewer
+            cluster_dips = _get_viewer_dips(X, ids_in_cluster, viewer_ids)
             # Calculate p-values
             if pval_strategy == "bootstrap":
                 # Bootstrap values here so it is not needed for each pval separately
-                boot_dips = dip_boot_samples(ids_in_cluster.shape[0], n_boots, random_state)
+                boot_dips = dip_boot_samples(ids_in_cluster.shape[0], n_boots, boot_random_state)
                 cluster_pvals = np.array([np.mean(point_dip <= boot_dips) for point_dip in cluster_dips])
             else:
                 cluster_pvals = np.array([dip_pval(point_dip, ids_in_cluster.shape[0], pval_strategy=pval_strategy,
-                                                   random_state=random_state) for point_dip in cluster_dips])
+                                                   random_state=boot_random_state) for point_dip in cluster_dips])
             # Get split viewers (points with dip-p-value of < significance)
             split_viewers = cluster_dips[cluster_pvals < significance]
             # Check if percentage share of split viewers in cluster is larger than threshold
-            if split_viewers.shape[0] / ids_in_cluster.shape[0] > split_viewers_threshold:
+            if split_viewers.shape[0] / viewer_ids.shape[0] > split_viewers_threshold:
                 # Calculate cluster score
                 cluster_scores[c] = np.mean(split_viewers)
         # Get cluster with maximum score
@@ -82,7 +128,7 @@ def _dipmeans(X: np.ndarray, significance: float, split_viewers_threshold: float
         if cluster_scores[cluster_id_to_split] > 0:
             # Split cluster using bisecting kmeans
             labels, centers, _ = _execute_two_means(X, ids_in_each_cluster, cluster_id_to_split, centers,
-                                                    n_split_trials, random_state)
+                                                    n_split_trials, random_state, split_strategy, n_jobs)
             n_clusters += 1
         else:
             break
@@ -97,6 +143,7 @@ class DipMeans(BaseEstimator, ClusterMixin):
     It calculates the dip-value of the distances of each point within a cluster to all other points in that cluster and checks how many points are assigned a dip-value below the threshold.
     If that amount of so called split viewers is above the split_viewers_threshold, the cluster will be split using 2-Means.
     The algorithm terminates if all clusters show a unimdoal behaviour.
+    For large data sets, the number of viewers per cluster can be limited using n_viewers. The distances are computed blockwise, so that no full distance matrix is created.
 
     Parameters
     ----------
@@ -114,6 +161,14 @@ class DipMeans(BaseEstimator, ClusterMixin):
         The initial number of clusters. Can also by of type np.ndarray if initial cluster centers are specified (default: 1)
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
+    n_viewers : int
+        Maximum number of viewers per cluster. If a cluster contains more points, the viewers will be sampled randomly (using random_state). If None, all points will be used as viewers (default: None)
+    split_strategy : str
+        Defines how a cluster is split. If 'global', each split trial executes KMeans on the whole data set using all cluster centers.
+        If 'local', each split trial executes 2-Means only on the objects of the cluster and the best split is refined by a single KMeans on the whole data set with a bounded number of iterations.
+        'local' is considerably faster for large data sets with many clusters (default: 'global')
+    n_jobs : int
+        Number of split trials that are executed concurrently (using threads). -1 uses all available cores (default: None)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
@@ -134,7 +189,8 @@ class DipMeans(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.001, split_viewers_threshold: float = 0.01,
                  pval_strategy: str = "table", n_boots: int = 1000, n_split_trials: int = 10, n_clusters_init: int = 1,
-                 max_n_clusters: int = np.inf, random_state: np.random.RandomState = None):
+                 max_n_clusters: int = np.inf, n_viewers: int = None, split_strategy: str = "global",
+                 n_jobs: int = None, random_state: np.random.RandomState = None):
         self.significance = significance
         self.split_viewers_threshold = split_viewers_threshold
         self.pval_strategy = pval_strategy
@@ -142,6 +198,9 @@ class DipMeans(BaseEstimator, ClusterMixin):
         self.n_split_trials = n_split_trials
         self.n_clusters_init = n_clusters_init
         self.max_n_clusters = max_n_clusters
+        self.n_viewers = n_viewers
+        self.split_strategy = split_strategy
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'DipMeans':
@@ -163,7 +222,8 @@ class DipMeans(BaseEstimator, ClusterMixin):
         """
         n_clusters, labels, centers = _dipmeans(X, self.significance, self.split_viewers_threshold,
                                                 self.pval_strategy, self.n_boots, self.n_split_trials,
-                                                self.n_clusters_init, self.max_n_clusters, self.random_state)
+                                                self.n_clusters_init, self.max_n_clusters, self.n_viewers,
+                                                self.split_strategy, self.n_jobs, self.random_state)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
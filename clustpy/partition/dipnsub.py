@@ -4,7 +4,7 @@ Collin Leiber
 """
 
 import numpy as np
-from clustpy.utils import dip_test, dip_pval, dip_pval_gradient
+from clustpy.utils import dip_test, dip_test_batch, dip_pval, dip_pval_gradient
 from clustpy.partition import UniDip
 from sklearn.decomposition import PCA
 from clustpy.partition.dipext import _angle, _n_starting_vectors_default, _ambiguous_modal_triangle_random
@@ -151,10 +151,15 @@ def _find_min_dippvalue_by_grouped_sgd(X: np.ndarray, labels: np.ndarray, n_clus
         The corresponing projection axis responsible for the dip-p-values,
         The data projected onto that projection axis
     """
-    # Get dip-p-value of each cluster on each axis
-    axis_dips = [
-        np.array([dip_test(X[labels == j, d], just_dip=True, is_data_sorted=False) for j in range(n_clusters)]) for d in
-        range(X.shape[1])]
+    # Get dip-p-value of each cluster on each axis (all combinations are calculated within a single batch)
+    ids_in_clusters = np.where(labels >= 0)[0]  # ignore outliers
+    ids_sorted_by_cluster = ids_in_clusters[np.argsort(labels[ids_in_clusters], kind="stable")]
+    cluster_offsets = np.r_[0, np.cumsum(np.bincount(labels[ids_in_clusters], minlength=n_clusters))]
+    n_points_in_clusters = ids_sorted_by_cluster.shape[0]
+    batch_offsets = np.r_[(np.arange(X.shape[1])[:, None] * n_points_in_clusters + cluster_offsets[:-1]).ravel(),
+                          n_points_in_clusters * X.shape[1]]
+    axis_dips = dip_test_batch(X[ids_sorted_by_cluster].T.ravel(), batch_offsets, just_dip=True,
+                               is_data_sorted=False).reshape(X.shape[1], n_clusters)
     axis_pvalues = [np.array(
         [dip_pval(d_inner, cluster_sizes[j], pval_strategy="function") for j, d_inner in enumerate(single_axis_dips)])
         for single_axis_dips in axis_dips]
@@ -9,14 +9,18 @@ from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 from sklearn.cluster import KMeans
 import matplotlib.pyplot as plt
-from scipy.spatial.distance import pdist
+from scipy.spatial.distance import cdist
+from joblib import Parallel, delayed
 
 
 def _gap_statistic(X: np.ndarray, min_n_clusters: int, max_n_clusters: int, n_boots: int,
-                   use_principal_components: bool, use_log: bool, random_state: np.random.RandomState) -> (
+                   use_principal_components: bool, use_log: bool, random_state: np.random.RandomState,
+                   n_jobs: int = None, warm_start: bool = False, early_stopping: bool = False) -> (
         int, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
     """
     Start the actual Gap Statistic procedure on the input data set.
+    The random data sets are not stored. Instead, each random data set is (re-)created from its own seed when it is needed.
+    For each number of clusters, the KMeans executions on the original data set and on the random data sets are independent and can be executed in parallel.
 
     Parameters
     ----------
@@ -36,6 +40,12 @@ def _gap_statistic(X: np.ndarray, min_n_clusters: int, max_n_clusters: int, n_bo
         For more information see Mohajer et al.
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    n_jobs : int
+        Number of processes used to execute KMeans. -1 uses all available cores (default: None)
+    warm_start : bool
+        If True, KMeans with k+1 clusters is initialized with the centers of the result for k clusters and one additional center (default: False)
+    early_stopping : bool
+        If True, the procedure stops at the first number of clusters that fulfills the Gap condition (default: False)
 
     Returns
     -------
@@ -43,8 +53,8 @@ def _gap_statistic(X: np.ndarray, min_n_clusters: int, max_n_clusters: int, n_bo
         The first number of clusters that fulfills the Gap condition (can be None),
         The labels as identified by the Gap Statistic (can be None),
         The cluster centers as identified by the Gap Statistic (Can be None),
-        The Gap values,
-        The sk values
+        The Gap values (np.nan if not calculated due to early_stopping),
+        The sk values (np.nan if not calculated due to early_stopping)
     """
     assert max_n_clusters >= min_n_clusters, "max_n_clusters can not be smaller than min_n_clusters"
     assert n_boots > 0, "n_boots must be larger than 0"
@@ -58,31 +68,38 @@ def _gap_statistic(X: np.ndarray, min_n_clusters: int, max_n_clusters: int, n_bo
     mins = np.min(X_transformed, axis=0)
     maxs = np.max(X_transformed, axis=0)
     # Prepare parameters
-    gaps = np.zeros(max_n_clusters + 2 - min_n_clusters)
-    sks = np.zeros(max_n_clusters + 2 - min_n_clusters)
-    all_labels = np.zeros((X.shape[0], max_n_clusters + 2 - min_n_clusters), dtype=np.int32)
-    random_datasets = [_generate_random_data(X.shape, mins, maxs, pca, random_state) for _ in
-                       range(n_boots)]
-    for n_clusters in range(min_n_clusters, max_n_clusters + 2):  # +1 because we need to calculate Gap(k+1)
-        # Execute KMeans on the original data
-        labels, W_k = _execute_kmeans(X, n_clusters, use_log, random_state)
-        # Save labels
-        all_labels[:, n_clusters - min_n_clusters] = labels
-        # Create random data
-        W_kbs = np.zeros(n_boots)
-        for b in range(n_boots):
-            # Execute KMeans on random data
-            labels, W_kb = _execute_kmeans(random_datasets[b], n_clusters, use_log, random_state)
-            # Save within cluster dispersion
-            W_kbs[b] = W_kb
-        # Calculate Gap Statistic
-        gaps[n_clusters - min_n_clusters] = np.mean(W_kbs) - W_k
-        sks[n_clusters - min_n_clusters] = np.std(W_kbs) * np.sqrt(1 + 1 / n_boots)
-    # Check if any result fulfills gap condition
-    fulfills_gap = gaps[:-1] >= gaps[1:] - sks[1:]
+    n_sweep = max_n_clusters + 2 - min_n_clusters  # +1 because we need to calculate Gap(k+1)
+    gaps = np.full(n_sweep, np.nan)
+    sks = np.full(n_sweep, np.nan)
+    all_labels = np.zeros((X.shape[0], n_sweep), dtype=np.int32)
+    # Derive seeds for the random data sets and for each KMeans execution (index 0 corresponds to the original data)
+    data_seeds = random_state.randint(np.iinfo(np.int32).max, size=n_boots)
+    kmeans_seeds = random_state.randint(np.iinfo(np.int32).max, size=(n_sweep, n_boots + 1))
+    previous_centers = [None] * (n_boots + 1)
+    best_index = None
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for n_clusters in range(min_n_clusters, max_n_clusters + 2):
+            i = n_clusters - min_n_clusters
+            results = parallel(
+                delayed(_gap_statistic_single_kmeans)(X if b == 0 else None, X.shape, mins, maxs, pca,
+                                                      None if b == 0 else data_seeds[b - 1], n_clusters, use_log,
+                                                      kmeans_seeds[i, b], previous_centers[b] if warm_start else None)
+                for b in range(n_boots + 1))
+            # Save labels
+            all_labels[:, i] = results[0][0]
+            W_k = results[0][1]
+            W_kbs = np.array([W_kb for _, W_kb, _ in results[1:]])
+            previous_centers = [centers for _, _, centers in results]
+            # Calculate Gap Statistic
+            gaps[i] = np.mean(W_kbs) - W_k
+            sks[i] = np.std(W_kbs) * np.sqrt(1 + 1 / n_boots)
+            # Check if previous result fulfills gap condition
+            if i > 0 and best_index is None and gaps[i - 1] >= gaps[i] - sks[i]:
+                best_index = i - 1
+                if early_stopping:
+                    break
     # Prepare final result
-    if np.any(fulfills_gap):
-        best_index = np.where(fulfills_gap)[0][0]
+    if best_index is not None:
         best_n_clusters = best_index + min_n_clusters
         best_labels = all_labels[:, best_index]
         best_centers = np.array([np.mean(X[best_labels == c], axis=0) for c in range(best_n_clusters)])
@@ -93,6 +110,90 @@ def _gap_statistic(X: np.ndarray, min_n_clusters: int, max_n_clusters: int, n_bo
     return best_n_clusters, best_labels, best_centers, gaps, sks
 
 
+def _gap_statistic_single_kmeans(X: np.ndarray, data_shape: tuple, mins: np.ndarray, maxs: np.ndarray, pca: PCA,
+                                 data_seed: int, n_clusters: int, use_log: bool, kmeans_seed: int,
+                                 previous_centers: np.ndarray) -> (np.ndarray, float, np.ndarray):
+    """
+    Execute KMeans on the original data set or on a random data set, which will be created using data_seed.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set. If None, a random data set will be created
+    data_shape : tuple
+        The data shape
+    mins : np.ndarray
+        The feature-wise minimum values
+    maxs : np.ndarray
+        The feature-wise maximum values
+    pca : PCA
+        The PCA object used to calculate mins and maxs. Can be None, if principle components are not used
+    data_seed : int
+        The seed used to create the random data set. Only relevant if X is None
+    n_clusters : int
+        The number of clusters
+    use_log : bool
+        True, if the logarithm of the within cluster dispersion should be used
+    kmeans_seed : int
+        The seed used for KMeans
+    previous_centers : np.ndarray
+        The cluster centers of the previous KMeans result on the same data set (used for warm start). Can be None
+
+    Returns
+    -------
+    tuple : (np.ndarray, float, np.ndarray)
+        The cluster labels (None for random data sets),
+        The within cluster dispersion,
+        The cluster centers
+    """
+    is_random_data = X is None
+    if is_random_data:
+        X = _generate_random_data(data_shape, mins, maxs, pca, np.random.RandomState(data_seed))
+    random_state = np.random.RandomState(kmeans_seed)
+    init = None
+    if previous_centers is not None and n_clusters > 1:
+        init = _get_warm_start_centers(X, previous_centers, n_clusters, random_state)
+    labels, W_k = _execute_kmeans(X, n_clusters, use_log, random_state, init)
+    centers = np.array([np.mean(X[labels == c], axis=0) if np.any(labels == c) else np.zeros(X.shape[1]) for c in
+                        range(n_clusters)])
+    return (None if is_random_data else labels), W_k, centers
+
+
+def _get_warm_start_centers(X: np.ndarray, previous_centers: np.ndarray, n_clusters: int,
+                            random_state: np.random.RandomState) -> np.ndarray:
+    """
+    Get the initial centers for KMeans using the centers of a previous result with fewer clusters.
+    The missing centers are sampled as in KMeans++, i.e. with a probability proportional to the squared distance to the closest existing center.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    previous_centers : np.ndarray
+        The cluster centers of the previous KMeans result
+    n_clusters : int
+        The number of clusters
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+
+    Returns
+    -------
+    init : np.ndarray
+        The initial cluster centers
+    """
+    init = previous_centers[:n_clusters]
+    min_squared_distances = np.min(cdist(X, init, metric="sqeuclidean"), axis=1)
+    while init.shape[0] < n_clusters:
+        if np.sum(min_squared_distances) > 0:
+            new_center_id = random_state.choice(X.shape[0], p=min_squared_distances / np.sum(min_squared_distances))
+        else:
+            new_center_id = random_state.choice(X.shape[0])
+        init = np.r_[init, [X[new_center_id]]]
+        min_squared_distances = np.minimum(min_squared_distances,
+                                           np.sum((X - X[new_center_id]) ** 2, axis=1))
+    return init
+
+
 def _generate_random_data(data_shape: tuple, mins: np.ndarray, maxs: np.ndarray, pca: PCA,
                           random_state: np.random.RandomState) -> np.ndarray:
     """
@@ -123,8 +224,8 @@ def _generate_random_data(data_shape: tuple, mins: np.ndarray, maxs: np.ndarray,
     return random_dataset
 
 
-def _execute_kmeans(X: np.ndarray, n_clusters: int, use_log: bool, random_state: np.random.RandomState) -> (
-        np.ndarray, float):
+def _execute_kmeans(X: np.ndarray, n_clusters: int, use_log: bool, random_state: np.random.RandomState,
+                    init: np.ndarray = None) -> (np.ndarray, float):
     """
     Execute KMeans on the given data set.
 
@@ -139,6 +240,8 @@ def _execute_kmeans(X: np.ndarray, n_clusters: int, use_log: bool, random_state:
         For more information see Mohajer et al.
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    init : np.ndarray
+        The initial cluster centers. If None, KMeans++ will be used (default: None)
 
     Returns
     -------
@@ -147,15 +250,18 @@ def _execute_kmeans(X: np.ndarray, n_clusters: int, use_log: bool, random_state:
         The within cluster dispersion
     """
     if n_clusters > 1:
-        kmeans = KMeans(n_clusters, random_state=random_state)
+        if init is None:
+            kmeans = KMeans(n_clusters, random_state=random_state)
+        else:
+            kmeans = KMeans(n_clusters, init=init, n_init=1, random_state=random_state)
         kmeans.fit(X)
         labels = kmeans.labels_
         # Calculate within cluster dispersion
         W_k = np.log(kmeans.inertia_) if use_log else kmeans.inertia_  # Equal to D_k = sum_k(D_r / (2n))
     else:
         labels = np.zeros(X.shape[0])
-        # Calculate within cluster dispersion
-        W_k = np.sum(pdist(X, metric="sqeuclidean")) / X.shape[0]
+        # Calculate within cluster dispersion (sum of pairwise squared distances / n is equal to the squared distances to the mean)
+        W_k = np.sum((X - np.mean(X, axis=0)) ** 2)
         W_k = np.log(W_k) if use_log else W_k
     return labels, W_k
 
@@ -167,6 +273,7 @@ class GapStatistic(BaseEstimator, ClusterMixin):
     The Gap Statistic is evaluated for multiple numebers of clusters.
     First clustering result that fulfills the Gap condition 'Gap(k) >= Gap(k+1)-s_{k+1}' will be returned.
     Beware: Result can be None if no clustering result fulfills that condition!
+    The random data sets are created from derived seeds when needed instead of being stored, and the KMeans executions for each number of clusters can be distributed over multiple processes.
 
     Parameters
     ----------
@@ -184,6 +291,14 @@ class GapStatistic(BaseEstimator, ClusterMixin):
         For more information see Mohajer et al. (default: True)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    n_jobs : int
+        Number of processes used to execute KMeans on the original and the random data sets. -1 uses all available cores.
+        The result does not depend on n_jobs (default: None)
+    warm_start : bool
+        If True, KMeans with k+1 clusters is initialized with the centers of the result for k clusters and one additional center sampled as in KMeans++ (default: False)
+    early_stopping : bool
+        If True, the procedure stops at the first number of clusters that fulfills the Gap condition.
+        The remaining Gap and sk values will be np.nan (default: False)
 
     Attributes
     ----------
@@ -194,9 +309,9 @@ class GapStatistic(BaseEstimator, ClusterMixin):
     cluster_centers_ : np.ndarray
         The cluster centers as identified by the Gap Statistic (Can be None)
     gaps_ : np.ndarray
-        The Gap values,
+        The Gap values (np.nan if not calculated due to early_stopping),
     sks_ : np.ndarray
-        The sk values
+        The sk values (np.nan if not calculated due to early_stopping)
 
     Examples
     ----------
@@ -220,13 +335,17 @@ class GapStatistic(BaseEstimator, ClusterMixin):
 
     def __init__(self, min_n_clusters: int = 1, max_n_clusters: int = 10, n_boots: int = 10,
                  use_principal_components: bool = True, use_log: bool = True,
-                 random_state: np.random.RandomState = None):
+                 random_state: np.random.RandomState = None, n_jobs: int = None, warm_start: bool = False,
+                 early_stopping: bool = False):
         self.min_n_clusters = min_n_clusters
         self.max_n_clusters = max_n_clusters
         self.n_boots = n_boots
         self.use_principal_components = use_principal_components
         self.use_log = use_log
         self.random_state = check_random_state(random_state)
+        self.n_jobs = n_jobs
+        self.warm_start = warm_start
+        self.early_stopping = early_stopping
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'GapStatistic':
         """
@@ -248,7 +367,8 @@ class GapStatistic(BaseEstimator, ClusterMixin):
         n_clusters, labels, centers, gaps, sks = _gap_statistic(X, self.min_n_clusters, self.max_n_clusters,
                                                                 self.n_boots,
                                                                 self.use_principal_components, self.use_log,
-                                                                self.random_state)
+                                                                self.random_state, self.n_jobs, self.warm_start,
+                                                                self.early_stopping)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
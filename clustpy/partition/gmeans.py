@@ -7,12 +7,14 @@ from sklearn.cluster import KMeans
 import numpy as np
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
-from clustpy.partition.xmeans import _initial_kmeans_clusters, _execute_two_means
+from clustpy.partition.xmeans import _initial_kmeans_clusters, _get_split_trial_centers, _get_best_kmeans_trial
 from scipy.stats import anderson
+from joblib import Parallel, delayed
 
 
 def _gmeans(X: np.ndarray, significance: float, n_clusters_init: int, max_n_clusters: int, n_split_trials: int,
-            random_state: np.random.RandomState) -> (int, np.ndarray, np.ndarray):
+            random_state: np.random.RandomState, n_jobs: int = None, backend: str = "threads") -> (
+        int, np.ndarray, np.ndarray):
     """
     Start the actual GMeans clustering procedure on the input data set.
 
@@ -30,6 +32,10 @@ def _gmeans(X: np.ndarray, significance: float, n_clusters_init: int, max_n_clus
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    n_jobs : int
+        Number of clusters that are tested concurrently. -1 uses all available cores (default: None)
+    backend : str
+        Defines whether the clusters are tested using 'threads' or 'processes' (default: 'threads')
 
     Returns
     -------
@@ -40,27 +46,28 @@ def _gmeans(X: np.ndarray, significance: float, n_clusters_init: int, max_n_clus
     """
     assert max_n_clusters >= n_clusters_init, "max_n_clusters can not be smaller than n_clusters_init"
     assert significance >= 0 and significance <= 1, "significance must be a value in the range [0, 1]"
+    assert backend in ["threads", "processes"], "backend must be 'threads' or 'processes'. Your input: {0}".format(
+        backend)
     # Initialize parameters
     n_clusters, labels, centers, _ = _initial_kmeans_clusters(X, n_clusters_init, random_state)
     while n_clusters <= max_n_clusters:
         n_clusters_old = n_clusters
-        for c in range(n_clusters_old):
-            ids_in_cluster = np.where(labels == c)[0]
-            if ids_in_cluster.shape[0] < 2:
-                continue
-            # Split cluster into two
-            labels_split, centers_split, _ = _execute_two_means(X[ids_in_cluster], [np.arange(ids_in_cluster.shape[0])], 0,
-                                                             np.array([centers[c]]), n_split_trials, random_state)
-            # Project data form cluster onto resulting connection axis
-            projected_data = np.dot(X[ids_in_cluster], centers_split[0] - centers_split[1])
-            # Use Anderson Darling to test if data is Gaussian
-            ad_result = anderson(projected_data, "norm")
-            p_value = _anderson_darling_statistic_to_prob(ad_result.statistic, len(ids_in_cluster))
+        ids_in_each_cluster = [np.where(labels == c)[0] for c in range(n_clusters_old)]
+        clusters_to_test = [c for c in range(n_clusters_old) if ids_in_each_cluster[c].shape[0] >= 2]
+        # The random initial centers are drawn in cluster order, so the result does not depend on n_jobs
+        trial_centers = [_get_split_trial_centers(X, ids_in_each_cluster[c], centers[c], n_split_trials, random_state)
+                         for c in clusters_to_test]
+        # Test all clusters (independent of each other)
+        split_results = Parallel(n_jobs=n_jobs, prefer="threads" if backend == "threads" else "processes")(
+            delayed(_gmeans_split_test)(X[ids_in_each_cluster[c]], random_centers, adjusted_centers, random_state)
+            for c, (random_centers, adjusted_centers) in zip(clusters_to_test, trial_centers))
+        # Apply accepted splits in cluster order
+        for c, (p_value, labels_split, centers_split) in zip(clusters_to_test, split_results):
             if p_value < significance:
                 # If data is not Gaussian, keep the newly created cluster centers
                 centers[c] = centers_split[0]
                 centers = np.r_[centers, [centers_split[1]]]
-                labels[ids_in_cluster[labels_split == 1]] = n_clusters
+                labels[ids_in_each_cluster[c][labels_split == 1]] = n_clusters
                 n_clusters += 1
         # If no cluster changed, GMeans terminates
         if n_clusters == n_clusters_old:
@@ -74,6 +81,41 @@ def _gmeans(X: np.ndarray, significance: float, n_clusters_init: int, max_n_clus
     return n_clusters, labels, centers
 
 
+def _gmeans_split_test(X_cluster: np.ndarray, random_centers: np.ndarray, adjusted_centers: np.ndarray,
+                       random_state: np.random.RandomState) -> (float, np.ndarray, np.ndarray):
+    """
+    Split a cluster into two using 2-Means and test whether the objects projected onto the axis connecting the two new centers are Gaussian.
+
+    Parameters
+    ----------
+    X_cluster : np.ndarray
+        The objects of the cluster
+    random_centers : np.ndarray
+        The first new center of each split trial
+    adjusted_centers : np.ndarray
+        The second new center of each split trial
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+
+    Returns
+    -------
+    tuple : (float, np.ndarray, np.ndarray)
+        The p-value of the Anderson Darling test,
+        The labels of the split,
+        The two new cluster centers
+    """
+    # Split cluster into two
+    best_kmeans = _get_best_kmeans_trial(X_cluster, [np.array([random_centers[i], adjusted_centers[i]]) for i in
+                                                     range(random_centers.shape[0])], random_state)
+    labels_split, centers_split = best_kmeans.labels_, best_kmeans.cluster_centers_
+    # Project data form cluster onto resulting connection axis
+    projected_data = np.dot(X_cluster, centers_split[0] - centers_split[1])
+    # Use Anderson Darling to test if data is Gaussian
+    ad_result = anderson(projected_data, "norm")
+    p_value = _anderson_darling_statistic_to_prob(ad_result.statistic, X_cluster.shape[0])
+    return p_value, labels_split, centers_split
+
+
 def _anderson_darling_statistic_to_prob(statistic: float, n_points: int) -> float:
     """
     Transform the statistic returned by the Anderson Darling test into a p_value.
@@ -118,6 +160,7 @@ class GMeans(BaseEstimator, ClusterMixin):
     Therefore, the data is projected onto the axis connecting the two resulting centers.
     If the Anderson Darling test does not assume a Gaussian distribution for this projection, the new clusters are retained.
     Otherwise, the cluster remains as it was originally. This is repeated until no cluster changes.
+    The clusters of an iteration are tested independently and can therefore be tested concurrently. The accepted splits are applied in cluster order, so the result does not depend on n_jobs.
 
     Parameters
     ----------
@@ -129,6 +172,10 @@ class GMeans(BaseEstimator, ClusterMixin):
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
     n_split_trials : int
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers (default: 10)
+    n_jobs : int
+        Number of clusters that are tested concurrently. -1 uses all available cores (default: None)
+    backend : str
+        Defines whether the clusters are tested using 'threads' or 'processes' (default: 'threads')
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
@@ -153,11 +200,14 @@ class GMeans(BaseEstimator, ClusterMixin):
     """
 
     def __init__(self, significance: float = 0.001, n_clusters_init: int = 1, max_n_clusters: int = np.inf,
-                 n_split_trials: int = 10, random_state: np.random.RandomState = None):
+                 n_split_trials: int = 10, n_jobs: int = None, backend: str = "threads",
+                 random_state: np.random.RandomState = None):
         self.significance = significance
         self.n_clusters_init = n_clusters_init
         self.max_n_clusters = max_n_clusters
         self.n_split_trials = n_split_trials
+        self.n_jobs = n_jobs
+        self.backend = backend
         self.random_state = check_random_state(random_state)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'GMeans':
@@ -178,7 +228,7 @@ class GMeans(BaseEstimator, ClusterMixin):
             this instance of the GMeans algorithm
         """
         n_clusters, labels, centers = _gmeans(X, self.significance, self.n_clusters_init, self.max_n_clusters,
-                                              self.n_split_trials, self.random_state)
+                                              self.n_split_trials, self.random_state, self.n_jobs, self.backend)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
@@ -5,13 +5,14 @@ Collin Leiber
 
 import numpy as np
 from sklearn.mixture import GaussianMixture as GMM
-from scipy.stats import ks_2samp
+from scipy.stats import ks_2samp, kstwo
+from scipy.special import ndtr
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 
 
 def _pgmeans(X, significance, n_projections, n_samples, n_new_centers, amount_random_centers, n_clusters_init,
-             max_n_clusters, random_state):
+             max_n_clusters, random_state, ks_strategy="sampling"):
     """
     Start the actual PGMeans clustering procedure on the input data set.
 
@@ -41,6 +42,9 @@ def _pgmeans(X, significance, n_projections, n_samples, n_new_centers, amount_ra
         Maximum number of clusters. Must be larger than n_clusters_init
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    ks_strategy : str
+        Defines how the Kolmogorov Smirnov Test is executed. Can be 'sampling' (two-sample test using n_samples samples from the projected GMM)
+        or 'analytic' (one-sample test using the cumulative distribution function of the projected GMM) (default: 'sampling')
 
     Returns
     -------
@@ -52,27 +56,18 @@ def _pgmeans(X, significance, n_projections, n_samples, n_new_centers, amount_ra
     assert max_n_clusters >= n_clusters_init, "max_n_clusters can not be smaller than n_clusters_init"
     assert significance >= 0 and significance <= 1, "significance must be a value in the range [0, 1]"
     assert amount_random_centers >= 0 and amount_random_centers <= 1, "amount_random_centers must be a value in the range [0, 1]"
+    assert ks_strategy in ["sampling", "analytic"], "ks_strategy must be 'sampling' or 'analytic'. Your input: {0}".format(
+        ks_strategy)
     # Start parameters
     n_new_random_centers = int(n_new_centers * amount_random_centers)
     n_new_non_random_centers = n_new_centers - n_new_random_centers
     n_clusters, current_gmm = _initial_gmm_clusters(X, n_clusters_init, n_new_centers, random_state)
     while n_clusters <= max_n_clusters:
-        gmm_matches = True
-        for _ in range(n_projections):
-            # Get random projection
-            projection_vector = random_state.rand(X.shape[1])
-            # Project data
-            projected_X = np.matmul(X, projection_vector)
-            # Project model - Alternative: Sample directly from model and project samples (should be slower)
-            proj_gmm = _project_model(current_gmm, projection_vector, n_clusters, random_state)
-            projected_samples, _ = proj_gmm.sample(n_samples)
-            projected_samples = projected_samples.reshape(-1, )
-            # Execute Kolmogorov-Smirnov test
-            _, p_value = ks_2samp(projected_X, projected_samples)
-            # Is hypothesis being rejected?
-            if p_value < significance:
-                gmm_matches = False
-                break
+        if ks_strategy == "analytic":
+            gmm_matches = _projected_gmm_matches_analytic(X, current_gmm, significance, n_projections, random_state)
+        else:
+            gmm_matches = _projected_gmm_matches_sampling(X, current_gmm, significance, n_projections, n_samples,
+                                                          n_clusters, random_state)
         if gmm_matches:
             break
         else:
@@ -86,6 +81,151 @@ def _pgmeans(X, significance, n_projections, n_samples, n_new_centers, amount_ra
     return n_clusters, labels, centers
 
 
+def _projected_gmm_matches_sampling(X: np.ndarray, current_gmm: GMM, significance: float, n_projections: int,
+                                    n_samples: int, n_clusters: int, random_state: np.random.RandomState) -> bool:
+    """
+    Check whether the data matches the current Gaussian mixture (GMM) on multiple random projection axes.
+    For each projection, samples are drawn from the projected GMM and compared to the projected data using the two-sample Kolmogorov Smirnov Test.
+    Stops at the first projection that rejects the GMM.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    current_gmm : GMM
+        The current GMM
+    significance : float
+        Threshold to decide if the result of the Kolmogorov Smirnov Test indicates a Gaussian Mixture Model
+    n_projections : int
+        Number of projection axes
+    n_samples : int
+        Number of samples generated from the projected GMM
+    n_clusters : int
+        The current number of clusters
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+
+    Returns
+    -------
+    gmm_matches : bool
+        True, if no projection rejects the GMM
+    """
+    gmm_matches = True
+    for _ in range(n_projections):
+        # Get random projection
+        projection_vector = random_state.rand(X.shape[1])
+        # Project data
+        projected_X = np.matmul(X, projection_vector)
+        # Project model - Alternative: Sample directly from model and project samples (should be slower)
+        proj_gmm = _project_model(current_gmm, projection_vector, n_clusters, random_state)
+        projected_samples, _ = proj_gmm.sample(n_samples)
+        projected_samples = projected_samples.reshape(-1, )
+        # Execute Kolmogorov-Smirnov test
+        _, p_value = ks_2samp(projected_X, projected_samples)
+        # Is hypothesis being rejected?
+        if p_value < significance:
+            gmm_matches = False
+            break
+    return gmm_matches
+
+
+def _projected_gmm_matches_analytic(X: np.ndarray, current_gmm: GMM, significance: float, n_projections: int,
+                                    random_state: np.random.RandomState) -> bool:
+    """
+    Check whether the data matches the current Gaussian mixture (GMM) on multiple random projection axes.
+    The data and the GMM are projected onto all projection axes at once.
+    For each projection, the projected data is compared to the cumulative distribution function of the projected GMM (a weighted sum of normal CDFs) using the one-sample Kolmogorov Smirnov Test.
+    Stops at the first projection that rejects the GMM.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    current_gmm : GMM
+        The current GMM
+    significance : float
+        Threshold to decide if the result of the Kolmogorov Smirnov Test indicates a Gaussian Mixture Model
+    n_projections : int
+        Number of projection axes
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+
+    Returns
+    -------
+    gmm_matches : bool
+        True, if no projection rejects the GMM
+    """
+    # Get random projections and project data and model
+    projection_vectors = random_state.rand(n_projections, X.shape[1])
+    projected_X = np.matmul(X, projection_vectors.T)
+    proj_means, proj_stds = _project_model_parameters(current_gmm, projection_vectors)
+    for p in range(n_projections):
+        # Execute Kolmogorov-Smirnov test
+        _, p_value = _ks_test_projected_gmm(projected_X[:, p], current_gmm.weights_, proj_means[:, p],
+                                            proj_stds[:, p])
+        # Is hypothesis being rejected?
+        if p_value < significance:
+            return False
+    return True
+
+
+def _ks_test_projected_gmm(projected_X: np.ndarray, weights: np.ndarray, proj_means: np.ndarray,
+                           proj_stds: np.ndarray) -> (float, float):
+    """
+    Execute the one-sample Kolmogorov Smirnov Test of one-dimensional data against a one-dimensional Gaussian mixture.
+    The cumulative distribution function of the mixture is the weighted sum of the normal CDFs of its components.
+
+    Parameters
+    ----------
+    projected_X : np.ndarray
+        the projected data set (one-dimensional)
+    weights : np.ndarray
+        The weights of the components
+    proj_means : np.ndarray
+        The projected means of the components
+    proj_stds : np.ndarray
+        The projected standard deviations of the components
+
+    Returns
+    -------
+    tuple : (float, float)
+        The Kolmogorov Smirnov statistic,
+        The p-value
+    """
+    n_points = projected_X.shape[0]
+    # Get CDF of the projected GMM at the sorted projected samples
+    sorted_projected_X = np.sort(projected_X)
+    gmm_cdf = ndtr((sorted_projected_X[:, None] - proj_means) / proj_stds) @ weights
+    # Compare to the empirical CDF before and after each sorted sample
+    ks_statistic = max(np.max(np.arange(1, n_points + 1) / n_points - gmm_cdf),
+                       np.max(gmm_cdf - np.arange(n_points) / n_points))
+    p_value = kstwo.sf(ks_statistic, n_points)
+    return ks_statistic, p_value
+
+
+def _project_model_parameters(gmm: GMM, projection_vectors: np.ndarray) -> (np.ndarray, np.ndarray):
+    """
+    Project the means and covariances of the current Gaussian mixture (GMM) onto multiple projection axes at once.
+
+    Parameters
+    ----------
+    gmm : GMM
+        The current GMM (with covariance_type 'full')
+    projection_vectors : np.ndarray
+        The projection axes (one axis per row)
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray)
+        The projected means (one column per projection),
+        The projected standard deviations (one column per projection)
+    """
+    proj_means = np.matmul(gmm.means_, projection_vectors.T)
+    proj_vars = np.einsum("pd,kde,pe->kp", projection_vectors, gmm.covariances_, projection_vectors)
+    proj_stds = np.sqrt(proj_vars)
+    return proj_means, proj_stds
+
+
 def _project_model(gmm: GMM, projection_vector: np.ndarray, n_clusters: int,
                    random_state: np.random.RandomState) -> GMM:
     """
@@ -148,7 +288,7 @@ def _update_gmm_with_new_center(X: np.ndarray, n_clusters: int, current_gmm: GMM
         The updated GMM with an additional center added
     """
     best_gmm = None
-    best_log_likelihood = np.inf
+    best_log_likelihood = -np.inf
     if n_new_non_random_centers > 0:
         # Non-random centers are chosen through lowest probability regarding current GMM
         max_probability_densities = np.max(current_gmm.predict_proba(X), axis=1)
@@ -164,8 +304,8 @@ def _update_gmm_with_new_center(X: np.ndarray, n_clusters: int, current_gmm: GMM
         new_gmm = GMM(n_components=n_clusters, n_init=1, means_init=np.r_[current_gmm.means_, [new_center]],
                       random_state=random_state)
         new_gmm.fit(X)
-        # Check error of new GMM
-        if new_gmm.lower_bound_ < best_log_likelihood:
+        # Check log-likelihood of new GMM (the larger, the better)
+        if new_gmm.lower_bound_ > best_log_likelihood:
             best_log_likelihood = new_gmm.lower_bound_
             best_gmm = new_gmm
     return best_gmm
@@ -230,7 +370,7 @@ class PGMeans(BaseEstimator, ClusterMixin):
     n_samples : int
         Number of samples generated from the fitted GMM and used to execute the Kolmogorov Smirnov Test.
         If it is chosen larger than the number of data samples, it will be equal to this value.
-        Can be None, in that case it will be set to: 3 / significance (default: None)
+        Can be None, in that case it will be set to: 3 / significance. Only relevant if ks_strategy is 'sampling' (default: None)
     n_new_centers : int
         Nummber of centers to test when a new center should be added to the current GMM model.
         The additional center producing the best new GMM will be used for subsequent iterations (default: 10)
@@ -244,6 +384,10 @@ class PGMeans(BaseEstimator, ClusterMixin):
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    ks_strategy : str
+        Defines how the Kolmogorov Smirnov Test is executed. Can be 'sampling' (two-sample test using n_samples samples from the projected GMM)
+        or 'analytic' (one-sample test using the cumulative distribution function of the projected GMM, which is a weighted sum of normal CDFs).
+        'analytic' avoids the sampling noise and projects the data onto all projection axes at once (default: 'sampling')
 
     Attributes
     ----------
@@ -262,7 +406,8 @@ class PGMeans(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.001, n_projections: int = None, n_samples: int = None,
                  n_new_centers: int = 10, amount_random_centers: float = 0.5, n_clusters_init: int = 1,
-                 max_n_clusters: int = np.inf, random_state: np.random.RandomState = None):
+                 max_n_clusters: int = np.inf, random_state: np.random.RandomState = None,
+                 ks_strategy: str = "sampling"):
         self.significance = significance
         if n_projections is None:
             n_projections = int(-2.6198 * np.log(significance)) + 1
@@ -275,6 +420,7 @@ class PGMeans(BaseEstimator, ClusterMixin):
         self.max_n_clusters = max_n_clusters
         self.amount_random_centers = amount_random_centers
         self.random_state = check_random_state(random_state)
+        self.ks_strategy = ks_strategy
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'PGMeans':
         """
@@ -296,7 +442,7 @@ class PGMeans(BaseEstimator, ClusterMixin):
         self.n_samples = min(self.n_samples, X.shape[0])
         n_clusters, labels, centers = _pgmeans(X, self.significance, self.n_projections, self.n_samples,
                                                self.n_new_centers, self.amount_random_centers, self.n_clusters_init,
-                                               self.max_n_clusters, self.random_state)
+                                               self.max_n_clusters, self.random_state, self.ks_strategy)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
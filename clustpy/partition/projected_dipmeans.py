@@ -5,14 +5,14 @@ Collin Leiber
 
 import numpy as np
 from sklearn.decomposition import PCA
-from clustpy.utils import dip_test, dip_pval
+from clustpy.utils import dip_test_batch, dip_pval
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 from clustpy.partition.xmeans import _initial_kmeans_clusters, _execute_two_means
 
 
 def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int, pval_strategy: str, n_boots: int,
-                   n_split_trials: int, n_clusters_init: int, max_n_clusters: int,
+                   n_split_trials: int, n_clusters_init: int, max_n_clusters: int, split_strategy: str, n_jobs: int,
                    random_state: np.random.RandomState) -> (int, np.ndarray, np.ndarray):
     """
     Start the actual ProjectedDipMeans clustering procedure on the input data set.
@@ -35,6 +35,12 @@ def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int
         The initial number of clusters. Can also by of type np.ndarray if initial cluster centers are specified
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init
+    split_strategy : str
+        Defines how a cluster is split. If 'global', each split trial executes KMeans on the whole data set using all cluster centers.
+        If 'local', each split trial executes 2-Means only on the objects of the cluster and the best split is refined by a single KMeans on the whole data set with a bounded number of iterations.
+        'local' is considerably faster for large data sets with many clusters
+    n_jobs : int
+        Number of split trials that are executed concurrently (using threads). -1 uses all available cores
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
 
@@ -59,8 +65,7 @@ def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int
             # Get projections
             projected_data = _get_projected_data(X[ids_in_cluster], n_random_projections, random_state)
             # Calculate dip values for the distances of each point
-            cluster_dips = np.array([dip_test(projected_data[:, p], just_dip=True, is_data_sorted=False) for p in
-                                     range(projected_data.shape[1])])
+            cluster_dips = dip_test_batch(projected_data.T, just_dip=True, is_data_sorted=False)
             # Calculate p-values of maximum dip
             pval = dip_pval(np.max(cluster_dips), ids_in_cluster.shape[0], pval_strategy=pval_strategy, n_boots=n_boots,
                             random_state=random_state)
@@ -72,7 +77,7 @@ def _proj_dipmeans(X: np.ndarray, significance: float, n_random_projections: int
         if cluster_scores[cluster_id_to_split] < significance:
             # Split cluster using bisecting kmeans
             labels, centers, _ = _execute_two_means(X, ids_in_each_cluster, cluster_id_to_split, centers,
-                                                    n_split_trials, random_state)
+                                                    n_split_trials, random_state, split_strategy, n_jobs)
             n_clusters += 1
         else:
             break
@@ -135,6 +140,12 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
         The initial number of clusters. Can also by of type np.ndarray if initial cluster centers are specified (default: 1)
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
+    split_strategy : str
+        Defines how a cluster is split. If 'global', each split trial executes KMeans on the whole data set using all cluster centers.
+        If 'local', each split trial executes 2-Means only on the objects of the cluster and the best split is refined by a single KMeans on the whole data set with a bounded number of iterations.
+        'local' is considerably faster for large data sets with many clusters (default: 'global')
+    n_jobs : int
+        Number of split trials that are executed concurrently (using threads). -1 uses all available cores (default: None)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
@@ -155,7 +166,7 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.001, n_random_projections: int = 0, pval_strategy: str = "table",
                  n_boots: int = 1000, n_split_trials: int = 10, n_clusters_init: int = 1, max_n_clusters: int = np.inf,
-                 random_state: np.random.RandomState = None):
+                 split_strategy: str = "global", n_jobs: int = None, random_state: np.random.RandomState = None):
         self.significance = significance
         self.n_random_projections = n_random_projections
         self.pval_strategy = pval_strategy
@@ -163,6 +174,8 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
         self.n_split_trials = n_split_trials
         self.n_clusters_init = n_clusters_init
         self.max_n_clusters = max_n_clusters
+        self.split_strategy = split_strategy
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'ProjectedDipMeans':
@@ -184,7 +197,8 @@ class ProjectedDipMeans(BaseEstimator, ClusterMixin):
         """
         n_clusters, labels, centers = _proj_dipmeans(X, self.significance, self.n_random_projections,
                                                      self.pval_strategy, self.n_boots, self.n_split_trials,
-                                                     self.n_clusters_init, self.max_n_clusters, self.random_state)
+                                                     self.n_clusters_init, self.max_n_clusters, self.split_strategy,
+                                                     self.n_jobs, self.random_state)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
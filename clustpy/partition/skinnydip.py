@@ -3,15 +3,20 @@
 Collin Leiber
 """
 
-from clustpy.utils import dip_test, dip_pval
+from clustpy.utils import dip_test, dip_test_batch, dip_pval
+from clustpy.utils.diptest import _get_dip_boot_random_state
 import numpy as np
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
+from joblib import Parallel, delayed, effective_n_jobs, dump, load
+import tempfile
+import shutil
+import os
 
 
 def _skinnydip(X: np.ndarray, significance: float, pval_strategy: str, n_boots: int, add_tails: bool, outliers: bool,
-               max_cluster_size_diff_factor: float, random_state: np.random.RandomState, debug: bool) -> (
-        int, np.ndarray):
+               max_cluster_size_diff_factor: float, random_state: np.random.RandomState, debug: bool,
+               n_jobs: int = None) -> (int, np.ndarray):
     """
     Start the actual SkinnyDip clustering procedure on the input data set.
 
@@ -36,6 +41,8 @@ def _skinnydip(X: np.ndarray, significance: float, pval_strategy: str, n_boots:
         use a fixed random state to get a repeatable solution. Only relevant if pval_strategy is 'bootstrap'
     debug : bool
         If true, additional information will be printed to the console
+    n_jobs : int
+        Number of clusters of a feature that are processed concurrently by UniDip. -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -57,30 +64,211 @@ def _skinnydip(X: np.ndarray, significance: float, pval_strategy: str, n_boots:
         return n_clusters, labels
     n_clusters = 1
     labels = np.zeros(X.shape[0], dtype=np.int32)
-    # Iterate over all features
-    for dim in range(X.shape[1]):
-        n_clusters_old = n_clusters
-        # Iterate over all clusters from last iteration
-        for i in range(n_clusters_old):
-            if debug:
-                print("[SkinnyDip] Execute UniDip for dimension {0} and cluster {1}".format(dim, i))
-            # Get points in this cluster
-            points_in_cluster = (labels == i)
-            # Call UniDip
-            n_clusters_new, labels_new, _ = _tailoreddip(X[points_in_cluster, dim], significance, pval_strategy,
-                                                         n_boots, add_tails, outliers, max_cluster_size_diff_factor,
-                                                         random_state, debug)
-            # Update labels
-            labels_new[labels_new > 0] = labels_new[labels_new > 0] + n_clusters - 1
-            labels_new[labels_new == 0] = i
-            labels[points_in_cluster] = labels_new
-            n_clusters += n_clusters_new - 1
+    # When running in parallel, the workers access the data set through a memmap instead of receiving pickled copies
+    tmp_folder = None
+    if effective_n_jobs(n_jobs) > 1:
+        tmp_folder = tempfile.mkdtemp(prefix="clustpy_skinnydip_")
+        dump(X, os.path.join(tmp_folder, "X.joblib"))
+        X = load(os.path.join(tmp_folder, "X.joblib"), mmap_mode="r")
+    try:
+        with Parallel(n_jobs=n_jobs) as parallel:
+            # Iterate over all features
+            for dim in range(X.shape[1]):
+                n_clusters_old = n_clusters
+                # Execute UniDip on all clusters from last iteration (independent of each other)
+                unidip_results = parallel(
+                    delayed(_skinnydip_single_cluster)(X, labels, dim, i, significance, pval_strategy, n_boots,
+                                                       add_tails, outliers, max_cluster_size_diff_factor,
+                                                       random_state, debug) for i in range(n_clusters_old))
+                # Update labels in cluster order
+                for i, (n_clusters_new, labels_new) in enumerate(unidip_results):
+                    labels_new[labels_new > 0] = labels_new[labels_new > 0] + n_clusters - 1
+                    labels_new[labels_new == 0] = i
+                    labels[labels == i] = labels_new
+                    n_clusters += n_clusters_new - 1
+    finally:
+        if tmp_folder is not None:
+            del X
+            shutil.rmtree(tmp_folder, ignore_errors=True)
     return n_clusters, labels
 
 
+def _skinnydip_single_cluster(X: np.ndarray, labels: np.ndarray, dim: int, cluster_id: int, significance: float,
+                              pval_strategy: str, n_boots: int, add_tails: bool, outliers: bool,
+                              max_cluster_size_diff_factor: float, random_state: np.random.RandomState,
+                              debug: bool) -> (int, np.ndarray):
+    """
+    Execute UniDip (TailoredDip) on a single feature of the samples within a cluster.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    labels : np.ndarray
+        The current cluster labels
+    dim : int
+        The feature that should be clustered
+    cluster_id : int
+        The cluster that should be clustered
+    significance : float
+        Threshold to decide if the result of the dip-test is unimodal or multimodal
+    pval_strategy : str
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+    n_boots : int
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+    add_tails : bool
+        Defines if TailoredDip should try to add tails to the surrounding clusters
+    outliers : bool
+        Defines if outliers should be identified as described by UniDip
+    max_cluster_size_diff_factor : float
+        The maximum different in size when comparing two clusters regarding the number of samples.
+        If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for merging and assigning tails of distributions if 'add_tails' is True
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution. Only relevant if pval_strategy is 'bootstrap'
+    debug : bool
+        If true, additional information will be printed to the console
+
+    Returns
+    -------
+    tuple : (int, np.ndarray)
+        The number of clusters identified by UniDip,
+        The labels of the samples within the cluster as identified by UniDip
+    """
+    if debug:
+        print("[SkinnyDip] Execute UniDip for dimension {0} and cluster {1}".format(dim, cluster_id))
+    # Get points in this cluster
+    points_in_cluster = (labels == cluster_id)
+    # Call UniDip
+    n_clusters_new, labels_new, _ = _tailoreddip(X[points_in_cluster, dim], significance, pval_strategy, n_boots,
+                                                 add_tails, outliers, max_cluster_size_diff_factor, random_state,
+                                                 debug)
+    return n_clusters_new, labels_new
+
+
+class _SortedDipIntervals():
+    """
+    Dip-tests on index ranges of a single sorted univariate data set as used by UniDip.
+    The data is never copied: every interval is a view of the same sorted buffer and the Dip results of each interval are memoized.
+    Intervals that are known to be needed next can be evaluated together by a single call of dip_test_batch (see prefetch_dips).
+    Mirrored data sets (see _dip_mirrored_data) are only built when they are needed and reuse a single buffer.
+    A sub-range (see subrange) shares the sorted buffer, the memoized results and the mirror buffer with its parent.
+
+    Parameters
+    ----------
+    X_1d_sorted : np.ndarray
+        the sorted univariate data set
+    offset : int
+        Position of the first sample of this range within X_1d_sorted (default: 0)
+    n_points : int
+        Number of samples in this range. If None, all samples starting from offset will be used (default: None)
+    shared : dict
+        The memoized Dip results and the mirror buffer of the parent. If None, a new dict will be created (default: None)
+
+    Attributes
+    ----------
+    X_1d_sorted : np.ndarray
+        The samples of this range
+    """
+
+    def __init__(self, X_1d_sorted: np.ndarray, offset: int = 0, n_points: int = None, shared: dict = None):
+        self._X_1d_sorted_full = X_1d_sorted
+        self.offset = offset
+        self.n_points = X_1d_sorted.shape[0] - offset if n_points is None else n_points
+        self.X_1d_sorted = X_1d_sorted[offset:offset + self.n_points]
+        self._shared = {"dips": {}, "mirror_buffer": None} if shared is None else shared
+
+    def subrange(self, start: int, end: int) -> '_SortedDipIntervals':
+        """
+        Get the index range [start, end) of this range as a new _SortedDipIntervals object.
+
+        Parameters
+        ----------
+        start : int
+            The first sample of the range
+        end : int
+            The first sample that is not part of the range anymore
+
+        Returns
+        -------
+        dip_intervals : _SortedDipIntervals
+            The new object, sharing all buffers with this object
+        """
+        return _SortedDipIntervals(self._X_1d_sorted_full, self.offset + start, end - start, self._shared)
+
+    def dip(self, start: int, end: int) -> (float, tuple):
+        """
+        Get the Dip-value and the modal interval of the samples within [start, end).
+
+        Parameters
+        ----------
+        start : int
+            The first sample of the interval
+        end : int
+            The first sample that is not part of the interval anymore
+
+        Returns
+        -------
+        tuple : (float, tuple)
+            The Dip-value,
+            The indices of the modal interval (relative to start)
+        """
+        key = (self.offset + start, self.offset + end)
+        if key not in self._shared["dips"]:
+            dip_value, modal_interval, _ = dip_test(self.X_1d_sorted[start:end], just_dip=False, is_data_sorted=True)
+            self._shared["dips"][key] = (dip_value, modal_interval)
+        return self._shared["dips"][key]
+
+    def prefetch_dips(self, intervals: list) -> None:
+        """
+        Calculate the Dip-values and the modal intervals of multiple intervals using a single call of dip_test_batch.
+        The results are memoized, so subsequent calls of dip do not execute the dip-test again.
+        Intervals that have already been evaluated are skipped.
+
+        Parameters
+        ----------
+        intervals : list
+            List of tuples containing the first sample of an interval and the first sample that is not part of the interval anymore
+        """
+        pending = list(dict.fromkeys((self.offset + start, self.offset + end) for start, end in intervals if
+                                     (self.offset + start, self.offset + end) not in self._shared["dips"]))
+        if len(pending) == 0:
+            return
+        # Ragged layout of all pending intervals (overlapping intervals are copied)
+        offsets = np.r_[0, np.cumsum([end - start for start, end in pending])]
+        X_batch = np.concatenate([self._X_1d_sorted_full[start:end] for start, end in pending])
+        dip_values, modal_intervals, _ = dip_test_batch(X_batch, offsets, just_dip=False, is_data_sorted=True)
+        for i, key in enumerate(pending):
+            self._shared["dips"][key] = (dip_values[i], (modal_intervals[i, 0], modal_intervals[i, 1]))
+
+    def mirrored_dip(self, start: int, end: int, orig_modal_interval: tuple) -> (float, int, int):
+        """
+        Get the result of _dip_mirrored_data for the samples within [start, end).
+
+        Parameters
+        ----------
+        start : int
+            The first sample of the interval
+        end : int
+            The first sample that is not part of the interval anymore
+        orig_modal_interval : tuple
+            Tuple containing the starting and ending index of the original modal interval (relative to start). Can be None
+
+        Returns
+        -------
+        tuple : (float, int, int)
+            The highest obtained Dip-value,
+            The new starting index of the modal interval (relative to start),
+            The new ending index of the modal interval (relative to start)
+        """
+        if self._shared["mirror_buffer"] is None:
+            self._shared["mirror_buffer"] = np.empty(max(2 * self._X_1d_sorted_full.shape[0] - 1, 0),
+                                                     dtype=self._X_1d_sorted_full.dtype)
+        return _dip_mirrored_data(self.X_1d_sorted[start:end], orig_modal_interval, self._shared["mirror_buffer"])
+
+
 def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool, pval_strategy: str, n_boots: int,
                      max_cluster_size_diff_factor: float, random_state: np.random.RandomState, debug: bool) -> (
-        int, np.ndarray, np.ndarray, np.ndarray, list):
+        int, np.ndarray, _SortedDipIntervals, np.ndarray, list):
     """
     Start the actual UniDip clustering procedure on the univariate input data set.
 
@@ -106,10 +294,10 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
 
     Returns
     -------
-    tuple : (int, np.ndarray, np.ndarray, np.ndarray, list)
+    tuple : (int, np.ndarray, _SortedDipIntervals, np.ndarray, list)
         The final number of clusters,
         The labels as identified by UniDip,
-        The sorted input data set,
+        The sorted input data set (including the memoized Dip results),
         The indices of the sorted data set,
         List of tuples containing the id of the first sample in a cluster and the first sample that is not part of the cluster anymore
 
@@ -118,9 +306,7 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
     Maurus, Samuel, and Claudia Plant. "Skinny-dip: clustering in a sea of noise."
     Proceedings of the 22nd ACM SIGKDD international conference on Knowledge discovery and data mining. 2016.
     """
-    assert significance >= 0 and significance <= 1, "[UniDip] significance must be a value in the range [0, 1]"
     assert X_1d.ndim == 1, "[UniDip] Data must be 1-dimensional. Your input has shape: {0}".format(X_1d.shape)
-    cluster_boundaries = []
     # Check if data is already sorted
     if already_sorted:
         argsorted = np.arange(X_1d.shape[0])
@@ -128,16 +314,59 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
     else:
         argsorted = np.argsort(X_1d)
         X_1d_sorted = X_1d[argsorted]
+    dip_intervals = _SortedDipIntervals(X_1d_sorted)
+    n_clusters, labels, cluster_boundaries = _unidip_intervals(dip_intervals, argsorted, significance, pval_strategy,
+                                                               n_boots, max_cluster_size_diff_factor, random_state,
+                                                               debug)
+    return n_clusters, labels, dip_intervals, argsorted, cluster_boundaries
+
+
+def _unidip_intervals(dip_intervals: _SortedDipIntervals, argsorted: np.ndarray, significance: float,
+                      pval_strategy: str, n_boots: int, max_cluster_size_diff_factor: float,
+                      random_state: np.random.RandomState, debug: bool) -> (int, np.ndarray, list):
+    """
+    Execute UniDip on a sorted univariate data set.
+    All intervals are handled as index ranges of the sorted data set, so no samples are copied.
+
+    Parameters
+    ----------
+    dip_intervals : _SortedDipIntervals
+        The sorted data set
+    argsorted : np.ndarray
+        The indices of the sorted data set
+    significance : float
+        Threshold to decide if the result of the dip-test is unimodal or multimodal
+    pval_strategy : str
+        Defines which strategy to use to receive dip-p-vales. Possibilities are 'table', 'function' and 'bootstrap'
+    n_boots : int
+        Number of bootstraps used to calculate dip-p-values. Only necessary if pval_strategy is 'bootstrap'
+    max_cluster_size_diff_factor : float
+        The maximum different in size when comparing two clusters regarding the number of samples.
+        If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used for merging
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution. Only relevant if pval_strategy is 'bootstrap'
+    debug : bool
+        If true, additional information will be printed to the console
+
+    Returns
+    -------
+    tuple : (int, np.ndarray, list)
+        The final number of clusters,
+        The labels as identified by UniDip,
+        List of tuples containing the id of the first sample in a cluster and the first sample that is not part of the cluster anymore
+    """
+    assert significance >= 0 and significance <= 1, "[UniDip] significance must be a value in the range [0, 1]"
+    n_points = dip_intervals.n_points
+    cluster_boundaries = []
     # tmp_borders contains: (start and end value to search. Should be mirrored?. Current search space (equals position of next left and right cluster))
-    tmp_borders = [(0, X_1d.shape[0], True, 0, X_1d.shape[0])]
+    # It is used as a stack, i.e., the last added interval will be checked next
+    tmp_borders = [(0, n_points, True, 0, n_points)]
     while len(tmp_borders) > 0:
-        start, end, should_mirror, search_space_start, search_space_end = tmp_borders.pop(0)
+        start, end, should_mirror, search_space_start, search_space_end = tmp_borders.pop()
         if debug:
             print("[UniDip] Checking interval {0} / Current clusters: {1}".format((start, end), cluster_boundaries))
-        # Get part of data
-        tmp_X_1d = X_1d_sorted[start:end]
-        dip_value, modal_interval, _ = dip_test(tmp_X_1d, just_dip=False, is_data_sorted=True)
-        dip_pvalue = dip_pval(dip_value, n_points=tmp_X_1d.shape[0], pval_strategy=pval_strategy,
+        dip_value, modal_interval = dip_intervals.dip(start, end)
+        dip_pvalue = dip_pval(dip_value, n_points=end - start, pval_strategy=pval_strategy,
                               n_boots=n_boots, random_state=random_state)
         low = modal_interval[0]
         high = modal_interval[1]
@@ -147,11 +376,11 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
         if dip_pvalue < significance:  # Data is multimodal
             # Check area between low and high in next iteration. Area between low and search_space_start as well as high and search_space_end will be checked if a unimodal area is identified
             if low != high:
-                tmp_borders.insert(0, (start + low, start + high + 1, False, search_space_start, search_space_end))
+                tmp_borders.append((start + low, start + high + 1, False, search_space_start, search_space_end))
         else:  # Data is unimodal
             # If the current cluster wasn't a modal before, mirror data
             if should_mirror:
-                _, low, high = _dip_mirrored_data(tmp_X_1d, (low, high))
+                _, low, high = dip_intervals.mirrored_dip(start, end, (low, high))
                 cluster_start = start + low
                 cluster_end = start + high + 1
                 if debug:
@@ -165,13 +394,15 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
             cluster_boundaries.append((cluster_start, cluster_end))
             if debug:
                 print("[UniDip] => Add cluster", (cluster_start, cluster_end))
+            # The checks of the points to the right and to the left are independent of each other
+            dip_intervals.prefetch_dips(([(cluster_start, search_space_end)] if cluster_end != search_space_end else []) +
+                                        ([(search_space_start, cluster_end)] if cluster_start != search_space_start else []))
             # Other clusters to the right? (right must be handled before left)
             if cluster_end != search_space_end:
-                right_X_1d = X_1d_sorted[cluster_start:search_space_end]
-                dip_value, modal_interval, _ = dip_test(right_X_1d, just_dip=False, is_data_sorted=True)
+                dip_value, modal_interval = dip_intervals.dip(cluster_start, search_space_end)
                 low, high = modal_interval
-                dip_pvalue = dip_pval(dip_value, n_points=right_X_1d.shape[0], pval_strategy=pval_strategy,
-                                      n_boots=n_boots, random_state=random_state)
+                dip_pvalue = dip_pval(dip_value, n_points=search_space_end - cluster_start,
+                                      pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
                 if debug:
                     print(
                         "[UniDip] -> Check of points to the right {0} resulted in modal interval {1} with p-value {2}".format(
@@ -179,10 +410,10 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
                             (cluster_start + low, cluster_start + high), dip_pvalue))
                 if dip_pvalue < significance:  # Data is multimodal
                     # Search area right of cluster
-                    tmp_borders.insert(0, (cluster_end, search_space_end, True, cluster_end, search_space_end))
+                    tmp_borders.append((cluster_end, search_space_end, True, cluster_end, search_space_end))
                 else:  # Data is unimodal
                     # Update current cluster boundaries
-                    _, low, high = _dip_mirrored_data(right_X_1d, (low, high))
+                    _, low, high = dip_intervals.mirrored_dip(cluster_start, search_space_end, (low, high))
                     cluster_boundaries[-1] = (min(cluster_start + low, cluster_boundaries[-1][0]),
                                               max(cluster_start + 1 + high, cluster_boundaries[-1][1]))
                     if debug:
@@ -190,11 +421,10 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
                                                                                    cluster_boundaries[-1][1]))
             # Other clusters to the left?
             if cluster_start != search_space_start:
-                left_X_1d = X_1d_sorted[search_space_start:cluster_end]
-                dip_value, modal_interval, _ = dip_test(left_X_1d, just_dip=False, is_data_sorted=True)
+                dip_value, modal_interval = dip_intervals.dip(search_space_start, cluster_end)
                 low, high = modal_interval
-                dip_pvalue = dip_pval(dip_value, n_points=left_X_1d.shape[0], pval_strategy=pval_strategy,
-                                      n_boots=n_boots, random_state=random_state)
+                dip_pvalue = dip_pval(dip_value, n_points=cluster_end - search_space_start,
+                                      pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
                 if debug:
                     print(
                         "[UniDip] -> Check of points to the left {0} resulted in modal interval {1} with p-value {2}".format(
@@ -202,10 +432,10 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
                             (search_space_start + low, search_space_start + high), dip_pvalue))
                 if dip_pvalue < significance:  # Data is multimodal
                     # Search area left of cluster
-                    tmp_borders.insert(0, (search_space_start, cluster_start, True, search_space_start, cluster_start))
+                    tmp_borders.append((search_space_start, cluster_start, True, search_space_start, cluster_start))
                 else:  # Data is unimodal
                     # Update current cluster boundaries
-                    _, low, high = _dip_mirrored_data(left_X_1d, (low, high))
+                    _, low, high = dip_intervals.mirrored_dip(search_space_start, cluster_end, (low, high))
                     cluster_boundaries[-1] = (min(search_space_start + low, cluster_boundaries[-1][0]),
                                               max(search_space_start + 1 + high, cluster_boundaries[-1][1]))
                     if debug:
@@ -215,22 +445,23 @@ def _unidip_original(X_1d: np.ndarray, significance: float, already_sorted: bool
     cluster_boundaries = sorted(cluster_boundaries, key=lambda x: x[0])
     # Create labels array (in the beginning everything is noise)
     n_clusters = len(cluster_boundaries)
-    labels = -np.ones(X_1d.shape[0], dtype=np.int32)
+    labels = -np.ones(n_points, dtype=np.int32)
     for i, boundary in enumerate(cluster_boundaries):
         cluster_start, cluster_end = boundary
         labels[argsorted[cluster_start:cluster_end]] = i
     if debug:
         print("[UniDip] Clusters before merging:", cluster_boundaries)
     # Merge nearby clusters
-    n_clusters, labels, cluster_boundaries = _merge_clusters(X_1d_sorted, argsorted, labels, n_clusters,
+    n_clusters, labels, cluster_boundaries = _merge_clusters(dip_intervals, argsorted, labels, n_clusters,
                                                              cluster_boundaries, significance, pval_strategy,
                                                              n_boots, max_cluster_size_diff_factor, random_state)
     if debug:
         print("[UniDip] Clusters after merging:", cluster_boundaries)
-    return n_clusters, labels, X_1d_sorted, argsorted, cluster_boundaries
+    return n_clusters, labels, cluster_boundaries
 
 
-def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (float, int, int):
+def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple, buffer: np.ndarray = None) -> (
+        float, int, int):
     """
     Mirror the data to get a more accurate modal interval.
     For more information see 'The DipEncoder: Enforcing Multimodality in Autoencoders'.
@@ -241,6 +472,9 @@ def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (
         the input data set, must be sorted
     orig_modal_interval : tuple
         Tuple containing the starting and ending index of the original modal interval. Can be None
+    buffer : np.ndarray
+        Array with at least 2 * len(X_1d_sorted) - 1 entries that is used to store the mirrored data.
+        If None, a new array will be created (default: None)
 
     Returns
     -------
@@ -254,14 +488,22 @@ def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (
     Leiber, Collin, et al. "The DipEncoder: Enforcing Multimodality in Autoencoders."
     Proceedings of the 28th ACM SIGKDD Conference on Knowledge Discovery and Data Mining. 2022.
     """
+    n_points = X_1d_sorted.shape[0]
+    if buffer is None:
+        buffer = np.empty(2 * n_points - 1, dtype=X_1d_sorted.dtype)
+    X_1d_mirrored = buffer[:2 * n_points - 1]
     # Left mirror
-    mirrored_addition_left = X_1d_sorted[0] - np.flip(X_1d_sorted[1:] - X_1d_sorted[0])
-    X_1d_left_mirrored = np.append(mirrored_addition_left, X_1d_sorted)
-    dip_value_left, modal_interval_left, _ = dip_test(X_1d_left_mirrored, just_dip=False, is_data_sorted=True)
-    # Right mirror
-    mirrored_addition_right = X_1d_sorted[-1] + np.flip(X_1d_sorted[-1] - X_1d_sorted[:-1])
-    X_1d_right_mirrored = np.append(X_1d_sorted, mirrored_addition_right)
-    dip_value_right, modal_interval_right, _ = dip_test(X_1d_right_mirrored, just_dip=False, is_data_sorted=True)
+    mirrored_addition_left = X_1d_mirrored[:n_points - 1]
+    np.subtract(X_1d_sorted[:0:-1], X_1d_sorted[0], out=mirrored_addition_left)
+    np.subtract(X_1d_sorted[0], mirrored_addition_left, out=mirrored_addition_left)
+    X_1d_mirrored[n_points - 1:] = X_1d_sorted
+    dip_value_left, modal_interval_left, _ = dip_test(X_1d_mirrored, just_dip=False, is_data_sorted=True)
+    # Right mirror (overwrites the left mirror)
+    X_1d_mirrored[:n_points] = X_1d_sorted
+    mirrored_addition_right = X_1d_mirrored[n_points:]
+    np.subtract(X_1d_sorted[-1], X_1d_sorted[-2::-1], out=mirrored_addition_right)
+    np.add(X_1d_sorted[-1], mirrored_addition_right, out=mirrored_addition_right)
+    dip_value_right, modal_interval_right, _ = dip_test(X_1d_mirrored, just_dip=False, is_data_sorted=True)
     # Get interval of larger dip
     if dip_value_left > dip_value_right:
         low = modal_interval_left[0]
@@ -289,7 +531,43 @@ def _dip_mirrored_data(X_1d_sorted: np.ndarray, orig_modal_interval: tuple) -> (
             return dip_value_right, 2 * (X_1d_sorted.shape[0] - 1) - high, 2 * (X_1d_sorted.shape[0] - 1) - low
 
 
-def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.ndarray, n_clusters: int,
+def _get_merge_transitions(cluster_boundaries: list, i: int, max_cluster_size_diff_factor: float) -> (tuple, tuple):
+    """
+    Get the intervals that describe the transition of cluster i into its left (i - 1) and its right (i + 1) neighboring cluster.
+
+    Parameters
+    ----------
+    cluster_boundaries : list
+        List of tuples containing the id of the first sample in a cluster and the first sample that is not part of the cluster anymore
+    i : int
+        The id of the central cluster
+    max_cluster_size_diff_factor : float
+        The maximum different in size when comparing two clusters regarding the number of samples.
+        If one cluster surpasses this difference factor, only the max_cluster_size_diff_factor*(size of smaller cluster) closest samples will be used
+
+    Returns
+    -------
+    tuple : (tuple, tuple)
+        The first and the last sample (exclusive) of the transition into the left cluster,
+        The first and the last sample (exclusive) of the transition into the right cluster
+    """
+    cluster_size_center = cluster_boundaries[i][1] - cluster_boundaries[i][0]
+    # Transition of i into left (i - 1)
+    cluster_size_left = cluster_boundaries[i - 1][1] - cluster_boundaries[i - 1][0]
+    start_left = max(cluster_boundaries[i - 1][0],
+                     int(cluster_boundaries[i - 1][1] - max_cluster_size_diff_factor * cluster_size_center))
+    end_left = min(cluster_boundaries[i][1],
+                   int(cluster_boundaries[i][0] + max_cluster_size_diff_factor * cluster_size_left))
+    # Transition of i into right (i + 1)
+    cluster_size_right = cluster_boundaries[i + 1][1] - cluster_boundaries[i + 1][0]
+    start_right = max(cluster_boundaries[i][0],
+                      int(cluster_boundaries[i][1] - max_cluster_size_diff_factor * cluster_size_right))
+    end_right = min(cluster_boundaries[i + 1][1],
+                    int(cluster_boundaries[i + 1][0] + max_cluster_size_diff_factor * cluster_size_center))
+    return (start_left, end_left), (start_right, end_right)
+
+
+def _merge_clusters(dip_intervals: _SortedDipIntervals, argsorted: np.ndarray, labels: np.ndarray, n_clusters: int,
                     cluster_boundaries: list, significance: float, pval_strategy: str, n_boots: int,
                     max_cluster_size_diff_factor: float, random_state: np.random.RandomState) -> (
         int, np.ndarray, list):
@@ -297,11 +575,12 @@ def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.n
     Check for each cluster if it can be merged with the left or right neighboring cluster.
     The first and the last cluster will hereby handled by its more central neighbors.
     The decision of two clusters can be merged will be made using the dip-test by analyzing the transition of one cluster into the other.
+    As the transitions are memoized in dip_intervals, the transition between i and i + 1 is only tested once, although it is checked for both clusters.
 
     Parameters
     ----------
-    X_1d_sorted : np.ndarray
-        The input data set, must be sorted
+    dip_intervals : _SortedDipIntervals
+        The sorted input data set
     argsorted : np.ndarray
         The indices of the sorted data set
     labels : np.ndarray
@@ -329,30 +608,22 @@ def _merge_clusters(X_1d_sorted: np.ndarray, argsorted: np.ndarray, labels: np.n
         The labels after merging,
         Updated list of tuples containing the id of the first sample in a cluster and the first sample that is not part of the cluster anymore
     """
+    # The transitions of the initial clusters are evaluated at once. Transitions of merged clusters are evaluated separately
+    transitions = []
+    for i in range(1, len(cluster_boundaries) - 1):
+        transitions += _get_merge_transitions(cluster_boundaries, i, max_cluster_size_diff_factor)
+    dip_intervals.prefetch_dips(transitions)
     i = 1
     while i < len(cluster_boundaries) - 1:
-        cluster_size_center = cluster_boundaries[i][1] - cluster_boundaries[i][0]
+        (start_left, end_left), (start_right, end_right) = _get_merge_transitions(cluster_boundaries, i,
+                                                                                  max_cluster_size_diff_factor)
         # Dip of i combined with left (i - 1)
-        cluster_size_left = cluster_boundaries[i - 1][1] - cluster_boundaries[i - 1][0]
-        start_left = max(cluster_boundaries[i - 1][0],
-                         int(cluster_boundaries[i - 1][1] - max_cluster_size_diff_factor * cluster_size_center))
-        end_left = min(cluster_boundaries[i][1],
-                       int(cluster_boundaries[i][0] + max_cluster_size_diff_factor * cluster_size_left))
-        tmp_X_1d = X_1d_sorted[start_left:end_left]
-        # Run dip-test
-        dip_value = dip_test(tmp_X_1d, just_dip=True, is_data_sorted=True)
-        dip_pvalue_left = dip_pval(dip_value, n_points=tmp_X_1d.shape[0], pval_strategy=pval_strategy,
+        dip_value, _ = dip_intervals.dip(start_left, end_left)
+        dip_pvalue_left = dip_pval(dip_value, n_points=end_left - start_left, pval_strategy=pval_strategy,
                                    n_boots=n_boots, random_state=random_state)
         # Dip of i combined with right (i + 1)
-        cluster_size_right = cluster_boundaries[i + 1][1] - cluster_boundaries[i + 1][0]
-        start_right = max(cluster_boundaries[i][0],
-                          int(cluster_boundaries[i][1] - max_cluster_size_diff_factor * cluster_size_right))
-        end_right = min(cluster_boundaries[i + 1][1],
-                        int(cluster_boundaries[i + 1][0] + max_cluster_size_diff_factor * cluster_size_center))
-        tmp_X_1d = X_1d_sorted[start_right:end_right]
-        # Run dip-test
-        dip_value = dip_test(tmp_X_1d, just_dip=True, is_data_sorted=True)
-        dip_pvalue_right = dip_pval(dip_value, n_points=tmp_X_1d.shape[0], pval_strategy=pval_strategy,
+        dip_value, _ = dip_intervals.dip(start_right, end_right)
+        dip_pvalue_right = dip_pval(dip_value, n_points=end_right - start_right, pval_strategy=pval_strategy,
                                     n_boots=n_boots, random_state=random_state)
         if dip_pvalue_left >= dip_pvalue_right and dip_pvalue_left >= significance:
             # Merge i - 1 and i. Overwrite labels (beware, outliers can be in between)
@@ -421,20 +692,20 @@ def _tailoreddip(X_1d: np.ndarray, significance: float, pval_strategy: str, n_bo
     Proceedings of the 2023 SIAM International Conference on Data Mining (SDM). Society for Industrial and Applied Mathematics, 2023.
     """
     # Start by executing the original UniDip algorithm
-    n_clusters, labels, sorted_X_1d, argsorted, cluster_boundaries = _unidip_original(X_1d, significance, False,
-                                                                                      pval_strategy, n_boots,
-                                                                                      max_cluster_size_diff_factor,
-                                                                                      random_state, debug)
+    n_clusters, labels, dip_intervals, argsorted, cluster_boundaries = _unidip_original(X_1d, significance, False,
+                                                                                        pval_strategy, n_boots,
+                                                                                        max_cluster_size_diff_factor,
+                                                                                        random_state, debug)
     if add_tails:
-        labels, cluster_boundaries = _add_tails(X_1d, labels, sorted_X_1d, argsorted, cluster_boundaries,
+        labels, cluster_boundaries = _add_tails(X_1d, labels, dip_intervals, argsorted, cluster_boundaries,
                                                 significance, pval_strategy, n_boots,
                                                 max_cluster_size_diff_factor, random_state, debug)
     if not outliers:
-        labels = _assign_outliers(X_1d, labels, n_clusters, sorted_X_1d, argsorted, cluster_boundaries)
+        labels = _assign_outliers(X_1d, labels, n_clusters, dip_intervals.X_1d_sorted, argsorted, cluster_boundaries)
     return n_clusters, labels, cluster_boundaries
 
 
-def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, argsorted: np.ndarray,
+def _add_tails(X_1d: np.ndarray, labels: np.ndarray, dip_intervals: _SortedDipIntervals, argsorted: np.ndarray,
                cluster_boundaries_orig: list, significance: float, pval_strategy: str, n_boots: int,
                max_cluster_size_diff_factor: float, random_state: np.random.RandomState, debug: bool) -> (
         np.ndarray, list):
@@ -450,7 +721,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
         the given data set
     labels : np.ndarray
         The labels as identified by UniDip
-    sorted_X_1d : np.ndarray
+    dip_intervals : _SortedDipIntervals
         The sorted input data set
     argsorted : np.ndarray
         The indices of the sorted data set
@@ -493,21 +764,20 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
                 end = X_1d.shape[0]
             if end - start < 4:  # Minimum number of samples for the dip-test is 4
                 break
-            X_tmp = sorted_X_1d[start:end]
             # Calculate mirrored dip to see if there is some relevant structure left between the clusters
-            dip_value_mirror, _, _ = _dip_mirrored_data(X_tmp, (None, None))
-            dip_pvalue_mirror = dip_pval(dip_value_mirror, n_points=(X_tmp.shape[0] * 2 - 1),
+            dip_value_mirror, _, _ = dip_intervals.mirrored_dip(start, end, (None, None))
+            dip_pvalue_mirror = dip_pval(dip_value_mirror, n_points=((end - start) * 2 - 1),
                                          pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
             if debug:
                 print("[UniDip Add Tails] Check if interval {0} is unimodal. P-value is {1}".format((start, end),
                                                                                                     dip_pvalue_mirror))
             if dip_pvalue_mirror < significance:  # samples are multimodal
                 # Execute UniDip on the noise data
-                n_clusters_new, _, _, _, cluster_boundaries_new = _unidip_original(X_tmp, significance,
-                                                                                   True, pval_strategy,
-                                                                                   n_boots,
-                                                                                   max_cluster_size_diff_factor,
-                                                                                   random_state, debug)
+                n_clusters_new, _, cluster_boundaries_new = _unidip_intervals(dip_intervals.subrange(start, end),
+                                                                              np.arange(end - start), significance,
+                                                                              pval_strategy, n_boots,
+                                                                              max_cluster_size_diff_factor,
+                                                                              random_state, debug)
                 if debug:
                     print("[UniDip Add Tails] -> Identified the clusters {0} in the interval {1}".format(
                         cluster_boundaries_new, (start, end)))
@@ -521,7 +791,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
                     start_left = max(cluster_boundaries_orig[i - 1][0],
                                      int(cluster_boundaries_orig[i - 1][1] - max_cluster_size_diff_factor * cluster_range))
                     end_left = start + cluster_boundaries_new[0][1]
-                    dip_value_left = dip_test(sorted_X_1d[start_left:end_left], just_dip=True, is_data_sorted=True)
+                    dip_value_left, _ = dip_intervals.dip(start_left, end_left)
                     dip_pvalue_left = dip_pval(dip_value_left, n_points=end_left - start_left,
                                                pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
                     if debug:
@@ -536,8 +806,7 @@ def _add_tails(X_1d: np.ndarray, labels: np.ndarray, sorted_X_1d: np.ndarray, ar
                     # Use a maximum of cluster_range points of right cluster to see if transition is unimodal
                     end_right = min(cluster_boundaries_orig[i][1],
                                     int(cluster_boundaries_orig[i][0] + max_cluster_size_diff_factor * cluster_range))
-                    dip_value_right = dip_test(sorted_X_1d[start_right:end_right], just_dip=True,
-                                               is_data_sorted=True)
+                    dip_value_right, _ = dip_intervals.dip(start_right, end_right)
                     dip_pvalue_right = dip_pval(dip_value_right, n_points=end_right - start_right,
                                                 pval_strategy=pval_strategy, n_boots=n_boots, random_state=random_state)
                     if debug:
@@ -656,6 +925,9 @@ class SkinnyDip(BaseEstimator, ClusterMixin):
         use a fixed random state to get a repeatable solution. Can also be of type int. Only relevant if pval_strategy is 'bootstrap' (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    n_jobs : int
+        Number of clusters of a feature that are processed concurrently by UniDip.
+        The workers are separate processes, which access the data set through a memmap. -1 uses all available cores (default: None)
 
     Attributes
     ----------
@@ -684,7 +956,7 @@ class SkinnyDip(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.05, pval_strategy: str = "table", n_boots: int = 1000,
                  add_tails: bool = False, outliers: bool = True, max_cluster_size_diff_factor: float = 2,
-                 random_state: np.random.RandomState = None, debug: bool = False):
+                 random_state: np.random.RandomState = None, debug: bool = False, n_jobs: int = None):
         self.significance = significance
         self.pval_strategy = pval_strategy
         self.n_boots = n_boots
@@ -693,6 +965,7 @@ class SkinnyDip(BaseEstimator, ClusterMixin):
         self.max_cluster_size_diff_factor = max_cluster_size_diff_factor
         self.random_state = check_random_state(random_state)
         self.debug = debug
+        self.n_jobs = n_jobs
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'SkinnyDip':
         """
@@ -711,8 +984,11 @@ class SkinnyDip(BaseEstimator, ClusterMixin):
         self : SkinnyDip
             this instance of the SkinnyDip algorithm
         """
+        # When bootstrapping, use a fixed seed so the null distributions can be reused across dimensions and clusters
+        boot_random_state = _get_dip_boot_random_state(self.random_state, self.pval_strategy)
         n_clusters, labels = _skinnydip(X, self.significance, self.pval_strategy, self.n_boots, self.add_tails,
-                                        self.outliers, self.max_cluster_size_diff_factor, self.random_state, self.debug)
+                                        self.outliers, self.max_cluster_size_diff_factor, boot_random_state, self.debug,
+                                        self.n_jobs)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         return self
@@ -796,9 +1072,11 @@ class UniDip(BaseEstimator, ClusterMixin):
         self : UniDip
             this instance of the UniDip algorithm
         """
+        # When bootstrapping, use a fixed seed so the null distributions can be reused across intervals
+        boot_random_state = _get_dip_boot_random_state(self.random_state, self.pval_strategy)
         n_clusters, labels, cluster_boundaries = _tailoreddip(X, self.significance, self.pval_strategy, self.n_boots,
                                                               self.add_tails, self.outliers,
-                                                              self.max_cluster_size_diff_factor, self.random_state,
+                                                              self.max_cluster_size_diff_factor, boot_random_state,
                                                               self.debug)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
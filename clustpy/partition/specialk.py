@@ -7,16 +7,16 @@ https://github.com/Sibylse/SpecialK/blob/master/SpecialK.ipynb
 """
 
 import numpy as np
-from scipy.spatial.distance import pdist, squareform
-from sklearn.neighbors import radius_neighbors_graph, kneighbors_graph
+from sklearn.neighbors import radius_neighbors_graph, NearestNeighbors
 from sklearn.cluster import KMeans
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
 import scipy
+from clustpy.utils import NeighborGraph
 
 
 def _specialk(X: np.ndarray, significance: float, n_dimensions: int, similarity_matrix: str, n_neighbors: int,
-              percentage: float, n_cluster_pairs_to_consider: int, max_n_clusters: int,
+              percentage: float, n_cluster_pairs_to_consider: int, max_n_clusters: int, neighbors_algorithm: str,
               random_state: np.random.RandomState, debug: bool) -> (int, np.ndarray):
     """
     Start the actual SpecialK clustering procedure on the input data set.
@@ -44,6 +44,10 @@ def _specialk(X: np.ndarray, significance: float, n_dimensions: int, similarity_
         Smaller values for n_cluster_pairs_to_consider will decrease the computing time
     max_n_clusters : int
         Maximum number of clusters
+    neighbors_algorithm : str
+        The algorithm used to compute the nearest neighbors. Can be 'auto', 'ball_tree', 'kd_tree' or 'brute' (see sklearn.neighbors.NearestNeighbors).
+        Can also be an (unfitted) object that provides fit(X) and kneighbors(X, n_neighbors) like sklearn.neighbors.NearestNeighbors, e.g., an approximate nearest neighbor index,
+        or a NeighborGraph (see clustpy.utils.NeighborGraph) that has been fitted on X
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
     debug : bool
@@ -58,9 +62,9 @@ def _specialk(X: np.ndarray, significance: float, n_dimensions: int, similarity_
     assert significance >= 0 and significance <= 1, "significance must be a value in the range [0, 1]"
     assert percentage >= 0 and percentage <= 1, "percentage must be a value in the range [0, 1]"
     if type(similarity_matrix) is str and similarity_matrix == 'NAM':
-        final_similarity_matrix = _get_neighborhood_adjacency_matrix(X, percentage, n_neighbors)
+        final_similarity_matrix = _get_neighborhood_adjacency_matrix(X, percentage, n_neighbors, neighbors_algorithm)
     elif type(similarity_matrix) is str and similarity_matrix == 'SAM':
-        final_similarity_matrix = _get_symmetrically_normalized_adjacency_matrix(X, n_neighbors)
+        final_similarity_matrix = _get_symmetrically_normalized_adjacency_matrix(X, n_neighbors, neighbors_algorithm)
     elif type(similarity_matrix) is np.ndarray or type(similarity_matrix) is scipy.sparse.csr_matrix:
         final_similarity_matrix = similarity_matrix
     else:
@@ -158,8 +162,52 @@ def _zz_top_bound(D: np.ndarray, ids_in_cluster_1: np.ndarray, ids_in_cluster_2:
     return t_total
 
 
-def _get_neighborhood_adjacency_matrix(X: np.ndarray, percentage: float = 0.99,
-                                       n_neighbors: int = 10) -> scipy.sparse.csr_matrix:
+def _get_nearest_neighbors(X: np.ndarray, n_neighbors: int, neighbors_algorithm: str = "auto") -> (
+        np.ndarray, np.ndarray, object):
+    """
+    Get the distances and ids of the n_neighbors nearest neighbors of each object (not including the object itself).
+    The neighbors are obtained from a nearest neighbor index, so that no full distance matrix has to be calculated.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    n_neighbors : int
+        The number of neighbors, not including the object itself
+    neighbors_algorithm : str
+        The algorithm used to compute the nearest neighbors. Can be 'auto', 'ball_tree', 'kd_tree' or 'brute' (see sklearn.neighbors.NearestNeighbors).
+        Can also be an (unfitted) object that provides fit(X) and kneighbors(X, n_neighbors) like sklearn.neighbors.NearestNeighbors,
+        or a NeighborGraph that has been fitted on X (default: 'auto')
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, object)
+        The distances to the nearest neighbors (sorted in ascending order),
+        The ids of the nearest neighbors,
+        The fitted nearest neighbor index
+    """
+    if type(neighbors_algorithm) is str:
+        nearest_neighbors = NearestNeighbors(n_neighbors=n_neighbors, algorithm=neighbors_algorithm, n_jobs=-1)
+        nearest_neighbors.fit(X)
+        # If no query is given, the object itself is not included
+        knn_distances, knn_ids = nearest_neighbors.kneighbors()
+    elif isinstance(neighbors_algorithm, NeighborGraph):
+        assert neighbors_algorithm.n_samples_ == X.shape[0], "The NeighborGraph must be fitted on the input data set"
+        nearest_neighbors = neighbors_algorithm
+        knn_distances, knn_ids = neighbors_algorithm.kneighbors(n_neighbors)
+    else:
+        nearest_neighbors = neighbors_algorithm.fit(X)
+        knn_distances, knn_ids = nearest_neighbors.kneighbors(X, n_neighbors + 1)
+        # Remove the object itself (if it is not contained, e.g. due to duplicates or approximations, remove the last neighbor)
+        is_self = knn_ids == np.arange(X.shape[0])[:, None]
+        is_self[~np.any(is_self, axis=1), -1] = True
+        knn_distances = knn_distances[~is_self].reshape(X.shape[0], n_neighbors)
+        knn_ids = knn_ids[~is_self].reshape(X.shape[0], n_neighbors)
+    return knn_distances, knn_ids, nearest_neighbors
+
+
+def _get_neighborhood_adjacency_matrix(X: np.ndarray, percentage: float = 0.99, n_neighbors: int = 10,
+                                       neighbors_algorithm: str = "auto") -> scipy.sparse.csr_matrix:
     """
     Get a neighborhood adjacency matrix, so that p% of the data points have at least n_neighbors neighbors.
     Here, p can be chosen using the 'percentage' parameter.
@@ -172,25 +220,33 @@ def _get_neighborhood_adjacency_matrix(X: np.ndarray, percentage: float = 0.99,
         The amount of data points that should have at least n_neighbors neighbors (default: 0.99)
     n_neighbors : int
         The number of neighbors, not including the object itself (default: 10)
+    neighbors_algorithm : str
+        The algorithm used to compute the nearest neighbors. Can be 'auto', 'ball_tree', 'kd_tree' or 'brute' (see sklearn.neighbors.NearestNeighbors).
+        Can also be an (unfitted) object that provides fit(X) and kneighbors(X, n_neighbors) like sklearn.neighbors.NearestNeighbors,
+        or a NeighborGraph that has been fitted on X (default: 'auto')
 
     Returns
     -------
     similarity_matrix : scipy.sparse.csr_matrix
         The resulting similarity matrix
     """
-    # Get pairwise distances
-    dist_matrix = squareform(pdist(X, 'euclidean'))
-    # Get kNN distances (+1 because self is not included in n_neighbors)
-    knn_distances = np.sort(dist_matrix, axis=1)[:, n_neighbors + 1]
-    # Get knn dist so that more than 'percentage' points have 'n_neighbors' neighbors
-    knn_dist_sorted = np.sort(knn_distances)
-    eps = knn_dist_sorted[int((X.shape[0] - 1) * percentage)]
+    # Get kNN distances (+1 because the (n_neighbors + 1)-th neighbor defines the radius)
+    knn_distances, _, nearest_neighbors = _get_nearest_neighbors(X, n_neighbors + 1, neighbors_algorithm)
+    knn_distances = knn_distances[:, n_neighbors]
+    # Get knn dist so that more than 'percentage' points have 'n_neighbors' neighbors (no full sort necessary)
+    eps_position = int((X.shape[0] - 1) * percentage)
+    eps = np.partition(knn_distances, eps_position)[eps_position]
     # Get neighbor graph
-    similarity_matrix = radius_neighbors_graph(X, radius=eps)
+    if type(neighbors_algorithm) is str:
+        # Reuse the index (without query the object itself is not included)
+        similarity_matrix = nearest_neighbors.radius_neighbors_graph(radius=eps)
+    else:
+        similarity_matrix = radius_neighbors_graph(X, radius=eps, n_jobs=-1)
     return similarity_matrix
 
 
-def _get_symmetrically_normalized_adjacency_matrix(X: np.ndarray, n_neighbors: int = 10) -> scipy.sparse.csr_matrix:
+def _get_symmetrically_normalized_adjacency_matrix(X: np.ndarray, n_neighbors: int = 10,
+                                                   neighbors_algorithm: str = "auto") -> scipy.sparse.csr_matrix:
     """
     Get a symmetrically normalized adjacency matrix of the kNN graph.
 
@@ -200,6 +256,10 @@ def _get_symmetrically_normalized_adjacency_matrix(X: np.ndarray, n_neighbors: i
         the given data set
     n_neighbors : int
         The number of neighbors, not including the object itself (default: 10)
+    neighbors_algorithm : str
+        The algorithm used to compute the nearest neighbors. Can be 'auto', 'ball_tree', 'kd_tree' or 'brute' (see sklearn.neighbors.NearestNeighbors).
+        Can also be an (unfitted) object that provides fit(X) and kneighbors(X, n_neighbors) like sklearn.neighbors.NearestNeighbors,
+        or a NeighborGraph that has been fitted on X (default: 'auto')
 
     Returns
     -------
@@ -207,14 +267,17 @@ def _get_symmetrically_normalized_adjacency_matrix(X: np.ndarray, n_neighbors: i
         The resulting similarity matrix
     """
     # Get neighbor graph
-    W = kneighbors_graph(X, n_neighbors=n_neighbors, mode="distance", include_self=False, n_jobs=-1)
+    knn_distances, knn_ids, _ = _get_nearest_neighbors(X, n_neighbors, neighbors_algorithm)
+    W = scipy.sparse.csr_matrix((knn_distances.ravel(), knn_ids.ravel(),
+                                 np.arange(0, X.shape[0] * n_neighbors + 1, n_neighbors)),
+                                shape=(X.shape[0], X.shape[0]))
     W = 0.5 * (W + W.T)
     d = np.sum(W, axis=1)
     # Convert np.matrix to np.array
     d = np.array(d).reshape(-1)
     d = np.power(d, -0.5)
     D = scipy.sparse.diags(d)
-    similarity_matrix = D @ W @ D
+    similarity_matrix = (D @ W @ D).tocsr()
     return similarity_matrix
 
 
@@ -247,6 +310,11 @@ class SpecialK(BaseEstimator, ClusterMixin):
         Smaller values for n_cluster_pairs_to_consider will decrease the computing time (default: 10)
     max_n_clusters : int
         Maximum number of clusters. Must be larger than n_clusters_init (default: np.inf)
+    neighbors_algorithm : str
+        The algorithm used to compute the nearest neighbors for the similarity matrix. Can be 'auto', 'ball_tree', 'kd_tree' or 'brute' (see sklearn.neighbors.NearestNeighbors).
+        Can also be an (unfitted) object that provides fit(X) and kneighbors(X, n_neighbors) like sklearn.neighbors.NearestNeighbors, e.g., an approximate nearest neighbor index,
+        or a NeighborGraph (see clustpy.utils.NeighborGraph) that has been fitted on X.
+        Only relevant if similarity_matrix is 'NAM' or 'SAM' (default: 'auto')
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution (default: None)
     debug : bool
@@ -267,7 +335,8 @@ class SpecialK(BaseEstimator, ClusterMixin):
 
     def __init__(self, significance: float = 0.01, n_dimensions: int = 200, similarity_matrix: str = 'NAM',
                  n_neighbors: int = 10, percentage: float = 0.99, n_cluster_pairs_to_consider: int = 10,
-                 max_n_clusters: int = np.inf, random_state: np.random.RandomState = None, debug: bool = False):
+                 max_n_clusters: int = np.inf, neighbors_algorithm: str = "auto",
+                 random_state: np.random.RandomState = None, debug: bool = False):
         self.significance = significance
         self.n_dimensions = n_dimensions
         self.similarity_matrix = similarity_matrix
@@ -275,6 +344,7 @@ class SpecialK(BaseEstimator, ClusterMixin):
         self.percentage = percentage
         self.n_cluster_pairs_to_consider = n_cluster_pairs_to_consider
         self.max_n_clusters = max_n_clusters
+        self.neighbors_algorithm = neighbors_algorithm
         self.random_state = check_random_state(random_state)
         self.debug = debug
 
@@ -297,7 +367,7 @@ class SpecialK(BaseEstimator, ClusterMixin):
         """
         n_clusters, labels = _specialk(X, self.significance, self.n_dimensions, self.similarity_matrix,
                                        self.n_neighbors, self.percentage, self.n_cluster_pairs_to_consider,
-                                       self.max_n_clusters, self.random_state, self.debug)
+                                       self.max_n_clusters, self.neighbors_algorithm, self.random_state, self.debug)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         return self
@@ -134,6 +134,10 @@ class SubKmeans(BaseEstimator, ClusterMixin):
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
     debug : bool
         If true, additional information will be printed to the console (default: False)
+    n_jobs : int
+        Number of SubKmeans executions (see n_init) that run concurrently.
+        The workers are separate processes, which access the data set through a memmap.
+        The result is equal to the one of a serial execution. -1 uses all available cores (default: None)
 
     Attributes
     ----------
@@ -158,7 +162,7 @@ class SubKmeans(BaseEstimator, ClusterMixin):
                  cluster_centers: np.ndarray = None, mdl_for_noisespace: bool = False, outliers: bool = False,
                  max_iter: int = 300, n_init: int = 1, cost_type: str = "default",
                  threshold_negative_eigenvalue: float = -1e-7, max_distance: float = None, precision: float = None,
-                 random_state: np.random.RandomState = None, debug: bool = False):
+                 random_state: np.random.RandomState = None, debug: bool = False, n_jobs: int = None):
         # Fixed attributes
         self.max_iter = max_iter
         self.n_init = n_init
@@ -169,6 +173,7 @@ class SubKmeans(BaseEstimator, ClusterMixin):
         self.max_distance = max_distance
         self.precision = precision
         self.debug = debug
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
         # Variables
         self.n_clusters = n_clusters
@@ -204,10 +209,10 @@ class SubKmeans(BaseEstimator, ClusterMixin):
             cluster_centers = self.cluster_centers
         nrkmeans = NrKmeans(n_clusters, V=self.V, m=m, P=P, cluster_centers=cluster_centers,
                             mdl_for_noisespace=self.mdl_for_noisespace, outliers=self.outliers,
-                            max_iter=self.max_iter, n_init=self.n_init,
+                            max_iter=self.max_iter, n_init=self.n_init, cost_type=self.cost_type,
                             threshold_negative_eigenvalue=self.threshold_negative_eigenvalue,
-                            max_distance=self.max_distance,
-                            precision=self.precision, random_state=self.random_state, debug=self.debug)
+                            max_distance=self.max_distance, precision=self.precision,
+                            random_state=self.random_state, debug=self.debug, n_jobs=self.n_jobs)
         nrkmeans.fit(X)
         # Adjust rotation to match SubKmeans properties
         if len(nrkmeans.P) == 2:
@@ -32,3 +32,33 @@ def test_simple_DipMeans():
     assert dipmeans.cluster_centers_.shape == (dipmeans.n_clusters_, X.shape[1])
     assert len(np.unique(dipmeans.labels_)) == dipmeans.n_clusters_
     assert np.array_equal(np.unique(dipmeans.labels_), np.arange(dipmeans.n_clusters_))
+
+
+def test_DipMeans_with_n_viewers():
+    X, labels = make_blobs(500, 4, centers=3, random_state=1)
+    dipmeans = DipMeans(n_viewers=50, random_state=1)
+    dipmeans.fit(X)
+    assert dipmeans.labels_.dtype == np.int32
+    assert dipmeans.labels_.shape == labels.shape
+    assert dipmeans.n_clusters_ == 3
+    # Test if random state is working
+    dipmeans2 = DipMeans(n_viewers=50, random_state=1)
+    dipmeans2.fit(X)
+    assert np.array_equal(dipmeans.labels_, dipmeans2.labels_)
+    # If n_viewers is larger than the number of points, the result should equal the one of the regular DipMeans
+    dipmeans_all = DipMeans(random_state=1).fit(X)
+    dipmeans_large = DipMeans(n_viewers=X.shape[0], random_state=1).fit(X)
+    assert np.array_equal(dipmeans_all.labels_, dipmeans_large.labels_)
+
+
+def test_DipMeans_with_local_split_strategy():
+    X, labels = make_blobs(500, 4, centers=3, random_state=1)
+    dipmeans = DipMeans(split_strategy="local", n_jobs=2, random_state=1)
+    dipmeans.fit(X)
+    assert dipmeans.labels_.shape == labels.shape
+    assert dipmeans.cluster_centers_.shape == (dipmeans.n_clusters_, X.shape[1])
+    assert np.array_equal(np.unique(dipmeans.labels_), np.arange(dipmeans.n_clusters_))
+    # Concurrent split trials do not change the result
+    dipmeans2 = DipMeans(split_strategy="local", random_state=1)
+    dipmeans2.fit(X)
+    assert np.array_equal(dipmeans.labels_, dipmeans2.labels_)
@@ -70,6 +70,33 @@ def test_simple_GapStatistic():
     assert np.array_equal(np.unique(gapstat.labels_), np.arange(gapstat.n_clusters_))
 
 
+def test_GapStatistic_parallel_warm_start_and_early_stopping():
+    X, labels = make_blobs(200, 4, centers=3, random_state=1)
+    gapstat = GapStatistic(max_n_clusters=6, random_state=1)
+    gapstat.fit(X)
+    # Result should not depend on n_jobs
+    gapstat_parallel = GapStatistic(max_n_clusters=6, n_jobs=2, random_state=1)
+    gapstat_parallel.fit(X)
+    assert gapstat.n_clusters_ == gapstat_parallel.n_clusters_
+    assert np.array_equal(gapstat.labels_, gapstat_parallel.labels_)
+    assert np.array_equal(gapstat.gaps_, gapstat_parallel.gaps_)
+    assert np.array_equal(gapstat.sks_, gapstat_parallel.sks_)
+    # Early stopping does not change the result but skips the remaining numbers of clusters
+    gapstat_early = GapStatistic(max_n_clusters=6, early_stopping=True, random_state=1)
+    gapstat_early.fit(X)
+    assert gapstat.n_clusters_ == gapstat_early.n_clusters_
+    assert np.array_equal(gapstat.labels_, gapstat_early.labels_)
+    n_calculated = gapstat.n_clusters_ + 1  # min_n_clusters is 1
+    assert np.array_equal(gapstat.gaps_[:n_calculated], gapstat_early.gaps_[:n_calculated])
+    assert np.all(np.isnan(gapstat_early.gaps_[n_calculated:]))
+    # Warm start
+    gapstat_warm = GapStatistic(max_n_clusters=6, warm_start=True, random_state=1)
+    gapstat_warm.fit(X)
+    assert gapstat_warm.labels_.shape == labels.shape
+    assert np.array_equal(np.unique(gapstat_warm.labels_), np.arange(gapstat_warm.n_clusters_))
+    assert not np.any(np.isnan(gapstat_warm.gaps_))
+
+
 @patch("matplotlib.pyplot.show")  # Used to test plots (show will not be called)
 def test_plot_gapstatistic(mock_fig):
     X, labels = make_blobs(200, 4, centers=3, random_state=1)
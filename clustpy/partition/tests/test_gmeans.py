@@ -46,3 +46,16 @@ def test_simple_GMeans():
     assert gmeans.cluster_centers_.shape == (gmeans.n_clusters_, X.shape[1])
     assert len(np.unique(gmeans.labels_)) == gmeans.n_clusters_
     assert np.array_equal(np.unique(gmeans.labels_), np.arange(gmeans.n_clusters_))
+
+
+def test_GMeans_parallel():
+    X, labels = make_blobs(500, 4, centers=5, random_state=1)
+    gmeans = GMeans(random_state=1)
+    gmeans.fit(X)
+    # Result should be equal for all backends and numbers of jobs
+    for backend in ["threads", "processes"]:
+        gmeans_parallel = GMeans(random_state=1, n_jobs=2, backend=backend)
+        gmeans_parallel.fit(X)
+        assert gmeans.n_clusters_ == gmeans_parallel.n_clusters_
+        assert np.array_equal(gmeans.labels_, gmeans_parallel.labels_)
+        assert np.array_equal(gmeans.cluster_centers_, gmeans_parallel.cluster_centers_)
@@ -1,8 +1,10 @@
 import numpy as np
 from clustpy.partition import PGMeans
-from clustpy.partition.pgmeans import _initial_gmm_clusters, _update_gmm_with_new_center, _project_model
+from clustpy.partition.pgmeans import _initial_gmm_clusters, _update_gmm_with_new_center, _project_model, \
+    _project_model_parameters, _ks_test_projected_gmm
 from sklearn.datasets import make_blobs
 from sklearn.mixture import GaussianMixture as GMM
+from scipy.stats import kstest, norm
 
 
 def test_project_model():
@@ -29,38 +31,33 @@ def test_project_model():
 
 def test_update_gmm_with_new_center():
     random_state = np.random.RandomState(1)
-    X = np.array([[1, 2, 3],
-                  [3, 1, 2],
-                  [2, 3, 1],
-                  [1, 1, 1],
-                  [3, 3, 3],
-                  [11, 12, 13],
-                  [13, 11, 12],
-                  [12, 13, 11],
-                  [11, 11, 11],
-                  [13, 13, 13],
-                  [12, 12, 12],
-                  [41, 42, 43],
-                  [43, 41, 42],
-                  [42, 43, 41],
-                  [41, 41, 41],
-                  [43, 43, 43],
-                  [43, 42, 43],
-                  [41, 42, 41]])
+    X = np.r_[random_state.normal(2, 1, (50, 3)), random_state.normal(12, 1, (50, 3)),
+              random_state.normal(42, 1, (50, 3))]
     gmm = GMM(n_components=2, n_init=1, random_state=random_state)
     gmm.fit(X)
     assert gmm.means_.shape == (2, 3)
     updated_gmm = _update_gmm_with_new_center(X, 3, gmm, 3, 3, random_state)
     assert updated_gmm.means_.shape == (3, 3)
-    assert np.allclose(updated_gmm.means_[0], [2, 2, 2]) or np.allclose(updated_gmm.means_[1],
-                                                                              [2, 2, 2]) or np.allclose(
-        updated_gmm.means_[2], [2, 2, 2])
-    assert np.allclose(updated_gmm.means_[0], [12, 12, 12]) or np.allclose(updated_gmm.means_[1],
-                                                                                 [12, 12, 12]) or np.allclose(
-        updated_gmm.means_[2], [12, 12, 12])
-    assert np.allclose(updated_gmm.means_[0], [42, 42, 42]) or np.allclose(updated_gmm.means_[1],
-                                                                                 [42, 42, 42]) or np.allclose(
-        updated_gmm.means_[2], [42, 42, 42])
+    # The GMM with the highest log-likelihood separates all three clusters
+    for center in [[2, 2, 2], [12, 12, 12], [42, 42, 42]]:
+        assert np.any([np.allclose(updated_gmm.means_[i], center, atol=0.5) for i in range(3)])
+
+
+def test_ks_test_projected_gmm():
+    random_state = np.random.RandomState(1)
+    X, _ = make_blobs(200, 4, centers=3, random_state=1)
+    gmm = GMM(n_components=3, n_init=1, random_state=random_state)
+    gmm.fit(X)
+    projection_vectors = random_state.rand(5, X.shape[1])
+    proj_means, proj_stds = _project_model_parameters(gmm, projection_vectors)
+    for p in range(projection_vectors.shape[0]):
+        projected_X = np.matmul(X, projection_vectors[p])
+        ks_statistic, p_value = _ks_test_projected_gmm(projected_X, gmm.weights_, proj_means[:, p], proj_stds[:, p])
+        # Compare with the one-sample test of scipy using the CDF of the projected mixture
+        mixture_cdf = lambda x: norm.cdf((x[:, None] - proj_means[:, p]) / proj_stds[:, p]) @ gmm.weights_
+        scipy_result = kstest(projected_X, mixture_cdf, method="exact")
+        assert np.isclose(ks_statistic, scipy_result.statistic)
+        assert np.isclose(p_value, scipy_result.pvalue)
 
 
 def test_initial_gmm_clusters():
@@ -113,3 +110,24 @@ def test_simple_PGMeans():
     assert pgmeans.cluster_centers_.shape == (pgmeans.n_clusters_, X.shape[1])
     assert len(np.unique(pgmeans.labels_)) == pgmeans.n_clusters_
     assert np.array_equal(np.unique(pgmeans.labels_), np.arange(pgmeans.n_clusters_))
+
+
+def test_PGMeans_analytic_ks_strategy():
+    X, labels = make_blobs(200, 4, centers=3, random_state=1)
+    pgmeans = PGMeans(random_state=1, ks_strategy="analytic")
+    pgmeans.fit(X)
+    assert pgmeans.labels_.dtype == np.int32
+    assert pgmeans.labels_.shape == labels.shape
+    assert pgmeans.cluster_centers_.shape == (pgmeans.n_clusters_, X.shape[1])
+    assert np.array_equal(np.unique(pgmeans.labels_), np.arange(pgmeans.n_clusters_))
+    # Test if random state is working
+    pgmeans2 = PGMeans(random_state=1, ks_strategy="analytic")
+    pgmeans2.fit(X)
+    assert pgmeans.n_clusters_ == pgmeans2.n_clusters_
+    assert np.array_equal(pgmeans.labels_, pgmeans2.labels_)
+    # Well-separated clusters should be identified correctly
+    X, labels = make_blobs(300, 4, centers=[[0, 0, 0, 0], [20, 0, 0, 0], [0, 20, 0, 0]], cluster_std=1,
+                           random_state=1)
+    pgmeans = PGMeans(random_state=1, ks_strategy="analytic")
+    pgmeans.fit(X)
+    assert pgmeans.n_clusters_ == 3
@@ -1,5 +1,7 @@
 import numpy as np
 from clustpy.partition import SkinnyDip, UniDip
+from clustpy.partition.skinnydip import _SortedDipIntervals, _dip_mirrored_data
+from clustpy.utils import dip_test
 from sklearn.datasets import make_blobs
 
 """
@@ -7,6 +9,31 @@ Tests regarding the SkinnyDip object
 """
 
 
+def test_sorted_dip_intervals():
+    X = np.sort(np.r_[np.random.RandomState(1).normal(0, 1, 100), np.random.RandomState(2).normal(5, 1, 100)])
+    dip_intervals = _SortedDipIntervals(X)
+    dip_value, modal_interval = dip_intervals.dip(20, 150)
+    dip_value_orig, modal_interval_orig, _ = dip_test(X[20:150], just_dip=False, is_data_sorted=True)
+    assert dip_value == dip_value_orig
+    assert modal_interval == modal_interval_orig
+    assert (20, 150) in dip_intervals._shared["dips"]
+    # Sub-ranges use the same memoized results
+    dip_intervals_sub = dip_intervals.subrange(10, 160)
+    assert np.array_equal(dip_intervals_sub.X_1d_sorted, X[10:160])
+    assert dip_intervals_sub.dip(10, 140) == (dip_value, modal_interval)
+    assert len(dip_intervals._shared["dips"]) == 1
+    # Mirrored data
+    assert dip_intervals_sub.mirrored_dip(5, 100, None) == _dip_mirrored_data(X[15:110], None)
+    # Multiple (overlapping) intervals are evaluated at once
+    dip_intervals_sub.prefetch_dips([(10, 140), (0, 120), (50, 150), (0, 120)])
+    assert len(dip_intervals._shared["dips"]) == 3
+    for start, end in [(10, 130), (60, 160)]:
+        dip_value_orig, modal_interval_orig, _ = dip_test(X[start:end], just_dip=False, is_data_sorted=True)
+        assert np.isclose(dip_intervals.dip(start, end)[0], dip_value_orig)
+        assert dip_intervals.dip(start, end)[1] == modal_interval_orig
+    assert len(dip_intervals._shared["dips"]) == 3
+
+
 def test_simple_SkinnyDip():
     X, labels = make_blobs(200, 4, centers=3, random_state=1)
     skinny = SkinnyDip(random_state=1)
@@ -51,3 +78,21 @@ def test_simple_UniDip():
     assert unidip.labels_.shape == labels.shape
     assert len(np.unique(unidip.labels_)) == unidip.n_clusters_
     assert np.array_equal(np.unique(unidip.labels_), np.arange(unidip.n_clusters_))
+
+
+def test_SkinnyDip_parallel():
+    X, labels = make_blobs(500, 4, centers=4, random_state=1)
+    skinny = SkinnyDip(random_state=1)
+    skinny.fit(X)
+    # Result should be equal for all numbers of jobs
+    skinny_parallel = SkinnyDip(random_state=1, n_jobs=2)
+    skinny_parallel.fit(X)
+    assert skinny.n_clusters_ == skinny_parallel.n_clusters_
+    assert np.array_equal(skinny.labels_, skinny_parallel.labels_)
+    # Also when bootstrapping
+    skinny = SkinnyDip(pval_strategy="bootstrap", n_boots=20, add_tails=True, random_state=1)
+    skinny.fit(X)
+    skinny_parallel = SkinnyDip(pval_strategy="bootstrap", n_boots=20, add_tails=True, random_state=1, n_jobs=2)
+    skinny_parallel.fit(X)
+    assert skinny.n_clusters_ == skinny_parallel.n_clusters_
+    assert np.array_equal(skinny.labels_, skinny_parallel.labels_)
@@ -1,6 +1,7 @@
 import numpy as np
 from clustpy.partition import SpecialK
-from clustpy.partition.specialk import _get_neighborhood_adjacency_matrix
+from clustpy.partition.specialk import _get_neighborhood_adjacency_matrix, _get_nearest_neighbors
+from clustpy.utils import NeighborGraph
 from sklearn.datasets import make_blobs
 
 """
@@ -31,3 +32,52 @@ def test_simple_SpecialK():
     assert specialk.labels_.shape == labels.shape
     assert len(np.unique(specialk.labels_)) == specialk.n_clusters_
     assert np.array_equal(np.unique(specialk.labels_), np.arange(specialk.n_clusters_))
+
+
+def test_get_nearest_neighbors_with_duplicates():
+    from sklearn.neighbors import NearestNeighbors
+    X, _ = make_blobs(100, 3, centers=2, random_state=1)
+    # Duplicates can be returned before the object itself
+    X = np.r_[X, X[:20], X[:20]]
+    knn_distances, knn_ids, _ = _get_nearest_neighbors(X, 5, "brute")
+    knn_distances_custom, knn_ids_custom, _ = _get_nearest_neighbors(X, 5, NearestNeighbors(algorithm="brute"))
+    assert knn_ids_custom.shape == (X.shape[0], 5)
+    assert not np.any(knn_ids_custom == np.arange(X.shape[0])[:, None])
+    assert np.allclose(knn_distances_custom, knn_distances)
+
+
+def test_get_neighborhood_adjacency_matrix():
+    from scipy.spatial.distance import pdist, squareform
+    from sklearn.neighbors import NearestNeighbors
+    X, _ = make_blobs(200, 3, centers=2, random_state=1)
+    # Compare to the result using the full distance matrix
+    dist_matrix = squareform(pdist(X))
+    eps = np.sort(np.sort(dist_matrix, axis=1)[:, 6])[int((X.shape[0] - 1) * 0.9)]
+    expected = (dist_matrix <= eps) & ~np.eye(X.shape[0], dtype=bool)
+    for neighbors_algorithm in ["auto", "kd_tree", "ball_tree", NearestNeighbors()]:
+        similarity_matrix = _get_neighborhood_adjacency_matrix(X, 0.9, 5, neighbors_algorithm)
+        assert np.array_equal(similarity_matrix.toarray() == 1, expected)
+
+
+def test_SpecialK_with_neighbors_algorithm():
+    from sklearn.neighbors import NearestNeighbors
+    X, labels = make_blobs(250, 4, centers=3, random_state=1)
+    specialk = SpecialK(random_state=1).fit(X)
+    for neighbors_algorithm in ["ball_tree", NearestNeighbors(algorithm="kd_tree")]:
+        specialk2 = SpecialK(neighbors_algorithm=neighbors_algorithm, random_state=1).fit(X)
+        assert specialk.n_clusters_ == specialk2.n_clusters_
+        assert np.array_equal(specialk.labels_, specialk2.labels_)
+    specialk_sam = SpecialK(similarity_matrix="SAM", neighbors_algorithm=NearestNeighbors(), max_n_clusters=5,
+                            random_state=1).fit(X)
+    assert specialk_sam.labels_.shape == labels.shape
+
+
+def test_SpecialK_with_neighbor_graph():
+    X, labels = make_blobs(250, 4, centers=3, random_state=1)
+    neighbor_graph = NeighborGraph(11).fit(X)
+    for similarity_matrix in ["NAM", "SAM"]:
+        specialk = SpecialK(similarity_matrix=similarity_matrix, max_n_clusters=5, random_state=1).fit(X)
+        specialk2 = SpecialK(similarity_matrix=similarity_matrix, max_n_clusters=5, neighbors_algorithm=neighbor_graph,
+                             random_state=1).fit(X)
+        assert specialk.n_clusters_ == specialk2.n_clusters_
+        assert np.array_equal(specialk.labels_, specialk2.labels_)
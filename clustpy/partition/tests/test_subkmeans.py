@@ -66,6 +66,11 @@ def test_simple_subkmeans():
     assert not hasattr(subkm_2, "labels_")
     subkm_2.fit(X)
     assert subkm_2.labels_.shape == labels.shape
+    # Test parallel execution
+    subkm_3 = SubKmeans(3, n_init=3, random_state=1).fit(X)
+    subkm_3_parallel = SubKmeans(3, n_init=3, n_jobs=2, random_state=1).fit(X)
+    assert np.array_equal(subkm_3.labels_, subkm_3_parallel.labels_)
+    assert np.array_equal(subkm_3.V, subkm_3_parallel.V)
 
 
 @patch("matplotlib.pyplot.show")  # Used to test plots (show will not be called)
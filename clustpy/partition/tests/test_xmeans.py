@@ -51,6 +51,14 @@ def test_execute_two_means():
     assert nmi(labels, np.array([0, 1, 1, 1, 0, 2, 2, 0, 2, 2, 0]))
     assert np.array_equal(centers, np.array([[51.5, 51.5], [2, 2], [12.5, 12.5]])) or np.array_equal(centers, np.array(
         [[51.5, 51.5], [12.5, 12.5], [2, 2]]))
+    # Local split strategy and concurrent trials
+    for split_strategy in ["global", "local"]:
+        centers = np.array([[51.5, 51.5], [8, 8]])
+        labels, centers, _ = _execute_two_means(X, ids_in_each_cluster, cluster_id_to_split, centers, 10,
+                                                np.random.RandomState(1), split_strategy, n_jobs=2)
+        assert nmi(labels, np.array([0, 1, 1, 1, 0, 2, 2, 0, 2, 2, 0])) == 1
+        assert np.array_equal(centers, np.array([[51.5, 51.5], [2, 2], [12.5, 12.5]])) or np.array_equal(
+            centers, np.array([[51.5, 51.5], [12.5, 12.5], [2, 2]]))
 
 
 def test_merge_clusters():
@@ -7,8 +7,14 @@ from sklearn.cluster import KMeans
 import numpy as np
 from sklearn.base import BaseEstimator, ClusterMixin
 from sklearn.utils import check_random_state
+from joblib import Parallel, delayed
 from clustpy.utils._information_theory import bic_costs
 
+"""
+Maximum number of iterations of the global KMeans that refines a split if split_strategy is 'local'
+"""
+_LOCAL_SPLIT_REFINEMENT_MAX_ITER = 20
+
 """
 HELPERS also used by other classes
 """
@@ -59,13 +65,114 @@ def _initial_kmeans_clusters(X: np.ndarray, n_clusters_init: int, random_state:
     return n_clusters, labels, centers, kmeans_error
 
 
+def _fit_kmeans_with_init(X: np.ndarray, init: np.ndarray, random_state: np.random.RandomState,
+                          max_iter: int = 300) -> KMeans:
+    """
+    Execute KMeans using the given initial cluster centers.
+    Since the initial centers are given, the random state is not changed, so multiple calls can be executed concurrently.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    init : np.ndarray
+        The initial cluster centers
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+    max_iter : int
+        Maximum number of KMeans iterations (default: 300)
+
+    Returns
+    -------
+    kmeans : KMeans
+        The fitted KMeans object
+    """
+    kmeans = KMeans(n_clusters=init.shape[0], init=init, n_init=1, max_iter=max_iter, random_state=random_state)
+    kmeans.fit(X)
+    return kmeans
+
+
+def _get_split_trial_centers(X: np.ndarray, ids_in_cluster: np.ndarray, old_center: np.ndarray, n_split_trials: int,
+                             random_state: np.random.RandomState) -> (np.ndarray, np.ndarray):
+    """
+    Get the initial centers of the two new clusters for each split trial.
+    The first new center is a random object of the cluster and the second new center is the coordinate on the opposite site of the original center.
+    This is the only step of a split that uses the random state.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    ids_in_cluster : np.ndarray
+        The ids of the objects within the cluster that should be split
+    old_center : np.ndarray
+        The original center of the cluster
+    n_split_trials : int
+        Number tries to split a cluster
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray)
+        The first new center of each trial,
+        The second new center of each trial
+    """
+    # Get random points in cluster as new centers
+    n_split_trials = min(n_split_trials, ids_in_cluster.shape[0])
+    random_centers = X[random_state.choice(ids_in_cluster, n_split_trials, replace=False), :]
+    # Calculate second new centers as: new2 = old - (new1 - old)
+    adjusted_centers = old_center - (random_centers - old_center)
+    return random_centers, adjusted_centers
+
+
+def _get_best_kmeans_trial(X: np.ndarray, trial_centers: list, random_state: np.random.RandomState,
+                           n_jobs: int = None) -> KMeans:
+    """
+    Execute KMeans for each set of initial centers and return the result with the lowest KMeans-error.
+    The trials can be executed concurrently (using threads) without changing the result.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    trial_centers : list
+        List containing the initial cluster centers of each trial
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+    n_jobs : int
+        Number of trials that are executed concurrently. -1 uses all available cores (default: None)
+
+    Returns
+    -------
+    best_kmeans : KMeans
+        The KMeans result with the lowest KMeans-error
+    """
+    kmeans_trials = Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator")(
+        delayed(_fit_kmeans_with_init)(X, tmp_centers, random_state) for tmp_centers in trial_centers)
+    # Get Kmeans result with minimum Kmeans-error
+    best_kmeans = None
+    for kmeans in kmeans_trials:
+        # Check squared distances to find best kmeans result
+        if best_kmeans is None or kmeans.inertia_ < best_kmeans.inertia_:
+            best_kmeans = kmeans
+    return best_kmeans
+
+
 def _execute_two_means(X: np.ndarray, ids_in_each_cluster: list, cluster_id_to_split: int, centers: np.ndarray,
-                       n_split_trials: int, random_state: np.random.RandomState) -> (np.ndarray, np.ndarray, float):
+                       n_split_trials: int, random_state: np.random.RandomState, split_strategy: str = "global",
+                       n_jobs: int = None) -> (np.ndarray, np.ndarray, float):
     """
     Execute 2-Means.
     Splits a cluster into two by first selecting a random object from the data set as first new cluster and then selects the coordinate on the opposite site of the original center as the second new center.
     Afterwards, KMeans will be executed.
     This procedure is repeated n_split_trials times and the result with the lowest KMeans-error will be returned.
+    If split_strategy is 'global', KMeans is executed on the whole data set using all cluster centers in each trial.
+    If split_strategy is 'local', KMeans is executed only on the objects of the cluster that should be split using the two new centers in each trial.
+    Afterwards, the best split is refined by a single KMeans on the whole data set with a bounded number of iterations (_LOCAL_SPLIT_REFINEMENT_MAX_ITER).
+    This refinement deviates from the original procedure, which only uses the converged global KMeans of the 'global' strategy.
+    It is executed once per call, i.e., once per round of DipMeans and ProjectedDipMeans since these algorithms split a single cluster per round.
+    It is required, because the objects of the remaining clusters may change their assignment to the new clusters, and these labels are used in the next round.
 
     Parameters
     ----------
@@ -81,6 +188,10 @@ def _execute_two_means(X: np.ndarray, ids_in_each_cluster: list, cluster_id_to_s
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    split_strategy : str
+        Defines on which objects the KMeans of each trial is executed. Can be 'global' or 'local' (default: 'global')
+    n_jobs : int
+        Number of trials that are executed concurrently (using threads). -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -90,26 +201,27 @@ def _execute_two_means(X: np.ndarray, ids_in_each_cluster: list, cluster_id_to_s
         The Kmeans error of the clustering result
     """
     assert X.shape[0] >= 2, "X must contain at least 2 elements"
+    assert split_strategy in ["global", "local"], "split_strategy must be 'global' or 'local'. Your input: {0}".format(
+        split_strategy)
     # Prepare cluster for splitting
     old_center = centers[cluster_id_to_split, :]
     reduced_centers = np.delete(centers, cluster_id_to_split, axis=0)
     ids_in_cluster = ids_in_each_cluster[cluster_id_to_split]
-    # Try to find kmeans result with smallest squared distances
-    best_kmeans = None
-    # Get random points in cluster as new centers
-    n_split_trials = min(n_split_trials, ids_in_cluster.shape[0])
-    random_centers = X[random_state.choice(ids_in_cluster, n_split_trials, replace=False), :]
-    # Calculate second new centers as: new2 = old - (new1 - old)
-    adjusted_centers = old_center - (random_centers - old_center)
-    # Get Kmeans result with minimum Kmeans-error
-    for i in range(n_split_trials):
-        # Run kmeans with new centers
-        tmp_centers = np.r_[reduced_centers, [random_centers[i]], [adjusted_centers[i]]]
-        kmeans = KMeans(n_clusters=tmp_centers.shape[0], init=tmp_centers, n_init=1, random_state=random_state)
-        kmeans.fit(X)
-        # Check squared distances to find best kmeans result
-        if best_kmeans is None or kmeans.inertia_ < best_kmeans.inertia_:
-            best_kmeans = kmeans
+    random_centers, adjusted_centers = _get_split_trial_centers(X, ids_in_cluster, old_center, n_split_trials,
+                                                                random_state)
+    # Run kmeans with new centers (trials can be executed concurrently)
+    if split_strategy == "global":
+        X_trials = X
+        trial_centers = [np.r_[reduced_centers, [random_centers[i]], [adjusted_centers[i]]] for i in
+                         range(random_centers.shape[0])]
+    else:
+        X_trials = X[ids_in_cluster]
+        trial_centers = [np.array([random_centers[i], adjusted_centers[i]]) for i in range(random_centers.shape[0])]
+    best_kmeans = _get_best_kmeans_trial(X_trials, trial_centers, random_state, n_jobs)
+    if split_strategy == "local":
+        # Refine the split on the whole data set (new clusters get the largest ids)
+        best_kmeans = _fit_kmeans_with_init(X, np.r_[reduced_centers, best_kmeans.cluster_centers_], random_state,
+                                            _LOCAL_SPLIT_REFINEMENT_MAX_ITER)
     return best_kmeans.labels_, best_kmeans.cluster_centers_, best_kmeans.inertia_
 
 
@@ -119,7 +231,8 @@ Actual XMeans methods
 
 
 def _xmeans(X: np.ndarray, n_clusters_init: int, max_n_clusters: int, check_global_score: bool, allow_merging: bool,
-            n_split_trials: int, random_state: np.random.RandomState) -> (int, np.ndarray, np.ndarray):
+            n_split_trials: int, random_state: np.random.RandomState, n_jobs: int = None) -> (
+        int, np.ndarray, np.ndarray):
     """
     Start the actual XMeans clustering procedure on the input data set.
 
@@ -139,6 +252,8 @@ def _xmeans(X: np.ndarray, n_clusters_init: int, max_n_clusters: int, check_glob
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution
+    n_jobs : int
+        Number of split trials that are executed concurrently (using threads). -1 uses all available cores (default: None)
 
     Returns
     -------
@@ -179,7 +294,7 @@ def _xmeans(X: np.ndarray, n_clusters_init: int, max_n_clusters: int, check_glob
             labels_split, centers_split, split_variance = _execute_two_means(X[ids_in_cluster],
                                                                              [np.arange(original_cluster_size)], 0,
                                                                              np.array([centers[c]]), n_split_trials,
-                                                                             random_state)
+                                                                             random_state, n_jobs=n_jobs)
             # Get variance of splitted clusters
             split_variance = split_variance / (ids_in_cluster.shape[0] - 2)
             cluster_sizes_split = np.array([np.sum(labels_split == c) for c in range(2)])
@@ -360,6 +475,8 @@ class XMeans(BaseEstimator, ClusterMixin):
          Normally, if allow_merging is True, check_global_score should be False (default: False)
     n_split_trials : int
         Number tries to split a cluster. For each try 2-KMeans is executed with different cluster centers (default: 10)
+    n_jobs : int
+        Number of split trials that are executed concurrently (using threads). -1 uses all available cores (default: None)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
 
@@ -398,12 +515,14 @@ class XMeans(BaseEstimator, ClusterMixin):
     """
 
     def __init__(self, n_clusters_init: int = 2, max_n_clusters: int = np.inf, check_global_score: bool = True,
-                 allow_merging: bool = False, n_split_trials: int = 10, random_state: np.random.RandomState = None):
+                 allow_merging: bool = False, n_split_trials: int = 10, n_jobs: int = None,
+                 random_state: np.random.RandomState = None):
         self.n_clusters_init = n_clusters_init
         self.max_n_clusters = max_n_clusters
         self.check_global_score = check_global_score
         self.allow_merging = allow_merging
         self.n_split_trials = n_split_trials
+        self.n_jobs = n_jobs
         self.random_state = check_random_state(random_state)
 
     def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'XMeans':
@@ -424,7 +543,8 @@ class XMeans(BaseEstimator, ClusterMixin):
             this instance of the XMeans algorithm
         """
         n_clusters, labels, centers = _xmeans(X, self.n_clusters_init, self.max_n_clusters, self.check_global_score,
-                                              self.allow_merging, self.n_split_trials, self.random_state)
+                                              self.allow_merging, self.n_split_trials, self.random_state,
+                                              self.n_jobs)
         self.n_clusters_ = n_clusters
         self.labels_ = labels
         self.cluster_centers_ = centers
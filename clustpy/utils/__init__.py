@@ -1,6 +1,7 @@
 from .evaluation import load_saved_autoencoder, evaluate_dataset, evaluate_multiple_datasets, EvaluationDataset, \
-    EvaluationAlgorithm, EvaluationMetric, EvaluationAutoencoder, evaluation_df_to_latex_table
-from .diptest import dip_test, dip_pval, dip_boot_samples, dip_gradient, dip_pval_gradient, plot_dip
+    EvaluationAlgorithm, EvaluationMetric, EvaluationAutoencoder, EvaluationResultStore, evaluation_df_to_latex_table
+from .diptest import dip_test, dip_test_batch, dip_pval, dip_boot_samples, dip_gradient, dip_pval_gradient, plot_dip
+from .neighbor_graph import NeighborGraph
 from .plots import plot_with_transformation, plot_image, plot_scatter_matrix, plot_histogram, plot_1d_data, \
     plot_2d_data, plot_3d_data
 
@@ -10,8 +11,10 @@ __all__ = ['evaluate_dataset',
            'EvaluationAlgorithm',
            'EvaluationDataset',
            'EvaluationAutoencoder',
+           'EvaluationResultStore',
            'load_saved_autoencoder',
            'dip_test',
+           'dip_test_batch',
            'dip_pval',
            'dip_boot_samples',
            'plot_with_transformation',
@@ -24,4 +27,5 @@ __all__ = ['evaluate_dataset',
            'dip_gradient',
            'dip_pval_gradient',
            'plot_dip',
+           'NeighborGraph',
            'evaluation_df_to_latex_table']
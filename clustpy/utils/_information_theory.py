@@ -250,6 +250,34 @@ def mdl_costs_gaussian_spherical_covariance(n_dims: int, scatter_matrix_cluster:
         rotation = np.identity(scatter_matrix_cluster.shape[0])
     # Calculate the actual costs
     trace = np.trace(np.matmul(np.matmul(rotation.transpose(), scatter_matrix_cluster), rotation))
+    pdf_costs = mdl_costs_gaussian_spherical_covariance_from_trace(n_dims, trace, n_points_in_cluster)
+    return pdf_costs
+
+
+def mdl_costs_gaussian_spherical_covariance_from_trace(n_dims: int, trace: float, n_points_in_cluster: int) -> float:
+    """
+    Calculate the coding costs of all points within a single Gaussian cluster.
+    This Gaussian has the same variance for each feature and no covariances.
+    In this case, the costs only depend on the trace of the (rotated) scatter matrix.
+    Since the trace equals the sum of the variances of the single dimensions, it can be updated incrementally when dimensions are added or removed.
+
+    Parameters
+    ----------
+    n_dims : int
+        Number of features
+    trace : float
+        The trace of the (rotated) scatter matrix of the cluster
+    n_points_in_cluster : int
+        The number of samples in the cluster
+
+    Returns
+    -------
+    pdf_costs : float
+        The encoding costs for all points in the cluster
+    """
+    # If only one point is in this cluster it is already encoded with the center
+    if n_points_in_cluster <= 1 or n_dims == 0:
+        return 0
     assert trace >= -1e-15, "Trace can not be negative! Trace is {0}".format(trace)
     # Can occur if all points in this cluster lie on the same position
     if trace <= 1e-15:
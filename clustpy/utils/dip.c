@@ -319,8 +319,61 @@ static PyObject *method_c_diptest(PyObject *self, PyObject *args) {
   return PyFloat_FromDouble(dip_value);
 }
 
+/*
+Batched version of c_diptest. The samples are stored consecutively in one sorted array and sample i is given by
+x[offsets[i]:offsets[i+1]]. The scratch arrays (gcm, lcm, mn, mj) are allocated once for the largest sample and
+reused for all samples. The GIL is released during the calculation.
+*/
+static PyObject *method_c_diptest_batch(PyObject *self, PyObject *args) {
+  // Needed variables
+  PyArrayObject *py_x, *py_offsets, *py_dips, *py_low_high, *py_modaltriangle;
+  double *c_x, *c_dips;
+  long long *c_offsets;
+  int *c_low_high, *c_modaltriangle, *c_gcm, *c_lcm, *c_mn, *c_mj;
+  int n_samples, debug, i, n, max_n = 0;
+  // Convert input parameters to C PyObejects
+  if (!PyArg_ParseTuple(args, "O!O!O!O!O!ii", &PyArray_Type, &py_x, &PyArray_Type, &py_offsets, &PyArray_Type, &py_dips, &PyArray_Type, &py_low_high, &PyArray_Type, &py_modaltriangle, &n_samples, &debug)) {
+    return NULL;
+  }
+  // Convert PyObjects to C arrays
+  c_x = (double*)py_x->data;
+  c_offsets = (long long*)py_offsets->data;
+  c_dips = (double*)py_dips->data;
+  c_low_high = (int*)py_low_high->data;
+  c_modaltriangle = (int*)py_modaltriangle->data;
+  // Allocate scratch arrays once using the size of the largest sample
+  for (i = 0; i < n_samples; ++i) {
+    n = (int)(c_offsets[i + 1] - c_offsets[i]);
+    if (n > max_n) max_n = n;
+  }
+  if (max_n < 1) max_n = 1;
+  c_gcm = (int*)malloc(4 * (size_t)max_n * sizeof(int));
+  if (c_gcm == NULL) {
+    return PyErr_NoMemory();
+  }
+  c_lcm = c_gcm + max_n;
+  c_mn = c_lcm + max_n;
+  c_mj = c_mn + max_n;
+  // Execute C diptest method for each sample
+  Py_BEGIN_ALLOW_THREADS
+  for (i = 0; i < n_samples; ++i) {
+    n = (int)(c_offsets[i + 1] - c_offsets[i]);
+    if (n == 0) {
+      // Empty samples would result in a division by zero
+      c_dips[i] = 0.;
+      continue;
+    }
+    c_dips[i] = fast_diptest(c_x + c_offsets[i], c_low_high + 2 * i, c_modaltriangle + 3 * i, c_gcm, c_lcm, c_mn,
+                             c_mj, n, debug);
+  }
+  Py_END_ALLOW_THREADS
+  free(c_gcm);
+  Py_RETURN_NONE;
+}
+
 static PyMethodDef diptestMethods[] = {
   {"c_diptest", method_c_diptest, METH_VARARGS, "Function for calculating the dip value in c"},
+  {"c_diptest_batch", method_c_diptest_batch, METH_VARARGS, "Function for calculating multiple dip values in c"},
   {NULL, NULL, 0, NULL}
 };
 
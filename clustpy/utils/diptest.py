@@ -2,10 +2,28 @@ try:
     from clustpy.utils.dipModule import c_diptest  # noqa - Import from C file (could be marked as unresolved)
 except:
     print("[WARNING] Could not import c_diptest in clustpy.utils.dipModule")
+try:
+    from clustpy.utils.dipModule import c_diptest_batch  # noqa - Import from C file (could be marked as unresolved)
+except ImportError:
+    # E.g., an older build of the C extension -> dip_test_batch calls dip_test for each sample
+    c_diptest_batch = None
 import numpy as np
 import matplotlib.pyplot as plt
+import os
+from collections import OrderedDict
 from clustpy.utils.plots import plot_histogram
 from sklearn.utils import check_random_state
+from joblib import Parallel, delayed
+
+"""
+Maximum number of bootstrapped null distributions that are kept in memory (see dip_boot_samples)
+"""
+_DIP_BOOT_CACHE_SIZE = 32
+_DIP_BOOT_CACHE = OrderedDict()
+"""
+Approximate number of random values that are processed within a single call of dip_test_batch when bootstrapping
+"""
+_DIP_BOOT_BATCH_ELEMENTS = 1000000
 
 
 def dip_test(X: np.ndarray, just_dip: bool = True, is_data_sorted: bool = False, return_gcm_lcm_mn_mj: bool = False,
@@ -116,13 +134,115 @@ def _dip_c_impl(X: np.ndarray, debug: bool) -> (float, tuple, tuple, np.ndarray,
     lcm = np.zeros(X.shape, dtype=np.int32)
     mj = np.zeros(X.shape, dtype=np.int32)
     mn = np.zeros(X.shape, dtype=np.int32)
-    # Execute C function
-    dip_value = c_diptest(X.astype(np.float64), modal_interval, modal_triangle, gcm, lcm, mn, mj, X.shape[0],
+    # Execute C function (contiguous float64 views, e.g. slices of sorted data, are passed without copying)
+    dip_value = c_diptest(np.ascontiguousarray(X, dtype=np.float64), modal_interval, modal_triangle, gcm, lcm, mn, mj, X.shape[0],
                           1 if debug else 0)
     return dip_value, (modal_interval[0], modal_interval[1]), (
         modal_triangle[0], modal_triangle[1], modal_triangle[2]), gcm, lcm, mn, mj
 
 
+def dip_test_batch(X: np.ndarray, offsets: np.ndarray = None, just_dip: bool = True, is_data_sorted: bool = False,
+                   use_c: bool = True, debug: bool = False) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Calculate the Dip-values of multiple univariate samples using a single call of the C implementation.
+    Compared to calling dip_test for each sample separately, the samples are sorted at once and the internal arrays of the C implementation are reused for all samples.
+    The samples can either be given as a 2-dimensional array, where each row corresponds to a sample, or as a ragged layout consisting of a 1-dimensional array containing the values of all samples and the offsets of the samples within this array.
+    In the latter case, sample i is given by X[offsets[i]:offsets[i + 1]].
+    Note that the modal intervals and modal triangles refer to the indices within the sorted samples and that a modal triangle can be (-1,-1,-1) if the triangle could not be determined correctly.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given samples, either a 2-dimensional array (one sample per row) or a 1-dimensional array in combination with offsets
+    offsets : np.ndarray
+        the start positions of the samples within X followed by the total number of values, i.e., an array of size n_samples + 1. Must be None if X is 2-dimensional (default: None)
+    just_dip : bool
+        Defines whether only the Dip-values should be returned or also the modal intervals and modal triangles (default: True)
+    is_data_sorted : bool
+        Should be True if each sample is already sorted (default: False)
+    use_c : bool
+        Defines whether the C implementation should be used (defualt: True)
+    debug : bool
+        If true, additional information will be printed to the console (default: False)
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray, np.ndarray)
+        The resulting Dip-values,
+        The indices of the modal intervals (if just_dip is False), array of shape (n_samples x 2),
+        The indices of the modal triangles (if just_dip is False), array of shape (n_samples x 3)
+    """
+    assert just_dip or is_data_sorted == True, "Data must be sorted if modal interval and/or modal triangle should be returned (else indices will not match)"
+    X, offsets = _get_dip_batch_layout(X, offsets, is_data_sorted)
+    n_samples = offsets.shape[0] - 1
+    dip_values = np.zeros(n_samples, dtype=np.float64)
+    modal_intervals = np.zeros((n_samples, 2), dtype=np.int32)
+    modal_intervals[:, 1] = np.diff(offsets) - 1
+    modal_triangles = -np.ones((n_samples, 3), dtype=np.int32)
+    if n_samples > 0:
+        c_failed = False
+        if use_c and c_diptest_batch is not None:
+            try:
+                c_diptest_batch(X, offsets, dip_values, modal_intervals, modal_triangles, n_samples, 1 if debug else 0)
+            except Exception as e:
+                print("[WARNING] C implementation can not be used for dip calculation.")
+                print(e)
+                c_failed = True
+        if not use_c or c_diptest_batch is None or c_failed:
+            for i in range(n_samples):
+                if offsets[i] == offsets[i + 1]:
+                    continue
+                dip_value, modal_interval, modal_triangle = dip_test(X[offsets[i]:offsets[i + 1]], just_dip=False,
+                                                                     is_data_sorted=True, use_c=use_c and not c_failed,
+                                                                     debug=debug)
+                dip_values[i] = dip_value
+                modal_intervals[i] = modal_interval
+                modal_triangles[i] = modal_triangle
+    if just_dip:
+        return dip_values
+    else:
+        return dip_values, modal_intervals, modal_triangles
+
+
+def _get_dip_batch_layout(X: np.ndarray, offsets: np.ndarray, is_data_sorted: bool) -> (np.ndarray, np.ndarray):
+    """
+    Transform the input of dip_test_batch into a single contiguous array of sorted float64 values and the corresponding int64 offsets as expected by the C implementation.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given samples, either a 2-dimensional array (one sample per row) or a 1-dimensional array in combination with offsets
+    offsets : np.ndarray
+        the start positions of the samples within X followed by the total number of values. Must be None if X is 2-dimensional
+    is_data_sorted : bool
+        Should be True if each sample is already sorted
+
+    Returns
+    -------
+    tuple : (np.ndarray, np.ndarray)
+        The contiguous array containing the sorted values of all samples,
+        The offsets of the samples within this array
+    """
+    if offsets is None:
+        assert X.ndim == 2, "If no offsets are given, data must be 2-dimensional (one sample per row). Your shape:{0}".format(
+            X.shape)
+        if not is_data_sorted:
+            X = np.sort(X, axis=1)
+        offsets = np.arange(X.shape[0] + 1, dtype=np.int64) * X.shape[1]
+        X = X.reshape(-1)
+    else:
+        assert X.ndim == 1, "If offsets are given, data must be 1-dimensional. Your shape:{0}".format(X.shape)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        assert offsets.ndim == 1 and offsets.shape[0] >= 1 and offsets[0] == 0 and offsets[-1] == X.shape[
+            0] and np.all(np.diff(offsets) >= 0), "offsets must be non-decreasing, start with 0 and end with the number of values in X"
+        if not is_data_sorted:
+            sample_ids = np.repeat(np.arange(offsets.shape[0] - 1), np.diff(offsets))
+            X = X[np.lexsort((X, sample_ids))]
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    return X, offsets
+
+
 def _dip_python_impl(X: np.ndarray, debug: bool) -> (
         float, tuple, tuple, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
     """
@@ -331,7 +451,7 @@ def _dip_python_impl(X: np.ndarray, debug: bool) -> (
 
 
 def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_boots: int = 1000,
-             random_state: np.random.RandomState = None) -> float:
+             random_state: np.random.RandomState = None, n_jobs: int = None, cache_dir: str = None) -> float:
     """
     Get the p-value of a corresponding Dip-value.
     P-values depend on the input Dip-value and the sample size.
@@ -349,7 +469,11 @@ def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_bo
     n_boots : int
         Number of random data sets that should be created to calculate Dip-values. Only relevant if pval_strategy is 'bootstrap' (default: 1000)
     random_state : np.random.RandomState
-        use a fixed random state to get a repeatable solution. Can also be of type int. Only relevant if pval_strategy is 'bootstrap' (default: None)
+        use a fixed random state to get a repeatable solution. Can also be of type int. If it is an int, the bootstrapped Dip-values will be cached. Only relevant if pval_strategy is 'bootstrap' (default: None)
+    n_jobs : int
+        Number of threads used to calculate the bootstrapped Dip-values. -1 uses all available cores. Only relevant if pval_strategy is 'bootstrap' (default: None)
+    cache_dir : str
+        Directory in which the bootstrapped Dip-values will be persisted. Only relevant if pval_strategy is 'bootstrap' and random_state is an int (default: None)
 
     Returns
     -------
@@ -374,7 +498,7 @@ def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_bo
     if n_points < 4:
         pval = 1.0
     elif pval_strategy == "bootstrap":
-        boot_dips = dip_boot_samples(int(n_points), n_boots, random_state)
+        boot_dips = dip_boot_samples(int(n_points), n_boots, random_state, n_jobs, cache_dir)
         pval = np.mean(dip_value <= boot_dips)
     elif pval_strategy == "table":
         pval = _dip_pval_table(dip_value, n_points)
@@ -386,10 +510,15 @@ def dip_pval(dip_value: float, n_points: int, pval_strategy: str = "table", n_bo
     return pval
 
 
-def dip_boot_samples(n_points: int, n_boots: int = 1000, random_state: np.random.RandomState = None) -> np.ndarray:
+def dip_boot_samples(n_points: int, n_boots: int = 1000, random_state: np.random.RandomState = None,
+                     n_jobs: int = None, cache_dir: str = None) -> np.ndarray:
     """
     Sample random data sets and calculate corresponding Dip-values.
     E.g. used to determine p-values.
+    The random data sets are processed in batches using dip_test_batch, which can be executed in parallel.
+    If random_state is an int, the resulting null distribution is memoized for the combination (n_points, n_boots, random_state).
+    In this case, the Dip-values can additionally be persisted in cache_dir, so that they can be reused across sessions.
+    The cache itself is read-only, so every call returns a copy of the cached Dip-values that can be modified by the caller.
 
     Parameters
     ----------
@@ -399,19 +528,97 @@ def dip_boot_samples(n_points: int, n_boots: int = 1000, random_state: np.random
         Number of random data sets that should be created to calculate Dip-values (default: 1000)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    n_jobs : int
+        Number of threads used to calculate the Dip-values. -1 uses all available cores. The result does not depend on n_jobs (default: None)
+    cache_dir : str
+        Directory in which the Dip-values will be persisted. Only relevant if random_state is an int (default: None)
+
+    Returns
+    -------
+    boot_dips : np.ndarray
+        Array of Dip-values
+    """
+    if not isinstance(random_state, (int, np.integer)):
+        # Results can not be cached
+        return _dip_boot_samples_batchwise(n_points, n_boots, check_random_state(random_state), n_jobs)
+    cache_key = (int(n_points), int(n_boots), int(random_state))
+    if cache_key in _DIP_BOOT_CACHE:
+        _DIP_BOOT_CACHE.move_to_end(cache_key)
+        return _DIP_BOOT_CACHE[cache_key].copy()
+    cache_file = None if cache_dir is None else os.path.join(cache_dir, "dip_boot_samples_{0}_{1}_{2}.npy".format(
+        *cache_key))
+    if cache_file is not None and os.path.isfile(cache_file):
+        boot_dips = np.load(cache_file)
+    else:
+        boot_dips = _dip_boot_samples_batchwise(n_points, n_boots, check_random_state(random_state), n_jobs)
+        if cache_file is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(cache_file, boot_dips)
+    boot_dips.flags.writeable = False
+    _DIP_BOOT_CACHE[cache_key] = boot_dips
+    if len(_DIP_BOOT_CACHE) > _DIP_BOOT_CACHE_SIZE:
+        _DIP_BOOT_CACHE.popitem(last=False)
+    return boot_dips.copy()
+
+
+def _dip_boot_samples_batchwise(n_points: int, n_boots: int, random_state: np.random.RandomState,
+                                n_jobs: int) -> np.ndarray:
+    """
+    Calculate the Dip-values of n_boots random uniform data sets.
+    The random data sets are created batch by batch (in the same order as a single call of random_state.rand(n_boots, n_points)), so only a few batches have to be kept in memory at the same time.
+    Since the C implementation releases the GIL, the batches can be processed by multiple threads.
+
+    Parameters
+    ----------
+    n_points : int
+        The number of samples
+    n_boots : int
+        Number of random data sets that should be created to calculate Dip-values
+    random_state : np.random.RandomState
+        use a fixed random state to get a repeatable solution
+    n_jobs : int
+        Number of threads used to calculate the Dip-values
 
     Returns
     -------
     boot_dips : np.ndarray
         Array of Dip-values
     """
-    # random uniform vectors
-    random_state = check_random_state(random_state)
-    boot_samples = random_state.rand(n_boots, n_points)
-    boot_dips = np.array([dip_test(boot_s, just_dip=True, is_data_sorted=False) for boot_s in boot_samples])
+    batch_size = max(1, _DIP_BOOT_BATCH_ELEMENTS // max(1, n_points))
+    batch_starts = range(0, n_boots, batch_size)
+    # The generator is consumed lazily in the main thread, therefore the random data sets are always the same
+    boot_dips_batches = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(dip_test_batch)(random_state.rand(min(batch_size, n_boots - start), n_points), just_dip=True,
+                                is_data_sorted=False) for start in batch_starts)
+    boot_dips = np.concatenate(boot_dips_batches) if len(boot_dips_batches) > 0 else np.zeros(0)
     return boot_dips
 
 
+def _get_dip_boot_random_state(random_state: np.random.RandomState, pval_strategy: str) -> int:
+    """
+    Get the random state that should be used to calculate Dip-p-values.
+    If the 'bootstrap' strategy is used, an int seed is drawn from the random state.
+    This allows dip_boot_samples to reuse the bootstrapped Dip-values for all tests with the same number of samples.
+
+    Parameters
+    ----------
+    random_state : np.random.RandomState
+        the random state of the clustering algorithm
+    pval_strategy : str
+        Specifies the strategy that should be used to calculate the p-value
+
+    Returns
+    -------
+    boot_random_state : int
+        The seed used for bootstrapping (if pval_strategy is 'bootstrap'), else the input random state
+    """
+    if pval_strategy.lower() == "bootstrap":
+        boot_random_state = int(check_random_state(random_state).randint(np.iinfo(np.int32).max))
+    else:
+        boot_random_state = random_state
+    return boot_random_state
+
+
 def _get_complete_gcm_lcm(mn: np.ndarray, mj: np.ndarray, modal_interval: tuple) -> (np.ndarray, np.ndarray):
     """
     Complete the GCM and LCM returned by the Dip-test.
@@ -6,8 +6,16 @@ from sklearn.utils import check_random_state
 from sklearn.base import ClusterMixin
 from collections.abc import Callable
 import os
+import io
+import re
+import json
+import hashlib
+import sqlite3
+import tracemalloc
 import inspect
+from contextlib import closing
 from sklearn.datasets._base import Bunch
+from joblib import Parallel, delayed
 
 
 def load_saved_autoencoder(path: str, autoencoder_class: torch.nn.Module, params: dict = None) -> torch.nn.Module:
@@ -108,7 +116,9 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
                      iteration_specific_autoencoders: list = None, aggregation_functions: tuple = (np.mean, np.std),
                      add_runtime: bool = True, add_n_clusters: bool = False, save_path: str = None,
                      save_labels_path: str = None, ignore_algorithms: tuple = (),
-                     random_state: np.random.RandomState = None) -> pd.DataFrame:
+                     random_state: np.random.RandomState = None, backend: str = "serial",
+                     n_jobs: int = None, result_store: 'EvaluationResultStore' = None,
+                     dataset_name: str = "", add_peak_memory: bool = False) -> pd.DataFrame:
     """
     Evaluate the clustering result of different clustering algorithms (as specified by evaluation_algorithms) on a given data set using different metrics (as specified by evaluation_metrics).
     Each algorithm will be executed n_repetitions times and all specified metrics will be used to evaluate the clustering result.
@@ -150,6 +160,24 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
         List of algorithm names (as specified in the EvaluationAlgorithm object) that should be ignored for this specific data set (default: [])
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    backend : str
+        Defines how the repetitions of an algorithm are executed. Can be 'serial', 'processes' or 'threads'.
+        The algorithms are evaluated one after another, so the algorithm-specific preprocessing is executed once per algorithm and only a single preprocessed data set is kept in memory.
+        In case of 'processes', each run seeds the global numpy random state of its worker process with its seed, so the results match the serial execution.
+        In case of 'threads', the global random state can not be used safely. Therefore, the seed of each run will be passed as 'random_state' to all algorithms that have such a parameter which is not specified in EvaluationAlgorithm.params (default: 'serial')
+    n_jobs : int
+        Maximum number of runs that are executed concurrently. Thereby, it also limits the number of runs that occupy memory at the same time. -1 uses all available cores. Only relevant if backend is not 'serial' (default: None)
+    result_store : EvaluationResultStore
+        Persistent store in which the result of each run is saved as soon as the run is finished. Can also be the path to the store (of type str).
+        Runs that are already contained in the store will not be executed again, instead the stored results will be used.
+        If None, the results will not be stored (default: None)
+    dataset_name : str
+        The name of the data set. Used to identify the runs in the result_store. Must be specified if result_store is not None (default: "")
+    add_peak_memory : bool
+        Add the peak memory (in bytes) allocated by python and numpy during the execution of each algorithm to the final table.
+        It is measured using tracemalloc in a second execution of the algorithm, so the runtime is not affected but the total evaluation time roughly doubles.
+        Note that tracemalloc only covers allocations of python and numpy. Memory allocated by torch or other native libraries (e.g., on the GPU) is not included.
+        Can not be used with the 'threads' backend (default: False)
 
     Returns
     -------
@@ -196,6 +224,15 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
     if save_labels_path is not None and not "." in save_labels_path:
         save_labels_path = save_labels_path + ".csv"
     assert save_labels_path is None or len(save_labels_path.split(".")) == 2, "save_labels_path must only contain a single dot. E.g., NAME.csv"
+    backend = backend.lower()
+    assert backend in ["serial", "processes",
+                       "threads"], "backend must be 'serial', 'processes' or 'threads'. Your input: {0}".format(backend)
+    assert not add_peak_memory or backend != "threads", "add_peak_memory can not be used with the 'threads' backend"
+    assert result_store is None or dataset_name != "", "dataset_name must be specified if result_store is used"
+    if type(result_store) is str:
+        result_store = EvaluationResultStore(result_store)
+    data_fingerprint = None if result_store is None else _get_data_fingerprint(X, labels_true, X_test,
+                                                                               labels_true_test)
     # Use same seed for each algorithm
     random_state = check_random_state(random_state)
     seeds = random_state.choice(10000, n_repetitions, replace=False)
@@ -208,149 +245,84 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
         metric_names += ["runtime"]
     if add_n_clusters:
         metric_names += ["n_clusters"]
+    if add_peak_memory:
+        metric_names += ["peak_memory"]
     header = pd.MultiIndex.from_product([algo_names, metric_names], names=["algorithm", "metric"])
     value_placeholder = np.zeros((n_repetitions, len(algo_names) * len(metric_names)))
     df = pd.DataFrame(value_placeholder, columns=header, index=range(n_repetitions))
+    # The algorithms are evaluated one after another, so only a single preprocessed data set has to be kept in memory
+    finished_runs = []
     for eval_algo in evaluation_algorithms:
-        automatically_set_n_clusters = False
         try:
             assert type(eval_algo) is EvaluationAlgorithm, "All algortihms must be of type EvaluationAlgortihm"
             if eval_algo.name in ignore_algorithms:
                 print("Ignoring algorithm {0}".format(eval_algo.name))
                 continue
-            print("Use algorithm {0}".format(eval_algo.name))
             # Add n_clusters automatically to algorithm parameters if it is None
-            if "n_clusters" in eval_algo.params and eval_algo.params["n_clusters"] is None and labels_true is not None:
-                automatically_set_n_clusters = True
-            if automatically_set_n_clusters:
+            algo_params = eval_algo.params.copy()
+            if "n_clusters" in algo_params and algo_params["n_clusters"] is None and labels_true is not None:
                 if labels_true.ndim == 1:
                     # In case of normal ground truth
-                    eval_algo.params["n_clusters"] = len(np.unique(labels_true[labels_true >= 0]))
+                    algo_params["n_clusters"] = len(np.unique(labels_true[labels_true >= 0]))
                 else:
                     # In case of hierarchical or nr ground truth
-                    eval_algo.params["n_clusters"] = [len(np.unique(labels_true[labels_true[:, i] >= 0, i])) for i in
-                                                      range(labels_true.shape[1])]
-            # Algorithms can preprocess datasets (e.g. PCA + K-means)
+                    algo_params["n_clusters"] = [len(np.unique(labels_true[labels_true[:, i] >= 0, i])) for i in
+                                                 range(labels_true.shape[1])]
+            # Collect the runs of this algorithm (deterministic algorithms are only executed once)
+            runs = []
+            for rep in range(1 if eval_algo.deterministic else n_repetitions):
+                eval_autoencoder = None if iteration_specific_autoencoders is None else iteration_specific_autoencoders[
+                    rep]
+                run_hash = _get_run_hash(eval_algo, algo_params, eval_autoencoder, seeds[rep], evaluation_metrics,
+                                         data_fingerprint)
+                # Check if run has already been executed
+                if result_store is not None:
+                    stored_result = result_store.get_result(dataset_name, eval_algo.name, run_hash, rep)
+                    if stored_result is not None and (not add_peak_memory or "peak_memory" in stored_result):
+                        print("Use stored result of {0} in iteration {1}".format(eval_algo.name, rep))
+                        finished_runs.append((eval_algo, rep, stored_result))
+                        continue
+                runs.append((rep, run_hash, eval_autoencoder))
+            if len(runs) == 0:
+                continue
+            # Algorithms can preprocess datasets (e.g. PCA + K-means). The preprocessing is done once for all repetitions
             if eval_algo.preprocess_methods is not None:
                 X_processed = _preprocess_dataset(X, eval_algo.preprocess_methods, eval_algo.preprocess_params)
-                if X_test is not None:
-                    X_test_processed = _preprocess_dataset(X_test, eval_algo.preprocess_methods,
-                                                           eval_algo.preprocess_params)
+                X_test_processed = None if X_test is None else _preprocess_dataset(X_test,
+                                                                                   eval_algo.preprocess_methods,
+                                                                                   eval_algo.preprocess_params)
             else:
                 X_processed = X
-                if X_test is not None:
-                    X_test_processed = X_test
-            # Execute the algorithm multiple times
-            for rep in range(n_repetitions):
-                print("- Iteration {0}".format(rep))
-                # set seed
-                np.random.seed(seeds[rep])
-                # Execute algorithm
-                start_time = time.time()
-                algo_obj = eval_algo.algorithm(**eval_algo.params)
-                # Check if algorithm uses an autoencoder and wether iteration_specific autoencoders are defined
-                if iteration_specific_autoencoders is not None:
-                    eval_autoencoder = iteration_specific_autoencoders[rep]
-                    assert type(
-                        eval_autoencoder) is EvaluationAutoencoder, "Each entry in iteration_specific_params must be a EvaluationAutoencoder"
-                    if hasattr(algo_obj, "autoencoder"):
-                        autoencoder = load_saved_autoencoder(eval_autoencoder.path, eval_autoencoder.autoencoder_class,
-                                                             eval_autoencoder.params)
-                        algo_obj.autoencoder = autoencoder
-                    if eval_autoencoder.path_custom_dataloaders is not None and hasattr(algo_obj, "custom_dataloaders"):
-                        custom_dataloaders = (torch.load(eval_autoencoder.path_custom_dataloaders[0]),
-                                              torch.load(eval_autoencoder.path_custom_dataloaders[1]))
-                        algo_obj.custom_dataloaders = custom_dataloaders
-                try:
-                    algo_obj.fit(X_processed)
-                except Exception as e:
-                    print("Execution of {0} raised an exception in iteration {1}".format(eval_algo.name, rep))
-                    print(e)
+                X_test_processed = X_test
+            run_jobs = (delayed(_evaluate_single_run)(
+                X, X_processed, labels_true, X_test, X_test_processed, labels_true_test, eval_algo.name,
+                eval_algo.algorithm, algo_params, evaluation_metrics, eval_autoencoder, rep, seeds[rep],
+                save_labels_path, backend == "threads", add_peak_memory) for rep, _, eval_autoencoder in runs)
+            # Execute runs (results are obtained one after another, so they can be stored directly)
+            if backend == "serial":
+                run_results = (function(*args, **kwargs) for function, args, kwargs in run_jobs)
+            else:
+                # pre_dispatch limits the number of runs whose input is prepared at the same time
+                run_results = Parallel(n_jobs=n_jobs, backend="loky" if backend == "processes" else "threading",
+                                       pre_dispatch="n_jobs", return_as="generator")(run_jobs)
+            # Iterate over the generator first, so that it is always exhausted
+            for run_output, (rep, run_hash, _) in zip(run_results, runs):
+                if run_output is None:
                     continue
-                # Optional: Obtain labels from the predict method
-                if X_test is not None:
-                    try:
-                        predict_params = inspect.getfullargspec(algo_obj.predict).args
-                        # Normally, there should not be X_train and X_test as input
-                        if "X_train" in predict_params and "X_test" in predict_params:
-                            labels_predicted_test = algo_obj.predict(X_train=X_processed,
-                                                                     X_test=X_test_processed)  # TODO Remove special case for DipEncoder
-                        else:
-                            labels_predicted_test = algo_obj.predict(X_test_processed)
-                    except Exception as e:
-                        print("Problem when running the predict method of {0} in iteration {1}".format(eval_algo.name,
-                                                                                                       rep))
-                        print(e)
-                        labels_predicted_test = None
-                runtime = time.time() - start_time
-                if add_runtime:
-                    df.at[rep, (eval_algo.name, "runtime")] = runtime
-                    print("-- runtime: {0}".format(runtime))
-                if add_n_clusters:
-                    n_clusters = _get_n_clusters_from_algo(algo_obj)
-                    df.at[rep, (eval_algo.name, "n_clusters")] = n_clusters
-                    print("-- n_clusters: {0}".format(n_clusters))
-                # Optional: Save labels
-                if save_labels_path is not None:
-                    save_labels_path_algo = None if save_labels_path is None else "{0}_{1}_{2}.{3}".format(
-                        save_labels_path.split(".")[0], eval_algo.name, rep, save_labels_path.split(".")[1])
-                    # Check if directory exists
-                    parent_directory = os.path.dirname(save_labels_path_algo)
-                    if parent_directory != "" and not os.path.isdir(parent_directory):
-                        os.makedirs(parent_directory)
-                    np.savetxt(save_labels_path_algo, algo_obj.labels_)
-                    # Also save predict labels
-                    if X_test is not None and labels_predicted_test is not None:
-                        save_labels_path_algo_test = "{0}_TEST.{1}".format(save_labels_path_algo.split(".")[0],
-                                                                           save_labels_path_algo.split(".")[1])
-                        np.savetxt(save_labels_path_algo_test, labels_predicted_test)
-                # Get result of all metrics
-                if evaluation_metrics is not None:
-                    for eval_metric in evaluation_metrics:
-                        try:
-                            assert type(eval_metric) is EvaluationMetric, "All metrics must be of type EvaluationMetric"
-                            # Check if metric uses ground truth (e.g. NMI, ACC, ...)
-                            if eval_metric.use_gt:
-                                assert labels_true is not None, "Ground truth can not be None if it is used for the chosen metric"
-                                result = eval_metric.method(labels_true, algo_obj.labels_, **eval_metric.params)
-                                if X_test is not None and labels_predicted_test is not None:
-                                    result_test = eval_metric.method(labels_true_test, labels_predicted_test,
-                                                                     **eval_metric.params)
-                            else:
-                                # Metric does not use ground truth (e.g. Silhouette, ...)
-                                result = eval_metric.method(X, algo_obj.labels_, **eval_metric.params)
-                                if X_test is not None and labels_predicted_test is not None:
-                                    result_test = eval_metric.method(X_test, labels_predicted_test,
-                                                                     **eval_metric.params)
-                            df.at[rep, (eval_algo.name, eval_metric.name)] = result
-                            print("-- {0}: {1}".format(eval_metric.name, result))
-                            if X_test is not None and labels_predicted_test is not None:
-                                df.at[rep, (eval_algo.name, eval_metric.name + "_TEST")] = result_test
-                                print("-- {0} (TEST): {1}".format(eval_metric.name, result_test))
-                        except Exception as e:
-                            print("Metric {0} raised an exception and will be skipped".format(eval_metric.name))
-                            print(e)
-                if eval_algo.deterministic:
-                    for element in range(1, n_repetitions):
-                        if add_runtime:
-                            df.at[element, (eval_algo.name, "runtime")] = df.at[
-                                0, (eval_algo.name, "runtime")]
-                        if add_n_clusters:
-                            df.at[element, (eval_algo.name, "n_clusters")] = df.at[
-                                0, (eval_algo.name, "n_clusters")]
-                        for eval_metric in evaluation_metrics:
-                            df.at[element, (eval_algo.name, eval_metric.name)] = df.at[
-                                0, (eval_algo.name, eval_metric.name)]
-                            if X_test is not None:
-                                df.at[element, (eval_algo.name, eval_metric.name + "_TEST")] = df.at[
-                                    0, (eval_algo.name, eval_metric.name + "_TEST")]
-                    break
+                run_result, labels_pred = run_output
+                if result_store is not None:
+                    result_store.save_result(dataset_name, eval_algo.name, run_hash, rep, run_result, labels_pred)
+                finished_runs.append((eval_algo, rep, run_result))
         except Exception as e:
             print("Algorithm {0} raised an exception and will be skipped".format(eval_algo.name))
             print(e)
-        # Prepare eval_algo params for next dataset
-        if automatically_set_n_clusters:
-            eval_algo.params["n_clusters"] = None
+    # Merge results into the DataFrame
+    for eval_algo, rep, run_result in finished_runs:
+        result_reps = range(n_repetitions) if eval_algo.deterministic else [rep]
+        for column_name, value in run_result.items():
+            if column_name in metric_names:
+                for element in result_reps:
+                    df.at[element, (eval_algo.name, column_name)] = value
     for agg in aggregation_functions:
         df.loc[agg.__name__] = agg(df.values, axis=0)
     if save_path is not None:
@@ -362,11 +334,301 @@ def evaluate_dataset(X: np.ndarray, evaluation_algorithms: list, evaluation_metr
     return df
 
 
+def _evaluate_single_run(X: np.ndarray, X_processed: np.ndarray, labels_true: np.ndarray, X_test: np.ndarray,
+                         X_test_processed: np.ndarray, labels_true_test: np.ndarray, algo_name: str,
+                         algorithm: ClusterMixin, algo_params: dict, evaluation_metrics: list,
+                         eval_autoencoder: 'EvaluationAutoencoder', rep: int, seed: int, save_labels_path: str,
+                         seed_by_random_state: bool, measure_peak_memory: bool) -> (dict, np.ndarray):
+    """
+    Execute a single run of a clustering algorithm and evaluate the result.
+    This function does not share any state with other runs, so it can be executed in parallel.
+    If the creation or the execution of the algorithm raises an exception, the run will be skipped.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    X_processed : np.ndarray
+        the data set after the algorithm-specific preprocessing has been applied
+    labels_true : np.ndarray
+        The ground truth labels of the data set
+    X_test : np.ndarray
+        An optional test data set that will be evaluated using the predict method of the clustering algorithm
+    X_test_processed : np.ndarray
+        the test data set after the algorithm-specific preprocessing has been applied
+    labels_true_test : np.ndarray
+        The ground truth labels of the test data set
+    algo_name : str
+        The name of the algorithm
+    algorithm : ClusterMixin
+        The clustering algorithm class
+    algo_params : dict
+        The parameters of the clustering algorithm
+    evaluation_metrics : list
+        Contains objects of type EvaluationMetric which are wrappers for the metrics
+    eval_autoencoder : EvaluationAutoencoder
+        The iteration-specific autoencoder. Can be None
+    rep : int
+        The number of the repetition
+    seed : int
+        The seed of this repetition
+    save_labels_path : str
+        The path where the clustering labels should be saved as csv. If None, the labels will not be saved
+    seed_by_random_state : bool
+        If True, the seed will be passed to the algorithm as 'random_state' (if it has such a parameter that is not specified in algo_params) instead of seeding the global numpy random state
+    measure_peak_memory : bool
+        If True, the algorithm will be executed a second time to measure the peak memory (in bytes) allocated by python and numpy using tracemalloc.
+        This is done separately, so the tracing does not affect the runtime
+
+    Returns
+    -------
+    tuple : (dict, np.ndarray)
+        Dictionary containing the result of each metric, the runtime, the number of clusters and optionally the peak memory,
+        The predicted labels.
+        None if the algorithm raised an exception
+    """
+    print("- {0}: Iteration {1}".format(algo_name, rep))
+    run_result = {}
+    # Execute algorithm
+    try:
+        # set seed
+        if seed_by_random_state:
+            if "random_state" in inspect.signature(algorithm).parameters and "random_state" not in algo_params:
+                algo_params = {**algo_params, "random_state": int(seed)}
+        else:
+            np.random.seed(seed)
+        start_time = time.time()
+        algo_obj = _create_algorithm(algorithm, algo_params, eval_autoencoder)
+        algo_obj.fit(X_processed)
+    except Exception as e:
+        print("Execution of {0} raised an exception in iteration {1} and will be skipped".format(algo_name, rep))
+        print(e)
+        return None
+    # Optional: Obtain labels from the predict method
+    labels_predicted_test = None
+    if X_test is not None:
+        try:
+            predict_params = inspect.getfullargspec(algo_obj.predict).args
+            # Normally, there should not be X_train and X_test as input
+            if "X_train" in predict_params and "X_test" in predict_params:
+                labels_predicted_test = algo_obj.predict(X_train=X_processed,
+                                                         X_test=X_test_processed)  # TODO Remove special case for DipEncoder
+            else:
+                labels_predicted_test = algo_obj.predict(X_test_processed)
+        except Exception as e:
+            print("Problem when running the predict method of {0} in iteration {1}".format(algo_name, rep))
+            print(e)
+    runtime = time.time() - start_time
+    run_result["runtime"] = runtime
+    print("-- runtime: {0}".format(runtime))
+    n_clusters = _get_n_clusters_from_algo(algo_obj)
+    run_result["n_clusters"] = n_clusters
+    print("-- n_clusters: {0}".format(n_clusters))
+    # Optional: Save labels
+    if save_labels_path is not None:
+        save_labels_path_algo = "{0}_{1}_{2}.{3}".format(save_labels_path.split(".")[0], algo_name, rep,
+                                                         save_labels_path.split(".")[1])
+        # Check if directory exists
+        parent_directory = os.path.dirname(save_labels_path_algo)
+        if parent_directory != "":
+            os.makedirs(parent_directory, exist_ok=True)
+        np.savetxt(save_labels_path_algo, algo_obj.labels_)
+        # Also save predict labels
+        if X_test is not None and labels_predicted_test is not None:
+            save_labels_path_algo_test = "{0}_TEST.{1}".format(save_labels_path_algo.split(".")[0],
+                                                               save_labels_path_algo.split(".")[1])
+            np.savetxt(save_labels_path_algo_test, labels_predicted_test)
+    # Get result of all metrics
+    if evaluation_metrics is not None:
+        for eval_metric in evaluation_metrics:
+            try:
+                assert type(eval_metric) is EvaluationMetric, "All metrics must be of type EvaluationMetric"
+                # Check if metric uses ground truth (e.g. NMI, ACC, ...)
+                if eval_metric.use_gt:
+                    assert labels_true is not None, "Ground truth can not be None if it is used for the chosen metric"
+                    result = eval_metric.method(labels_true, algo_obj.labels_, **eval_metric.params)
+                    if X_test is not None and labels_predicted_test is not None:
+                        result_test = eval_metric.method(labels_true_test, labels_predicted_test,
+                                                         **eval_metric.params)
+                else:
+                    # Metric does not use ground truth (e.g. Silhouette, ...)
+                    result = eval_metric.method(X, algo_obj.labels_, **eval_metric.params)
+                    if X_test is not None and labels_predicted_test is not None:
+                        result_test = eval_metric.method(X_test, labels_predicted_test, **eval_metric.params)
+                run_result[eval_metric.name] = result
+                print("-- {0}: {1}".format(eval_metric.name, result))
+                if X_test is not None and labels_predicted_test is not None:
+                    run_result[eval_metric.name + "_TEST"] = result_test
+                    print("-- {0} (TEST): {1}".format(eval_metric.name, result_test))
+            except Exception as e:
+                print("Metric {0} raised an exception and will be skipped".format(eval_metric.name))
+                print(e)
+    if measure_peak_memory:
+        # Repeat the execution with the same seed while tracing the allocated memory
+        if not seed_by_random_state:
+            np.random.seed(seed)
+        tracemalloc.start()
+        try:
+            _create_algorithm(algorithm, algo_params, eval_autoencoder).fit(X_processed)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        except Exception as e:
+            print("Problem when measuring the peak memory of {0} in iteration {1}".format(algo_name, rep))
+            print(e)
+            peak_memory = np.nan
+        finally:
+            tracemalloc.stop()
+        run_result["peak_memory"] = peak_memory
+        print("-- peak_memory: {0}".format(peak_memory))
+    return run_result, algo_obj.labels_
+
+
+def _create_algorithm(algorithm: ClusterMixin, algo_params: dict,
+                      eval_autoencoder: 'EvaluationAutoencoder') -> ClusterMixin:
+    """
+    Create the clustering algorithm object.
+    If an iteration-specific autoencoder is defined, it will be loaded and used by the algorithm.
+
+    Parameters
+    ----------
+    algorithm : ClusterMixin
+        The clustering algorithm class
+    algo_params : dict
+        The parameters of the clustering algorithm
+    eval_autoencoder : EvaluationAutoencoder
+        The iteration-specific autoencoder. Can be None
+
+    Returns
+    -------
+    algo_obj : ClusterMixin
+        The clustering algorithm object
+    """
+    algo_obj = algorithm(**algo_params)
+    # Check if algorithm uses an autoencoder and wether iteration_specific autoencoders are defined
+    if eval_autoencoder is not None:
+        assert type(
+            eval_autoencoder) is EvaluationAutoencoder, "Each entry in iteration_specific_params must be a EvaluationAutoencoder"
+        if hasattr(algo_obj, "autoencoder"):
+            autoencoder = load_saved_autoencoder(eval_autoencoder.path, eval_autoencoder.autoencoder_class,
+                                                 eval_autoencoder.params)
+            algo_obj.autoencoder = autoencoder
+        if eval_autoencoder.path_custom_dataloaders is not None and hasattr(algo_obj, "custom_dataloaders"):
+            custom_dataloaders = (torch.load(eval_autoencoder.path_custom_dataloaders[0]),
+                                  torch.load(eval_autoencoder.path_custom_dataloaders[1]))
+            algo_obj.custom_dataloaders = custom_dataloaders
+    return algo_obj
+
+
+def _to_json_serializable(value: object) -> object:
+    """
+    Convert a value that can not be serialized by json (e.g., numpy arrays and numpy scalars) into a serializable object.
+    Unknown objects are converted into their string representation.
+
+    Parameters
+    ----------
+    value : object
+        The value that should be converted
+
+    Returns
+    -------
+    serializable_value : object
+        The serializable version of the value
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return str(value)
+
+
+def _get_data_fingerprint(X: np.ndarray, labels_true: np.ndarray, X_test: np.ndarray,
+                          labels_true_test: np.ndarray) -> str:
+    """
+    Get a hash of the content of the data set that is evaluated.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        the given data set
+    labels_true : np.ndarray
+        the ground truth labels of X. Can be None
+    X_test : np.ndarray
+        An optional test data set. Can be None
+    labels_true_test : np.ndarray
+        the ground truth labels of X_test. Can be None
+
+    Returns
+    -------
+    data_fingerprint : str
+        The hash of the data set
+    """
+    data_hash = hashlib.sha1()
+    for array in [X, labels_true, X_test, labels_true_test]:
+        if array is None:
+            data_hash.update(b"None")
+        else:
+            array = np.ascontiguousarray(array)
+            data_hash.update("{0}{1}".format(array.dtype, array.shape).encode())
+            data_hash.update(array.tobytes())
+    data_fingerprint = data_hash.hexdigest()
+    return data_fingerprint
+
+
+def _get_run_hash(eval_algo: 'EvaluationAlgorithm', algo_params: dict, eval_autoencoder: 'EvaluationAutoencoder',
+                  seed: int, evaluation_metrics: list, data_fingerprint: str) -> str:
+    """
+    Get a hash that identifies the configuration of a single run.
+    It considers the algorithm, its parameters, the preprocessing, the iteration-specific autoencoder, the seed, the evaluation metrics and the data set.
+    Therefore, a stored run will not be reused if a metric is added or if another data set is evaluated.
+    Objects without a meaningful representation (e.g., functions) are described by their qualified name and arrays by a hash of their content.
+
+    Parameters
+    ----------
+    eval_algo : EvaluationAlgorithm
+        The evaluation algorithm
+    algo_params : dict
+        The parameters of the clustering algorithm (including an automatically set n_clusters)
+    eval_autoencoder : EvaluationAutoencoder
+        The iteration-specific autoencoder. Can be None
+    seed : int
+        The seed of the run
+    evaluation_metrics : list
+        list of EvaluationMetric. Can be None
+    data_fingerprint : str
+        The hash of the data set (see _get_data_fingerprint())
+
+    Returns
+    -------
+    run_hash : str
+        The hash of the run
+    """
+
+    def _stable_repr(obj):
+        if isinstance(obj, np.ndarray):
+            return "ndarray:" + hashlib.sha1(np.ascontiguousarray(obj).tobytes()).hexdigest()
+        if hasattr(obj, "__qualname__"):
+            return "{0}.{1}".format(getattr(obj, "__module__", ""), obj.__qualname__)
+        # Remove memory addresses from default representations
+        return re.sub(r" at 0x[0-9a-fA-F]+", "", repr(obj))
+
+    run_description = {"algorithm": _stable_repr(eval_algo.algorithm), "params": algo_params,
+                       "preprocess_methods": eval_algo.preprocess_methods,
+                       "preprocess_params": eval_algo.preprocess_params,
+                       "autoencoder": None if eval_autoencoder is None else [eval_autoencoder.path,
+                                                                             eval_autoencoder.path_custom_dataloaders],
+                       "seed": int(seed),
+                       "metrics": None if evaluation_metrics is None else [
+                           [eval_metric.name, eval_metric.method, eval_metric.params, eval_metric.use_gt] for
+                           eval_metric in evaluation_metrics],
+                       "data": data_fingerprint}
+    run_hash = hashlib.sha1(json.dumps(run_description, sort_keys=True, default=_stable_repr).encode()).hexdigest()
+    return run_hash
+
+
 def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms: list, evaluation_metrics: list = None,
                                n_repetitions: int = 10, aggregation_functions: tuple = (np.mean, np.std),
                                add_runtime: bool = True, add_n_clusters: bool = False, save_path: str = None,
                                save_intermediate_results: bool = False, save_labels_path: str = None,
-                               random_state: np.random.RandomState = None) -> pd.DataFrame:
+                               random_state: np.random.RandomState = None, backend: str = "serial",
+                               n_jobs: int = None, result_store: 'EvaluationResultStore' = None,
+                               add_peak_memory: bool = False) -> pd.DataFrame:
     """
     Evaluate the clustering result of different clustering algorithms (as specified by evaluation_algorithms) on a set of data sets (as specified by evaluation_datasets) using different metrics (as specified by evaluation_metrics).
     Each algorithm will be executed n_repetitions times and all specified metrics will be used to evaluate the clustering result.
@@ -396,6 +658,20 @@ def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms:
         The path where the clustering labels should be saved as csv. If None, the labels will not be saved (default: None)
     random_state : np.random.RandomState
         use a fixed random state to get a repeatable solution. Can also be of type int (default: None)
+    backend : str
+        Defines how the repetitions of an algorithm are executed. Can be 'serial', 'processes' or 'threads'.
+        The algorithms are evaluated one after another, so the algorithm-specific preprocessing is executed once per algorithm and only a single preprocessed data set is kept in memory.
+        The data sets are evaluated one after another, so only a single data set has to be kept in memory. See evaluate_dataset() for more information (default: 'serial')
+    n_jobs : int
+        Maximum number of runs that are executed concurrently. -1 uses all available cores. Only relevant if backend is not 'serial' (default: None)
+    result_store : EvaluationResultStore
+        Persistent store in which the result of each run is saved as soon as the run is finished. Can also be the path to the store (of type str).
+        Runs that are already contained in the store will not be executed again, so an interrupted evaluation can be resumed.
+        If None, the results will not be stored (default: None)
+    add_peak_memory : bool
+        Add the peak memory (in bytes) allocated by python and numpy during the execution of each algorithm to the final table.
+        Requires a second execution of each algorithm and only covers allocations of python and numpy (not torch or other native libraries).
+        See evaluate_dataset() for more information (default: False)
 
     Returns
     -------
@@ -443,6 +719,8 @@ def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms:
     if save_labels_path is not None and not "." in save_labels_path:
         save_labels_path = save_labels_path + ".csv"
     assert save_labels_path is None or len(save_labels_path.split(".")) == 2, "save_labels_path must only contain a single dot. E.g., NAME.csv"
+    if type(result_store) is str:
+        result_store = EvaluationResultStore(result_store)
     data_names = [d.name for d in evaluation_datasets]
     df_list = []
     for eval_data in evaluation_datasets:
@@ -471,7 +749,9 @@ def evaluate_multiple_datasets(evaluation_datasets: list, evaluation_algorithms:
                                   aggregation_functions=aggregation_functions,
                                   add_runtime=add_runtime, add_n_clusters=add_n_clusters, save_path=inner_save_path,
                                   save_labels_path=inner_save_labels_path,
-                                  ignore_algorithms=eval_data.ignore_algorithms, random_state=random_state)
+                                  ignore_algorithms=eval_data.ignore_algorithms, random_state=random_state,
+                                  backend=backend, n_jobs=n_jobs, result_store=result_store,
+                                  dataset_name=eval_data.name, add_peak_memory=add_peak_memory)
             df_list.append(df)
         except Exception as e:
             print("Dataset {0} raised an exception and will be skipped".format(eval_data.name))
@@ -909,3 +1189,139 @@ class EvaluationAutoencoder():
             path_custom_dataloaders[
                 1]) is str), "path_custom_dataloaders must be None or must contain the path to a saved trainloader at the first position and the path to a saved testloader at the second position"
         self.path_custom_dataloaders = path_custom_dataloaders
+
+
+class EvaluationResultStore():
+    """
+    Persistent store for the results of single runs within evaluate_dataset() and evaluate_multiple_datasets().
+    The results are saved in an SQLite database as soon as a run is finished.
+    Each run is identified by the name of the data set, the name of the algorithm, a hash of the run configuration (parameters, preprocessing, seed, ...) and the repetition.
+    For each run, the results of the metrics, the runtime, the number of clusters, the peak memory (if measured) and the predicted labels are stored.
+    If an evaluation is restarted with the same store, completed runs will be skipped.
+
+    Parameters
+    ----------
+    path : str
+        Path to the SQLite database. Will be created if it does not exist
+
+    Examples
+    ----------
+    See evaluate_multiple_datasets()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        parent_directory = os.path.dirname(path)
+        if parent_directory != "":
+            os.makedirs(parent_directory, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS runs (dataset TEXT, algorithm TEXT, run_hash TEXT, "
+                               "repetition INTEGER, results TEXT, labels BLOB, "
+                               "PRIMARY KEY (dataset, algorithm, run_hash, repetition))")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the SQLite database.
+
+        Returns
+        -------
+        connection : sqlite3.Connection
+            The connection to the database
+        """
+        connection = sqlite3.connect(self.path, timeout=60)
+        return connection
+
+    def save_result(self, dataset: str, algorithm: str, run_hash: str, repetition: int, results: dict,
+                    labels: np.ndarray) -> None:
+        """
+        Save the result of a single run. An existing entry of the same run will be replaced.
+
+        Parameters
+        ----------
+        dataset : str
+            The name of the data set
+        algorithm : str
+            The name of the algorithm
+        run_hash : str
+            The hash of the run configuration
+        repetition : int
+            The number of the repetition
+        results : dict
+            Dictionary containing the results of the metrics, the runtime, etc.
+        labels : np.ndarray
+            The predicted labels
+        """
+        labels_buffer = io.BytesIO()
+        np.save(labels_buffer, np.asarray(labels))
+        results_json = json.dumps(results, default=_to_json_serializable)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+                               (dataset, algorithm, run_hash, int(repetition), results_json,
+                                labels_buffer.getvalue()))
+
+    def get_result(self, dataset: str, algorithm: str, run_hash: str, repetition: int) -> dict:
+        """
+        Get the stored results of a single run.
+
+        Parameters
+        ----------
+        dataset : str
+            The name of the data set
+        algorithm : str
+            The name of the algorithm
+        run_hash : str
+            The hash of the run configuration
+        repetition : int
+            The number of the repetition
+
+        Returns
+        -------
+        results : dict
+            Dictionary containing the results of the metrics, the runtime, etc. None if the run is not contained in the store
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT results FROM runs WHERE dataset=? AND algorithm=? AND run_hash=? AND "
+                                     "repetition=?", (dataset, algorithm, run_hash, int(repetition))).fetchone()
+        results = None if row is None else json.loads(row[0])
+        return results
+
+    def get_labels(self, dataset: str, algorithm: str, run_hash: str, repetition: int) -> np.ndarray:
+        """
+        Get the stored labels of a single run.
+
+        Parameters
+        ----------
+        dataset : str
+            The name of the data set
+        algorithm : str
+            The name of the algorithm
+        run_hash : str
+            The hash of the run configuration
+        repetition : int
+            The number of the repetition
+
+        Returns
+        -------
+        labels : np.ndarray
+            The predicted labels. None if the run is not contained in the store
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT labels FROM runs WHERE dataset=? AND algorithm=? AND run_hash=? AND "
+                                     "repetition=?", (dataset, algorithm, run_hash, int(repetition))).fetchone()
+        labels = None if row is None else np.load(io.BytesIO(row[0]))
+        return labels
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Get all stored runs as a DataFrame. Each row corresponds to a single run and contains the results of the metrics, the runtime, etc.
+
+        Returns
+        -------
+        df : pd.DataFrame
+            The DataFrame containing all stored runs
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute("SELECT dataset, algorithm, run_hash, repetition, results FROM runs").fetchall()
+        df = pd.DataFrame([{"dataset": row[0], "algorithm": row[1], "run_hash": row[2], "repetition": row[3],
+                            **json.loads(row[4])} for row in rows])
+        return df
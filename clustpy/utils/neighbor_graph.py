@@ -0,0 +1,193 @@
+"""
+@authors:
+agent
+"""
+
+import numpy as np
+import scipy.sparse
+from scipy.spatial import cKDTree
+from sklearn.neighbors import NearestNeighbors
+
+
+class NeighborGraph():
+    """
+    The k-nearest-neighbor graph of a data set.
+    The graph is computed once (blockwise) and can afterward be reused by multiple algorithms and parameter settings,
+    e.g., MultiDensityDBSCAN, SpecialK and get_neighbors_batchwise (NeighborEncoder).
+    The object itself is never contained in its own neighborhood.
+    The graph is stored in CSR format using int32 neighbor ids and float32 distances and can be saved to disk.
+
+    Parameters
+    ----------
+    n_neighbors : int
+        The number of nearest neighbors of each object (not including the object itself)
+    metric : str
+        The metric used to calculate the distances (see sklearn.neighbors.NearestNeighbors) (default: 'euclidean')
+    approximation_eps : float
+        If larger than 0, an approximate nearest neighbor search is executed using scipy.spatial.cKDTree.
+        The distance to the k-th returned neighbor is at most (1 + approximation_eps) times the distance to the true k-th nearest neighbor.
+        Only available for the 'euclidean' metric (default: 0)
+    block_size : int
+        The number of objects whose neighbors are queried at once (default: 10000)
+    n_jobs : int
+        Number of jobs used for the nearest neighbor search. -1 uses all available cores (default: None)
+
+    Attributes
+    ----------
+    indptr_ : np.ndarray
+        The CSR index pointer, i.e., the neighbors of object i are stored at positions indptr_[i]:indptr_[i+1]
+    indices_ : np.ndarray
+        The ids of the neighbors (int32), sorted by increasing distance for each object
+    distances_ : np.ndarray
+        The distances to the neighbors (float32)
+
+    Examples
+    ----------
+    >>> from sklearn.datasets import make_blobs
+    >>> from clustpy.density import MultiDensityDBSCAN
+    >>> X, L = make_blobs(1000, 3, centers=5)
+    >>> neighbor_graph = NeighborGraph(30).fit(X)
+    >>> neighbor_graph.save("neighbor_graph.npz")
+    >>> neighbor_graph = NeighborGraph.load("neighbor_graph.npz")
+    >>> for k in [10, 20, 30]:
+    ...     MultiDensityDBSCAN(k=k).fit(neighbor_graph)
+    """
+
+    def __init__(self, n_neighbors: int, metric: str = "euclidean", approximation_eps: float = 0,
+                 block_size: int = 10000, n_jobs: int = None):
+        assert approximation_eps == 0 or metric == "euclidean", "Approximate search is only available for the 'euclidean' metric"
+        self.n_neighbors = n_neighbors
+        self.metric = metric
+        self.approximation_eps = approximation_eps
+        self.block_size = block_size
+        self.n_jobs = n_jobs
+
+    @property
+    def n_samples_(self) -> int:
+        """
+        Get the number of objects in the graph.
+
+        Returns
+        -------
+        n_samples : int
+            The number of objects
+        """
+        return self.indptr_.shape[0] - 1
+
+    def fit(self, X: np.ndarray, y: np.ndarray = None) -> 'NeighborGraph':
+        """
+        Compute the k-nearest-neighbor graph of the input data set.
+        The neighbors are queried blockwise, so only block_size x (n_neighbors + 1) results are kept in full precision at the same time.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            the given data set
+        y : np.ndarray
+            the labels (can be ignored)
+
+        Returns
+        -------
+        self : NeighborGraph
+            this instance of the NeighborGraph
+        """
+        assert self.n_neighbors < X.shape[0], "n_neighbors must be smaller than the number of objects"
+        if self.approximation_eps > 0:
+            tree = cKDTree(X)
+            query = lambda X_block: tree.query(X_block, self.n_neighbors + 1, eps=self.approximation_eps,
+                                               workers=1 if self.n_jobs is None else self.n_jobs)
+        else:
+            nearest_neighbors = NearestNeighbors(metric=self.metric, n_jobs=self.n_jobs).fit(X)
+            query = lambda X_block: nearest_neighbors.kneighbors(X_block, self.n_neighbors + 1)
+        self.indices_ = np.zeros(X.shape[0] * self.n_neighbors, dtype=np.int32)
+        self.distances_ = np.zeros(X.shape[0] * self.n_neighbors, dtype=np.float32)
+        for start in range(0, X.shape[0], self.block_size):
+            ids_in_block = np.arange(start, min(start + self.block_size, X.shape[0]))
+            distances, indices = query(X[ids_in_block])
+            # Remove the object itself (if it is not contained, e.g. due to duplicates, remove the last neighbor)
+            is_self = indices == ids_in_block[:, None]
+            is_self[~np.any(is_self, axis=1), -1] = True
+            positions = slice(start * self.n_neighbors, (start + ids_in_block.shape[0]) * self.n_neighbors)
+            self.indices_[positions] = indices[~is_self]
+            self.distances_[positions] = distances[~is_self]
+        self.indptr_ = np.arange(0, X.shape[0] * self.n_neighbors + 1, self.n_neighbors, dtype=np.int64)
+        return self
+
+    def kneighbors(self, n_neighbors: int = None) -> (np.ndarray, np.ndarray):
+        """
+        Get the distances and ids of the n_neighbors nearest neighbors of each object (not including the object itself).
+
+        Parameters
+        ----------
+        n_neighbors : int
+            The number of nearest neighbors. Must not be larger than the n_neighbors used to compute the graph.
+            If None, all neighbors in the graph will be returned (default: None)
+
+        Returns
+        -------
+        tuple : (np.ndarray, np.ndarray)
+            The distances to the nearest neighbors (sorted in ascending order),
+            The ids of the nearest neighbors
+        """
+        if n_neighbors is None:
+            n_neighbors = self.n_neighbors
+        assert n_neighbors <= self.n_neighbors, "The graph only contains {0} neighbors per object, but {1} are required".format(
+            self.n_neighbors, n_neighbors)
+        knn_distances = self.distances_.reshape(-1, self.n_neighbors)[:, :n_neighbors]
+        knn_ids = self.indices_.reshape(-1, self.n_neighbors)[:, :n_neighbors]
+        return knn_distances, knn_ids
+
+    def to_csr_matrix(self, n_neighbors: int = None) -> scipy.sparse.csr_matrix:
+        """
+        Get the graph as a sparse distance matrix.
+
+        Parameters
+        ----------
+        n_neighbors : int
+            The number of nearest neighbors to include. If None, all neighbors in the graph will be used (default: None)
+
+        Returns
+        -------
+        graph : scipy.sparse.csr_matrix
+            The sparse distance matrix of shape (n_samples, n_samples)
+        """
+        knn_distances, knn_ids = self.kneighbors(n_neighbors)
+        graph = scipy.sparse.csr_matrix((knn_distances.ravel(), knn_ids.ravel(),
+                                         np.arange(0, knn_ids.size + 1, knn_ids.shape[1])),
+                                        shape=(self.n_samples_, self.n_samples_))
+        return graph
+
+    def save(self, path: str) -> None:
+        """
+        Save the graph to disk (as a .npz file).
+
+        Parameters
+        ----------
+        path : str
+            The path where the graph should be stored
+        """
+        np.savez(path, n_neighbors=self.n_neighbors, metric=self.metric, approximation_eps=self.approximation_eps,
+                 indptr=self.indptr_, indices=self.indices_, distances=self.distances_)
+
+    @staticmethod
+    def load(path: str) -> 'NeighborGraph':
+        """
+        Load a graph that has been saved using save().
+
+        Parameters
+        ----------
+        path : str
+            The path of the stored graph
+
+        Returns
+        -------
+        neighbor_graph : NeighborGraph
+            The loaded graph
+        """
+        with np.load(path) as data:
+            neighbor_graph = NeighborGraph(int(data["n_neighbors"]), str(data["metric"]),
+                                           float(data["approximation_eps"]))
+            neighbor_graph.indptr_ = data["indptr"]
+            neighbor_graph.indices_ = data["indices"]
+            neighbor_graph.distances_ = data["distances"]
+        return neighbor_graph
@@ -1,6 +1,6 @@
-from clustpy.utils import dip_test, dip_pval, dip_boot_samples, plot_dip, dip_gradient, dip_pval_gradient
+from clustpy.utils import dip_test, dip_test_batch, dip_pval, dip_boot_samples, plot_dip, dip_gradient, dip_pval_gradient
 from clustpy.utils.diptest import _dip_c_impl, _dip_python_impl, _dip_pval_function, _dip_pval_table, \
-    _get_dip_table_values
+    _get_dip_table_values, _DIP_BOOT_CACHE
 import numpy as np
 from unittest.mock import patch
 
@@ -91,6 +91,52 @@ def test_diptest_python_impl_matches_c_impl_with_random_data():
     assert np.array_equal(mj_py, mj_c)
 
 
+def test_dip_test_batch():
+    random_state = np.random.RandomState(1)
+    # 2-dimensional input (one sample per row)
+    X = random_state.rand(20, 30)
+    X[3] = 1  # unimodal sample
+    X[5, :15] += 2  # multimodal sample
+    dips = dip_test_batch(X)
+    assert dips.shape == (20,)
+    assert np.array_equal(dips, np.array([dip_test(x) for x in X]))
+    # Test modal intervals and modal triangles
+    X_sorted = np.sort(X, axis=1)
+    dips, modal_intervals, modal_triangles = dip_test_batch(X_sorted, just_dip=False, is_data_sorted=True)
+    assert modal_intervals.shape == (20, 2)
+    assert modal_triangles.shape == (20, 3)
+    for i, x in enumerate(X_sorted):
+        dip, modal_interval, modal_triangle = dip_test(x, just_dip=False, is_data_sorted=True)
+        assert dips[i] == dip
+        assert tuple(modal_intervals[i]) == modal_interval
+        assert tuple(modal_triangles[i]) == modal_triangle
+    # Test if python implementation returns the same result
+    dips_py, modal_intervals_py, modal_triangles_py = dip_test_batch(X_sorted, just_dip=False, is_data_sorted=True,
+                                                                     use_c=False)
+    assert np.allclose(dips_py, dips)
+    assert np.array_equal(modal_intervals_py, modal_intervals)
+    assert np.array_equal(modal_triangles_py, modal_triangles)
+    # Test if a C extension without the batch function results in the same result (fallback to dip_test)
+    with patch("clustpy.utils.diptest.c_diptest_batch", None):
+        dips_single, modal_intervals_single, modal_triangles_single = dip_test_batch(X_sorted, just_dip=False,
+                                                                                     is_data_sorted=True)
+    assert np.array_equal(dips_single, dips)
+    assert np.array_equal(modal_intervals_single, modal_intervals)
+    assert np.array_equal(modal_triangles_single, modal_triangles)
+    # Ragged input (including an empty sample and a sample with less than 4 points)
+    X = random_state.rand(40)
+    offsets = np.array([0, 2, 2, 15, 40])
+    dips, modal_intervals, _ = dip_test_batch(np.r_[np.sort(X[:2]), np.sort(X[2:15]), np.sort(X[15:])], offsets,
+                                              just_dip=False, is_data_sorted=True)
+    assert dips.shape == (4,)
+    assert dips[0] == 0 and dips[1] == 0
+    assert np.array_equal(modal_intervals[:2], np.array([[0, 1], [0, -1]]))
+    assert dips[2] == dip_test(X[2:15])
+    assert dips[3] == dip_test(X[15:])
+    assert np.array_equal(dip_test_batch(X, offsets), dips)
+    assert np.allclose(dip_test_batch(X, offsets, use_c=False), dips)
+
+
 def test_dip_pval():
     random_state = np.random.RandomState(1)
     # Multimodal Example
@@ -173,6 +219,34 @@ def test_dip_boot_samples():
     dips = dip_boot_samples(50, n_boots, random_state)
     assert dips.shape[0] == n_boots
     assert np.all(dips >= 0) and np.all(dips <= 0.25)
+    # Same result as calculating each Dip-value separately (also when using multiple threads)
+    dips_separately = np.array([dip_test(x) for x in np.random.RandomState(2).rand(n_boots, 50)])
+    assert np.array_equal(dip_boot_samples(50, n_boots, np.random.RandomState(2)), dips_separately)
+    assert np.array_equal(dip_boot_samples(50, n_boots, np.random.RandomState(2), n_jobs=2), dips_separately)
+
+
+def test_dip_boot_samples_cache(tmp_path):
+    # Results for an int random state are cached
+    dips = dip_boot_samples(60, 100, 3)
+    assert not _DIP_BOOT_CACHE[(60, 100, 3)].flags.writeable
+    assert np.array_equal(_DIP_BOOT_CACHE[(60, 100, 3)], dips)
+    # A copy of the cached values is returned, so modifying the result does not change the cache
+    assert dips.flags.writeable
+    dips_copy = dips.copy()
+    dips[:] = -1
+    assert np.array_equal(dip_boot_samples(60, 100, 3), dips_copy)
+    dips = dips_copy
+    assert np.array_equal(dips, dip_boot_samples(60, 100, np.random.RandomState(3)))
+    assert not np.array_equal(dips, dip_boot_samples(60, 100, 4))
+    # Results can be persisted
+    dips = dip_boot_samples(61, 100, 3, cache_dir=str(tmp_path))
+    assert (tmp_path / "dip_boot_samples_61_100_3.npy").is_file()
+    _DIP_BOOT_CACHE.clear()
+    dips_loaded = dip_boot_samples(61, 100, 3, cache_dir=str(tmp_path))
+    assert dips_loaded is not dips
+    assert np.array_equal(dips_loaded, dips)
+    # Cached results are used by dip_pval
+    assert dip_pval(0.05, 61, pval_strategy="bootstrap", n_boots=100, random_state=3) == np.mean(0.05 <= dips)
 
 
 @patch("matplotlib.pyplot.show")  # Used to test plots (show will not be called)
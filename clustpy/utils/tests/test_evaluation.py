@@ -1,6 +1,7 @@
 import torch
 from clustpy.utils import evaluate_multiple_datasets, evaluate_dataset, EvaluationAlgorithm, EvaluationDataset, \
-    EvaluationMetric, EvaluationAutoencoder, load_saved_autoencoder, evaluation_df_to_latex_table
+    EvaluationMetric, EvaluationAutoencoder, load_saved_autoencoder, evaluation_df_to_latex_table, \
+    EvaluationResultStore
 from clustpy.utils.evaluation import _preprocess_dataset, _get_n_clusters_from_algo
 import numpy as np
 from clustpy.deep.autoencoders import FeedforwardAutoencoder
@@ -100,6 +101,131 @@ def test_evaluate_dataset():
     assert df.shape == (n_repetitions + len(aggregations), len(algorithms) * (len(metrics) + 2))
 
 
+def test_evaluate_dataset_parallel():
+    from sklearn.cluster import KMeans, DBSCAN
+    from sklearn.metrics import normalized_mutual_info_score as nmi, silhouette_score as silhouette
+    X, L = create_subspace_data(300, subspace_features=(3, 2), random_state=1)
+    n_repetitions = 3
+    algorithms = [
+        EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 6, "init": "random", "n_init": 1}),
+        EvaluationAlgorithm(name="DBSCAN", algorithm=DBSCAN, params={"eps": 0.5, "min_samples": 2}, deterministic=True)]
+    metrics = [EvaluationMetric(name="nmi", metric=nmi, params={"average_method": "geometric"}, use_gt=True),
+               EvaluationMetric(name="silhouette", metric=silhouette, use_gt=False)]
+    df_serial = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                                 n_repetitions=n_repetitions, add_runtime=False, add_n_clusters=True, random_state=1)
+    # Results of the repetitions should differ
+    assert df_serial.at[0, ("KMeans", "nmi")] != df_serial.at[1, ("KMeans", "nmi")]
+    for backend in ["processes", "threads"]:
+        df_parallel = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics,
+                                       labels_true=L, n_repetitions=n_repetitions, add_runtime=False,
+                                       add_n_clusters=True, random_state=1, backend=backend, n_jobs=2)
+        assert df_parallel.equals(df_serial)
+
+
+def test_evaluate_dataset_with_failing_algorithm():
+    from sklearn.cluster import KMeans
+    X = np.array([[0, 0], [1, 1], [2, 2], [5, 5], [6, 6], [7, 7]])
+    algorithms = [
+        EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 2}),
+        EvaluationAlgorithm(name="KMeans_unknown_param", algorithm=KMeans, params={"n_clusters": 2, "unknown": 1}),
+        EvaluationAlgorithm(name="KMeans_failing_preprocess", algorithm=KMeans, params={"n_clusters": 2},
+                            preprocess_methods=[_add_value], preprocess_params=[{"unknown": 1}])]
+    for backend in ["serial", "threads"]:
+        # Runs that raise an exception are skipped, the remaining runs are still executed
+        df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, n_repetitions=2, aggregation_functions=[],
+                              add_n_clusters=True, random_state=1, backend=backend, n_jobs=2)
+        assert np.array_equal(df[("KMeans", "n_clusters")].values, [2, 2])
+        assert np.array_equal(df[("KMeans_unknown_param", "n_clusters")].values, [0, 0])
+        assert np.array_equal(df[("KMeans_failing_preprocess", "n_clusters")].values, [0, 0])
+
+
+def test_evaluate_dataset_preprocessing_once_per_algorithm():
+    from sklearn.cluster import KMeans
+    X = np.array([[0, 0], [1, 1], [2, 2], [5, 5], [6, 6], [7, 7]])
+    preprocessed_data_sets = []
+
+    def _add_noise(X):
+        X_processed = X + np.random.rand(*X.shape)
+        preprocessed_data_sets.append(X_processed)
+        return X_processed
+
+    algorithms = [EvaluationAlgorithm(name="KMeans_with_noise", algorithm=KMeans, params={"n_clusters": 2},
+                                      preprocess_methods=_add_noise)]
+    for backend in ["serial", "threads"]:
+        preprocessed_data_sets.clear()
+        df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, n_repetitions=3, aggregation_functions=[],
+                              add_runtime=False, add_n_clusters=True, random_state=1, backend=backend, n_jobs=2)
+        # The randomized preprocessing is executed once and shared by all repetitions
+        assert len(preprocessed_data_sets) == 1
+        assert np.array_equal(df[("KMeans_with_noise", "n_clusters")].values, [2, 2, 2])
+
+
+def test_evaluate_dataset_with_result_store(tmp_path):
+    from sklearn.cluster import KMeans, DBSCAN
+    from sklearn.metrics import normalized_mutual_info_score as nmi
+    X, L = create_subspace_data(300, subspace_features=(3, 2), random_state=1)
+    store_path = str(tmp_path / "results.db")
+    algorithms = [
+        EvaluationAlgorithm(name="KMeans", algorithm=KMeans, params={"n_clusters": 6, "init": "random", "n_init": 1}),
+        EvaluationAlgorithm(name="DBSCAN", algorithm=DBSCAN, params={"eps": 0.5, "min_samples": 2}, deterministic=True)]
+    metrics = [EvaluationMetric(name="nmi", metric=nmi, params={"average_method": "geometric"}, use_gt=True)]
+    df = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                          n_repetitions=3, add_runtime=True, add_n_clusters=True, random_state=1,
+                          result_store=store_path, dataset_name="subspace")
+    store = EvaluationResultStore(store_path)
+    df_store = store.to_dataframe()
+    assert df_store.shape[0] == 4  # 3 runs of KMeans + 1 run of DBSCAN
+    assert "peak_memory" not in df_store.columns
+    run_hash = df_store[df_store["algorithm"] == "DBSCAN"]["run_hash"].iloc[0]
+    assert np.array_equal(store.get_labels("subspace", "DBSCAN", run_hash, 0), DBSCAN(eps=0.5, min_samples=2).fit(X).labels_)
+    # Rerun should use the stored results (including the runtime)
+    df_rerun = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                                n_repetitions=3, add_runtime=True, add_n_clusters=True, random_state=1,
+                                result_store=store, dataset_name="subspace", backend="threads", n_jobs=2)
+    assert df_rerun.equals(df)
+    assert store.to_dataframe().shape[0] == 4
+    # Changed parameters result in new runs
+    algorithms[1].params["eps"] = 0.6
+    evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                     n_repetitions=3, add_runtime=True, add_n_clusters=True, random_state=1,
+                     result_store=store, dataset_name="subspace")
+    assert store.to_dataframe().shape[0] == 5
+    # Stored runs without peak memory are executed again if the peak memory is requested
+    df_memory = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                                 n_repetitions=3, add_runtime=False, add_n_clusters=True, random_state=1,
+                                 result_store=store, dataset_name="subspace", add_peak_memory=True)
+    assert np.all(df_memory.loc[range(3), (slice(None), "peak_memory")].values > 0)
+    assert np.array_equal(df_memory.loc[range(3), ("KMeans", "nmi")].values, df.loc[range(3), ("KMeans", "nmi")].values)
+    df_store = store.to_dataframe()
+    assert df_store.shape[0] == 5
+    assert "peak_memory" in df_store.columns
+    # Adding a metric results in new runs that contain all metrics
+    from sklearn.metrics import adjusted_rand_score as ari
+    metrics_extended = metrics + [EvaluationMetric(name="ari", metric=ari, use_gt=True)]
+    df_metric = evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics_extended,
+                                 labels_true=L, n_repetitions=3, add_runtime=False, add_n_clusters=True,
+                                 random_state=1, result_store=store, dataset_name="subspace")
+    assert store.to_dataframe().shape[0] == 9
+    assert np.all(df_metric.loc[range(3), (slice(None), "ari")].values != 0)
+    assert np.array_equal(df_metric.loc[range(3), ("KMeans", "nmi")].values, df.loc[range(3), ("KMeans", "nmi")].values)
+    # Another data set with the same name does not reuse the stored runs
+    X_2, L_2 = create_subspace_data(300, subspace_features=(3, 2), random_state=2)
+    df_2 = evaluate_dataset(X=X_2, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L_2,
+                            n_repetitions=3, add_runtime=False, add_n_clusters=True, random_state=1,
+                            result_store=store, dataset_name="subspace")
+    assert store.to_dataframe().shape[0] == 13
+    assert not np.array_equal(df_2.loc[range(3), ("KMeans", "nmi")].values,
+                              df.loc[range(3), ("KMeans", "nmi")].values)
+    # The name of the data set must be specified if a result store is used
+    with pytest.raises(AssertionError):
+        evaluate_dataset(X=X, evaluation_algorithms=algorithms, evaluation_metrics=metrics, labels_true=L,
+                         n_repetitions=3, random_state=1, result_store=store)
+    # Values that are not natively serializable by json can be stored
+    store.save_result("subspace", "Other", "hash", 0, {"n_clusters": np.int64(2), "centers": np.zeros(2),
+                                                        "algorithm": KMeans}, np.zeros(3))
+    assert store.get_result("subspace", "Other", "hash", 0)["n_clusters"] == 2
+
+
 @pytest.mark.usefixtures("cleanup_autoencoders")
 def test_evaluate_dataset_with_autoencoders():
     from sklearn.cluster import KMeans
@@ -1,6 +1,7 @@
 from clustpy.utils._information_theory import bic_costs, mdl_costs_probability, \
     integer_costs, mdl_costs_gmm_multiple_covariances, mdl_costs_gmm_common_covariance, _mdl_costs_gaussian, \
-    mdl_costs_gaussian_diagonal_covariance, mdl_costs_gaussian_full_covariance, mdl_costs_gaussian_spherical_covariance
+    mdl_costs_gaussian_diagonal_covariance, mdl_costs_gaussian_full_covariance, mdl_costs_gaussian_spherical_covariance, \
+    mdl_costs_gaussian_spherical_covariance_from_trace
 from sklearn.mixture import GaussianMixture as GMM
 import numpy as np
 
@@ -151,6 +152,8 @@ def test_mdl_costs_gaussian():
     mdl_our2 = mdl_costs_gaussian_spherical_covariance(X.shape[1], scatter, X.shape[0], None)
     assert abs(mdl_real - mdl_our) < 1e-9
     assert mdl_our == mdl_our2
+    mdl_our3 = mdl_costs_gaussian_spherical_covariance_from_trace(X.shape[1], np.trace(scatter), X.shape[0])
+    assert mdl_our == mdl_our3
     # Diagonal
     mdl_real = _real_costs_of_single_gauss(X, mean, "diag")
     mdl_our = _mdl_costs_gaussian(X.shape[1], scatter, X.shape[0], None, "diag")
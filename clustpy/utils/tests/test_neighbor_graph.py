@@ -0,0 +1,48 @@
+from clustpy.utils import NeighborGraph
+from sklearn.datasets import make_blobs
+from sklearn.neighbors import NearestNeighbors
+import numpy as np
+import os
+
+
+def test_NeighborGraph():
+    X, _ = make_blobs(300, 3, centers=3, random_state=1)
+    neighbor_graph = NeighborGraph(10, block_size=70)
+    assert not hasattr(neighbor_graph, "indices_")
+    neighbor_graph.fit(X)
+    assert neighbor_graph.n_samples_ == X.shape[0]
+    assert neighbor_graph.indices_.dtype == np.int32
+    assert neighbor_graph.distances_.dtype == np.float32
+    # Compare to sklearn
+    expected_distances, expected_ids = NearestNeighbors(n_neighbors=10).fit(X).kneighbors()
+    knn_distances, knn_ids = neighbor_graph.kneighbors()
+    assert np.array_equal(knn_ids, expected_ids)
+    assert np.allclose(knn_distances, expected_distances, atol=1e-5)
+    # Use fewer neighbors
+    knn_distances, knn_ids = neighbor_graph.kneighbors(4)
+    assert knn_ids.shape == (X.shape[0], 4)
+    assert np.array_equal(knn_ids, expected_ids[:, :4])
+    # Sparse matrix
+    graph = neighbor_graph.to_csr_matrix(4)
+    assert graph.shape == (X.shape[0], X.shape[0])
+    assert graph.nnz == X.shape[0] * 4
+    assert np.allclose(graph[0, expected_ids[0, :4]].toarray(), expected_distances[0, :4], atol=1e-5)
+    # Approximate search
+    neighbor_graph_approx = NeighborGraph(10, approximation_eps=0.5).fit(X)
+    knn_distances_approx, knn_ids_approx = neighbor_graph_approx.kneighbors()
+    assert knn_ids_approx.shape == (X.shape[0], 10)
+    assert not np.any(knn_ids_approx == np.arange(X.shape[0])[:, None])
+    assert np.all(knn_distances_approx[:, -1] <= 1.5 * expected_distances[:, -1] + 1e-5)
+
+
+def test_NeighborGraph_save_and_load(tmp_path):
+    X, _ = make_blobs(100, 3, centers=3, random_state=1)
+    neighbor_graph = NeighborGraph(5, metric="manhattan").fit(X)
+    path = os.path.join(tmp_path, "neighbor_graph.npz")
+    neighbor_graph.save(path)
+    loaded = NeighborGraph.load(path)
+    assert loaded.n_neighbors == 5
+    assert loaded.metric == "manhattan"
+    assert loaded.n_samples_ == X.shape[0]
+    assert np.array_equal(loaded.indices_, neighbor_graph.indices_)
+    assert np.array_equal(loaded.distances_, neighbor_graph.distances_)